@@ -0,0 +1,383 @@
+"""
+Analytics which compare the planned and actual schedules of a session over a range of
+dates. Planned tasks are matched to actual tasks with the same name which start close
+to them in time, from which we get the start delay and duration overrun of each task
+that was done, the planned tasks which were missed, the actual tasks which weren't
+planned, and the adherence to the plan over each week or month.
+
+Tasks are compared as NumPy columns (start and end times as int64 microseconds since
+the epoch, priorities, and name ids), and matched by rounds of vectorized nearest
+neighbour searches, so that comparing a year of history doesn't loop over Task objects.
+The columns of a ColumnarSchedule are used as they are (see
+ColumnarSchedule.interval_columns()). NumPy is an optional dependency, which is only
+needed for analytics.
+"""
+
+from datetime import datetime, date, time, timedelta
+from typing import List, Dict, Tuple, NamedTuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from flowshop.columnar import (
+    ColumnarSchedule,
+    EPOCH,
+    MICROSECOND,
+    MICROSECONDS_PER_HOUR,
+    to_epoch,
+)
+from flowshop.schedule import Schedule
+from flowshop.task import Task
+
+
+# Planned and actual tasks are only matched if they start at most this far apart.
+MAX_DISTANCE = timedelta(hours=12)
+
+WEEK = "week"
+MONTH = "month"
+PERIODS = [WEEK, MONTH]
+
+MICROSECONDS_PER_DAY = 24 * MICROSECONDS_PER_HOUR
+
+
+class TaskColumns(NamedTuple):
+    """ Tasks as columns, in order of start time. """
+
+    starts: "np.ndarray"
+    ends: "np.ndarray"
+    priorities: "np.ndarray"
+    name_ids: "np.ndarray"
+
+    def points(self) -> "np.ndarray":
+        """ Points of each task. """
+        return self.priorities * (self.ends - self.starts) / MICROSECONDS_PER_HOUR
+
+
+class PeriodAdherence(NamedTuple):
+    """
+    Comparison of the planned and actual tasks which start in a week or a month.
+    ``completed_points`` are the points of the planned tasks which were done, and
+    ``adherence`` is those as a percentage of ``planned_points`` (or 100 if nothing was
+    planned), as for Session.range_score().
+    """
+
+    start_date: date
+    planned_points: float
+    actual_points: float
+    completed_points: float
+    num_missed: int
+    num_unplanned: int
+    adherence: float
+
+
+class ScheduleComparison:
+    """
+    Comparison of the ``planned`` and ``actual`` tasks (as TaskColumns) of a session,
+    where ``names`` maps name ids to names. ``planned_match`` holds the index of the
+    actual task matched to each planned task, and ``actual_match`` the index of the
+    planned task matched to each actual task, or -1 for tasks which weren't matched.
+    """
+
+    def __init__(
+        self,
+        names: List[str],
+        planned: TaskColumns,
+        actual: TaskColumns,
+        planned_match: "np.ndarray",
+        actual_match: "np.ndarray",
+    ) -> None:
+        """ Init function for ScheduleComparison object. """
+
+        self.names = names
+        self.planned = planned
+        self.actual = actual
+        self.planned_match = planned_match
+        self.actual_match = actual_match
+
+    def matches(self) -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        Return the indices of the matched planned tasks, in order of start time, along
+        with the indices of the actual tasks matched to them.
+        """
+
+        planned_indices = np.flatnonzero(self.planned_match >= 0)
+        return planned_indices, self.planned_match[planned_indices]
+
+    def start_delays(self) -> "np.ndarray":
+        """
+        Hours from the planned start to the actual start of each matched task (negative
+        for tasks which started early), in the order of matches().
+        """
+
+        planned_indices, actual_indices = self.matches()
+        delays = (
+            self.actual.starts[actual_indices] - self.planned.starts[planned_indices]
+        )
+        return delays / MICROSECONDS_PER_HOUR
+
+    def overruns(self) -> "np.ndarray":
+        """
+        Hours by which each matched task took longer than planned (negative for tasks
+        which took less time), in the order of matches().
+        """
+
+        planned_indices, actual_indices = self.matches()
+        actual_durations = (
+            self.actual.ends[actual_indices] - self.actual.starts[actual_indices]
+        )
+        planned_durations = (
+            self.planned.ends[planned_indices] - self.planned.starts[planned_indices]
+        )
+        return (actual_durations - planned_durations) / MICROSECONDS_PER_HOUR
+
+    def missed(self) -> "np.ndarray":
+        """ Indices of the planned tasks which weren't done. """
+        return np.flatnonzero(self.planned_match < 0)
+
+    def unplanned(self) -> "np.ndarray":
+        """ Indices of the actual tasks which weren't planned. """
+        return np.flatnonzero(self.actual_match < 0)
+
+    def task(self, planned: bool, index: int) -> Task:
+        """ Return the planned or actual task with index ``index`` as a Task. """
+
+        columns = self.planned if planned else self.actual
+        return Task(
+            self.names[columns.name_ids[index]],
+            priority=float(columns.priorities[index]),
+            start_time=EPOCH + int(columns.starts[index]) * MICROSECOND,
+            end_time=EPOCH + int(columns.ends[index]) * MICROSECOND,
+        )
+
+    def adherence(self, period: str = WEEK) -> List[PeriodAdherence]:
+        """
+        Compare the planned and actual tasks which start in each week (starting on
+        Monday) or month, for each period with tasks in it, in order.
+        """
+
+        if period not in PERIODS:
+            raise ValueError("Unrecognized period %s." % period)
+
+        planned_periods = _periods(self.planned.starts, period)
+        actual_periods = _periods(self.actual.starts, period)
+        keys, inverse = np.unique(
+            np.concatenate((planned_periods, actual_periods)), return_inverse=True
+        )
+        planned_inverse = inverse[: len(planned_periods)]
+        actual_inverse = inverse[len(planned_periods) :]
+
+        def total(indices: "np.ndarray", weights: "np.ndarray" = None) -> "np.ndarray":
+            """ Sum ``weights`` (or count) by period. """
+            return np.bincount(indices, weights, minlength=len(keys))
+
+        done = self.planned_match >= 0
+        points = self.planned.points()
+        planned_points = total(planned_inverse, points)
+        actual_points = total(actual_inverse, self.actual.points())
+        completed_points = total(planned_inverse, points * done)
+        num_missed = total(planned_inverse, ~done)
+        num_unplanned = total(actual_inverse, self.actual_match < 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            adherence = np.where(
+                planned_points > 0, 100.0 * completed_points / planned_points, 100.0
+            )
+
+        return [
+            PeriodAdherence(
+                _period_start(int(key), period),
+                float(planned_points[k]),
+                float(actual_points[k]),
+                float(completed_points[k]),
+                int(num_missed[k]),
+                int(num_unplanned[k]),
+                float(adherence[k]),
+            )
+            for k, key in enumerate(keys)
+        ]
+
+
+def compare_schedules(
+    planned: Schedule,
+    actual: Schedule,
+    start_date: date,
+    end_date: date,
+    max_distance: timedelta = MAX_DISTANCE,
+) -> ScheduleComparison:
+    """
+    Compare the tasks of ``planned`` and ``actual`` which start in the days from
+    ``start_date`` up to (but not including) ``end_date``. Tasks are matched to tasks
+    with the same name which start at most ``max_distance`` apart, each planned task to
+    at most one actual task, closest pairs first.
+    """
+
+    if np is None:
+        raise ImportError("Analytics require numpy.")
+
+    start_time = datetime.combine(start_date, time())
+    end_time = datetime.combine(end_date, time())
+    name_ids: Dict[str, int] = {}
+    planned_columns = schedule_columns(planned, start_time, end_time, name_ids)
+    actual_columns = schedule_columns(actual, start_time, end_time, name_ids)
+    planned_match, actual_match = _match(
+        planned_columns, actual_columns, max_distance // MICROSECOND
+    )
+    names = sorted(name_ids, key=name_ids.get)
+    return ScheduleComparison(
+        names, planned_columns, actual_columns, planned_match, actual_match
+    )
+
+
+def compare_session(
+    session, start_date: date, end_date: date, max_distance: timedelta = MAX_DISTANCE
+) -> ScheduleComparison:
+    """ Compare the current planned and actual schedules of ``session``. """
+
+    planned, actual = session.current_schedules()
+    return compare_schedules(planned, actual, start_date, end_date, max_distance)
+
+
+def schedule_columns(
+    schedule: Schedule,
+    start_time: datetime,
+    end_time: datetime,
+    name_ids: Dict[str, int],
+) -> TaskColumns:
+    """
+    Return the tasks of ``schedule`` which start from ``start_time`` up to ``end_time``
+    as columns, with name ids from ``name_ids``, to which new names are added. Tasks
+    without a priority get a priority of 0.
+    """
+
+    if isinstance(schedule, ColumnarSchedule):
+        starts, ends, priorities, task_name_ids = schedule.interval_columns(
+            start_time, end_time
+        )
+        inside = (starts >= to_epoch(start_time)) & (starts < to_epoch(end_time))
+        starts = starts[inside]
+        ends = ends[inside]
+        priorities = np.nan_to_num(priorities[inside])
+        lookup = np.array(
+            [name_ids.setdefault(name, len(name_ids)) for name in schedule.names],
+            dtype=np.int64,
+        )
+        ids = lookup[task_name_ids[inside]]
+    else:
+        tasks = [
+            task
+            for task in schedule.tasks_in_interval(start_time, end_time)
+            if start_time <= task.start_time < end_time
+        ]
+        starts = _epochs(task.start_time for task in tasks)
+        ends = _epochs(task.end_time for task in tasks)
+        priorities = np.fromiter(
+            (task.priority or 0.0 for task in tasks), np.float64, len(tasks)
+        )
+        ids = np.fromiter(
+            (name_ids.setdefault(task.name, len(name_ids)) for task in tasks),
+            np.int64,
+            len(tasks),
+        )
+
+    return TaskColumns(starts, ends, priorities, ids)
+
+
+def _match(
+    planned: TaskColumns, actual: TaskColumns, max_distance: int
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Match planned tasks to actual tasks with the same name whose starts are at most
+    ``max_distance`` microseconds apart, returning the index of the match of each
+    planned task and of each actual task (or -1). Tasks are sorted by a key which
+    separates names by more than ``max_distance``, so that a nearest neighbour by key
+    which is close enough has the same name. Each round matches the unmatched pairs of
+    tasks which are each other's nearest neighbour, until a round matches nothing.
+    """
+
+    planned_match = np.full(len(planned.starts), -1, dtype=np.int64)
+    actual_match = np.full(len(actual.starts), -1, dtype=np.int64)
+    if len(planned.starts) == 0 or len(actual.starts) == 0:
+        return planned_match, actual_match
+
+    origin = min(planned.starts.min(), actual.starts.min())
+    span = max(planned.starts.max(), actual.starts.max()) - origin
+    name_span = int(span) + 2 * max_distance + 1
+    num_names = int(max(planned.name_ids.max(), actual.name_ids.max())) + 1
+    if num_names * name_span >= 2 ** 63:
+        raise ValueError("Too many task names to match over this range of time.")
+    planned_keys = planned.name_ids * name_span + (planned.starts - origin)
+    actual_keys = actual.name_ids * name_span + (actual.starts - origin)
+
+    # Unmatched tasks, as indices sorted by key.
+    planned_free = np.argsort(planned_keys, kind="stable")
+    actual_free = np.argsort(actual_keys, kind="stable")
+    while len(planned_free) > 0 and len(actual_free) > 0:
+        planned_sorted = planned_keys[planned_free]
+        actual_sorted = actual_keys[actual_free]
+        nearest_actual, distance = _nearest(planned_sorted, actual_sorted)
+        nearest_planned, _ = _nearest(actual_sorted, planned_sorted)
+
+        mutual = (nearest_planned[nearest_actual] == np.arange(len(planned_free))) & (
+            distance <= max_distance
+        )
+        if not mutual.any():
+            break
+        planned_indices = planned_free[mutual]
+        actual_indices = actual_free[nearest_actual[mutual]]
+        planned_match[planned_indices] = actual_indices
+        actual_match[actual_indices] = planned_indices
+
+        planned_free = planned_free[~mutual]
+        matched_actual = np.zeros(len(actual_free), dtype=bool)
+        matched_actual[nearest_actual[mutual]] = True
+        actual_free = actual_free[~matched_actual]
+
+    return planned_match, actual_match
+
+
+def _nearest(
+    keys: "np.ndarray", other_keys: "np.ndarray"
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Return the position of the nearest of sorted ``other_keys`` to each of ``keys``
+    (the earlier one on ties), along with its distance.
+    """
+
+    positions = np.searchsorted(other_keys, keys)
+    left = np.clip(positions - 1, 0, len(other_keys) - 1)
+    right = np.clip(positions, 0, len(other_keys) - 1)
+    left_distance = np.abs(keys - other_keys[left])
+    right_distance = np.abs(other_keys[right] - keys)
+    use_right = right_distance < left_distance
+    return (
+        np.where(use_right, right, left),
+        np.where(use_right, right_distance, left_distance),
+    )
+
+
+def _periods(starts: "np.ndarray", period: str) -> "np.ndarray":
+    """
+    Return the period of each start time, as the number of days from the epoch to the
+    Monday of its week, or the number of months from the epoch to its month.
+    """
+
+    if period == WEEK:
+        # The epoch is a Thursday, the 3rd day of its week counting from 0.
+        days = starts // MICROSECONDS_PER_DAY
+        return days - (days + 3) % 7
+    months = starts.astype("datetime64[us]").astype("datetime64[M]")
+    return months.astype(np.int64)
+
+
+def _period_start(key: int, period: str) -> date:
+    """ Return the first day of the period with key ``key`` (see _periods()). """
+
+    if period == WEEK:
+        return EPOCH.date() + timedelta(days=key)
+    return date(EPOCH.year + key // 12, key % 12 + 1, 1)
+
+
+def _epochs(times) -> "np.ndarray":
+    """ Convert an iterable of datetimes into an int64 array of epoch microseconds. """
+    return np.fromiter((to_epoch(time_point) for time_point in times), np.int64)
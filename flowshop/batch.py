@@ -0,0 +1,228 @@
+"""
+Batch scoring of many saved sessions over a process pool. Session names are split into
+chunks, and each worker process reads the sessions of a chunk from STORAGE_DIR itself
+(see flowshop.reports.session_schedules()), so only names go to the workers and only
+scores come back. Chunks are scored in parallel and their results are written to a
+single JSON file in order of name, as each chunk in turn finishes.
+
+The scores of a session are the points of its current schedules, a table of the score
+of each day of each week with tasks, and, if NumPy is installed, adherence to the plan
+(see flowshop.analytics).
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from typing import List, Dict, Any, Sequence, Iterator, NamedTuple, Optional, TextIO
+
+from flowshop import analytics, files
+from flowshop.reports import session_schedules, week_report
+from flowshop.schedule import Schedule
+from flowshop.session import score
+
+
+# Number of sessions scored by a worker at a time.
+CHUNK_SIZE = 16
+
+
+class WeekScores(NamedTuple):
+    """
+    Scores of the week of a session which starts on ``week_start``: its points and
+    score, the score of each day from Monday to Sunday, and the adherence to the plan
+    along with the numbers of missed and unplanned tasks (or None without NumPy).
+    """
+
+    week_start: date
+    planned_points: float
+    actual_points: float
+    score: float
+    daily_scores: List[float]
+    adherence: Optional[float]
+    num_missed: Optional[int]
+    num_unplanned: Optional[int]
+
+
+class SessionScores(NamedTuple):
+    """
+    Scores of a session: the points of its current schedules, its score and adherence
+    over the range of dates which was scored, the mean start delay and overrun in hours
+    of the tasks which were done (or None without NumPy, or without such tasks), and the
+    scores of each week with tasks.
+    """
+
+    name: str
+    planned_points: float
+    actual_points: float
+    score: float
+    adherence: Optional[float]
+    mean_start_delay: Optional[float]
+    mean_overrun: Optional[float]
+    weeks: List[WeekScores]
+
+
+def score_sessions(
+    names: Sequence[str], start_date: date, end_date: date
+) -> List[SessionScores]:
+    """
+    Score the saved sessions with names ``names`` over the weeks from the week of
+    ``start_date`` up to ``end_date`` (see flowshop.reports.weekly_reports()), reading
+    them one at a time.
+    """
+
+    return [
+        score_schedules(name, planned, actual, start_date, end_date)
+        for name, planned, actual in session_schedules(names)
+    ]
+
+
+def score_schedules(
+    name: str, planned: Schedule, actual: Schedule, start_date: date, end_date: date
+) -> SessionScores:
+    """ Score the schedules of session ``name`` (see score_sessions()). """
+
+    first_monday = start_date - timedelta(days=start_date.weekday())
+    week_starts = []
+    range_end = first_monday
+    while range_end < end_date:
+        week_starts.append(range_end)
+        range_end += timedelta(days=7)
+
+    comparison = None
+    adherence: Dict[date, analytics.PeriodAdherence] = {}
+    if analytics.np is not None:
+        comparison = analytics.compare_schedules(
+            planned, actual, first_monday, range_end
+        )
+        adherence = {week.start_date: week for week in comparison.adherence()}
+
+    weeks = []
+    for week_start in week_starts:
+        report = week_report(
+            name, planned, actual, week_start, week_start + timedelta(days=7)
+        )
+        if report.num_planned == 0 and report.num_actual == 0:
+            continue
+
+        # Weeks with tasks which start in other weeks have no adherence of their own.
+        week = adherence.get(
+            week_start,
+            analytics.PeriodAdherence(week_start, 0.0, 0.0, 0.0, 0, 0, 100.0),
+        )
+        weeks.append(
+            WeekScores(
+                week_start,
+                report.planned_points,
+                report.actual_points,
+                report.score,
+                [
+                    _day_score(planned, actual, week_start + timedelta(days=day))
+                    for day in range(7)
+                ],
+                None if comparison is None else week.adherence,
+                None if comparison is None else week.num_missed,
+                None if comparison is None else week.num_unplanned,
+            )
+        )
+
+    range_adherence = None
+    mean_start_delay = None
+    mean_overrun = None
+    if comparison is not None:
+        points = comparison.planned.points()
+        range_adherence = score(
+            float(points.sum()), float(points[comparison.planned_match >= 0].sum())
+        )
+        if len(comparison.matches()[0]) > 0:
+            mean_start_delay = float(comparison.start_delays().mean())
+            mean_overrun = float(comparison.overruns().mean())
+
+    return SessionScores(
+        name,
+        planned.points(),
+        actual.points(),
+        score(
+            sum(week.planned_points for week in weeks),
+            sum(week.actual_points for week in weeks),
+        ),
+        range_adherence,
+        mean_start_delay,
+        mean_overrun,
+        weeks,
+    )
+
+
+def score_sessions_parallel(
+    names: Sequence[str],
+    start_date: date,
+    end_date: date,
+    num_workers: int = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[SessionScores]:
+    """
+    Score the saved sessions with names ``names`` (see score_sessions()) in chunks of
+    ``chunk_size`` sessions over ``num_workers`` worker processes (by default, one per
+    CPU), yielding the scores of each session in the order of ``names``.
+    """
+
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    if num_workers < 1:
+        raise ValueError("Need at least 1 worker, not %d." % num_workers)
+    if chunk_size < 1:
+        raise ValueError("Need at least 1 session per chunk, not %d." % chunk_size)
+
+    chunks = [names[i : i + chunk_size] for i in range(0, len(names), chunk_size)]
+    with ProcessPoolExecutor(
+        num_workers, initializer=_init_worker, initargs=(files.STORAGE_DIR,)
+    ) as executor:
+        futures = [
+            executor.submit(score_sessions, chunk, start_date, end_date)
+            for chunk in chunks
+        ]
+        for future in futures:
+            yield from future.result()
+
+
+def write_scores(scores: Iterator[SessionScores], output: TextIO) -> int:
+    """
+    Write the scores of sessions to ``output`` as a JSON array with one object per
+    session, one session at a time. Returns the number of sessions written.
+    """
+
+    output.write("[")
+    num_sessions = 0
+    for session_scores in scores:
+        output.write(
+            "%s\n  %s"
+            % (
+                "," if num_sessions > 0 else "",
+                json.dumps(_scores_dict(session_scores)),
+            )
+        )
+        num_sessions += 1
+    output.write("\n]\n" if num_sessions > 0 else "]\n")
+    return num_sessions
+
+
+def _init_worker(storage_dir: str) -> None:
+    """ Read sessions from ``storage_dir`` in a worker process. """
+    files.STORAGE_DIR = storage_dir
+
+
+def _day_score(planned: Schedule, actual: Schedule, day: date) -> float:
+    """ Compute the score of a single day, as Session.daily_score() does. """
+
+    next_day = day + timedelta(days=1)
+    return score(planned.days_points(day, next_day), actual.days_points(day, next_day))
+
+
+def _scores_dict(session_scores: SessionScores) -> Dict[str, Any]:
+    """ Convert the scores of a session into a dict which can be dumped to JSON. """
+
+    scores_dict = session_scores._asdict()
+    scores_dict["weeks"] = [
+        dict(week._asdict(), week_start=week.week_start.isoformat())
+        for week in session_scores.weeks
+    ]
+    return scores_dict
@@ -0,0 +1,187 @@
+"""
+Schedule backed by NumPy arrays, for fast aggregates over large schedules. NumPy is an
+optional dependency, which is only needed to construct a ColumnarSchedule.
+"""
+
+from datetime import datetime, timedelta
+from typing import List, Dict, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from flowshop.schedule import Schedule
+from flowshop.task import Task
+
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+MICROSECONDS_PER_HOUR = 3600 * 10 ** 6
+
+
+def to_epoch(time: datetime) -> int:
+    """ Convert a (naive) datetime into integer microseconds since the epoch. """
+    return (time - EPOCH) // MICROSECOND
+
+
+def to_epochs(times: Sequence[datetime]) -> "np.ndarray":
+    """ Convert (naive) datetimes into an int64 array of microseconds since the epoch. """
+    return np.fromiter((to_epoch(time) for time in times), np.int64, len(times))
+
+
+class ColumnarSchedule(Schedule):
+    """
+    Schedule which also stores its tasks as columns: start and end times as int64
+    microseconds since the epoch, priorities as float64 and names as int32 ids into a
+    table of names. The Schedule API is unchanged, and whole-schedule aggregates
+    (points, interval points, overlap checking and interval selection) are computed
+    over the columns with NumPy instead of by looping over Task objects.
+
+    Columns are never modified in place, only replaced, so that copies of a schedule
+    can share them. The table of names is only ever appended to, and is shared too.
+    """
+
+    def __init__(self, name: str, tasks: List[Task] = None) -> None:
+        """ Init function for ColumnarSchedule object. """
+
+        if np is None:
+            raise ImportError("ColumnarSchedule requires numpy.")
+
+        self._names: List[str] = []
+        self._name_ids: Dict[str, int] = {}
+        super().__init__(name, tasks)
+
+    def __setstate__(self, state) -> None:
+        """ Restore state when unpickling, and rebuild columns. """
+
+        self._names = []
+        self._name_ids = {}
+        super().__setstate__(state)
+
+    def splice_tasks(
+        self, task_index: int, num_removed: int, new_tasks: Sequence[Task]
+    ) -> None:
+        """ Replace a run of tasks (see Schedule.splice_tasks()), updating columns. """
+
+        super().splice_tasks(task_index, num_removed, new_tasks)
+        end_index = task_index + num_removed
+        columns = self._task_columns(new_tasks)
+        self._starts, self._ends, self._priorities, self._task_name_ids = (
+            np.concatenate((old[:task_index], new, old[end_index:]))
+            for old, new in zip(self._columns(), columns)
+        )
+
+    def check_for_overlap(self) -> None:
+        """
+        Checks whether self.tasks contains any overlapping tasks. Raises an error if so.
+        """
+
+        # Only sort (which rebuilds the columns) if the tasks aren't already sorted.
+        if np.any(self._starts[1:] < self._starts[:-1]):
+            self._sort_tasks()
+        overlapping = np.flatnonzero(self._ends[:-1] > self._starts[1:])
+        if len(overlapping) > 0:
+            i = overlapping[0]
+            raise ValueError(
+                "Schedule contains overlapping tasks %s and %s."
+                % (self.tasks[i], self.tasks[i + 1])
+            )
+
+    def points(self) -> float:
+        """ Computes points earned for entire schedule. """
+
+        hours = (self._ends - self._starts) / MICROSECONDS_PER_HOUR
+        return float(np.sum(self._priorities * hours))
+
+    def interval_points(self, start_time: datetime, end_time: datetime) -> float:
+        """ Computes points for all tasks within a given time interval. """
+
+        indices = self._interval_indices(start_time, end_time)
+        hours = (self._ends[indices] - self._starts[indices]) / MICROSECONDS_PER_HOUR
+        return float(np.sum(self._priorities[indices] * hours))
+
+    def tasks_in_interval(self, start_time: datetime, end_time: datetime) -> List[Task]:
+        """
+        Returns a list of all tasks in the schedule that overlap the interval
+        (start_time, end_time).
+        """
+
+        return [self.tasks[i] for i in self._interval_indices(start_time, end_time)]
+
+    def interval_columns(self, start_time: datetime, end_time: datetime) -> tuple:
+        """
+        Returns the columns (start times, end times, priorities and name ids) of the
+        tasks in the schedule that overlap the interval (start_time, end_time), as
+        tasks_in_interval() selects them. Name ids are indices into self.names.
+        """
+
+        indices = self._interval_indices(start_time, end_time)
+        return tuple(column[indices] for column in self._columns())
+
+    @property
+    def names(self) -> Sequence[str]:
+        """ Table of task names, indexed by name id. It is only ever appended to. """
+        return self._names
+
+    def _interval_indices(
+        self, start_time: datetime, end_time: datetime
+    ) -> "np.ndarray":
+        """
+        Indices into self.tasks of the tasks that overlap the interval (start_time,
+        end_time), using the same rules as Schedule.tasks_in_interval().
+        """
+
+        start = to_epoch(start_time)
+        end = to_epoch(end_time)
+        starts = self._starts
+        ends = self._ends
+
+        # Narrow down to candidates by start time, unless the window is degenerate.
+        low, high = 0, len(starts)
+        if end >= start:
+            max_duration = self._max_duration // MICROSECOND
+            low = int(np.searchsorted(starts, start - max_duration, side="left"))
+            high = int(np.searchsorted(starts, end, side="right"))
+        starts = starts[low:high]
+        ends = ends[low:high]
+
+        overlapping_start = (starts >= start) & (starts < end)
+        overlapping_end = (ends > start) & (ends <= end)
+        surrounding = (starts <= start) & (ends >= end)
+        mask = overlapping_start | overlapping_end | surrounding
+        return np.flatnonzero(mask) + low
+
+    def _build_index(self) -> None:
+        """ Rebuild the indices used for interval queries, along with the columns. """
+
+        super()._build_index()
+        (
+            self._starts,
+            self._ends,
+            self._priorities,
+            self._task_name_ids,
+        ) = self._task_columns(self.tasks)
+
+    def _columns(self) -> tuple:
+        """ The columns of the schedule, in a fixed order. """
+        return (self._starts, self._ends, self._priorities, self._task_name_ids)
+
+    def _task_columns(self, tasks: Sequence[Task]) -> tuple:
+        """ Build columns for a sequence of tasks. """
+
+        starts = to_epochs([task.start_time for task in tasks])
+        ends = to_epochs([task.end_time for task in tasks])
+        priorities = np.array([task.priority for task in tasks], dtype=np.float64)
+        name_ids = np.array(
+            [self._name_id(task.name) for task in tasks], dtype=np.int32
+        )
+        return starts, ends, priorities, name_ids
+
+    def _name_id(self, name: str) -> int:
+        """ Get the id of a task name in the table of names, adding it if necessary. """
+
+        if name not in self._name_ids:
+            self._name_ids[name] = len(self._names)
+            self._names.append(name)
+        return self._name_ids[name]
@@ -0,0 +1,253 @@
+"""
+Compression codecs for saved sessions. Codecs are registered by name (which is what a
+session stores to choose its codec) and by id (which is what is stored in a file, so
+that the codec can be detected when the file is loaded). The zlib, lzma and bz2 codecs
+use the standard library, and the zstd codec needs the optional zstandard package.
+
+Codecs which support dictionaries can compress each of many small blobs against a
+shared dictionary (see flowshop.indexed), which recovers most of the redundancy
+between blobs while still allowing each blob to be decompressed on its own.
+"""
+
+import bz2
+import lzma
+import struct
+import zlib
+from typing import Dict, Optional
+
+
+# Compressed files which don't have a header of their own (i.e. pickled sessions)
+# start with MAGIC and the id of their codec. Uncompressed pickles never start with
+# MAGIC, since pickles start with a protocol opcode.
+MAGIC = b"FSZ1"
+HEADER = struct.Struct("<4sB")
+
+# Codec id stored in files which aren't compressed.
+NO_CODEC = 0
+
+
+class Codec:
+    """
+    A compression codec. Subclasses set ``name`` and ``codec_id``, and implement
+    compress() and decompress(). Codecs which support dictionaries also set
+    ``dictionary_size``, the largest dictionary which is worth using.
+    """
+
+    name = ""
+    codec_id = NO_CODEC
+    dictionary_size = 0
+
+    @property
+    def supports_dictionary(self) -> bool:
+        """ Whether or not the codec can compress data against a dictionary. """
+        return self.dictionary_size > 0
+
+    def compress(self, data: bytes, dictionary: Optional[bytes] = None) -> bytes:
+        """ Compress ``data``, against ``dictionary`` if it is given. """
+        raise NotImplementedError
+
+    def decompress(self, data: bytes, dictionary: Optional[bytes] = None) -> bytes:
+        """ Decompress ``data``, which was compressed against ``dictionary``. """
+        raise NotImplementedError
+
+    def _check_dictionary(self, dictionary: Optional[bytes]) -> None:
+        """ Raise an error if a dictionary is given to a codec which can't use it. """
+
+        if dictionary is not None and not self.supports_dictionary:
+            raise ValueError("The %s codec doesn't support dictionaries." % self.name)
+
+
+class ZlibCodec(Codec):
+    """ zlib (deflate) codec. Fast, and supports preset dictionaries of up to 32KB. """
+
+    name = "zlib"
+    codec_id = 1
+    dictionary_size = 32 * 1024
+
+    def __init__(self, level: int = 6) -> None:
+        """ Init function for ZlibCodec object. """
+        self.level = level
+
+    def compress(self, data: bytes, dictionary: Optional[bytes] = None) -> bytes:
+        """ Compress ``data``, against ``dictionary`` if it is given. """
+
+        if dictionary is None:
+            return zlib.compress(data, self.level)
+        compressor = zlib.compressobj(self.level, zdict=dictionary)
+        return compressor.compress(data) + compressor.flush()
+
+    def decompress(self, data: bytes, dictionary: Optional[bytes] = None) -> bytes:
+        """ Decompress ``data``, which was compressed against ``dictionary``. """
+
+        if dictionary is None:
+            return zlib.decompress(data)
+        decompressor = zlib.decompressobj(zdict=dictionary)
+        return decompressor.decompress(data) + decompressor.flush()
+
+
+class LzmaCodec(Codec):
+    """ lzma (xz) codec. Slow, but compresses best of the standard library codecs. """
+
+    name = "lzma"
+    codec_id = 2
+
+    def __init__(self, preset: int = 6) -> None:
+        """ Init function for LzmaCodec object. """
+        self.preset = preset
+
+    def compress(self, data: bytes, dictionary: Optional[bytes] = None) -> bytes:
+        """ Compress ``data``. """
+
+        self._check_dictionary(dictionary)
+        return lzma.compress(data, preset=self.preset)
+
+    def decompress(self, data: bytes, dictionary: Optional[bytes] = None) -> bytes:
+        """ Decompress ``data``. """
+
+        self._check_dictionary(dictionary)
+        return lzma.decompress(data)
+
+
+class Bz2Codec(Codec):
+    """ bz2 codec. """
+
+    name = "bz2"
+    codec_id = 3
+
+    def __init__(self, level: int = 9) -> None:
+        """ Init function for Bz2Codec object. """
+        self.level = level
+
+    def compress(self, data: bytes, dictionary: Optional[bytes] = None) -> bytes:
+        """ Compress ``data``. """
+
+        self._check_dictionary(dictionary)
+        return bz2.compress(data, self.level)
+
+    def decompress(self, data: bytes, dictionary: Optional[bytes] = None) -> bytes:
+        """ Decompress ``data``. """
+
+        self._check_dictionary(dictionary)
+        return bz2.decompress(data)
+
+
+class ZstdCodec(Codec):
+    """
+    zstd codec, which needs the zstandard package. Fast, compresses well, and supports
+    large dictionaries.
+    """
+
+    name = "zstd"
+    codec_id = 4
+    dictionary_size = 256 * 1024
+
+    def __init__(self, level: int = 3) -> None:
+        """ Init function for ZstdCodec object. """
+        self.level = level
+
+    def compress(self, data: bytes, dictionary: Optional[bytes] = None) -> bytes:
+        """ Compress ``data``, against ``dictionary`` if it is given. """
+
+        zstandard = _import_zstandard()
+        if dictionary is None:
+            return zstandard.ZstdCompressor(level=self.level).compress(data)
+        dict_data = zstandard.ZstdCompressionDict(
+            dictionary, dict_type=zstandard.DICT_TYPE_RAWCONTENT
+        )
+        compressor = zstandard.ZstdCompressor(level=self.level, dict_data=dict_data)
+        return compressor.compress(data)
+
+    def decompress(self, data: bytes, dictionary: Optional[bytes] = None) -> bytes:
+        """ Decompress ``data``, which was compressed against ``dictionary``. """
+
+        zstandard = _import_zstandard()
+        if dictionary is None:
+            return zstandard.ZstdDecompressor().decompress(data)
+        dict_data = zstandard.ZstdCompressionDict(
+            dictionary, dict_type=zstandard.DICT_TYPE_RAWCONTENT
+        )
+        return zstandard.ZstdDecompressor(dict_data=dict_data).decompress(data)
+
+
+CODECS: Dict[str, Codec] = {}
+CODEC_IDS: Dict[int, Codec] = {}
+
+
+def register_codec(codec: Codec) -> None:
+    """ Register ``codec``, so that sessions can be saved and loaded with it. """
+
+    if codec.codec_id == NO_CODEC or codec.codec_id in CODEC_IDS:
+        raise ValueError("Codec id %d is already taken." % codec.codec_id)
+    CODECS[codec.name] = codec
+    CODEC_IDS[codec.codec_id] = codec
+
+
+def get_codec(name: Optional[str]) -> Optional[Codec]:
+    """ Get a codec by name. Returns None (i.e. no compression) if ``name`` is None. """
+
+    if name is None:
+        return None
+    if name not in CODECS:
+        raise ValueError("Unrecognized compression codec %s." % name)
+    return CODECS[name]
+
+
+def codec_from_id(codec_id: int) -> Optional[Codec]:
+    """ Get a codec by the id stored in a file. Returns None for NO_CODEC. """
+
+    if codec_id == NO_CODEC:
+        return None
+    if codec_id not in CODEC_IDS:
+        raise ValueError("Unrecognized compression codec id %d." % codec_id)
+    return CODEC_IDS[codec_id]
+
+
+def codec_id(codec: Optional[Codec]) -> int:
+    """ Get the id to store in a file for ``codec``, which may be None. """
+    return NO_CODEC if codec is None else codec.codec_id
+
+
+def compress_file(data: bytes, codec: Optional[Codec]) -> bytes:
+    """
+    Compress the contents of a file which has no header of its own, prefixing it with a
+    header which identifies the codec. Data isn't changed if ``codec`` is None.
+    """
+
+    if codec is None:
+        return data
+    return HEADER.pack(MAGIC, codec.codec_id) + codec.compress(data)
+
+
+def decompress_file(data: bytes) -> bytes:
+    """ Decompress the contents of a file compressed by compress_file(), if it is. """
+
+    codec = detect_codec(data)
+    if codec is None:
+        return data
+    return codec.decompress(data[HEADER.size :])
+
+
+def detect_codec(data: bytes) -> Optional[Codec]:
+    """
+    Detect the codec of the contents of a file compressed by compress_file(), given at
+    least its first HEADER.size bytes. Returns None if the file isn't compressed.
+    """
+
+    if len(data) < HEADER.size or data[: len(MAGIC)] != MAGIC:
+        return None
+    _, file_codec_id = HEADER.unpack_from(data)
+    return codec_from_id(file_codec_id)
+
+
+def _import_zstandard():
+    """ Import the optional zstandard package. """
+
+    try:
+        import zstandard  # pylint: disable=import-outside-toplevel
+    except ImportError as error:
+        raise ImportError("The zstd codec requires zstandard.") from error
+    return zstandard
+
+
+for _codec in [ZlibCodec(), LzmaCodec(), Bz2Codec(), ZstdCodec()]:
+    register_codec(_codec)
@@ -0,0 +1,262 @@
+"""
+Binary encoding of tasks, schedules and edit history entries for indexed session files
+(see flowshop.indexed). Everything is packed with struct into little-endian fixed-width
+records, so that decoding never runs arbitrary code like unpickling can.
+
+Tasks are encoded in chunks. A chunk starts with a header holding the resolution of
+its timestamps and its number of tasks, followed by one record per task holding the id
+of its name in a table of names, its start and end time and its priority. Timestamps
+are stored as minutes since the epoch when every task in the chunk starts and ends on
+a whole minute (which is true of tasks entered through a Session), and as microseconds
+since the epoch otherwise, so that every task round trips exactly. A priority of None
+is stored as NaN.
+"""
+
+import math
+import struct
+from datetime import datetime, date, timedelta
+from typing import List, Dict, Tuple, Union
+
+from flowshop.history import Splice, Delta
+from flowshop.task import Task
+
+
+EPOCH = datetime(1970, 1, 1)
+MINUTE = timedelta(minutes=1)
+MICROSECOND = timedelta(microseconds=1)
+MICROSECONDS_PER_MINUTE = 60 * 10 ** 6
+
+MINUTES = 0
+MICROSECONDS = 1
+CHUNK_HEADER = struct.Struct("<BI")
+TASK_RECORDS = {
+    MINUTES: struct.Struct("<Iiid"),
+    MICROSECONDS: struct.Struct("<Iqqd"),
+}
+
+SCHEDULE_HEADER = struct.Struct("<qI")
+WEEK = struct.Struct("<iIIQQ")
+SPLICE_HEADER = struct.Struct("<BI")
+COUNT = struct.Struct("<I")
+STRING_LENGTH = struct.Struct("<H")
+
+NO_DATE = 0
+DATE = 1
+DATETIME = 2
+DATE_VALUE = struct.Struct("<Bq")
+
+
+class NameTable:
+    """
+    Table of interned task names, so that each task only stores the id of its name. Ids
+    are assigned in order of first appearance, and never change.
+    """
+
+    def __init__(self, names: List[str] = None) -> None:
+        """ Init function for NameTable object. """
+
+        self.names: List[str] = list(names) if names is not None else []
+        self.ids: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self) -> int:
+        """ Number of names in table. """
+        return len(self.names)
+
+    def name_id(self, name: str) -> int:
+        """ Get the id of ``name``, adding it to the table if necessary. """
+
+        if name not in self.ids:
+            self.ids[name] = len(self.names)
+            self.names.append(name)
+        return self.ids[name]
+
+    def encode(self) -> bytes:
+        """ Encode the table of names. """
+        return COUNT.pack(len(self.names)) + b"".join(
+            encode_string(name) for name in self.names
+        )
+
+    @classmethod
+    def decode(cls, data: bytes, offset: int = 0) -> Tuple["NameTable", int]:
+        """ Decode a table of names at ``offset``, returning it and the end offset. """
+
+        (num_names,) = COUNT.unpack_from(data, offset)
+        offset += COUNT.size
+        names = []
+        for _ in range(num_names):
+            name, offset = decode_string(data, offset)
+            names.append(name)
+        return cls(names), offset
+
+
+def encode_tasks(tasks: List[Task], names: NameTable) -> bytes:
+    """ Encode a chunk of tasks, interning their names into ``names``. """
+
+    resolution = MINUTES
+    times = []
+    for task in tasks:
+        start = (task.start_time - EPOCH) // MICROSECOND
+        end = (task.end_time - EPOCH) // MICROSECOND
+        if start % MICROSECONDS_PER_MINUTE != 0 or end % MICROSECONDS_PER_MINUTE != 0:
+            resolution = MICROSECONDS
+        times.append((start, end))
+
+    if resolution == MINUTES:
+        times = [
+            (start // MICROSECONDS_PER_MINUTE, end // MICROSECONDS_PER_MINUTE)
+            for start, end in times
+        ]
+
+    record = TASK_RECORDS[resolution]
+    return CHUNK_HEADER.pack(resolution, len(tasks)) + b"".join(
+        record.pack(
+            names.name_id(task.name),
+            start,
+            end,
+            math.nan if task.priority is None else task.priority,
+        )
+        for task, (start, end) in zip(tasks, times)
+    )
+
+
+def decode_tasks(data: bytes, names: NameTable) -> List[Task]:
+    """ Decode a chunk of tasks encoded by encode_tasks(). """
+
+    resolution, num_tasks = CHUNK_HEADER.unpack_from(data)
+    if resolution not in TASK_RECORDS:
+        raise ValueError("Unrecognized timestamp resolution %d." % resolution)
+    record = TASK_RECORDS[resolution]
+    unit = MINUTE if resolution == MINUTES else MICROSECOND
+    end_offset = CHUNK_HEADER.size + num_tasks * record.size
+    if len(data) < end_offset:
+        raise ValueError("Task chunk is truncated.")
+
+    return [
+        Task(
+            names.names[name_id],
+            None if math.isnan(priority) else priority,
+            EPOCH + start * unit,
+            EPOCH + end * unit,
+        )
+        for name_id, start, end, priority in record.iter_unpack(
+            data[CHUNK_HEADER.size : end_offset]
+        )
+    ]
+
+
+def encode_schedule_meta(
+    name: str, max_duration: timedelta, weeks: List[Tuple[int, int, int, int, int]]
+) -> bytes:
+    """
+    Encode the metadata of a schedule: its name, the maximum duration of its tasks, and
+    its weeks (see flowshop.indexed.Week).
+    """
+
+    return (
+        encode_string(name)
+        + SCHEDULE_HEADER.pack(max_duration // MICROSECOND, len(weeks))
+        + b"".join(WEEK.pack(*week) for week in weeks)
+    )
+
+
+def decode_schedule_meta(
+    data: bytes, offset: int = 0
+) -> Tuple[Tuple[str, timedelta, List[Tuple[int, int, int, int, int]]], int]:
+    """
+    Decode the metadata of a schedule encoded by encode_schedule_meta() at ``offset``,
+    returning it and the end offset.
+    """
+
+    name, offset = decode_string(data, offset)
+    max_duration, num_weeks = SCHEDULE_HEADER.unpack_from(data, offset)
+    offset += SCHEDULE_HEADER.size
+    weeks = [WEEK.unpack_from(data, offset + i * WEEK.size) for i in range(num_weeks)]
+    offset += num_weeks * WEEK.size
+    return (name, max_duration * MICROSECOND, weeks), offset
+
+
+def encode_delta(delta: Delta, names: NameTable) -> bytes:
+    """ Encode a Delta between two entries of an edit history. """
+
+    data = [COUNT.pack(len(delta.splices))]
+    for splice in delta.splices:
+        data.append(SPLICE_HEADER.pack(splice.planned, splice.index))
+        data.append(encode_tasks(list(splice.removed), names))
+        data.append(encode_tasks(list(splice.added), names))
+    return b"".join(data)
+
+
+def decode_delta(data: bytes, names: NameTable) -> Delta:
+    """ Decode a Delta encoded by encode_delta(). """
+
+    (num_splices,) = COUNT.unpack_from(data)
+    offset = COUNT.size
+    splices = []
+    for _ in range(num_splices):
+        planned, index = SPLICE_HEADER.unpack_from(data, offset)
+        offset += SPLICE_HEADER.size
+        removed, offset = _decode_chunk_at(data, offset, names)
+        added, offset = _decode_chunk_at(data, offset, names)
+        splices.append(Splice(bool(planned), index, tuple(removed), tuple(added)))
+    return Delta(tuple(splices))
+
+
+def encode_date(day: Union[date, datetime, None]) -> bytes:
+    """
+    Encode a date as its ordinal, or a datetime as microseconds since the epoch. Sessions
+    hold either as their base date, so the kind of value is encoded along with it.
+    """
+
+    if day is None:
+        return DATE_VALUE.pack(NO_DATE, 0)
+    if isinstance(day, datetime):
+        return DATE_VALUE.pack(DATETIME, (day - EPOCH) // MICROSECOND)
+    return DATE_VALUE.pack(DATE, day.toordinal())
+
+
+def decode_date(
+    data: bytes, offset: int = 0
+) -> Tuple[Union[date, datetime, None], int]:
+    """
+    Decode a date encoded by encode_date() at ``offset``, returning it and the end
+    offset.
+    """
+
+    kind, value = DATE_VALUE.unpack_from(data, offset)
+    offset += DATE_VALUE.size
+    if kind == NO_DATE:
+        return None, offset
+    if kind == DATETIME:
+        return EPOCH + value * MICROSECOND, offset
+    if kind == DATE:
+        return date.fromordinal(value), offset
+    raise ValueError("Unrecognized kind of date %d." % kind)
+
+
+def encode_string(string: str) -> bytes:
+    """ Encode a string as UTF-8, prefixed by its length. """
+
+    data = string.encode("utf-8")
+    if len(data) >= 1 << (8 * STRING_LENGTH.size):
+        raise ValueError("String of %d bytes is too long to encode." % len(data))
+    return STRING_LENGTH.pack(len(data)) + data
+
+
+def decode_string(data: bytes, offset: int = 0) -> Tuple[str, int]:
+    """ Decode a string encoded by encode_string() at ``offset``. """
+
+    (length,) = STRING_LENGTH.unpack_from(data, offset)
+    offset += STRING_LENGTH.size
+    return bytes(data[offset : offset + length]).decode("utf-8"), offset + length
+
+
+def _decode_chunk_at(
+    data: bytes, offset: int, names: NameTable
+) -> Tuple[List[Task], int]:
+    """ Decode the chunk of tasks at ``offset``, returning it and the end offset. """
+
+    resolution, num_tasks = CHUNK_HEADER.unpack_from(data, offset)
+    if resolution not in TASK_RECORDS:
+        raise ValueError("Unrecognized timestamp resolution %d." % resolution)
+    end_offset = offset + CHUNK_HEADER.size + num_tasks * TASK_RECORDS[resolution].size
+    return decode_tasks(data[offset:end_offset], names), end_offset
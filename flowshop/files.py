@@ -1,25 +1,183 @@
 """ Functions for saving and loading schedule sessions. """
 
+import glob
 import os
 import pickle
-from typing import Dict, Any
+from contextlib import contextmanager
+from typing import List, Dict, Any, Tuple, Optional, Iterator
+
+from flowshop.compression import (
+    get_codec,
+    compress_file,
+    decompress_file,
+    detect_codec,
+    HEADER,
+)
+from flowshop.history import EditHistory
+from flowshop.journal import Journal, journal_codec
+from flowshop.indexed import save_indexed, load_indexed, indexed_codec
+from flowshop.locking import file_lock, atomic_write
+from flowshop.store import SessionStore
 
 
 STORAGE_DIR = "data"
 
+# Ways of storing a session on disk, along with the extension of their files. Pickled
+# sessions are rewritten in full on every save, journaled sessions append their changes
+# to a journal (see save_session_journal()), and indexed sessions are memory-mapped and
+# decoded lazily on load (see flowshop.indexed). Sessions in the STORE storage don't
+# have a file of their own, and are held together in the session store at STORE_FILE
+# (see flowshop.store).
+PICKLE = "pickle"
+JOURNAL = "journal"
+INDEXED = "indexed"
+STORE = "store"
+STORAGE_EXTENSIONS = {PICKLE: "pkl", JOURNAL: "journal", INDEXED: "fss"}
+STORAGES = [PICKLE, JOURNAL, INDEXED, STORE]
+STORE_FILE = "sessions.db"
+LOCK_EXTENSION = "lock"
+
 
 def saved_session_exists(name: str) -> bool:
     """ Return True if there exists a saved session with name ``name``. """
 
-    return os.path.isfile(filename_from_name(name))
+    return saved_session_storage(name) is not None
+
+
+def saved_session_storage(name: str) -> Optional[str]:
+    """
+    Return the storage of the saved session with name ``name``, or None if there is no
+    saved session with that name.
+    """
+
+    for storage in [JOURNAL, INDEXED, PICKLE]:
+        if os.path.isfile(filename_from_name(name, storage)):
+            return storage
+    if os.path.isfile(store_path()):
+        with open_store() as store:
+            if name in store:
+                return STORE
+    return None
+
+
+def saved_session_names() -> List[str]:
+    """
+    Return the names of all saved sessions in STORAGE_DIR, in any storage, sorted. Only
+    the directory and the catalog of the session store are read.
+    """
+
+    names = set()
+    for extension in STORAGE_EXTENSIONS.values():
+        pattern = os.path.join(glob.escape(STORAGE_DIR), "*.%s" % extension)
+        names.update(
+            os.path.splitext(os.path.basename(path))[0] for path in glob.glob(pattern)
+        )
+    if os.path.isfile(store_path()):
+        with open_store() as store:
+            names.update(entry.name for entry in store.catalog())
+    return sorted(names)
+
+
+def store_path() -> str:
+    """ Return the path of the session store which holds sessions stored in STORE. """
+    return os.path.join(STORAGE_DIR, STORE_FILE)
+
+
+def open_store() -> SessionStore:
+    """ Open the session store which holds sessions stored in STORE. """
+    return SessionStore(store_path())
+
+
+def saved_session_compression(name: str) -> Optional[str]:
+    """
+    Return the name of the compression codec of the saved session with name ``name``,
+    which is detected from the header of its file, or None if it isn't compressed.
+    """
+
+    storage = saved_session_storage(name)
+    if storage is None:
+        raise ValueError("No saved session with name %s." % name)
+
+    if storage == STORE:
+        with open_store() as store:
+            return store.entry(name).compression
+
+    session_filename = filename_from_name(name, storage)
+    if storage == JOURNAL:
+        codec = journal_codec(session_filename)
+    elif storage == INDEXED:
+        codec = indexed_codec(session_filename)
+    else:
+        with open(session_filename, "rb") as session_file:
+            codec = detect_codec(session_file.read(HEADER.size))
+    return codec.name if codec is not None else None
+
+
+@contextmanager
+def session_lock(name: str) -> Iterator[None]:
+    """
+    Hold the lock of the session with name ``name``, which every process saving,
+    migrating or removing the session holds while it does, so that writers of a session
+    take turns. Readers don't take the lock, since session files are replaced
+    atomically (see flowshop.locking). Sessions in the session store are locked by
+    SQLite instead, so they don't need to hold the lock.
+    """
+
+    lock_filename = os.path.join(STORAGE_DIR, "%s.%s" % (name, LOCK_EXTENSION))
+
+    # Create directory if it doesn't exist.
+    lock_dir = os.path.dirname(lock_filename)
+    if not os.path.isdir(lock_dir):
+        os.makedirs(lock_dir)
+
+    with file_lock(lock_filename):
+        yield
 
 
 def save_session(session: "Session"):
-    """ Save session ``session`` to disk. """
+    """
+    Save session ``session`` to disk, in the storage and with the compression codec of
+    the session, while holding the lock of the session. Journaled sessions are saved by
+    appending their changes to their journal (see save_session_journal()), and other
+    sessions are rewritten in full (see write_state_dict()).
+    """
+
+    if session.storage == STORE:
+        write_state_dict(session.state_dict(), STORE, session.compression)
+        return
+
+    with session_lock(session.name):
+        if session.storage == JOURNAL:
+            save_session_journal(session)
+        else:
+            write_state_dict(session.state_dict(), session.storage, session.compression)
 
-    # Get state dictionary and filename.
-    state_dict = session.state_dict()
-    session_filename = filename_from_name(state_dict["name"])
+
+def write_state_dict(
+    state_dict: Dict[str, Any], storage: str, compression: Optional[str] = None
+) -> None:
+    """
+    Write a session state dict to disk in ``storage``, compressed with the codec named
+    ``compression`` (see flowshop.compression), replacing any saved session in that
+    storage with the same name. Indexed sessions are written with
+    flowshop.indexed.save_indexed(), which copies week chunks of schedules that were
+    loaded from the old file and never decoded over as they are, and compresses each
+    blob against a shared dictionary if the codec supports it. Journaled sessions are
+    written as a journal holding only a snapshot, and compress each frame. Pickled
+    sessions, and sessions in the session store, are compressed as a whole. Session
+    files are replaced atomically, but callers which write to files should hold the lock
+    of the session (see session_lock()).
+    """
+
+    if storage not in STORAGES:
+        raise ValueError("Unrecognized session storage %s." % storage)
+    codec = get_codec(compression)
+    if storage == STORE:
+        with open_store() as store:
+            store.save_state_dicts([(state_dict, compression)])
+        return
+
+    session_filename = filename_from_name(state_dict["name"], storage)
 
     # Create directory if it doesn't exist.
     save_dir = os.path.dirname(session_filename)
@@ -27,8 +185,83 @@ def save_session(session: "Session"):
         os.makedirs(save_dir)
 
     # Save state dictionary.
-    with open(session_filename, "wb") as session_file:
-        pickle.dump(state_dict, session_file)
+    if storage == INDEXED:
+        save_indexed(session_filename, state_dict, codec)
+    elif storage == JOURNAL:
+        with Journal(session_filename, codec=codec) as journal:
+            journal.write_snapshot(state_dict)
+    else:
+        atomic_write(session_filename, compress_file(pickle.dumps(state_dict), codec))
+
+
+def migrate_session(
+    name: str, storage: str = INDEXED, compression: Optional[str] = None
+) -> str:
+    """
+    Convert the saved session with name ``name`` to ``storage`` and the compression
+    codec named ``compression``, for example to migrate pickled sessions to compressed
+    indexed files. The session is written in the new storage and read back to check
+    that it holds the same state before the old file is removed. The lock of the
+    session is held throughout. Returns the old storage of the session.
+    """
+
+    with session_lock(name):
+        return _migrate_session(name, storage, compression)
+
+
+def _migrate_session(name: str, storage: str, compression: Optional[str]) -> str:
+    """ Migrate a session as migrate_session() does, without taking its lock. """
+
+    old_storage = saved_session_storage(name)
+    if old_storage is None:
+        raise ValueError("No saved session with name %s." % name)
+    if old_storage == storage and saved_session_compression(name) == compression:
+        return old_storage
+
+    # Sessions saved before EditHistory existed hold a list of schedule pairs.
+    state_dict = load_session_state_dict(name)
+    if not isinstance(state_dict["edit_history"], EditHistory):
+        state_dict["edit_history"] = EditHistory(state_dict["edit_history"])
+
+    # Recompressing a session in the same storage replaces its file, so the file is
+    # only removed if the migration changed its storage.
+    write_state_dict(state_dict, storage, compression)
+    migrated_state_dict = read_state_dict(name, storage)
+    if not _same_state(state_dict, migrated_state_dict):
+        if old_storage != storage:
+            remove_saved_session(name, storage)
+        raise ValueError(
+            "Migrating session %s to %s changed its state." % (name, storage)
+        )
+
+    if old_storage != storage:
+        remove_saved_session(name, old_storage)
+    return old_storage
+
+
+def remove_saved_session(name: str, storage: str) -> None:
+    """
+    Remove the session with name ``name`` saved in ``storage``. Callers which remove a
+    file should hold the lock of the session (see session_lock()).
+    """
+
+    if storage == STORE:
+        with open_store() as store:
+            store.remove(name)
+    else:
+        os.remove(filename_from_name(name, storage))
+
+
+def saved_session_size(name: str) -> int:
+    """ Return the size in bytes of the saved session with name ``name``. """
+
+    storage = saved_session_storage(name)
+    if storage is None:
+        raise ValueError("No saved session with name %s." % name)
+    if storage == STORE:
+        with open_store() as store:
+            return store.entry(name).size
+    return os.path.getsize(filename_from_name(name, storage))
 
 
 def load_session_state_dict(name: str) -> Dict[str, Any]:
@@ -38,14 +271,103 @@ def load_session_state_dict(name: str) -> Dict[str, Any]:
     if not saved_session_exists(name):
         raise ValueError("No saved session with name %s." % name)
 
-    session_filename = filename_from_name(name)
+    return read_state_dict(name, saved_session_storage(name))
+
+
+def read_state_dict(name: str, storage: str) -> Dict[str, Any]:
+    """
+    Read the state dict of the session with name ``name`` saved in ``storage``.
+    Journaled sessions are rebuilt by replaying their journal, and indexed sessions are
+    loaded lazily.
+    """
+
+    if storage == JOURNAL:
+        journal, state_dict = open_session_journal(name)
+        with journal:
+            return state_dict
+    if storage == INDEXED:
+        return load_indexed(filename_from_name(name, INDEXED))
+    if storage == STORE:
+        with open_store() as store:
+            ((state_dict, _),) = store.load_state_dicts([name])
+        return state_dict
+
+    session_filename = filename_from_name(name, storage)
     with open(session_filename, "rb") as session_file:
-        state_dict = pickle.load(session_file)
+        state_dict = pickle.loads(decompress_file(session_file.read()))
 
     return state_dict
 
 
-def filename_from_name(name: str) -> str:
-    """ Return filename from session name. """
+def save_session_journal(session: "Session") -> None:
+    """
+    Save journaled session ``session`` to disk. The changes to the edit history since
+    the last save, along with the other state variables, are appended to the journal as
+    a single record. A new snapshot of the whole session is written instead if the
+    journal doesn't exist yet, if its log has grown large enough to compact, or if
+    another process wrote to the journal since the session loaded or saved it, in which
+    case the last save wins as it does for other storages. The caller should hold the
+    lock of the session (see session_lock()).
+    """
+
+    state_dict = session.state_dict()
+    journal_filename = filename_from_name(state_dict["name"], JOURNAL)
+
+    # Create directory if it doesn't exist.
+    save_dir = os.path.dirname(journal_filename)
+    if not os.path.isdir(save_dir):
+        os.makedirs(save_dir)
+
+    changes = session.edit_history.take_journal()
+    codec = get_codec(session.compression)
+    if session.journal is None:
+        session.journal = Journal(journal_filename, codec=codec)
+
+    # A journal which was written with another codec is replaced by a new snapshot.
+    if session.journal.codec is not codec:
+        session.journal.codec = codec
+        changes = None
+
+    if (
+        changes is None
+        or session.journal.changed_on_disk()
+        or session.journal.needs_compaction()
+    ):
+        session.journal.write_snapshot(state_dict)
+        session.edit_history.start_journal()
+    else:
+        state = {key: val for key, val in state_dict.items() if key != "edit_history"}
+        session.journal.append([(changes, state)])
+
+
+def open_session_journal(name: str) -> Tuple[Journal, Dict[str, Any]]:
+    """
+    Open the journal of the session with name ``name``, and rebuild its state dict by
+    replaying the records of the journal on top of its snapshot. Returns the journal,
+    which can be used to append further records, and the state dict.
+    """
+
+    journal, state_dict, records = Journal.open(filename_from_name(name, JOURNAL))
+    for changes, state in records:
+        for change in changes:
+            state_dict["edit_history"].replay(change)
+        state_dict.update(state)
+
+    return journal, state_dict
+
+
+def filename_from_name(name: str, storage: str = PICKLE) -> str:
+    """ Return filename of a session stored in ``storage`` from session name. """
+
+    return os.path.join(STORAGE_DIR, "%s.%s" % (name, STORAGE_EXTENSIONS[storage]))
+
+
+def _same_state(state_dict: Dict[str, Any], other_state_dict: Dict[str, Any]) -> bool:
+    """ Whether or not two session state dicts hold the same state. """
 
-    return os.path.join(STORAGE_DIR, "%s.pkl" % name)
+    return state_dict.keys() == other_state_dict.keys() and all(
+        list(val) == list(other_state_dict[key])
+        if key == "edit_history"
+        else val == other_state_dict[key]
+        for key, val in state_dict.items()
+    )
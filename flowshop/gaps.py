@@ -0,0 +1,117 @@
+"""
+Index of the free time of a schedule, for finding a free slot for a task without
+trying times until the schedule stops raising for overlap. The free time is the list of
+gaps between consecutive tasks, along with the unbounded gaps before the first task
+and after the last one.
+
+Gaps are kept in buckets by length, where the gaps in bucket ``k`` are at least 2^(k-1)
+and less than 2^k microseconds long, and each bucket is sorted by start time. A gap of
+any bucket above the bucket of a duration fits it, and a gap of any bucket below it
+doesn't, so the gaps which fit a duration after a given time are found by bisecting a
+few dozen buckets, and only the gaps of the bucket of the duration itself are checked
+one by one. Adding and removing a gap bisects its bucket.
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from heapq import merge
+from typing import List, Tuple, Iterable, Iterator
+
+
+class GapIndex:
+    """
+    Gaps of free time, bucketed by length and sorted by start time. ``starts`` and
+    ``ends`` hold the start and end times of the gaps in each bucket.
+    """
+
+    def __init__(self, gaps: Iterable[Tuple[datetime, datetime]] = ()) -> None:
+        """ Init function for GapIndex object. """
+
+        self.starts: List[List[datetime]] = []
+        self.ends: List[List[datetime]] = []
+        for start, end in gaps:
+            self.add(start, end)
+
+    @classmethod
+    def between(cls, tasks: Iterable) -> "GapIndex":
+        """ Index the gaps between ``tasks``, which must be sorted and not overlap. """
+
+        gaps = cls()
+        previous_end = datetime.min
+        for task in tasks:
+            gaps.add(previous_end, task.start_time)
+            previous_end = task.end_time
+        gaps.add(previous_end, datetime.max)
+        return gaps
+
+    def copy(self) -> "GapIndex":
+        """ Return a copy of the index. """
+
+        gaps = GapIndex.__new__(GapIndex)
+        gaps.starts = [list(starts) for starts in self.starts]
+        gaps.ends = [list(ends) for ends in self.ends]
+        return gaps
+
+    def __iter__(self) -> Iterator[Tuple[datetime, datetime]]:
+        """ Iterate over every gap, in order of start time. """
+        return self.fitting(timedelta(0), datetime.min, datetime.max)
+
+    def add(self, start: datetime, end: datetime) -> None:
+        """ Add the gap from ``start`` to ``end``, if it isn't empty. """
+
+        if end <= start:
+            return
+        bucket = _bucket(end - start)
+        while len(self.starts) <= bucket:
+            self.starts.append([])
+            self.ends.append([])
+        position = bisect_left(self.starts[bucket], start)
+        self.starts[bucket].insert(position, start)
+        self.ends[bucket].insert(position, end)
+
+    def remove(self, start: datetime, end: datetime) -> None:
+        """ Remove the gap from ``start`` to ``end``, if it isn't empty. """
+
+        if end <= start:
+            return
+        bucket = _bucket(end - start)
+        position = bisect_left(self.starts[bucket], start)
+        del self.starts[bucket][position]
+        del self.ends[bucket][position]
+
+    def fitting(
+        self, duration: timedelta, earliest: datetime, latest: datetime
+    ) -> Iterator[Tuple[datetime, datetime]]:
+        """
+        Iterate over the gaps which are at least ``duration`` long and overlap the time
+        from ``earliest`` to ``latest``, in order of start time. Gaps aren't clipped to
+        that time, so they may not fit ``duration`` within it.
+        """
+
+        first_bucket = _bucket(duration)
+        buckets = []
+        for bucket in range(first_bucket, len(self.starts)):
+            gaps = self._bucket_gaps(bucket, earliest, latest)
+            if bucket == first_bucket:
+                gaps = (gap for gap in gaps if gap[1] - gap[0] >= duration)
+            buckets.append(gaps)
+        return merge(*buckets)
+
+    def _bucket_gaps(
+        self, bucket: int, earliest: datetime, latest: datetime
+    ) -> Iterator[Tuple[datetime, datetime]]:
+        """ Iterate over the gaps of a bucket which overlap ``earliest`` to ``latest``. """
+
+        starts = self.starts[bucket]
+        ends = self.ends[bucket]
+
+        # Gaps don't overlap, so the ends of the gaps in a bucket are sorted as well.
+        first = bisect_right(ends, earliest)
+        last = bisect_left(starts, latest)
+        for position in range(first, last):
+            yield starts[position], ends[position]
+
+
+def _bucket(length: timedelta) -> int:
+    """ Return the bucket of gaps which are ``length`` long. """
+    return (length // timedelta(microseconds=1)).bit_length()
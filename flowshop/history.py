@@ -0,0 +1,375 @@
+""" Edit history of a session, stored as a log of small deltas between schedules. """
+
+from typing import (
+    List,
+    Tuple,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Optional,
+    Union,
+    Callable,
+    Any,
+)
+
+from flowshop.schedule import Schedule
+from flowshop.task import Task
+
+
+CHECKPOINT_INTERVAL = 10
+
+
+class Splice(NamedTuple):
+    """
+    A change to one schedule of a pair: the tasks ``removed`` starting at ``index`` in
+    the tasks of the old schedule are replaced by the tasks ``added``. This covers
+    inserting, deleting, editing and moving tasks, and is its own inverse when
+    ``removed`` and ``added`` are swapped.
+    """
+
+    planned: bool
+    index: int
+    removed: Tuple[Task, ...]
+    added: Tuple[Task, ...]
+
+
+class Checkpoint(NamedTuple):
+    """ A full (planned, actual) pair of schedules stored in the edit history. """
+
+    planned: Schedule
+    actual: Schedule
+
+
+class Delta(NamedTuple):
+    """ The changes between two consecutive (planned, actual) pairs in history. """
+
+    splices: Tuple[Splice, ...]
+
+
+class LazyEntry(NamedTuple):
+    """
+    An entry of the edit history which hasn't been loaded yet, along with whether or
+    not it is a checkpoint. ``load`` returns the Checkpoint or Delta.
+    """
+
+    checkpoint: bool
+    load: Callable[[], Union[Checkpoint, Delta]]
+
+
+class EditHistory:
+    """
+    Edit history of a session, which behaves like a list of (planned, actual) schedule
+    pairs. Only every ``checkpoint_interval``-th entry is stored as a full pair of
+    schedules, and all other entries are stored as a Delta from the previous entry, so
+    that memory grows with the size of each edit instead of the size of the schedules.
+    Entries are materialized on access, by applying deltas forward from the nearest
+    checkpoint (or backward/forward from the most recently accessed entry, which is
+    what undo and redo need). If the history grows past ``max_len`` entries, the oldest
+    entries are dropped on append.
+    """
+
+    def __init__(
+        self,
+        entries: Iterable[Tuple[Schedule, Schedule]] = (),
+        max_len: int = None,
+        checkpoint_interval: int = CHECKPOINT_INTERVAL,
+    ) -> None:
+        """
+        Init function for EditHistory object. Note that ``entries`` aren't trimmed to
+        ``max_len``, so that positions into a loaded history stay valid until the next
+        append.
+        """
+
+        self.max_len = max_len
+        self.checkpoint_interval = checkpoint_interval
+
+        self._entries: List[Union[Checkpoint, Delta, LazyEntry]] = []
+        self._cache_pos = -1
+        self._cache: Optional[Tuple[Schedule, Schedule]] = None
+        self._journal: Optional[List[tuple]] = None
+        for planned, actual in entries:
+            self._push(planned, actual)
+
+    def __getstate__(self) -> dict:
+        """
+        Return state for pickling. Materialized entries and the journal of changes
+        aren't saved.
+        """
+
+        state = dict(self.__dict__)
+        state["_entries"] = [self._entry(i) for i in range(len(self))]
+        state["_cache_pos"] = -1
+        state["_cache"] = None
+        state["_journal"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """ Restore state when unpickling. """
+
+        self.__dict__.update(state)
+        self._journal = None
+
+    def __len__(self) -> int:
+        """ Number of entries in history. """
+        return len(self._entries)
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[Tuple[Schedule, Schedule], List[Tuple[Schedule, Schedule]]]:
+        """ Get (planned, actual) pair at ``index``, or a list of pairs for a slice. """
+
+        if isinstance(index, slice):
+            return [self._materialize(i) for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Edit history index out of range.")
+        return self._materialize(index)
+
+    def __iter__(self) -> Iterator[Tuple[Schedule, Schedule]]:
+        """ Iterate over (planned, actual) pairs in history. """
+
+        for i in range(len(self)):
+            yield self._materialize(i)
+
+    def __eq__(self, other: Any) -> bool:
+        """ Definition of self == other. Compares entries with any sequence of pairs. """
+
+        try:
+            if len(self) != len(other):
+                return False
+        except TypeError:
+            return NotImplemented
+        return all(entry == other_entry for entry, other_entry in zip(self, other))
+
+    def append(self, schedules: Tuple[Schedule, Schedule]) -> None:
+        """
+        Append a (planned, actual) pair to the end of history. If this makes the history
+        longer than self.max_len, the oldest entries are dropped.
+        """
+
+        planned, actual = schedules
+        self._push(planned, actual)
+
+        if self.max_len is not None and len(self) > self.max_len:
+            self._drop_oldest(len(self) - self.max_len)
+
+    def truncate(self, length: int) -> None:
+        """ Remove all entries after the first ``length`` entries of history. """
+
+        # Move the materialized entry back to the new last entry before deleting, so
+        # that the deltas needed to get there are still around.
+        if length > 0 and self._cache_pos >= length:
+            self._materialize(length - 1)
+
+        del self._entries[length:]
+        if self._cache_pos >= length:
+            self._cache_pos = -1
+            self._cache = None
+        self._record(("truncate", length))
+
+    @classmethod
+    def from_stored(
+        cls,
+        entries: List[Union[Checkpoint, Delta, LazyEntry]],
+        max_len: int = None,
+        checkpoint_interval: int = CHECKPOINT_INTERVAL,
+    ) -> "EditHistory":
+        """
+        Construct an edit history from entries as they are stored, i.e. checkpoints,
+        deltas and entries which will be loaded when they are first needed. The first
+        entry must be a checkpoint.
+        """
+
+        history = cls(max_len=max_len, checkpoint_interval=checkpoint_interval)
+        history._entries = list(entries)
+        return history
+
+    def stored_entries(self) -> List[Union[Checkpoint, Delta, LazyEntry]]:
+        """ Return the entries of history as they are stored, without loading them. """
+        return list(self._entries)
+
+    def start_journal(self) -> None:
+        """
+        Start recording changes to the stored entries, so that they can be saved
+        without saving the whole history (see flowshop.files.save_session()).
+        """
+        self._journal = []
+
+    def take_journal(self) -> Optional[List[tuple]]:
+        """
+        Return the changes recorded since the journal was started or last taken, and
+        start a new journal. Returns None if the journal was never started.
+        """
+
+        changes = self._journal
+        if changes is not None:
+            self._journal = []
+        return changes
+
+    def replay(self, change: tuple) -> None:
+        """ Apply a change which was recorded in the journal of another history. """
+
+        journal = self._journal
+        self._journal = None
+        if change[0] == "append":
+            self._entries.append(change[1])
+        elif change[0] == "truncate":
+            self.truncate(change[1])
+        elif change[0] == "drop":
+            self._cache_pos = -1
+            self._cache = None
+            self._entries = [change[2]] + self._entries[change[1] + 1 :]
+        else:
+            raise ValueError("Unrecognized edit history change %s." % change[0])
+        self._journal = journal
+
+    def is_checkpoint(self, index: int) -> bool:
+        """ Whether or not the entry at ``index`` is stored as a full checkpoint. """
+        return _is_checkpoint(self._entries[index])
+
+    def _push(self, planned: Schedule, actual: Schedule) -> None:
+        """ Store a new entry at the end of history, as a delta if possible. """
+
+        entry: Union[Checkpoint, Delta] = Checkpoint(planned, actual)
+        if self._entries and self._since_checkpoint() < self.checkpoint_interval:
+            old_planned, old_actual = self._materialize(len(self) - 1)
+            planned_splice = _diff(old_planned, planned, True)
+            actual_splice = _diff(old_actual, actual, False)
+            if planned_splice is not False and actual_splice is not False:
+                entry = Delta(
+                    tuple(
+                        splice
+                        for splice in (planned_splice, actual_splice)
+                        if splice is not None
+                    )
+                )
+
+        self._entries.append(entry)
+        self._cache_pos = len(self) - 1
+        self._cache = (planned, actual)
+        self._record(("append", entry))
+
+    def _record(self, change: tuple) -> None:
+        """ Record a change to the stored entries, if the journal is started. """
+
+        if self._journal is not None:
+            self._journal.append(change)
+
+    def _since_checkpoint(self) -> int:
+        """ Number of entries since the last checkpoint, including the checkpoint. """
+
+        count = 0
+        for entry in reversed(self._entries):
+            count += 1
+            if _is_checkpoint(entry):
+                break
+        return count
+
+    def _drop_oldest(self, num_entries: int) -> None:
+        """
+        Drop the oldest ``num_entries`` entries of history, making sure that the new
+        first entry is a checkpoint.
+        """
+
+        cache_pos, cache = self._cache_pos, self._cache
+        first = self._entry(num_entries)
+        if not isinstance(first, Checkpoint):
+            first = Checkpoint(*self._materialize(num_entries))
+        self._entries = [first] + self._entries[num_entries + 1 :]
+        self._record(("drop", num_entries, first))
+
+        # Keep the entry which was materialized before dropping, if it still exists.
+        if cache_pos >= num_entries:
+            self._cache_pos = cache_pos - num_entries
+            self._cache = cache
+        else:
+            self._cache_pos = -1
+            self._cache = None
+
+    def _entry(self, index: int) -> Union[Checkpoint, Delta]:
+        """ Return the entry at ``index``, loading it first if necessary. """
+
+        entry = self._entries[index]
+        if isinstance(entry, LazyEntry):
+            entry = entry.load()
+            self._entries[index] = entry
+        return entry
+
+    def _materialize(self, index: int) -> Tuple[Schedule, Schedule]:
+        """ Reconstruct the (planned, actual) pair at ``index``. """
+
+        entry = self._entry(index)
+        if index == self._cache_pos:
+            schedules = self._cache
+        elif isinstance(entry, Checkpoint):
+            schedules = (entry.planned, entry.actual)
+        elif index == self._cache_pos + 1:
+            schedules = _apply(self._cache, entry, forward=True)
+        elif index == self._cache_pos - 1 and not _is_checkpoint(
+            self._entries[index + 1]
+        ):
+            schedules = _apply(self._cache, self._entry(index + 1), forward=False)
+        else:
+            start = index
+            while not _is_checkpoint(self._entries[start]):
+                start -= 1
+            checkpoint = self._entry(start)
+            schedules = (checkpoint.planned, checkpoint.actual)
+            for delta_index in range(start + 1, index + 1):
+                schedules = _apply(schedules, self._entry(delta_index), forward=True)
+
+        self._cache_pos = index
+        self._cache = schedules
+        return schedules
+
+
+def _is_checkpoint(entry: Union[Checkpoint, Delta, LazyEntry]) -> bool:
+    """ Whether or not a stored entry is a checkpoint, without loading it. """
+
+    if isinstance(entry, LazyEntry):
+        return entry.checkpoint
+    return isinstance(entry, Checkpoint)
+
+
+def _diff(old: Schedule, new: Schedule, planned: bool) -> Union[Splice, None, bool]:
+    """
+    Compute the Splice which changes ``old`` into ``new``. Returns None if the schedules
+    hold the same tasks, and False if the change can't be represented as a Splice.
+    """
+
+    if old is new:
+        return None
+    if type(old) is not type(new) or old.name != new.name:
+        return False
+
+    # Schedules which keep track of their edits don't need their tasks compared (see
+    # Schedule.edits_since()).
+    index, removed, added = new.edits_since(old)
+    if not removed and not added:
+        return None
+    return Splice(planned, index, removed, added)
+
+
+def _apply(
+    schedules: Tuple[Schedule, Schedule], delta: Delta, forward: bool
+) -> Tuple[Schedule, Schedule]:
+    """
+    Apply ``delta`` to a pair of schedules, or undo it if ``forward`` is False. The
+    schedules aren't modified: a schedule which is changed by the delta is replaced by
+    a copy, and the other schedule is shared.
+    """
+
+    new_schedules = list(schedules)
+    for splice in delta.splices:
+        removed, added = splice.removed, splice.added
+        if not forward:
+            removed, added = added, removed
+
+        side = 0 if splice.planned else 1
+        schedule = new_schedules[side].copy()
+        schedule.splice_tasks(splice.index, len(removed), added)
+        new_schedules[side] = schedule
+
+    return (new_schedules[0], new_schedules[1])
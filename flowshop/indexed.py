@@ -0,0 +1,699 @@
+"""
+Indexed session files, which are memory-mapped and decoded lazily when a session is
+loaded, so that opening a session with a long history of large schedules only decodes
+what is displayed.
+
+An indexed file starts with a header holding MAGIC, the version of the format and the
+id of the codec which compresses the file, followed by blobs, then a footer and a
+trailer. The trailer holds the offset of the footer and MAGIC again. The footer holds
+the location of the compression dictionary, the session state variables other than the
+edit history, the table of task names, and the offset and length of the blob of each
+entry of the edit history. Checkpoint blobs hold the metadata of their two schedules,
+which locates the tasks of each schedule in separate blobs with one chunk of tasks per
+week. Identical week chunks are only written once, so checkpoints which share most of
+their tasks share most of their chunks. Everything is encoded with flowshop.encoding.
+
+If the file has a codec, each blob is compressed on its own (so that it can still be
+decoded lazily), and prefixed by a byte which says whether it was compressed or stored
+as it is because compressing it didn't make it smaller. Codecs which support
+dictionaries compress each blob against a dictionary built from the week chunks of the
+current entry of the edit history, which most other entries are near duplicates of.
+The dictionary is stored in the file, and kept when the file is saved again with the
+same codec, so that blobs which weren't decoded can be copied over as they are.
+
+Version 1 of the format pickled its blobs and footer, and is no longer supported.
+Version 2 had no codec or dictionary, and is read as an uncompressed file.
+"""
+
+import mmap
+import struct
+from bisect import bisect_left, bisect_right
+from datetime import datetime, date, time, timedelta
+from typing import List, Dict, Any, Tuple, Union, Optional, BinaryIO
+
+from flowshop.compression import Codec, codec_id, codec_from_id
+from flowshop.encoding import (
+    NameTable,
+    COUNT,
+    encode_tasks,
+    decode_tasks,
+    encode_schedule_meta,
+    decode_schedule_meta,
+    encode_delta,
+    decode_delta,
+    encode_date,
+    decode_date,
+    encode_string,
+    decode_string,
+)
+from flowshop.history import EditHistory, Checkpoint, Delta, LazyEntry
+from flowshop.locking import atomic_file
+from flowshop.schedule import Schedule, _overlaps
+from flowshop.task import Task
+
+
+MAGIC = b"FSIX"
+VERSION = 3
+HEADER = struct.Struct("<4sH")
+CODEC_ID = struct.Struct("<B")
+TRAILER = struct.Struct("<Q4s")
+DICTIONARY = struct.Struct("<QQ")
+HISTORY_POS = struct.Struct("<q")
+ENTRY = struct.Struct("<BQQ")
+
+# Prefixes of blobs in files with a codec.
+STORED = b"\x00"
+COMPRESSED = b"\x01"
+
+# Attributes of a schedule which a LazySchedule only sets once it decodes all of its
+# tasks (see LazySchedule.materialize()).
+MATERIALIZED_VARS = (
+    "tasks",
+    "_start_keys",
+    "_end_keys",
+    "_day_counts",
+    "_day_index",
+    "_day_keys",
+    "_day_points",
+    "_day_prefix",
+    "_gaps",
+)
+
+# A week of a schedule, as stored in the metadata of a checkpoint: the ordinal of its
+# Monday, the index of its first task in the schedule, its number of tasks, and the
+# offset and length of the chunk holding its tasks.
+Week = Tuple[int, int, int, int, int]
+
+
+class LazySchedule(Schedule):
+    """
+    Schedule loaded from an indexed file, which decodes the tasks of each week from the
+    file when they are first needed. Looking up tasks by day, tasks in an interval and
+    points over days only decodes the weeks involved. Anything else (including
+    comparing or editing the schedule) decodes every week first, after which the
+    schedule behaves exactly like a Schedule. Copies of a LazySchedule are plain
+    Schedules, since they are only made to be edited.
+    """
+
+    def __init__(
+        self,
+        indexed_file: "IndexedFile",
+        name: str,
+        max_duration: timedelta,
+        weeks: List[Week],
+    ) -> None:
+        """ Init function for LazySchedule object. """
+
+        self.name = name
+        self.state_vars = ["name", "tasks"]
+        self._max_duration = max_duration
+        self._file = indexed_file
+        self._weeks = weeks
+        self._week_ordinals = [week[0] for week in self._weeks]
+        self._week_tasks: Dict[int, Tuple[List[Task], List[datetime]]] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        """ Decode all tasks when an attribute of a full schedule is first needed. """
+
+        if name in MATERIALIZED_VARS:
+            self.materialize()
+            return self.__dict__[name]
+        raise AttributeError(name)
+
+    def __reduce__(self) -> tuple:
+        """ Pickle as a plain Schedule. """
+        return (Schedule.__new__, (Schedule,), self.__getstate__())
+
+    @property
+    def indexed_file(self) -> "IndexedFile":
+        """ Indexed file that the schedule is loaded from. """
+        return self._file
+
+    @property
+    def weeks(self) -> List[Week]:
+        """ Weeks of the schedule, as stored in the metadata of its checkpoint. """
+        return self._weeks
+
+    @property
+    def materialized(self) -> bool:
+        """ Whether or not all tasks of the schedule have been decoded. """
+        return "tasks" in self.__dict__
+
+    def materialize(self) -> None:
+        """ Decode the tasks of every week, and build the indices of the schedule. """
+
+        if self.materialized:
+            return
+
+        tasks = []
+        for position in range(len(self._weeks)):
+            tasks.extend(self._week(position)[0])
+        self.tasks = tasks
+        self._week_tasks = {}
+        self._build_index()
+
+    def copy(self) -> Schedule:
+        """ Return a copy of the schedule (see Schedule.copy()) as a plain Schedule. """
+
+        self.materialize()
+        schedule = Schedule.__new__(Schedule)
+        schedule.__dict__.update(
+            {
+                key: val
+                for key, val in self.__dict__.items()
+                if key in MATERIALIZED_VARS
+                or key in ["name", "state_vars", "_max_duration"]
+            }
+        )
+        return Schedule.copy(schedule)
+
+    def get_task_index(self, day: date, daily_index: int) -> int:
+        """
+        Get index of the ``daily_index``-th task on day ``day``.
+        """
+
+        if self.materialized:
+            return super().get_task_index(day, daily_index)
+
+        position, week_index = self._locate(day, daily_index)
+        return self._weeks[position][1] + week_index
+
+    def get_task(self, day: date, daily_index: int) -> Task:
+        """
+        Get the ``daily_index``-th task on day ``day``.
+        """
+
+        if self.materialized:
+            return super().get_task(day, daily_index)
+
+        position, week_index = self._locate(day, daily_index)
+        return self._week(position)[0][week_index]
+
+    def days_points(self, start_date: date, end_date: date) -> float:
+        """
+        Computes points for all tasks within the days from ``start_date`` up to (but not
+        including) ``end_date`` (see Schedule.days_points()).
+        """
+
+        if self.materialized:
+            return super().days_points(start_date, end_date)
+
+        # Tasks which start exactly at midnight of ``end_date`` only overlap the
+        # interval if they have zero length, and so have zero points, so we don't need
+        # to decode the week which starts there.
+        start_time = datetime.combine(start_date, time())
+        end_time = datetime.combine(end_date, time())
+        candidates = self._week_range_tasks(
+            start_time - self._max_duration, end_time - timedelta(microseconds=1)
+        )
+        return sum(
+            task.points()
+            for task in candidates
+            if _overlaps(task, start_time, end_time)
+        )
+
+    def tasks_in_interval(self, start_time: datetime, end_time: datetime) -> List[Task]:
+        """
+        Returns a list of all tasks in the schedule that overlap the interval
+        (start_time, end_time).
+        """
+
+        if self.materialized or end_time < start_time:
+            return super().tasks_in_interval(start_time, end_time)
+
+        # Only decode the weeks which hold tasks starting between ``start_time -
+        # self._max_duration`` and ``end_time``.
+        candidates = self._week_range_tasks(start_time - self._max_duration, end_time)
+        return [task for task in candidates if _overlaps(task, start_time, end_time)]
+
+    def count_in_interval(self, start_time: datetime, end_time: datetime) -> int:
+        """
+        Returns the number of tasks in the schedule that overlap the interval
+        (start_time, end_time).
+        """
+
+        if self.materialized:
+            return super().count_in_interval(start_time, end_time)
+        return len(self.tasks_in_interval(start_time, end_time))
+
+    def week_chunks(self) -> List[Tuple[Week, bytes]]:
+        """ Return the weeks of the schedule along with their encoded chunks. """
+
+        return [(week, self._file.read(week[3], week[4])) for week in self._weeks]
+
+    def _week(self, position: int) -> Tuple[List[Task], List[datetime]]:
+        """
+        Return the tasks of the week at ``position`` in self._weeks along with their
+        start times, decoding them if necessary.
+        """
+
+        if position not in self._week_tasks:
+            _, _, _, offset, length = self._weeks[position]
+            tasks = self._file.chunk(offset, length)
+            self._week_tasks[position] = (tasks, [task.start_time for task in tasks])
+
+        return self._week_tasks[position]
+
+    def _week_range_tasks(
+        self, first_time: datetime, last_time: datetime
+    ) -> List[Task]:
+        """
+        Return the tasks of the weeks which overlap the days from ``first_time`` to
+        ``last_time``, decoding them if necessary.
+        """
+
+        low = bisect_left(self._week_ordinals, _monday(first_time.date()))
+        high = bisect_right(self._week_ordinals, last_time.date().toordinal())
+        return [
+            task for position in range(low, high) for task in self._week(position)[0]
+        ]
+
+    def _locate(self, day: date, daily_index: int) -> Tuple[int, int]:
+        """
+        Find the ``daily_index``-th task on day ``day``, returning the position of its
+        week in self._weeks and its index within the week. Raises the same errors as
+        Schedule.get_task_index().
+        """
+
+        position = bisect_left(self._week_ordinals, _monday(day))
+        if position == len(self._weeks) or self._week_ordinals[position] != _monday(
+            day
+        ):
+            raise ValueError("No task on day %s" % str(day))
+
+        _, start_keys = self._week(position)
+        day_start = datetime.combine(day, time())
+        low = bisect_left(start_keys, day_start)
+        high = bisect_left(start_keys, day_start + timedelta(days=1))
+        if low == high:
+            raise ValueError("No task on day %s" % str(day))
+        if not 0 <= daily_index < high - low:
+            raise ValueError(
+                "Index %d is larger than number of tasks on day %s" % (daily_index, day)
+            )
+
+        return position, low + daily_index
+
+
+def save_indexed(
+    path: str,
+    state_dict: Dict[str, Any],
+    codec: Optional[Codec] = None,
+    use_dictionary: bool = True,
+) -> None:
+    """
+    Save a session state dict to an indexed file at ``path``, compressed with
+    ``codec`` if it is given (against a dictionary if the codec supports it and
+    ``use_dictionary`` is True). The entry at the current history position is always
+    saved as a checkpoint, so that loading the session only has to decode that entry.
+    The file is written atomically (see flowshop.locking.atomic_file()), so that a
+    crash while saving leaves the old file in place, and readers which mapped the old
+    file keep reading it.
+    """
+
+    edit_history: EditHistory = state_dict["edit_history"]
+    history_pos = state_dict["history_pos"]
+    stored_entries = edit_history.stored_entries()
+    if 0 <= history_pos < len(stored_entries) and not edit_history.is_checkpoint(
+        history_pos
+    ):
+        stored_entries[history_pos] = Checkpoint(*edit_history[history_pos])
+
+    with atomic_file(path) as session_file:
+        writer = _Writer(session_file, codec, _source_file(stored_entries))
+        if (
+            use_dictionary
+            and codec is not None
+            and codec.supports_dictionary
+            and 0 <= history_pos < len(stored_entries)
+        ):
+            writer.set_dictionary(stored_entries[history_pos])
+        dictionary_blob = (0, 0)
+        if writer.dictionary is not None:
+            dictionary_blob = writer.write(writer.dictionary)
+
+        entries = [writer.write_entry(entry) for entry in stored_entries]
+
+        footer = [
+            DICTIONARY.pack(*dictionary_blob),
+            HISTORY_POS.pack(history_pos),
+            encode_date(state_dict["base_date"]),
+            encode_string(state_dict["name"]),
+            writer.names.encode(),
+            COUNT.pack(len(entries)),
+        ]
+        footer.extend(ENTRY.pack(*entry) for entry in entries)
+        footer_offset, _ = writer.write(b"".join(footer))
+        writer.write(TRAILER.pack(footer_offset, MAGIC))
+
+
+def load_indexed(path: str) -> Dict[str, Any]:
+    """
+    Load a session state dict from the indexed file at ``path``. Only the footer is
+    decoded here: the entries of the edit history are decoded when they are first
+    accessed, and the tasks of checkpoints when they are first looked up.
+    """
+
+    with open(path, "rb") as session_file:
+        buffer = mmap.mmap(session_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    version, codec, offset = _read_header(buffer, path)
+    if len(buffer) < offset + TRAILER.size:
+        raise ValueError("%s is not an indexed session file." % path)
+    footer_offset, magic = TRAILER.unpack_from(buffer, len(buffer) - TRAILER.size)
+    if magic != MAGIC:
+        raise ValueError("Indexed session file %s is incomplete." % path)
+
+    offset = footer_offset
+    dictionary = None
+    if version >= 3:
+        dictionary_offset, dictionary_length = DICTIONARY.unpack_from(buffer, offset)
+        offset += DICTIONARY.size
+        if dictionary_length > 0:
+            dictionary = buffer[
+                dictionary_offset : dictionary_offset + dictionary_length
+            ]
+    (history_pos,) = HISTORY_POS.unpack_from(buffer, offset)
+    base_date, offset = decode_date(buffer, offset + HISTORY_POS.size)
+    name, offset = decode_string(buffer, offset)
+    names, offset = NameTable.decode(buffer, offset)
+    indexed_file = IndexedFile(buffer, names, codec, dictionary)
+    (num_entries,) = COUNT.unpack_from(buffer, offset)
+    offset += COUNT.size
+
+    entries = []
+    for i in range(num_entries):
+        checkpoint, entry_offset, length = ENTRY.unpack_from(
+            buffer, offset + i * ENTRY.size
+        )
+        loader = _EntryLoader(indexed_file, bool(checkpoint), entry_offset, length)
+        entries.append(LazyEntry(bool(checkpoint), loader))
+
+    return {
+        "name": name,
+        "edit_history": EditHistory.from_stored(entries),
+        "history_pos": history_pos,
+        "base_date": base_date,
+    }
+
+
+def indexed_codec(path: str) -> Optional[Codec]:
+    """ Read the codec of the indexed file at ``path`` from its header. """
+
+    with open(path, "rb") as session_file:
+        _, codec, _ = _read_header(session_file.read(HEADER.size + CODEC_ID.size), path)
+    return codec
+
+
+class IndexedFile:
+    """
+    An indexed file mapped into memory, along with its table of task names and its
+    codec and compression dictionary, if it has them. Decoded chunks of tasks are
+    cached by their offset, so that schedules which share a chunk also share its Task
+    objects, as they did before they were saved.
+    """
+
+    def __init__(
+        self,
+        buffer: mmap.mmap,
+        names: NameTable,
+        codec: Optional[Codec] = None,
+        dictionary: Optional[bytes] = None,
+    ) -> None:
+        """ Init function for IndexedFile object. """
+
+        self.buffer = buffer
+        self.names = names
+        self.codec = codec
+        self.dictionary = dictionary
+        self._chunks: Dict[int, List[Task]] = {}
+
+    def read_stored(self, offset: int, length: int) -> bytes:
+        """ Read the blob at ``offset`` as it is stored, i.e. possibly compressed. """
+        return self.buffer[offset : offset + length]
+
+    def read(self, offset: int, length: int) -> bytes:
+        """ Read the blob at ``offset``, decompressing it if necessary. """
+
+        data = self.read_stored(offset, length)
+        if self.codec is None:
+            return data
+        if data[:1] == COMPRESSED:
+            return self.codec.decompress(data[1:], self.dictionary)
+        return data[1:]
+
+    def chunk(self, offset: int, length: int) -> List[Task]:
+        """ Decode the chunk of tasks at ``offset``. The result must not be modified. """
+
+        if offset not in self._chunks:
+            self._chunks[offset] = decode_tasks(self.read(offset, length), self.names)
+        return self._chunks[offset]
+
+
+class _EntryLoader:
+    """
+    Decodes the entry of an edit history stored in the blob at ``offset`` in
+    ``indexed_file``, when called.
+    """
+
+    def __init__(
+        self, indexed_file: IndexedFile, checkpoint: bool, offset: int, length: int
+    ) -> None:
+        """ Init function for _EntryLoader object. """
+
+        self.file = indexed_file
+        self.checkpoint = checkpoint
+        self.offset = offset
+        self.length = length
+
+    def __call__(self) -> Union[Checkpoint, Delta]:
+        """ Decode the entry. """
+
+        data = self.file.read(self.offset, self.length)
+        if not self.checkpoint:
+            return decode_delta(data, self.file.names)
+
+        schedules = []
+        offset = 0
+        for _ in range(2):
+            meta, offset = decode_schedule_meta(data, offset)
+            schedules.append(LazySchedule(self.file, *meta))
+        return Checkpoint(*schedules)
+
+
+class _Writer:
+    """
+    Writes blobs to an indexed file, keeping track of their offsets and of the week
+    chunks which were already written. Task names are interned into self.names, which
+    starts as a copy of the table of names of ``source`` (the file that the history was
+    loaded from, if any), so that blobs which were loaded from that file and never
+    decoded can be copied over without decoding them. They are copied as they are
+    stored if the source file has the same codec and dictionary, and are decompressed
+    and compressed again otherwise.
+    """
+
+    def __init__(
+        self,
+        session_file: BinaryIO,
+        codec: Optional[Codec] = None,
+        source: Optional[IndexedFile] = None,
+    ) -> None:
+        """ Init function for _Writer object. """
+
+        self.file = session_file
+        self.offset = 0
+        self.codec = codec
+        self.dictionary: Optional[bytes] = None
+        self.source = source
+        self.names = NameTable(source.names.names if source is not None else None)
+        self.chunks: Dict[bytes, Tuple[int, int]] = {}
+        self.source_chunks: Dict[int, Tuple[int, int]] = {}
+        self.encoded: Dict[Tuple[int, ...], bytes] = {}
+        self.write(HEADER.pack(MAGIC, VERSION) + CODEC_ID.pack(codec_id(codec)))
+
+    def set_dictionary(self, entry: Union[Checkpoint, LazyEntry]) -> None:
+        """
+        Set the dictionary to compress blobs against. The dictionary of the source file
+        is kept if it has the same codec, and otherwise a dictionary is built from the
+        week chunks of the checkpoint ``entry``, keeping the latest weeks if they don't
+        all fit.
+        """
+
+        if (
+            self.source is not None
+            and self.source.codec is self.codec
+            and self.source.dictionary is not None
+        ):
+            self.dictionary = self.source.dictionary
+            return
+
+        if isinstance(entry, LazyEntry):
+            entry = entry.load()
+        chunks = []
+        for schedule in entry:
+            for week, data in self.week_chunks(schedule):
+                chunks.append(data if data is not None else self.source.read(*week[3:]))
+        dictionary = b"".join(chunks)[-self.codec.dictionary_size :]
+        self.dictionary = dictionary if dictionary else None
+
+    def write(self, data: bytes) -> Tuple[int, int]:
+        """ Write ``data`` as it is, returning its offset and length. """
+
+        offset = self.offset
+        self.file.write(data)
+        self.offset += len(data)
+        return offset, len(data)
+
+    def write_blob(self, data: bytes) -> Tuple[int, int]:
+        """ Write a blob, compressing it if there is a codec. """
+
+        if self.codec is None:
+            return self.write(data)
+        compressed = self.codec.compress(data, self.dictionary)
+        if len(compressed) < len(data):
+            return self.write(COMPRESSED + compressed)
+        return self.write(STORED + data)
+
+    def copy_blob(self, offset: int, length: int) -> Tuple[int, int]:
+        """ Copy the blob at ``offset`` in the source file. """
+
+        if self.source.codec is self.codec and self.source.dictionary == (
+            self.dictionary
+        ):
+            return self.write(self.source.read_stored(offset, length))
+        return self.write_blob(self.source.read(offset, length))
+
+    def write_entry(
+        self, entry: Union[Checkpoint, Delta, LazyEntry]
+    ) -> Tuple[bool, int, int]:
+        """
+        Write an entry of an edit history, returning whether or not it is a checkpoint
+        along with the offset and length of its blob.
+        """
+
+        if isinstance(entry, LazyEntry):
+            loader = entry.load
+            if (
+                not entry.checkpoint
+                and isinstance(loader, _EntryLoader)
+                and loader.file is self.source
+            ):
+                return (False,) + self.copy_blob(loader.offset, loader.length)
+            entry = entry.load()
+
+        if isinstance(entry, Checkpoint):
+            data = b"".join(self.schedule_meta(schedule) for schedule in entry)
+            return (True,) + self.write_blob(data)
+        return (False,) + self.write_blob(encode_delta(entry, self.names))
+
+    def schedule_meta(self, schedule: Schedule) -> bytes:
+        """
+        Write the week chunks of ``schedule``, returning the encoded metadata which
+        locates them.
+        """
+
+        weeks = []
+        for week, data in self.week_chunks(schedule):
+            monday, first_index, num_tasks, source_offset, source_length = week
+            if data is None:
+                # Chunk of a LazySchedule loaded from the source file.
+                if source_offset not in self.source_chunks:
+                    self.source_chunks[source_offset] = self.copy_blob(
+                        source_offset, source_length
+                    )
+                weeks.append(
+                    (monday, first_index, num_tasks) + self.source_chunks[source_offset]
+                )
+                continue
+
+            if data not in self.chunks:
+                self.chunks[data] = self.write_blob(data)
+            weeks.append((monday, first_index, num_tasks) + self.chunks[data])
+
+        return encode_schedule_meta(schedule.name, schedule.max_duration, weeks)
+
+    def week_chunks(self, schedule: Schedule) -> List[Tuple[Week, Optional[bytes]]]:
+        """
+        Split ``schedule`` into weeks, returning each week along with its encoded
+        chunk. Weeks of a LazySchedule loaded from the source file which were never
+        decoded aren't encoded again: their chunk is None, and the offset and length of
+        their chunk in the source file are given with the week.
+        """
+
+        if (
+            isinstance(schedule, LazySchedule)
+            and not schedule.materialized
+            and schedule.indexed_file is self.source
+        ):
+            return [(week, None) for week in schedule.weeks]
+
+        week_chunks = []
+        first_index = 0
+        for monday, tasks in _split_weeks(schedule.tasks):
+            # Copies of schedules share Task objects, so weeks which hold the same Task
+            # objects as a week which was already encoded reuse its encoding.
+            key = tuple(id(task) for task in tasks)
+            if key not in self.encoded:
+                self.encoded[key] = encode_tasks(tasks, self.names)
+            week_chunks.append(
+                ((monday, first_index, len(tasks), 0, 0), self.encoded[key])
+            )
+            first_index += len(tasks)
+
+        return week_chunks
+
+
+def _read_header(data: bytes, path: str) -> Tuple[int, Optional[Codec], int]:
+    """
+    Read the header at the start of the contents of an indexed file, returning the
+    version and codec of the file, and the offset of the end of the header.
+    """
+
+    if len(data) < HEADER.size:
+        raise ValueError("%s is not an indexed session file." % path)
+    magic, version = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("%s is not an indexed session file." % path)
+    if version == 2:
+        return version, None, HEADER.size
+    if version != VERSION:
+        raise ValueError(
+            "Unsupported version %d of indexed session file %s." % (version, path)
+        )
+    (file_codec_id,) = CODEC_ID.unpack_from(data, HEADER.size)
+    return version, codec_from_id(file_codec_id), HEADER.size + CODEC_ID.size
+
+
+def _source_file(
+    entries: List[Union[Checkpoint, Delta, LazyEntry]]
+) -> Optional[IndexedFile]:
+    """ Find the indexed file that entries of an edit history were loaded from, if any. """
+
+    for entry in entries:
+        if isinstance(entry, LazyEntry) and isinstance(entry.load, _EntryLoader):
+            return entry.load.file
+        if isinstance(entry, Checkpoint):
+            for schedule in entry:
+                if isinstance(schedule, LazySchedule):
+                    return schedule.indexed_file
+    return None
+
+
+def _split_weeks(tasks: List[Task]) -> List[Tuple[int, List[Task]]]:
+    """
+    Split a sorted list of tasks into weeks, returning the ordinal of the Monday of each
+    week along with its tasks.
+    """
+
+    weeks: List[Tuple[int, List[Task]]] = []
+    for task in tasks:
+        monday = _monday(task.date)
+        if not weeks or weeks[-1][0] != monday:
+            weeks.append((monday, []))
+        weeks[-1][1].append(task)
+    return weeks
+
+
+def _monday(day: date) -> int:
+    """ Ordinal of the Monday of the week of ``day``. """
+    return day.toordinal() - day.weekday()
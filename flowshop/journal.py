@@ -0,0 +1,276 @@
+"""
+Append-only journal files for saving sessions. A journal file holds a snapshot of a
+session state dict followed by a log of records describing the changes made since the
+snapshot, so that saving a session only writes what changed.
+"""
+
+import os
+import pickle
+import struct
+import time
+import zlib
+from typing import List, Tuple, Any, BinaryIO, Optional
+
+from flowshop.compression import Codec, codec_id, codec_from_id
+from flowshop.locking import atomic_file
+
+
+# Journals start with MAGIC and the id of the codec which compresses their frames.
+MAGIC = b"FSJ2"
+FRAME_HEADER = struct.Struct("<II")
+SYNC_INTERVAL = 1.0
+COMPACT_RECORDS = 1000
+COMPACT_RATIO = 2.0
+
+
+class Journal:
+    """
+    Writer for a journal file. The file starts with MAGIC and the id of the codec of the
+    journal, followed by frames which each hold a pickled object: first the snapshot,
+    then one frame per record. The pickled object of each frame is compressed with the
+    codec, if the journal has one. Each frame is prefixed by its length and a CRC32
+    checksum, so that a frame which was only partially written before a crash (a torn
+    tail) can be detected. Readers stop before a torn tail, and the next append
+    truncates it.
+
+    Records are flushed to the OS on every append, but only fsync-ed to disk if
+    ``sync_interval`` seconds have passed since the last fsync, so that frequent saves
+    don't each wait on the disk. Snapshots are always fsync-ed, and written atomically
+    (see flowshop.locking.atomic_file()), so that a crash while compacting leaves the
+    old journal in place.
+
+    The journal keeps the file it last read or wrote open until it is closed, and
+    remembers where its last frame ends, so that changed_on_disk() can tell whether
+    another process wrote to the journal since. Holding the file open also keeps its
+    inode from being reused by a file which replaces it. Journals are context managers
+    which close the file on exit.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        sync_interval: float = SYNC_INTERVAL,
+        compact_records: int = COMPACT_RECORDS,
+        compact_ratio: float = COMPACT_RATIO,
+        codec: Optional[Codec] = None,
+    ) -> None:
+        """ Init function for Journal object. """
+
+        self.path = path
+        self.codec = codec
+        self.sync_interval = sync_interval
+        self.compact_records = compact_records
+        self.compact_ratio = compact_ratio
+
+        self.snapshot_size = 0
+        self.log_size = 0
+        self.num_records = 0
+        self.end = 0
+        self._file: Optional[BinaryIO] = None
+        self._last_sync = 0.0
+
+    def __enter__(self) -> "Journal":
+        """ Enter a context which closes the journal on exit. """
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """ Close the journal. """
+        self.close()
+
+    def needs_compaction(self) -> bool:
+        """
+        Whether or not the log has grown large enough (in number of records, or in size
+        relative to the snapshot) that a new snapshot should be written.
+        """
+
+        return (
+            self.num_records >= self.compact_records
+            or self.log_size > self.compact_ratio * max(self.snapshot_size, 1)
+        )
+
+    def write_snapshot(self, snapshot: Any) -> None:
+        """ Replace the journal with a new one holding only ``snapshot``. """
+
+        self.close()
+        data = MAGIC + bytes([codec_id(self.codec)]) + _frame(snapshot, self.codec)
+        with atomic_file(self.path) as journal_file:
+            journal_file.write(data)
+        # The file stays open until the journal is closed.
+        self._file = open(self.path, "r+b")  # pylint: disable=consider-using-with
+
+        self.snapshot_size = len(data) - len(MAGIC) - 1
+        self.log_size = 0
+        self.num_records = 0
+        self.end = len(data)
+        self._last_sync = time.monotonic()
+
+    def append(self, records: List[Any]) -> None:
+        """
+        Append ``records`` to the log, each in its own frame, after the last frame of
+        the journal. Anything after that frame (i.e. a torn tail) is truncated.
+        """
+
+        if self._file is None or not self._file.writable():
+            self.close()
+            self._file = open(self.path, "r+b")  # pylint: disable=consider-using-with
+        self._file.seek(self.end)
+        self._file.truncate()
+
+        frames = b"".join(_frame(record, self.codec) for record in records)
+        self._file.write(frames)
+        self._file.flush()
+        self.end += len(frames)
+        self.log_size += len(frames)
+        self.num_records += len(records)
+
+        if time.monotonic() - self._last_sync >= self.sync_interval:
+            self.sync()
+
+    def changed_on_disk(self) -> bool:
+        """
+        Whether or not the journal file was replaced, removed or appended to by another
+        writer since this journal last read or wrote it. Bytes after the last frame
+        which don't hold a complete frame are a torn tail, which isn't a change.
+        """
+
+        if self._file is None:
+            return True
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return True
+        if not os.path.samestat(stat, os.fstat(self._file.fileno())):
+            return True
+        if stat.st_size <= self.end:
+            return stat.st_size < self.end
+
+        self._file.seek(self.end)
+        return _read_frame(self._file.read(), 0) is not None
+
+    def sync(self) -> None:
+        """ Force all appended records to disk. """
+
+        if self._file is not None and self._file.writable():
+            os.fsync(self._file.fileno())
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        """ Sync and close the journal file, if it is open. """
+
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    @classmethod
+    def open(cls, path: str, **kwargs: Any) -> Tuple["Journal", Any, List[Any]]:
+        """
+        Read the journal at ``path``, and return a Journal for appending to it (with
+        the codec of the journal) along with its snapshot and records. The journal
+        keeps the file open until it is closed.
+        """
+
+        journal_file = open(path, "rb")  # pylint: disable=consider-using-with
+        try:
+            codec, objects, sizes, end = _read_frames(journal_file.read(), path)
+        except BaseException:
+            journal_file.close()
+            raise
+
+        journal = cls(path, codec=codec, **kwargs)
+        journal.snapshot_size = sizes[0]
+        journal.log_size = sum(sizes[1:])
+        journal.num_records = len(objects) - 1
+        journal.end = end
+        journal._file = journal_file
+        journal._last_sync = time.monotonic()
+        return journal, objects[0], objects[1:]
+
+
+def journal_codec(path: str) -> Optional[Codec]:
+    """ Read the codec of the journal at ``path``. """
+
+    with open(path, "rb") as journal_file:
+        codec, _ = _read_header(journal_file.read(len(MAGIC) + 1), path)
+    return codec
+
+
+def read_journal(path: str) -> Tuple[Any, List[Any], List[int]]:
+    """
+    Read the journal at ``path``, returning the snapshot, the list of records after
+    it, and the size of each frame. Reading stops at an incomplete or corrupt frame,
+    such as a record which another process is still appending, and never writes to the
+    file.
+    """
+
+    with open(path, "rb") as journal_file:
+        data = journal_file.read()
+    _, objects, sizes, _ = _read_frames(data, path)
+    return objects[0], objects[1:], sizes
+
+
+def _read_frames(
+    data: bytes, path: str
+) -> Tuple[Optional[Codec], List[Any], List[int], int]:
+    """
+    Read the frames of the contents of a journal up to the first incomplete or corrupt
+    frame, returning the codec of the journal, the object and size of each frame, and
+    the offset of the end of the last frame.
+    """
+
+    codec, pos = _read_header(data, path)
+    objects = []
+    sizes = []
+    while True:
+        frame = _read_frame(data, pos)
+        if frame is None:
+            break
+        payload, size = frame
+        if codec is not None:
+            payload = codec.decompress(payload)
+        objects.append(pickle.loads(payload))
+        sizes.append(size)
+        pos += size
+
+    if not objects:
+        raise ValueError("Journal %s has no snapshot." % path)
+    return codec, objects, sizes, pos
+
+
+def _read_frame(data: bytes, pos: int) -> Optional[Tuple[bytes, int]]:
+    """
+    Read the frame at offset ``pos`` of ``data``, returning its payload and size, or
+    None if there isn't a complete frame with a correct checksum there.
+    """
+
+    if pos + FRAME_HEADER.size > len(data):
+        return None
+    length, checksum = FRAME_HEADER.unpack_from(data, pos)
+    start = pos + FRAME_HEADER.size
+    payload = data[start : start + length]
+    if len(payload) < length or zlib.crc32(payload) != checksum:
+        return None
+    return payload, FRAME_HEADER.size + length
+
+
+def _read_header(data: bytes, path: str) -> Tuple[Optional[Codec], int]:
+    """
+    Read the header at the start of the contents of a journal, returning the codec of
+    the journal and the offset of its first frame.
+    """
+
+    if data[: len(MAGIC)] == MAGIC and len(data) > len(MAGIC):
+        return codec_from_id(data[len(MAGIC)]), len(MAGIC) + 1
+    raise ValueError("%s is not a session journal." % path)
+
+
+def _frame(obj: Any, codec: Optional[Codec] = None) -> bytes:
+    """
+    Pickle ``obj`` into a frame with a length and checksum header, compressing it with
+    ``codec`` if it is given.
+    """
+
+    payload = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    if codec is not None:
+        payload = codec.compress(payload)
+    return FRAME_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
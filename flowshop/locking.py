@@ -0,0 +1,91 @@
+"""
+Advisory file locks and atomic file writes, so that many processes can read saved
+sessions while another process saves them.
+
+Saved sessions follow a reader/writer protocol. Writers hold an exclusive advisory lock
+on the lock file of a session while saving it (see flowshop.files.session_lock()), so
+that two processes saving the same session take turns instead of interleaving their
+writes. Readers never lock: files which are rewritten on save are written to a temporary
+file, fsync-ed and renamed over the old file, so a reader always sees either the whole
+old file or the whole new one, and a reader which already opened (or memory-mapped) the
+old file keeps reading it after the rename. Journals are appended to in place, but each
+frame is checksummed, so readers stop at the last complete frame (see flowshop.journal).
+
+Locks are POSIX record locks taken with fcntl.lockf(), which are held by a process (so
+they aren't inherited by processes forked from it), and are skipped on platforms which
+don't have fcntl.
+"""
+
+import os
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """
+    Hold an exclusive advisory lock on the lock file at ``path``, which is created if
+    it doesn't exist, waiting for any other process which holds it. Locks only exclude
+    other processes, not other threads of the same process, and a process shouldn't
+    take a lock which it already holds, since the lock is released as soon as either
+    is.
+    """
+
+    lock_fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o666)
+    try:
+        if fcntl is not None:
+            fcntl.lockf(lock_fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        # Closing the file releases the lock.
+        os.close(lock_fd)
+
+
+@contextmanager
+def atomic_file(path: str) -> Iterator[BinaryIO]:
+    """
+    Open a temporary file to write the new contents of the file at ``path``. On exit,
+    the temporary file is fsync-ed and renamed over ``path``, so that a crash while
+    writing leaves the old file in place. If the context exits with an error, the
+    temporary file is removed instead.
+    """
+
+    temp_path = "%s.%d.tmp" % (path, os.getpid())
+    try:
+        with open(temp_path, "wb") as temp_file:
+            yield temp_file
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    os.replace(temp_path, path)
+    fsync_dir(os.path.dirname(path))
+
+
+def atomic_write(path: str, data: bytes) -> None:
+    """ Replace the contents of the file at ``path`` with ``data`` atomically. """
+
+    with atomic_file(path) as out_file:
+        out_file.write(data)
+
+
+def fsync_dir(path: str) -> None:
+    """
+    Force the entries of the directory at ``path`` to disk, so that a rename into it
+    survives a crash. Does nothing on platforms which can't open directories.
+    """
+
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    dir_fd = os.open(path or ".", os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
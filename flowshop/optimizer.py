@@ -0,0 +1,608 @@
+"""
+Optimizer which schedules tasks automatically. Given tasks which aren't scheduled yet,
+each with a priority, a duration and a window of time which it has to be done in, along
+with blocked time (such as the tasks of an existing schedule), the optimizer finds a
+planned Schedule without overlap which maximizes Schedule.points().
+
+Since the points of a task don't depend on when it is done, this amounts to choosing
+which tasks to fit in, which is NP-hard in general (it is the weighted number of late
+jobs problem with release dates). The optimizer combines:
+
+- A dynamic program over the tasks in order of deadline, which keeps the Pareto front
+  of (end of the last task, points) over the subsets of tasks considered so far. This
+  is exact when windows are agreeable (tasks which can start earlier also have earlier
+  deadlines) and no time is blocked.
+- A greedy pass, which places tasks in order of priority at the earliest time they fit.
+- A local search, which inserts unscheduled tasks into gaps, ejects tasks worth fewer
+  points to make room for tasks worth more, and shifts tasks to merge gaps.
+- Given a time budget, an iterated local search, which removes a random run of
+  consecutive tasks and sequences the unscheduled tasks into the freed time again with
+  the dynamic program, in a random order, keeping the best schedule found (see
+  Optimizer.solutions(), which yields each improvement as it is found).
+
+Times are handled internally as integer microseconds since the epoch (as in
+flowshop.encoding), and tasks as parallel lists, so that schedules can be searched
+without creating Task objects. Optimizer.arrays() packs these lists into TaskArrays,
+from which Optimizer.from_arrays() creates an equivalent optimizer (in another process,
+for instance, as flowshop.parallel does).
+"""
+
+import random
+from array import array
+import time
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import List, Dict, Tuple, Iterable, Iterator, Sequence, NamedTuple, Optional
+
+from flowshop.encoding import EPOCH, MICROSECOND
+from flowshop.schedule import Schedule
+from flowshop.task import Task
+
+
+# Largest fraction of scheduled tasks removed by each perturbation of the iterated local
+# search.
+PERTURB_FRACTION = 0.3
+
+# Probability that a perturbation may remove any number of tasks, up to all of them,
+# which lets the search escape local optima which need larger changes.
+RESTART_PROBABILITY = 0.1
+
+MICROSECONDS_PER_HOUR = 3600 * 10 ** 6
+
+
+class PendingTask(NamedTuple):
+    """
+    A task which isn't scheduled yet. The task takes ``duration``, and has to start at
+    or after ``earliest`` and end at or before ``latest``.
+    """
+
+    name: str
+    priority: float
+    duration: timedelta
+    earliest: datetime
+    latest: datetime
+
+    def points(self) -> float:
+        """ Points for completing task, as for Task.points(). """
+        return self.priority * self.duration.total_seconds() / 3600
+
+
+class TaskArrays(NamedTuple):
+    """
+    Tasks and free time of an Optimizer as compact arrays: the duration, earliest start,
+    latest end and priority of each task, and the starts and ends of the gaps of free
+    time, all in integer microseconds since the epoch except for priorities.
+    """
+
+    durations: array
+    earliest: array
+    latest: array
+    priorities: array
+    free_starts: array
+    free_ends: array
+
+
+class Optimizer:
+    """
+    Optimizer which schedules ``tasks`` (a sequence of PendingTask) around ``blocked``,
+    a list of (start, end) pairs of time which no task can overlap. ``seed`` seeds the
+    random choices of the iterated local search.
+    """
+
+    def __init__(
+        self,
+        tasks: Sequence[PendingTask],
+        blocked: Iterable[Tuple[datetime, datetime]] = (),
+        seed: int = 0,
+    ) -> None:
+        """ Init function for Optimizer object. """
+
+        self.tasks = list(tasks)
+        for task in self.tasks:
+            if task.duration <= timedelta(0):
+                raise ValueError("Task %s has no duration." % task.name)
+            if task.priority is None:
+                raise ValueError("Task %s has no priority." % task.name)
+
+        self._init_tasks(
+            [task.duration // MICROSECOND for task in self.tasks],
+            [_to_int(task.earliest) for task in self.tasks],
+            [_to_int(task.latest) for task in self.tasks],
+            [task.priority for task in self.tasks],
+        )
+        self.free = _FreeTime.around(
+            [(_to_int(start), _to_int(end)) for start, end in blocked],
+            min(self.earliest, default=0),
+            max(self.latest, default=0),
+        )
+        self.rng = random.Random(seed)
+
+    @classmethod
+    def from_arrays(cls, arrays: TaskArrays, seed: int = 0) -> "Optimizer":
+        """
+        Create an optimizer from the arrays of another one, which searches the same
+        solutions. It has no PendingTask objects, so its solutions are turned into
+        schedules by the optimizer which the arrays came from.
+        """
+
+        optimizer = cls.__new__(cls)
+        optimizer.tasks = []
+        optimizer._init_tasks(
+            list(arrays.durations),
+            list(arrays.earliest),
+            list(arrays.latest),
+            list(arrays.priorities),
+        )
+        optimizer.free = _FreeTime(
+            min(optimizer.earliest, default=0), max(optimizer.latest, default=0)
+        )
+        optimizer.free.starts = list(arrays.free_starts)
+        optimizer.free.ends = list(arrays.free_ends)
+        optimizer.rng = random.Random(seed)
+        return optimizer
+
+    def _init_tasks(
+        self,
+        durations: List[int],
+        earliest: List[int],
+        latest: List[int],
+        priorities: List[float],
+    ) -> None:
+        """ Set the parallel lists which describe the tasks. """
+
+        self.num_tasks = len(durations)
+        self.durations = durations
+        self.earliest = earliest
+        self.latest = latest
+        self.priorities = priorities
+        self.weights = [
+            priority * duration / MICROSECONDS_PER_HOUR
+            for priority, duration in zip(priorities, durations)
+        ]
+        self.iterations = 0
+
+    def arrays(self) -> TaskArrays:
+        """ Pack the tasks and free time of the optimizer into arrays. """
+
+        return TaskArrays(
+            array("q", self.durations),
+            array("q", self.earliest),
+            array("q", self.latest),
+            array("d", self.priorities),
+            array("q", self.free.starts),
+            array("q", self.free.ends),
+        )
+
+    def solution(self, starts: Dict[int, int]) -> "_Solution":
+        """ Create a solution which schedules each task ``i`` of ``starts`` at starts[i]. """
+
+        solution = _Solution(self)
+        for i, start in starts.items():
+            solution.add(i, start)
+        return solution
+
+    def solutions(
+        self,
+        time_limit: float = None,
+        local_search: bool = True,
+        initial: Dict[int, int] = None,
+    ) -> Iterator[Dict[int, int]]:
+        """
+        Yield solutions (dicts from the index of each scheduled task to its start time)
+        with increasing points, ending with the best solution found. The greedy and
+        dynamic programming solutions (or the solution ``initial``, if it is given) are
+        improved by a local search if ``local_search`` is True, and then by an iterated
+        local search until ``time_limit`` seconds have passed, if it is given. Each
+        iteration adds to ``self.iterations``.
+        """
+
+        deadline = None if time_limit is None else time.perf_counter() + time_limit
+        if initial is not None:
+            best = self.solution(initial)
+        else:
+            best = max(
+                [self.sequence(self.deadline_order()), self.greedy()],
+                key=lambda solution: solution.points,
+            )
+        yield dict(best.starts)
+        if not local_search:
+            return
+
+        if self.improve(best, deadline):
+            yield dict(best.starts)
+
+        current = best.copy()
+        while deadline is not None and time.perf_counter() < deadline:
+            self.iterations += 1
+            candidate = current.copy()
+            self.perturb(candidate)
+            candidate = self.sequence(self.random_order(candidate), candidate)
+            self.improve(candidate, deadline)
+            if candidate.points >= current.points - 1e-9:
+                current = candidate
+            if current.points > best.points + 1e-9:
+                best = current.copy()
+                yield dict(best.starts)
+
+    def schedule(self, solution: Dict[int, int], name: str = "optimized") -> Schedule:
+        """ Create a planned Schedule with name ``name`` holding the tasks of a solution. """
+
+        return Schedule(
+            name,
+            [
+                Task(
+                    self.tasks[i].name,
+                    priority=self.tasks[i].priority,
+                    start_time=_from_int(start),
+                    end_time=_from_int(start + self.durations[i]),
+                )
+                for i, start in solution.items()
+            ],
+        )
+
+    def deadline_order(self) -> List[int]:
+        """ Indices of the tasks in order of deadline, then of earliest start. """
+
+        return sorted(
+            range(self.num_tasks), key=lambda i: (self.latest[i], self.earliest[i])
+        )
+
+    def random_order(self, solution: "_Solution") -> List[int]:
+        """
+        Indices of the unscheduled tasks of ``solution``, in order of a random target
+        start time within the window of each task.
+        """
+
+        return sorted(
+            self._unscheduled(solution),
+            key=lambda i: self.rng.uniform(
+                self.earliest[i],
+                max(self.earliest[i], self.latest[i] - self.durations[i]),
+            ),
+        )
+
+    def sequence(
+        self, order: Sequence[int], solution: "_Solution" = None
+    ) -> "_Solution":
+        """
+        Solve the dynamic program which picks the subset of tasks worth the most points
+        that can be done one after another in ``order``, each as early as it fits in
+        the free time of ``solution`` (or in free time, if no solution is given), and
+        return a solution which adds them. States hold the end of the last task, the
+        points so far and the placements which lead to them (as a linked list). Only
+        states on the Pareto front are kept, since a state which ends later with no more
+        points can never do better.
+        """
+
+        solution = _Solution(self) if solution is None else solution.copy()
+        free = solution.free
+        front: List[Tuple[int, float, Optional[tuple]]] = [(free.start, 0.0, None)]
+        ends = [free.start]
+        for i in order:
+            duration = self.durations[i]
+            candidates = []
+
+            # Every state which ends before the task can start places it at the same
+            # time, so only the last of them (which has the most points) is extended.
+            first = max(bisect_right(ends, self.earliest[i]) - 1, 0)
+            for end, points, placements in front[first:]:
+                start = free.fit(duration, max(end, self.earliest[i]), self.latest[i])
+                # Tasks only fit later after a state which ends later.
+                if start is None:
+                    break
+                candidates.append(
+                    (start + duration, points + self.weights[i], (i, start, placements))
+                )
+            # New states end after the task, so states which end before the first of
+            # them stay on the front as they are.
+            if candidates:
+                keep = bisect_right(ends, candidates[0][0])
+                tail = _pareto_front(front[keep:] + candidates, front[keep - 1][1])
+                front[keep:] = tail
+                ends[keep:] = [state[0] for state in tail]
+
+        placements = front[-1][2]
+        while placements is not None:
+            i, start, placements = placements
+            solution.add(i, start)
+        return solution
+
+    def greedy(self) -> "_Solution":
+        """ Place tasks in order of priority, each at the earliest time it fits. """
+
+        solution = _Solution(self)
+        order = sorted(
+            range(self.num_tasks),
+            key=lambda i: (-self.priorities[i], -self.weights[i], self.latest[i]),
+        )
+        for i in order:
+            solution.try_add(i)
+        return solution
+
+    def improve(self, solution: "_Solution", deadline: float = None) -> bool:
+        """
+        Improve ``solution`` in place by local search, until no move improves it or
+        ``deadline`` (a time.perf_counter() value) has passed. Returns whether or not
+        the solution was improved.
+        """
+
+        points = solution.points
+        improved = True
+        while improved and (deadline is None or time.perf_counter() < deadline):
+            improved = self._insert(solution) | self._eject(solution)
+            if not improved:
+                self._compact(solution)
+                improved = self._insert(solution)
+        return solution.points > points + 1e-9
+
+    def perturb(self, solution: "_Solution") -> None:
+        """
+        Remove a random run of consecutive tasks from ``solution``, which frees a stretch
+        of time for the unscheduled tasks to be sequenced into again.
+        """
+
+        scheduled = sorted(solution.starts, key=solution.starts.get)
+        if not scheduled:
+            return
+        max_removed = len(scheduled)
+        if self.rng.random() >= RESTART_PROBABILITY:
+            max_removed = max(2, int(PERTURB_FRACTION * len(scheduled)))
+        num_removed = self.rng.randint(1, max_removed)
+        first = self.rng.randrange(len(scheduled))
+        for i in scheduled[first : first + num_removed]:
+            solution.remove(i)
+
+    def _unscheduled(self, solution: "_Solution") -> List[int]:
+        """
+        Indices of the unscheduled tasks, roughly in order of most points first, with
+        random noise so that repeated searches try tasks in different orders.
+        """
+
+        unscheduled = [i for i in range(self.num_tasks) if i not in solution.starts]
+        return sorted(
+            unscheduled, key=lambda i: -self.weights[i] * self.rng.uniform(0.9, 1.1)
+        )
+
+    def _insert(self, solution: "_Solution") -> bool:
+        """
+        Insert unscheduled tasks wherever they fit, returning whether any task was
+        inserted. Every task is tried, even after one was inserted.
+        """
+
+        inserted = False
+        for i in self._unscheduled(solution):
+            if solution.try_add(i):
+                inserted = True
+        return inserted
+
+    def _eject(self, solution: "_Solution") -> bool:
+        """
+        Make room for unscheduled tasks by removing a scheduled task worth fewer points
+        whose time overlaps their window, then try to place the removed task elsewhere.
+        """
+
+        improved = False
+        for i in self._unscheduled(solution):
+            if i in solution.starts:
+                continue
+            for j in solution.overlapping(self.earliest[i], self.latest[i]):
+                if self.weights[j] >= self.weights[i]:
+                    continue
+                old_start = solution.remove(j)
+                if solution.try_add(i):
+                    solution.try_add(j)
+                    improved = True
+                    break
+                solution.add(j, old_start)
+        return improved
+
+    def _compact(self, solution: "_Solution") -> None:
+        """ Move every scheduled task to the earliest time it fits, merging gaps. """
+
+        for i, _ in sorted(solution.starts.items(), key=lambda item: item[1]):
+            # The task fits where it was, so it fits there or earlier.
+            solution.remove(i)
+            solution.try_add(i)
+
+
+def optimize_schedule(
+    tasks: Sequence[PendingTask],
+    blocked: Iterable[Tuple[datetime, datetime]] = (),
+    name: str = "optimized",
+    time_limit: float = None,
+    local_search: bool = True,
+    seed: int = 0,
+) -> Schedule:
+    """
+    Schedule ``tasks`` around ``blocked`` time to maximize points, returning a planned
+    Schedule with name ``name`` which holds the tasks which were scheduled. See
+    Optimizer.solutions() for ``time_limit`` and ``local_search``.
+    """
+
+    optimizer = Optimizer(tasks, blocked, seed=seed)
+    solution: Dict[int, int] = {}
+    for solution in optimizer.solutions(time_limit, local_search):
+        pass
+    return optimizer.schedule(solution, name)
+
+
+def blocked_time(schedule: Schedule) -> List[Tuple[datetime, datetime]]:
+    """ Return the time taken by the tasks of ``schedule``, to schedule around it. """
+    return [(task.start_time, task.end_time) for task in schedule.tasks]
+
+
+class _FreeTime:
+    """
+    Free time between ``start`` and ``end``, as sorted lists of the starts and ends of
+    the gaps between blocked time.
+    """
+
+    def __init__(self, start: int, end: int) -> None:
+        """ Init function for _FreeTime object. """
+
+        self.start = start
+        self.end = end
+        self.starts = [start] if start < end else []
+        self.ends = [end] if start < end else []
+
+    @classmethod
+    def around(
+        cls, blocked: List[Tuple[int, int]], start: int, end: int
+    ) -> "_FreeTime":
+        """ Free time between ``start`` and ``end`` outside of ``blocked``. """
+
+        free = cls(start, end)
+        for block_start, block_end in blocked:
+            free.occupy(max(block_start, start), min(block_end, end))
+        return free
+
+    def copy(self) -> "_FreeTime":
+        """ Return a copy of the free time. """
+
+        free = _FreeTime.__new__(_FreeTime)
+        free.start = self.start
+        free.end = self.end
+        free.starts = list(self.starts)
+        free.ends = list(self.ends)
+        return free
+
+    def fit(self, duration: int, earliest: int, latest: int) -> Optional[int]:
+        """
+        Return the earliest start at or after ``earliest`` of ``duration`` of free time
+        which ends at or before ``latest``, or None if there is none.
+        """
+
+        gap = bisect_right(self.ends, earliest)
+        while gap < len(self.starts):
+            start = max(self.starts[gap], earliest)
+            if start + duration > latest:
+                return None
+            if start + duration <= self.ends[gap]:
+                return start
+            gap += 1
+        return None
+
+    def occupy(self, start: int, end: int) -> None:
+        """ Remove the time between ``start`` and ``end`` from the free time. """
+
+        # Gaps from ``first`` up to ``last`` overlap the time, and are replaced by the
+        # parts of the first and last of them which are outside of it.
+        first = bisect_right(self.ends, start)
+        last = first
+        while last < len(self.starts) and self.starts[last] < end:
+            last += 1
+        if first == last or start >= end:
+            return
+
+        pieces = []
+        if self.starts[first] < start:
+            pieces.append((self.starts[first], start))
+        if self.ends[last - 1] > end:
+            pieces.append((end, self.ends[last - 1]))
+        self.starts[first:last] = [piece_start for piece_start, _ in pieces]
+        self.ends[first:last] = [piece_end for _, piece_end in pieces]
+
+    def release(self, start: int, end: int) -> None:
+        """
+        Add the time between ``start`` and ``end``, which must not be free, to the free
+        time, merging it with the gaps around it.
+        """
+
+        gap = bisect_right(self.starts, start)
+        if gap > 0 and self.ends[gap - 1] == start:
+            gap -= 1
+            start = self.starts[gap]
+            del self.starts[gap]
+            del self.ends[gap]
+        if gap < len(self.starts) and self.starts[gap] == end:
+            end = self.ends[gap]
+            del self.starts[gap]
+            del self.ends[gap]
+        self.starts.insert(gap, start)
+        self.ends.insert(gap, end)
+
+
+class _Solution:
+    """ Start times of the scheduled tasks of an Optimizer, along with the free time. """
+
+    def __init__(self, optimizer: Optimizer) -> None:
+        """ Init function for _Solution object. """
+
+        self.optimizer = optimizer
+        self.starts: Dict[int, int] = {}
+        self.free = optimizer.free.copy()
+        self.points = 0.0
+
+    def copy(self) -> "_Solution":
+        """ Return a copy of the solution. """
+
+        solution = _Solution.__new__(_Solution)
+        solution.optimizer = self.optimizer
+        solution.starts = dict(self.starts)
+        solution.free = self.free.copy()
+        solution.points = self.points
+        return solution
+
+    def add(self, i: int, start: int) -> None:
+        """ Schedule task ``i`` at ``start``, which must be free. """
+
+        self.starts[i] = start
+        self.free.occupy(start, start + self.optimizer.durations[i])
+        self.points += self.optimizer.weights[i]
+
+    def try_add(self, i: int) -> bool:
+        """ Schedule task ``i`` at the earliest time it fits, if it fits. """
+
+        optimizer = self.optimizer
+        start = self.free.fit(
+            optimizer.durations[i], optimizer.earliest[i], optimizer.latest[i]
+        )
+        if start is None:
+            return False
+        self.add(i, start)
+        return True
+
+    def remove(self, i: int) -> int:
+        """ Unschedule task ``i``, returning its start time. """
+
+        start = self.starts.pop(i)
+        self.free.release(start, start + self.optimizer.durations[i])
+        self.points -= self.optimizer.weights[i]
+        return start
+
+    def overlapping(self, start: int, end: int) -> List[int]:
+        """ Indices of scheduled tasks which overlap the time from start to end. """
+
+        durations = self.optimizer.durations
+        return [
+            i
+            for i, task_start in self.starts.items()
+            if task_start < end and task_start + durations[i] > start
+        ]
+
+
+def _pareto_front(
+    states: List[Tuple[int, float, Optional[tuple]]], min_points: float
+) -> List[Tuple[int, float, Optional[tuple]]]:
+    """
+    Keep the states with more than ``min_points`` (the points of the states which end
+    before them) which no other state dominates, by ending earlier with at least as
+    many points, sorted by end.
+    """
+
+    front = []
+    for state in sorted(states, key=lambda state: (state[0], -state[1])):
+        if state[1] > min_points + 1e-9:
+            front.append(state)
+            min_points = state[1]
+    return front
+
+
+def _to_int(time_point: datetime) -> int:
+    """ Convert a datetime to microseconds since the epoch. """
+    return (time_point - EPOCH) // MICROSECOND
+
+
+def _from_int(microseconds: int) -> datetime:
+    """ Convert microseconds since the epoch to a datetime. """
+    return EPOCH + microseconds * MICROSECOND
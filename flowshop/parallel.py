@@ -0,0 +1,210 @@
+"""
+Parallel schedule optimization, which runs the iterated local search of
+flowshop.optimizer on several islands at once, each in a worker process of a process
+pool. Workers receive the tasks once, as the compact TaskArrays of the optimizer, and
+solutions travel between processes as arrays of (task index, start) pairs, so no Task
+or PendingTask objects are pickled.
+
+The search runs in epochs. In each epoch, every island improves its best solution with
+its own random seed for a fraction of the time budget. Between epochs, elite solutions
+migrate around a ring of islands: each island takes the best solution of the island
+before it, if it is better than its own. The islands start from the greedy and dynamic
+programming solutions, so the first epoch also runs the local search on every island.
+"""
+
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import List, Dict, Tuple, Iterable, Iterator, Sequence, NamedTuple, Optional
+
+from flowshop.optimizer import PendingTask, Optimizer, TaskArrays
+from flowshop.schedule import Schedule
+
+
+# Seconds of search by each island between exchanges of elite solutions.
+EXCHANGE_INTERVAL = 0.25
+
+
+class IslandResult(NamedTuple):
+    """
+    Best solution of an island after an epoch, as an array of (task index, start)
+    pairs, along with its points and the number of iterations run in the epoch.
+    """
+
+    solution: array
+    points: float
+    iterations: int
+
+
+class _Worker:
+    """
+    State of a worker process: the optimizer created from the task arrays, which
+    searches every island that the worker is given.
+    """
+
+    def __init__(self) -> None:
+        """ Init function for _Worker object. """
+        self.optimizer: Optional[Optimizer] = None
+
+    def start(self, arrays: TaskArrays) -> None:
+        """ Create the optimizer of the worker from the task arrays. """
+        self.optimizer = Optimizer.from_arrays(arrays)
+
+    def search(
+        self, solution: Optional[array], time_limit: float, seed: int
+    ) -> IslandResult:
+        """
+        Improve the solution of an island (or the greedy and dynamic programming
+        solutions, if it has none yet) for ``time_limit`` seconds.
+        """
+
+        optimizer = self.optimizer
+        optimizer.rng.seed(seed)
+        optimizer.iterations = 0
+
+        initial = None if solution is None else _decode_solution(solution)
+        starts: Dict[int, int] = {}
+        for starts in optimizer.solutions(time_limit, initial=initial):
+            pass
+        return IslandResult(
+            _encode_solution(starts),
+            sum(optimizer.weights[i] for i in starts),
+            optimizer.iterations,
+        )
+
+
+# State of the current worker process, set up by _init_worker().
+_WORKER = _Worker()
+
+
+class ParallelOptimizer:
+    """
+    Optimizer which searches schedules of ``tasks`` around ``blocked`` time, as
+    flowshop.optimizer.Optimizer does, with ``num_workers`` islands in as many worker
+    processes (by default, one per CPU). ``seed`` seeds the random choices of the
+    islands.
+    """
+
+    def __init__(
+        self,
+        tasks: Sequence[PendingTask],
+        blocked: Iterable[Tuple[datetime, datetime]] = (),
+        num_workers: int = None,
+        seed: int = 0,
+    ) -> None:
+        """ Init function for ParallelOptimizer object. """
+
+        if num_workers is None:
+            num_workers = os.cpu_count() or 1
+        if num_workers < 1:
+            raise ValueError("Need at least 1 worker, not %d." % num_workers)
+
+        self.optimizer = Optimizer(tasks, blocked, seed=seed)
+        self.num_workers = num_workers
+        self.seed = seed
+        self.iterations = 0
+
+    def solutions(
+        self, time_limit: float, exchange_interval: float = EXCHANGE_INTERVAL
+    ) -> Iterator[Dict[int, int]]:
+        """
+        Yield solutions (as for Optimizer.solutions()) with increasing points, after
+        each epoch which improves the best solution of all islands, until
+        ``time_limit`` seconds have passed. Islands exchange elite solutions every
+        ``exchange_interval`` seconds. The number of iterations run by all islands is
+        added to ``self.iterations``.
+        """
+
+        num_epochs = max(1, round(time_limit / exchange_interval))
+        epoch_time = time_limit / num_epochs
+        islands: List[Optional[IslandResult]] = [None] * self.num_workers
+        best: Optional[IslandResult] = None
+
+        with ProcessPoolExecutor(
+            self.num_workers,
+            initializer=_init_worker,
+            initargs=(self.optimizer.arrays(),),
+        ) as executor:
+            for epoch in range(num_epochs):
+                futures = [
+                    executor.submit(
+                        _search_island,
+                        None if result is None else result.solution,
+                        epoch_time,
+                        hash((self.seed, island, epoch)),
+                    )
+                    for island, result in enumerate(islands)
+                ]
+                islands = [future.result() for future in futures]
+                self.iterations += sum(result.iterations for result in islands)
+
+                elite = max(islands, key=lambda result: result.points)
+                if best is None or elite.points > best.points + 1e-9:
+                    best = elite
+                    yield _decode_solution(best.solution)
+                islands = _migrate(islands)
+
+    def schedule(self, solution: Dict[int, int], name: str = "optimized") -> Schedule:
+        """ Create a planned Schedule with name ``name`` holding the tasks of a solution. """
+        return self.optimizer.schedule(solution, name)
+
+
+def optimize_schedule_parallel(
+    tasks: Sequence[PendingTask],
+    blocked: Iterable[Tuple[datetime, datetime]] = (),
+    name: str = "optimized",
+    time_limit: float = 1.0,
+    num_workers: int = None,
+    seed: int = 0,
+) -> Schedule:
+    """
+    Schedule ``tasks`` around ``blocked`` time to maximize points with ``num_workers``
+    worker processes searching for ``time_limit`` seconds, returning a planned Schedule
+    with name ``name`` which holds the tasks which were scheduled.
+    """
+
+    optimizer = ParallelOptimizer(tasks, blocked, num_workers, seed)
+    solution: Dict[int, int] = {}
+    for solution in optimizer.solutions(time_limit):
+        pass
+    return optimizer.schedule(solution, name)
+
+
+def _migrate(islands: List[IslandResult]) -> List[IslandResult]:
+    """
+    Send the best solution of each island to the next island around the ring, which
+    keeps it if it is better than its own.
+    """
+
+    return [
+        max(result, islands[island - 1], key=lambda result: result.points)
+        for island, result in enumerate(islands)
+    ]
+
+
+def _init_worker(arrays: TaskArrays) -> None:
+    """ Create the optimizer of a worker process from the task arrays. """
+    _WORKER.start(arrays)
+
+
+def _search_island(
+    solution: Optional[array], time_limit: float, seed: int
+) -> IslandResult:
+    """ Improve the solution of an island in a worker process (see _Worker.search()). """
+    return _WORKER.search(solution, time_limit, seed)
+
+
+def _encode_solution(solution: Dict[int, int]) -> array:
+    """ Pack a solution into an array of (task index, start) pairs. """
+
+    encoded = array("q")
+    for i, start in solution.items():
+        encoded.append(i)
+        encoded.append(start)
+    return encoded
+
+
+def _decode_solution(encoded: array) -> Dict[int, int]:
+    """ Unpack a solution packed by _encode_solution(). """
+    return dict(zip(encoded[::2], encoded[1::2]))
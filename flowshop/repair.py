@@ -0,0 +1,102 @@
+"""
+Repair of a planned schedule when the actual schedule diverges from it. Planned tasks
+which start before the current time are left alone, even if they are still in progress,
+and the remaining planned tasks are re-planned around the actual tasks after the current
+time: each keeps its planned time if it is still free, and otherwise moves as little
+as it can later on its planned day, in the planned order. Tasks which no longer fit are
+dropped, giving up the fewest points, and then fitted back into any free time which is
+left, in order of points.
+
+Finding which tasks to keep is the dynamic program of Optimizer.sequence() (see
+flowshop.optimizer), over the remaining tasks only, so a repair takes milliseconds and
+can run on every edit of the actual schedule (see Session.auto_repair). Tasks which
+don't move are shared with the planned schedule, so the edit history only records the
+tasks which moved or were dropped.
+"""
+
+from copy import copy
+from datetime import datetime, time, timedelta
+from typing import List
+
+from flowshop.encoding import EPOCH, MICROSECOND
+from flowshop.optimizer import PendingTask, Optimizer
+from flowshop.schedule import Schedule
+from flowshop.task import Task
+
+
+def repair_plan(
+    planned: Schedule, actual: Schedule, now: datetime, end_time: datetime = None
+) -> Schedule:
+    """
+    Return a copy of ``planned`` in which the tasks which start from ``now`` up to
+    ``end_time`` (with no limit if it is None) are re-planned around the tasks of
+    ``actual``. Tasks which started before ``now`` are kept as they are. Tasks can move
+    up to the end of the day they were planned on, or up to ``end_time`` if that comes
+    first. Tasks without a duration or a priority are worth no points, and are dropped.
+    """
+
+    if end_time is None:
+        end_time = datetime.max
+    repaired = planned.copy()
+    remaining = [
+        task
+        for task in planned.tasks_in_interval(now, end_time)
+        if now <= task.start_time < end_time
+    ]
+    if not remaining:
+        return repaired
+
+    movable = [
+        task
+        for task in remaining
+        if task.priority is not None and task.duration > timedelta(0)
+    ]
+    pending = [
+        PendingTask(
+            task.name,
+            task.priority,
+            task.duration,
+            task.start_time,
+            max(task.end_time, min(_day_end(task), end_time)),
+        )
+        for task in movable
+    ]
+    horizon = max((task.latest for task in pending), default=now)
+    blocked = [
+        (task.start_time, task.end_time)
+        for task in actual.tasks_in_interval(now, horizon)
+    ]
+
+    # Remaining tasks are sequenced in their planned order, each as early as it fits
+    # from its planned start, so that tasks which still fit keep their planned time.
+    optimizer = Optimizer(pending, blocked)
+    solution = optimizer.sequence(range(len(pending)))
+    dropped = [i for i in range(len(pending)) if i not in solution.starts]
+    for i in sorted(dropped, key=lambda i: -optimizer.weights[i]):
+        solution.try_add(i)
+
+    new_tasks: List[Task] = []
+    for i, start in solution.starts.items():
+        task = movable[i]
+        start_time = EPOCH + start * MICROSECOND
+        if start_time != task.start_time:
+            delay = start_time - task.start_time
+            task = copy(task)
+            task.start_time += delay
+            task.end_time += delay
+        new_tasks.append(task)
+    new_tasks.sort(key=lambda task: task.start_time)
+
+    # Tasks with the same start as the first remaining task come right before it, and
+    # are remaining as well.
+    first_start = remaining[0].start_time
+    first_index = repaired.insert_index(first_start) - sum(
+        1 for task in remaining if task.start_time == first_start
+    )
+    repaired.splice_tasks(first_index, len(remaining), new_tasks)
+    return repaired
+
+
+def _day_end(task: Task) -> datetime:
+    """ Return midnight at the end of the day that ``task`` starts on. """
+    return datetime.combine(task.date + timedelta(days=1), time())
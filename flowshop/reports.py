@@ -0,0 +1,189 @@
+"""
+Reports over every saved session in STORAGE_DIR, such as the points and score of each
+week, which are streamed so that memory use doesn't grow with the number of sessions.
+Sessions are read one at a time, and only the current schedules of each session are
+kept while its rows are yielded. Indexed sessions only read the entries of their edit
+history that the current schedules need, and only decode the weeks which are reported
+on (see flowshop.indexed). Pickled, journaled and stored sessions are saved as a whole,
+so their whole edit history is loaded while they are read, and peak memory use grows
+with the history of the largest such session. Rows are written to CSV or JSON as they
+are yielded, and score distributions are counted into fixed bins.
+"""
+
+import csv
+import json
+from datetime import datetime, date, time, timedelta
+from typing import List, Tuple, Iterable, Iterator, NamedTuple, TextIO
+
+from flowshop.files import saved_session_names, saved_session_storage, read_state_dict
+from flowshop.schedule import Schedule
+from flowshop.session import score
+
+
+CSV = "csv"
+JSON = "json"
+FORMATS = [CSV, JSON]
+
+# Width of the bins of score distributions, and the score above which all scores are
+# counted in the last bin.
+SCORE_BIN_WIDTH = 10.0
+MAX_SCORE = 200.0
+
+
+class WeekReport(NamedTuple):
+    """
+    Points and score of the week of a session which starts on ``week_start``, along
+    with the number of planned and actual tasks which overlap the week.
+    """
+
+    session: str
+    week_start: date
+    planned_points: float
+    actual_points: float
+    score: float
+    num_planned: int
+    num_actual: int
+
+
+class ScoreDistribution:
+    """
+    Distribution of scores, counted into bins ``bin_width`` wide from 0 up to
+    ``max_score``, with a last bin for every higher score.
+    """
+
+    def __init__(
+        self, bin_width: float = SCORE_BIN_WIDTH, max_score: float = MAX_SCORE
+    ) -> None:
+        """ Init function for ScoreDistribution object. """
+
+        if bin_width <= 0 or max_score <= 0:
+            raise ValueError("Score bins need a positive width and maximum score.")
+
+        self.bin_width = bin_width
+        self.max_score = max_score
+        self.counts = [0] * (int(max_score // bin_width) + 1)
+
+    def add(self, week_score: float) -> None:
+        """ Count a score. """
+
+        position = int(max(week_score, 0.0) // self.bin_width)
+        self.counts[min(position, len(self.counts) - 1)] += 1
+
+    def count(self, reports: Iterable[WeekReport]) -> Iterator[WeekReport]:
+        """ Count the score of each report while passing it on. """
+
+        for report in reports:
+            self.add(report.score)
+            yield report
+
+    def bins(self) -> List[Tuple[float, int]]:
+        """ Return the lower bound of each bin along with its count. """
+        return [(i * self.bin_width, count) for i, count in enumerate(self.counts)]
+
+
+def session_schedules(
+    names: Iterable[str] = None,
+) -> Iterator[Tuple[str, Schedule, Schedule]]:
+    """
+    Yield the name of each saved session in ``names`` (by default, every saved session)
+    along with its current planned and actual schedules. Each session is read when it
+    is reached, and nothing else of it is kept. Sessions which aren't indexed are read
+    along with their whole edit history, which is released before they are yielded.
+    """
+
+    if names is None:
+        names = saved_session_names()
+    for name in names:
+        storage = saved_session_storage(name)
+        if storage is None:
+            raise ValueError("No saved session with name %s." % name)
+        state_dict = read_state_dict(name, storage)
+        planned, actual = state_dict["edit_history"][state_dict["history_pos"]]
+        del state_dict
+        yield name, planned, actual
+
+
+def weekly_reports(
+    start_date: date, end_date: date, names: Iterable[str] = None
+) -> Iterator[WeekReport]:
+    """
+    Yield a report of each week with tasks from the week of ``start_date`` up to the
+    week of ``end_date`` (not included, unless ``end_date`` isn't a Monday) for each
+    saved session in ``names`` (by default, every saved session), session by session.
+    """
+
+    first_monday = start_date - timedelta(days=start_date.weekday())
+    for name, planned, actual in session_schedules(names):
+        week_start = first_monday
+        while week_start < end_date:
+            week_end = week_start + timedelta(days=7)
+            report = week_report(name, planned, actual, week_start, week_end)
+            if report.num_planned > 0 or report.num_actual > 0:
+                yield report
+            week_start = week_end
+
+
+def write_csv(reports: Iterable[WeekReport], output: TextIO) -> int:
+    """
+    Write ``reports`` to ``output`` as CSV with a header row, one row at a time.
+    Returns the number of rows written.
+    """
+
+    writer = csv.writer(output)
+    writer.writerow(WeekReport._fields)
+    num_rows = 0
+    for report in reports:
+        writer.writerow(report._replace(week_start=report.week_start.isoformat()))
+        num_rows += 1
+    return num_rows
+
+
+def write_json(reports: Iterable[WeekReport], output: TextIO) -> int:
+    """
+    Write ``reports`` to ``output`` as a JSON array of objects, one object at a time.
+    Returns the number of objects written.
+    """
+
+    output.write("[")
+    num_rows = 0
+    for report in reports:
+        row = report._replace(week_start=report.week_start.isoformat())._asdict()
+        output.write("%s\n  %s" % ("," if num_rows > 0 else "", json.dumps(row)))
+        num_rows += 1
+    output.write("\n]\n" if num_rows > 0 else "]\n")
+    return num_rows
+
+
+def write_reports(reports: Iterable[WeekReport], output: TextIO, fmt: str = CSV) -> int:
+    """ Write ``reports`` to ``output`` in format ``fmt`` (CSV or JSON). """
+
+    if fmt == CSV:
+        return write_csv(reports, output)
+    if fmt == JSON:
+        return write_json(reports, output)
+    raise ValueError("Unrecognized report format %s." % fmt)
+
+
+def week_report(
+    name: str, planned: Schedule, actual: Schedule, week_start: date, week_end: date
+) -> WeekReport:
+    """ Report on the week from ``week_start`` up to ``week_end`` of a session. """
+
+    planned_points = planned.days_points(week_start, week_end)
+    actual_points = actual.days_points(week_start, week_end)
+    start_time = _midnight(week_start)
+    end_time = _midnight(week_end)
+    return WeekReport(
+        name,
+        week_start,
+        planned_points,
+        actual_points,
+        score(planned_points, actual_points),
+        planned.count_in_interval(start_time, end_time),
+        actual.count_in_interval(start_time, end_time),
+    )
+
+
+def _midnight(day: date) -> datetime:
+    """ Return midnight at the start of ``day``. """
+    return datetime.combine(day, time())
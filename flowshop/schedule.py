@@ -1,11 +1,20 @@
 """ Schedule object which holds a set of tasks. """
 
-from datetime import datetime, date
-from typing import List
+from bisect import bisect_left, bisect_right
+from copy import copy
+from heapq import merge
+from datetime import datetime, date, time, timedelta
+from typing import List, Dict, Any, Sequence, Iterable, Iterator, Tuple, Optional
 
+from flowshop.gaps import GapIndex
 from flowshop.task import Task
 
 
+# Adding more than this many tasks at once merges them into the schedule in one pass,
+# instead of inserting them one at a time.
+BULK_INSERT_SIZE = 256
+
+
 class Schedule:
     """ Schedule object which holds a set of tasks. """
 
@@ -20,8 +29,24 @@ class Schedule:
             self.check_for_overlap()
         else:
             self.tasks = []
+            self._build_index()
+
+        self.state_vars = ["name", "tasks"]
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """
+        Return state for pickling. Derived indices aren't saved, they are rebuilt from
+        self.tasks when the schedule is loaded.
+        """
+
+        return {var_name: getattr(self, var_name) for var_name in self.state_vars}
 
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """ Restore state when unpickling, and rebuild derived indices. """
+
+        self.__dict__.update(state)
         self.state_vars = ["name", "tasks"]
+        self._build_index()
 
     def __eq__(self, other) -> bool:
         """ Definition of self == other. """
@@ -39,63 +64,257 @@ class Schedule:
     def add_task(self, task: Task) -> None:
         """
         Adds a task to self.tasks. Checks to ensure that task isn't overlapping an
-        existing task.
+        existing task. Since self.tasks is already sorted and free of overlap, we only
+        have to check the neighbours of the task at its sorted position.
         """
 
-        self.tasks += [task]
+        task_index = self.insert_index(task.start_time)
+        self._check_neighbours(task_index, task)
+        self.splice_tasks(task_index, 0, [task])
 
-        # This is a redundant sorting, since self.tasks gets sorted in
-        # self.check_for_overlap(). We just do this to be safe, in case
-        # self.check_for_overlap() changes later. We take the extra computation time for
-        # a safety need.
-        self._sort_tasks()
-        self.check_for_overlap()
+    def add_tasks(self, tasks: Sequence[Task]) -> None:
+        """
+        Adds a sequence of tasks to self.tasks, sorting them once and checking them for
+        overlap once. If any of the tasks overlap, no tasks are added. A few tasks are
+        inserted one at a time, and many tasks are merged into self.tasks in a single
+        pass.
+        """
+
+        new_tasks = sorted(tasks, key=lambda task: task.start_time)
+        task_indices = [self.insert_index(task.start_time) for task in new_tasks]
+
+        # Check each new task against its neighbours among the existing tasks, and
+        # against the previous new task.
+        for i, (task_index, task) in enumerate(zip(task_indices, new_tasks)):
+            self._check_neighbours(task_index, task)
+            if i > 0 and new_tasks[i - 1].end_time > task.start_time:
+                raise ValueError(
+                    "Schedule contains overlapping tasks %s and %s."
+                    % (new_tasks[i - 1], task)
+                )
+
+        if len(new_tasks) <= BULK_INSERT_SIZE:
+            for i, (task_index, task) in enumerate(zip(task_indices, new_tasks)):
+                self.splice_tasks(task_index + i, 0, [task])
+        else:
+            self._merge_tasks(new_tasks)
+
+    def _merge_tasks(self, new_tasks: List[Task]) -> None:
+        """
+        Merge sorted ``new_tasks``, which were already checked for overlap, into
+        self.tasks in a single pass.
+        """
+
+        self.tasks = list(
+            merge(self.tasks, new_tasks, key=lambda task: task.start_time)
+        )
+        self._build_index()
+
+    def copy(self) -> "Schedule":
+        """
+        Return a copy of the schedule which shares its Task objects with ``self``. Tasks
+        in a schedule are treated as immutable, so that copies can share them: an edit
+        should replace a task with an edited copy (see replace_task()) instead of
+        modifying it in place.
+        """
+
+        schedule = type(self).__new__(type(self))
+        schedule.__dict__.update(self.__dict__)
+        schedule.tasks = list(self.tasks)
+        schedule._start_keys = list(self._start_keys)
+        schedule._end_keys = list(self._end_keys)
+        schedule._day_counts = dict(self._day_counts)
+        if self._day_index is not None:
+            schedule._day_index = dict(self._day_index)
+            schedule._day_keys = list(self._day_keys)
+        if self._day_points is not None:
+            schedule._day_points = dict(self._day_points)
+        if self._gaps is not None:
+            schedule._gaps = self._gaps.copy()
+        return schedule
+
+    def replace_task(self, task_index: int, task: Task) -> Task:
+        """
+        Replace the task at index ``task_index`` in self.tasks with ``task``. Checks to
+        ensure that the new task isn't overlapping an existing task, and leaves the
+        schedule unchanged if it is. Returns the replaced task.
+        """
+
+        old_task = self.remove_task(task_index)
+        try:
+            self.add_task(task)
+        except ValueError:
+            self.splice_tasks(task_index, 0, [old_task])
+            raise
+
+        return old_task
+
+    def shift_tasks(
+        self, start_task_index: int, end_task_index: int, time_delta: timedelta
+    ) -> None:
+        """
+        Move the tasks self.tasks[start_task_index: end_task_index] in time by
+        ``time_delta``. The moved tasks are replaced by shifted copies, and we check to
+        ensure that they aren't overlapping any other tasks, leaving the schedule
+        unchanged if they are.
+        """
+
+        old_tasks = self._task_range(start_task_index, end_task_index)
+        new_tasks = []
+        for old_task in old_tasks:
+            task = copy(old_task)
+            task.start_time += time_delta
+            task.end_time += time_delta
+            new_tasks.append(task)
+
+        self.splice_tasks(start_task_index, len(old_tasks), [])
+        try:
+            self.add_tasks(new_tasks)
+        except ValueError:
+            self.splice_tasks(start_task_index, 0, old_tasks)
+            raise
+
+    def splice_tasks(
+        self, task_index: int, num_removed: int, new_tasks: Sequence[Task]
+    ) -> None:
+        """
+        Replace the ``num_removed`` tasks starting at ``task_index`` in self.tasks with
+        ``new_tasks``. Note that this doesn't check for overlap or sort the tasks, it is
+        meant for replaying changes which were already checked (see EditHistory).
+        """
+
+        end_index = task_index + num_removed
+        if self._gaps is not None:
+            self._update_gaps(task_index, end_index, new_tasks)
+        changed_days = set()
+        for task in self.tasks[task_index:end_index]:
+            task_date = task.date
+            changed_days.add(task_date)
+            self._day_counts[task_date] -= 1
+            if self._day_counts[task_date] == 0:
+                del self._day_counts[task_date]
+        for task in new_tasks:
+            task_date = task.date
+            changed_days.add(task_date)
+            self._day_counts[task_date] = self._day_counts.get(task_date, 0) + 1
+
+        self.tasks[task_index:end_index] = new_tasks
+        self._start_keys[task_index:end_index] = [task.start_time for task in new_tasks]
+        self._end_keys[task_index:end_index] = [task.end_time for task in new_tasks]
+        for task in new_tasks:
+            self._max_duration = max(self._max_duration, task.duration)
+        self._update_day_index(changed_days, len(new_tasks) - num_removed)
+        self._update_day_points(changed_days)
 
     def remove_task(self, task_index: int) -> Task:
         """
         Remove task by its index in self.tasks. Returns removed task.
         """
 
-        return self.tasks.pop(task_index)
+        if task_index < 0:
+            task_index += len(self.tasks)
+        removed = self._task_range(task_index, task_index + 1)
+        if task_index < 0 or not removed:
+            raise IndexError("Task index %d out of range." % task_index)
+        self.splice_tasks(task_index, 1, [])
+        return removed[0]
 
     def get_task_index(self, day: date, daily_index: int) -> int:
         """
         Get index of the ``daily_index``-th task on day ``day``.
         """
 
-        # First, find some task whose date is equal to the day we're looking for.
-        task_index = len(self.tasks) // 2
-        low = 0
-        high = len(self.tasks) - 1
-        found = False
-        while low <= high:
-            if self.tasks[task_index].date == day:
-                found = True
-                break
-
-            if self.tasks[task_index].date < day:
-                low = task_index + 1
-            elif self.tasks[task_index].date > day:
-                high = task_index - 1
-            task_index = int((low + high) / 2)
+        # Look up the index of the first task on ``day`` and the number of tasks on it.
+        day_bounds = self._get_day_index().get(day)
 
         # Make sure that such a task exists.
-        if not found:
+        if day_bounds is None:
             raise ValueError("No task on day %s" % str(day))
 
-        # Find the first task whose date is equal to ``day``.
-        while task_index >= 0 and self.tasks[task_index].date == day:
-            task_index -= 1
-        task_index += 1
-
-        # Make sure that the final task index has the correct date.
-        task_index += daily_index
-        if self.tasks[task_index].date != day:
+        # Make sure that the daily index is within the tasks on ``day``.
+        first_index, num_tasks = day_bounds
+        if not 0 <= daily_index < num_tasks:
             raise ValueError(
                 "Index %d is larger than number of tasks on day %s" % (daily_index, day)
             )
 
-        return task_index
+        return first_index + daily_index
+
+    def get_task(self, day: date, daily_index: int) -> Task:
+        """
+        Get the ``daily_index``-th task on day ``day``.
+        """
+
+        return self.tasks[self.get_task_index(day, daily_index)]
+
+    def edits_since(
+        self, old: "Schedule"
+    ) -> Tuple[int, Tuple[Task, ...], Tuple[Task, ...]]:
+        """
+        Return the edit which changes ``old`` into this schedule as the index of the
+        first changed task along with the tasks removed from ``old`` and the tasks added
+        in their place (see EditHistory). The tasks of both schedules are compared, and
+        the edit covers everything between the tasks they start and end with in common.
+        Copies share Task objects, so unchanged tasks are usually the same objects.
+        """
+
+        old_tasks = old.tasks
+        new_tasks = self.tasks
+        max_common = min(len(old_tasks), len(new_tasks))
+
+        start = 0
+        while start < max_common and _same_task(old_tasks[start], new_tasks[start]):
+            start += 1
+        end = 0
+        while end < max_common - start and _same_task(
+            old_tasks[-end - 1], new_tasks[-end - 1]
+        ):
+            end += 1
+
+        return (
+            start,
+            tuple(old_tasks[start : len(old_tasks) - end]),
+            tuple(new_tasks[start : len(new_tasks) - end]),
+        )
+
+    def _task_range(self, start_index: int, end_index: int) -> List[Task]:
+        """ Return the tasks from ``start_index`` up to ``end_index`` in self.tasks. """
+        return self.tasks[start_index:end_index]
+
+    @property
+    def max_duration(self) -> timedelta:
+        """
+        Upper bound on the duration of any task in the schedule, so that the tasks
+        overlapping an interval start at most this long before it.
+        """
+        return self._max_duration
+
+    def insert_index(self, start_time: datetime) -> int:
+        """
+        Returns the index in self.tasks at which a task starting at ``start_time`` would
+        be inserted, i.e. after every task which starts at or before it.
+        """
+
+        return bisect_right(self._start_keys, start_time)
+
+    def _check_neighbours(self, task_index: int, task: Task) -> None:
+        """
+        Checks whether ``task`` overlaps the tasks which would be its neighbours if it
+        were inserted into self.tasks at ``task_index``. Raises an error if so.
+        """
+
+        neighbours = self._task_range(max(task_index - 1, 0), task_index + 1)
+        if task_index > 0 and neighbours[0].end_time > task.start_time:
+            raise ValueError(
+                "Schedule contains overlapping tasks %s and %s." % (neighbours[0], task)
+            )
+        if len(neighbours) > int(task_index > 0) and (
+            task.end_time > neighbours[-1].start_time
+        ):
+            raise ValueError(
+                "Schedule contains overlapping tasks %s and %s."
+                % (task, neighbours[-1])
+            )
 
     def check_for_overlap(self) -> None:
         """
@@ -121,28 +340,263 @@ class Schedule:
         return sum(task.points() for task in self.tasks)
 
     def interval_points(self, start_time: datetime, end_time: datetime) -> float:
-        """ Computes points for all tasks within a given time interval. """
+        """
+        Computes points for all tasks within a given time interval. Intervals which
+        start and end at midnight are looked up in the index of daily points.
+        """
+
+        if start_time.time() == end_time.time() == time() and start_time < end_time:
+            return self.days_points(start_time.date(), end_time.date())
 
         tasks_in_interval = self.tasks_in_interval(start_time, end_time)
         return sum(task.points() for task in tasks_in_interval)
 
+    def days_points(self, start_date: date, end_date: date) -> float:
+        """
+        Computes points for all tasks within the days from ``start_date`` up to (but not
+        including) ``end_date``, i.e. the tasks which tasks_in_interval() returns for
+        the interval from midnight of ``start_date`` to midnight of ``end_date``. Tasks
+        which cross midnight into the interval are counted in full, as they are there.
+        The points of tasks which start inside the interval are looked up in a prefix
+        sum over days, so this only costs a few binary searches. Datetimes (which
+        sessions may hold as their base date) count as the day they fall on.
+        """
+
+        if isinstance(start_date, datetime):
+            start_date = start_date.date()
+        if isinstance(end_date, datetime):
+            end_date = end_date.date()
+
+        start_time = datetime.combine(start_date, time())
+        end_time = datetime.combine(end_date, time())
+        if end_date <= start_date:
+            return sum(
+                task.points() for task in self.tasks_in_interval(start_time, end_time)
+            )
+
+        # Points of tasks which start inside the interval. For a single day we can
+        # skip the prefix sums.
+        if end_date - start_date == timedelta(days=1):
+            points = self._get_day_points().get(start_date, 0.0)
+        else:
+            ordinals, prefix_points = self._get_day_prefix()
+            low = bisect_left(ordinals, start_date.toordinal())
+            high = bisect_left(ordinals, end_date.toordinal())
+            points = prefix_points[high] - prefix_points[low]
+
+        # Points of tasks which start before the interval and end inside of or after
+        # the start of the interval. Tasks that start exactly at the end of the
+        # interval only overlap it if they have zero length, and so have zero points.
+        low = bisect_right(self._end_keys, start_time)
+        high = bisect_left(self._start_keys, start_time)
+        for task in self.tasks[low:high]:
+            points += task.points()
+
+        return points
+
     def tasks_in_interval(self, start_time: datetime, end_time: datetime) -> List[Task]:
         """
         Returns a list of all tasks in the schedule that overlap the interval
         (start_time, end_time).
         """
 
-        tasks_in_interval = []
-        for task in self.tasks:
-            overlapping_start = (
-                task.start_time >= start_time and task.start_time < end_time
+        # The window is degenerate, so fall back to checking every task.
+        if end_time < start_time:
+            return [
+                task for task in self.tasks if _overlaps(task, start_time, end_time)
+            ]
+
+        low, high = self._interval_range(start_time, end_time)
+        return self.tasks[low:high]
+
+    def count_in_interval(self, start_time: datetime, end_time: datetime) -> int:
+        """
+        Returns the number of tasks in the schedule that overlap the interval
+        (start_time, end_time), without listing them.
+        """
+
+        if end_time < start_time:
+            return len(self.tasks_in_interval(start_time, end_time))
+
+        low, high = self._interval_range(start_time, end_time)
+        return high - low
+
+    def task_at(self, time_point: datetime) -> Optional[Task]:
+        """
+        Returns the task which is running at ``time_point`` (the task which starts at
+        or before it and ends after it), or None if there is none. Tasks don't overlap,
+        so there is at most one.
+        """
+
+        for task in self.tasks_in_interval(time_point, time_point):
+            if task.start_time <= time_point < task.end_time:
+                return task
+        return None
+
+    def tasks_in_intervals(
+        self, intervals: Iterable[Tuple[datetime, datetime]]
+    ) -> List[List[Task]]:
+        """
+        Returns the tasks that overlap each of ``intervals``, a sequence of (start_time,
+        end_time) pairs, as tasks_in_interval() does.
+        """
+
+        return [
+            self.tasks_in_interval(start_time, end_time)
+            for start_time, end_time in intervals
+        ]
+
+    def count_in_intervals(
+        self, intervals: Iterable[Tuple[datetime, datetime]]
+    ) -> List[int]:
+        """
+        Returns the number of tasks that overlap each of ``intervals``, a sequence of
+        (start_time, end_time) pairs, as count_in_interval() does.
+        """
+
+        return [
+            self.count_in_interval(start_time, end_time)
+            for start_time, end_time in intervals
+        ]
+
+    def tasks_at(self, time_points: Iterable[datetime]) -> List[Optional[Task]]:
+        """
+        Returns the task running at each of ``time_points`` (or None), as task_at()
+        does.
+        """
+
+        return [self.task_at(time_point) for time_point in time_points]
+
+    def _interval_range(
+        self, start_time: datetime, end_time: datetime
+    ) -> Tuple[int, int]:
+        """
+        Returns the range of indices in self.tasks of the tasks that overlap the
+        interval (start_time, end_time), where ``start_time`` is at most ``end_time``.
+        Tasks don't overlap, so their end times are sorted along with their start times,
+        and the tasks overlapping the interval are the tasks which end at or after
+        ``start_time`` and start at or before ``end_time``, except for those which only
+        touch the interval.
+        """
+
+        # Make sure that the index hasn't gone stale from direct edits to self.tasks.
+        if len(self._start_keys) != len(self.tasks):
+            self._build_index()
+
+        low = bisect_left(self._end_keys, start_time)
+        high = bisect_right(self._start_keys, end_time)
+
+        # A task which ends exactly at the start of a proper interval, or starts exactly
+        # at its end, only overlaps it if it has zero length. There is at most one such
+        # task at either end of the range, since tasks don't overlap.
+        if start_time < end_time:
+            if low < high and self._start_keys[low] < start_time == self._end_keys[low]:
+                low += 1
+            if (
+                low < high
+                and self._start_keys[high - 1] == end_time < self._end_keys[high - 1]
+            ):
+                high -= 1
+
+        return low, high
+
+    def find_slot(
+        self,
+        duration: timedelta,
+        earliest: datetime,
+        latest: datetime = None,
+        weekdays: Iterable[int] = None,
+        day_start: time = None,
+        day_end: time = None,
+        best_fit: bool = False,
+    ) -> Optional[datetime]:
+        """
+        Find a start time for a task of length ``duration`` which doesn't overlap any
+        task of the schedule, and lies between ``earliest`` and ``latest`` (with no
+        limit if it is None). If ``weekdays`` (as numbered by date.weekday()),
+        ``day_start`` or ``day_end`` are given, the task also has to start on one of
+        ``weekdays`` and lie between ``day_start`` and ``day_end`` on that day (by
+        default, the whole day). Returns the earliest such start, or with ``best_fit``,
+        the earliest start in the shortest gap between tasks which fits the task, so
+        that longer gaps are kept for longer tasks. Returns None if there is no slot.
+        """
+
+        if duration < timedelta(0):
+            raise ValueError("Can't find a slot for negative duration %s." % duration)
+        if latest is None:
+            latest = datetime.max
+        if day_start is not None and day_end is not None and day_end <= day_start:
+            raise ValueError(
+                "Day ends at %s before it starts at %s." % (day_end, day_start)
             )
-            overlapping_end = task.end_time > start_time and task.end_time <= end_time
-            surrounding = task.start_time <= start_time and task.end_time >= end_time
-            if overlapping_start or overlapping_end or surrounding:
-                tasks_in_interval.append(task)
 
-        return tasks_in_interval
+        constrained = (
+            weekdays is not None or day_start is not None or day_end is not None
+        )
+        if constrained:
+            weekdays = set(range(7) if weekdays is None else weekdays)
+            day_start = time() if day_start is None else day_start
+            day_length = (
+                datetime.combine(date.min + timedelta(days=1), time())
+                if day_end is None
+                else datetime.combine(date.min, day_end)
+            ) - datetime.combine(date.min, day_start)
+            if not weekdays or day_length < duration:
+                return None
+
+        gaps: Iterable[Tuple[datetime, datetime]] = self._free_gaps(
+            duration, earliest, latest
+        )
+        if best_fit:
+            gaps = sorted(gaps, key=lambda gap: gap[1] - gap[0])
+        for gap_start, gap_end in gaps:
+            start = max(gap_start, earliest)
+            end = min(gap_end, latest)
+            if constrained:
+                start = _earliest_in_days(
+                    start, end, duration, weekdays, day_start, day_length
+                )
+                if start is not None:
+                    return start
+            elif start + duration <= end:
+                return start
+
+        return None
+
+    def _free_gaps(
+        self, duration: timedelta, earliest: datetime, latest: datetime
+    ) -> Iterator[Tuple[datetime, datetime]]:
+        """
+        Iterate over the gaps between tasks which are at least ``duration`` long and
+        overlap the time from ``earliest`` to ``latest``, in order of start time. The
+        gaps before the first task and after the last one start at datetime.min and end
+        at datetime.max.
+        """
+
+        if self._gaps is None:
+            self._gaps = GapIndex.between(self.tasks)
+        return self._gaps.fitting(duration, earliest, latest)
+
+    def _update_gaps(
+        self, task_index: int, end_index: int, new_tasks: Sequence[Task]
+    ) -> None:
+        """
+        Replace the gaps around the tasks from ``task_index`` up to ``end_index`` in
+        self.tasks with the gaps around ``new_tasks``, which replace them.
+        """
+
+        previous_end = self.tasks[task_index - 1].end_time if task_index > 0 else None
+        following_start = (
+            self.tasks[end_index].start_time if end_index < len(self.tasks) else None
+        )
+        old_gaps = _gaps_around(
+            previous_end, self.tasks[task_index:end_index], following_start
+        )
+        new_gaps = _gaps_around(previous_end, new_tasks, following_start)
+        for gap_start, gap_end in old_gaps:
+            self._gaps.remove(gap_start, gap_end)
+        for gap_start, gap_end in new_gaps:
+            self._gaps.add(gap_start, gap_end)
 
     def _sort_tasks(self):
         """
@@ -150,3 +604,214 @@ class Schedule:
         """
 
         self.tasks = sorted(self.tasks, key=lambda task: task.start_time)
+        self._build_index()
+
+    def _build_index(self) -> None:
+        """
+        Rebuild the indices used for queries on the schedule:
+        - self._start_keys and self._end_keys hold the start and end time of each task
+          in self.tasks (so they can be bisected), and self._max_duration is an upper
+          bound on the duration of any task in the schedule. Tasks don't overlap, so
+          both are sorted, and the tasks which overlap an interval are found with two
+          binary searches (see _interval_range()).
+        - self._day_counts holds the number of tasks starting on each day, and
+          self._day_index maps each day to the index of its first task and its number
+          of tasks, with its days sorted in self._day_keys. The latter are built lazily
+          from the former, and then updated in place by each splice.
+        - self._day_points holds the total points of the tasks starting on each day,
+          and self._day_prefix holds prefix sums of those. These are built lazily, the
+          first time that points are looked up.
+        - self._gaps indexes the free time between tasks (see flowshop.gaps). It is
+          built lazily, the first time that a free slot is looked up.
+        """
+
+        self._start_keys = [task.start_time for task in self.tasks]
+        self._end_keys = [task.end_time for task in self.tasks]
+        self._max_duration = max(
+            (task.duration for task in self.tasks),
+            default=timedelta(0),
+        )
+        self._max_duration = max(self._max_duration, timedelta(0))
+
+        self._day_counts: Dict[date, int] = {}
+        for task in self.tasks:
+            task_date = task.date
+            self._day_counts[task_date] = self._day_counts.get(task_date, 0) + 1
+        self._day_index: Optional[Dict[date, Tuple[int, int]]] = None
+        self._day_keys: Optional[List[date]] = None
+
+        self._day_points: Optional[Dict[date, float]] = None
+        self._day_prefix: Optional[Tuple[List[int], List[float]]] = None
+        self._gaps: Optional[GapIndex] = None
+
+    def _update_day_index(self, days: Iterable[date], num_added: int) -> None:
+        """
+        Update the first index and number of tasks of each of ``days`` after a splice
+        which added ``num_added`` tasks to self.tasks (or removed them, if negative),
+        and shift the first index of the days after it. Days which weren't touched by
+        the splice keep their tasks, and lie entirely before or after the splice, so the
+        days after it are found by bisecting the sorted days for its last day.
+        """
+
+        days = set(days)
+        if self._day_index is None or not days:
+            return
+
+        if num_added != 0:
+            after = bisect_right(self._day_keys, max(days))
+            for day in self._day_keys[after:]:
+                first_index, num_tasks = self._day_index[day]
+                self._day_index[day] = (first_index + num_added, num_tasks)
+        for day in days:
+            num_tasks = self._day_counts.get(day, 0)
+            key_index = bisect_left(self._day_keys, day)
+            has_key = (
+                key_index < len(self._day_keys) and self._day_keys[key_index] == day
+            )
+            if num_tasks == 0:
+                if has_key:
+                    del self._day_keys[key_index]
+                    del self._day_index[day]
+            else:
+                if not has_key:
+                    self._day_keys.insert(key_index, day)
+                day_start = datetime.combine(day, time())
+                self._day_index[day] = (
+                    bisect_left(self._start_keys, day_start),
+                    num_tasks,
+                )
+
+    def _update_day_points(self, days: Iterable[date]) -> None:
+        """
+        Recompute the total points of tasks starting on each of ``days``. The points of
+        each day are summed from scratch (instead of adding and subtracting the points
+        of changed tasks), so that rounding errors don't build up through edits.
+        """
+
+        if self._day_points is None:
+            return
+
+        for day in days:
+            day_start = datetime.combine(day, time())
+            low = bisect_left(self._start_keys, day_start)
+            high = bisect_left(self._start_keys, day_start + timedelta(days=1))
+            if low == high:
+                self._day_points.pop(day, None)
+            else:
+                self._day_points[day] = sum(
+                    task.points() for task in self.tasks[low:high]
+                )
+        self._day_prefix = None
+
+    def _get_day_index(self) -> Dict[date, Tuple[int, int]]:
+        """
+        Return a dictionary mapping each day with tasks on it to the index of its first
+        task in self.tasks and its number of tasks, building it from the number of
+        tasks on each day if it hasn't been built since the last rebuild of the indices.
+        """
+
+        if self._day_index is None:
+            self._day_index = {}
+            self._day_keys = sorted(self._day_counts)
+            first_index = 0
+            for day in self._day_keys:
+                num_tasks = self._day_counts[day]
+                self._day_index[day] = (first_index, num_tasks)
+                first_index += num_tasks
+
+        return self._day_index
+
+    def _get_day_points(self) -> Dict[date, float]:
+        """
+        Return the total points of the tasks starting on each day, building them if
+        they haven't been built since the last rebuild of the indices.
+        """
+
+        if self._day_points is None:
+            self._day_points = {}
+            for task in self.tasks:
+                task_date = task.date
+                self._day_points[task_date] = (
+                    self._day_points.get(task_date, 0) + task.points()
+                )
+            self._day_prefix = None
+
+        return self._day_points
+
+    def _get_day_prefix(self) -> Tuple[List[int], List[float]]:
+        """
+        Return the sorted ordinals of days with tasks on them, along with prefix sums of
+        their points (where the i-th prefix sum is the total points of days before the
+        i-th day). These are rebuilt after the points of any day change.
+        """
+
+        if self._day_prefix is None:
+            ordinals = []
+            prefix_points = [0.0]
+            day_points = self._get_day_points()
+            for day in sorted(day_points):
+                ordinals.append(day.toordinal())
+                prefix_points.append(prefix_points[-1] + day_points[day])
+            self._day_prefix = (ordinals, prefix_points)
+
+        return self._day_prefix
+
+
+def _same_task(task: Task, other: Task) -> bool:
+    """ Whether two tasks are the same object or are equal. """
+    return task is other or task == other
+
+
+def _overlaps(task: Task, start_time: datetime, end_time: datetime) -> bool:
+    """ Whether or not ``task`` overlaps the interval (start_time, end_time). """
+
+    overlapping_start = task.start_time >= start_time and task.start_time < end_time
+    overlapping_end = task.end_time > start_time and task.end_time <= end_time
+    surrounding = task.start_time <= start_time and task.end_time >= end_time
+    return overlapping_start or overlapping_end or surrounding
+
+
+def _gaps_around(
+    previous_end: Optional[datetime],
+    tasks: Sequence[Task],
+    following_start: Optional[datetime],
+) -> List[Tuple[datetime, datetime]]:
+    """
+    Return the gaps between ``tasks``, from the end ``previous_end`` of the task before
+    them to the start ``following_start`` of the task after them, where None means that
+    there is no such task.
+    """
+
+    bounds = [datetime.min if previous_end is None else previous_end]
+    for task in tasks:
+        bounds.append(task.start_time)
+        bounds.append(task.end_time)
+    bounds.append(datetime.max if following_start is None else following_start)
+    return list(zip(bounds[::2], bounds[1::2]))
+
+
+def _earliest_in_days(
+    start: datetime,
+    end: datetime,
+    duration: timedelta,
+    weekdays: Iterable[int],
+    day_start: time,
+    day_length: timedelta,
+) -> Optional[datetime]:
+    """
+    Return the earliest start between ``start`` and ``end`` of ``duration`` which lies
+    within ``day_length`` from ``day_start`` on one of ``weekdays``, or None if there
+    is none. The length of each day is at least ``duration``, so that an allowed day
+    comes within a week.
+    """
+
+    day = start.date()
+    while True:
+        window_start = datetime.combine(day, day_start)
+        if window_start >= end:
+            return None
+        if day.weekday() in weekdays:
+            slot_start = max(start, window_start)
+            if slot_start + duration <= min(end, window_start + day_length):
+                return slot_start
+        day += timedelta(days=1)
@@ -1,12 +1,27 @@
 """ Session object for editing schedules. """
 
 from datetime import datetime, date, time, timedelta
-from copy import deepcopy
-from typing import List, Tuple, Dict, Any
+from copy import copy
+from typing import List, Tuple, Dict, Any, Iterable, Optional
 
+from flowshop.compression import get_codec
+from flowshop.history import EditHistory
 from flowshop.schedule import Schedule
 from flowshop.task import Task
-from flowshop.files import saved_session_exists, save_session, load_session_state_dict
+from flowshop.files import (
+    PICKLE,
+    JOURNAL,
+    STORE,
+    open_store,
+    saved_session_exists,
+    saved_session_storage,
+    saved_session_compression,
+    save_session,
+    load_session_state_dict,
+    open_session_journal,
+)
+from flowshop.journal import Journal
+from flowshop.repair import repair_plan
 
 
 HISTORY_LEN = 100
@@ -15,16 +30,45 @@ HISTORY_LEN = 100
 class Session:
     """ Session object for editing schedules. """
 
-    def __init__(self, name: str, load=False) -> None:
-        """ Init function for Session object. """
+    def __init__(
+        self,
+        name: str,
+        load=False,
+        history_len: int = HISTORY_LEN,
+        storage: str = PICKLE,
+        compression: Optional[str] = None,
+        state_dict: Optional[Dict[str, Any]] = None,
+        auto_repair: bool = False,
+    ) -> None:
+        """
+        Init function for Session object. ``storage`` is the way that the session is
+        saved to disk (see flowshop.files): a pickled session is rewritten on every
+        save, a journaled session appends its changes to a journal file, and an indexed
+        session is decoded lazily when it is loaded. ``compression`` is the name of the
+        codec that the session is compressed with (see flowshop.compression), or None
+        to save it uncompressed. Loaded sessions keep the storage and compression that
+        they were saved with. If ``state_dict`` is given, the session is restored from
+        it instead, e.g. by a session store which loads many sessions at once. If
+        ``auto_repair`` is True, editing or inserting a task in the actual schedule
+        also re-plans the rest of the week after that task (see repair_plan()).
+        """
 
         self.name: str = name
+        self.storage = storage
+        self.compression = compression
+        self.auto_repair = auto_repair
+
+        # Check that the compression codec exists before the session is edited.
+        get_codec(compression)
+        self.journal: Optional[Journal] = None
 
         # self.edit_history represents the history of schedules through changes, so that
         # we can implement undo and redo. self.history_pos holds the position within
         # history of the current schedule. The 0th slot is for the planned schedule, the
-        # 1st is for the actual schedule.
-        self.edit_history: List[Tuple[Schedule, Schedule]] = []
+        # 1st is for the actual schedule. At most ``history_len`` points in history are
+        # kept.
+        self.history_len = history_len
+        self.edit_history = EditHistory(max_len=history_len)
         self.history_pos: int = -1
 
         # self.base_date is the date of the Monday of the week which is currently being
@@ -40,7 +84,10 @@ class Session:
         ]
 
         # Load a session in, if necessary.
-        if load:
+        if state_dict is not None:
+            self.copy_from_state_dict(state_dict)
+
+        elif load:
             self.load_from(name)
 
         else:
@@ -59,8 +106,30 @@ class Session:
             self.base_date = date.today()
             self.base_date -= timedelta(days=self.base_date.weekday())
 
+    def __enter__(self) -> "Session":
+        """ Enter a context which closes the session on exit. """
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """ Close the session. """
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the journal of the session, if it has one open. The session can still be
+        edited and saved afterwards, but its next save writes a new snapshot.
+        """
+
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
     def save(self) -> None:
         """ Save session to file. """
+
+        # A journal which the session was loaded from isn't needed in other storages.
+        if self.storage != JOURNAL:
+            self.close()
         save_session(self)
 
     def load_from(self, name: str) -> None:
@@ -70,16 +139,31 @@ class Session:
         if not saved_session_exists(name):
             raise ValueError("No saved session with name %s." % name)
 
-        # Load in session.
-        state_dict = load_session_state_dict(name)
+        # Load in session, closing the journal of the session it replaces.
+        self.close()
+        self.storage = saved_session_storage(name)
+        self.compression = saved_session_compression(name)
+        if self.storage == JOURNAL:
+            self.journal, state_dict = open_session_journal(name)
+        else:
+            state_dict = load_session_state_dict(name)
         self.copy_from_state_dict(state_dict)
 
+        # Record changes to the edit history from here on, to save them to the journal.
+        if self.storage == JOURNAL:
+            self.edit_history.start_journal()
+
     def copy_from_state_dict(self, state_dict: Dict[str, Any]) -> None:
         """ Copy state from state dict. """
 
         for state_var in self.state_vars:
             setattr(self, state_var, state_dict[state_var])
 
+        # Sessions saved before EditHistory existed hold a list of schedule pairs.
+        if not isinstance(self.edit_history, EditHistory):
+            self.edit_history = EditHistory(self.edit_history)
+        self.edit_history.max_len = self.history_len
+
     def state_dict(self) -> Dict[str, Any]:
         """ Return dictionary holding state variables. """
 
@@ -102,7 +186,8 @@ class Session:
         new schedules to the history, and increment the history position. Finally, if
         the history position doesn't point to the end of history, but the new schedules
         are equal to the next point in history, we simply increment the history position
-        (equivalent to a redo operation).
+        (equivalent to a redo operation). When appending makes the history longer than
+        self.history_len, the oldest points in history are dropped.
         """
 
         if self.history_pos == len(self.edit_history) - 1:
@@ -115,9 +200,9 @@ class Session:
             if (planned, actual) != self.edit_history[self.history_pos + 1]:
 
                 # Second case.
-                self.edit_history = self.edit_history[: self.history_pos + 1]
+                self.edit_history.truncate(self.history_pos + 1)
                 self.edit_history.append((planned, actual))
-                self.history_pos += 1
+                self.history_pos = len(self.edit_history) - 1
             else:
 
                 # Third case.
@@ -138,30 +223,26 @@ class Session:
         planned_schedule, actual_schedule = self.current_schedules()
         target = planned_schedule if planned else actual_schedule
         task_date = self.base_date + timedelta(days=day)
-        overall_index = target.get_task_index(task_date, task_index)
-        return target.tasks[overall_index]
+        return target.get_task(task_date, task_index)
 
     def edit_task(
         self, planned: bool, day: int, task_index: int, new_values: Dict[str, Any]
     ) -> None:
         """ Edit a task in the current session by providing new values. """
 
-        # Create new schedule objects to represent edited schedules.
-        current_schedules = self.current_schedules()
-        new_planned = deepcopy(current_schedules[0])
-        new_actual = deepcopy(current_schedules[1])
+        # Create a new schedule object to represent the edited schedule.
+        target = self._copy_schedule(planned)
 
-        # Set values in new schedule objects.
-        target = new_planned if planned else new_actual
+        # Replace task with an edited copy in the new schedule object.
         task_date = self.base_date + timedelta(days=day)
         overall_index = target.get_task_index(task_date, task_index)
+        task = copy(target.get_task(task_date, task_index))
         for param, new_val in new_values.items():
-            setattr(target.tasks[overall_index], param, new_val)
-        target._sort_tasks()
-        target.check_for_overlap()
+            setattr(task, param, new_val)
+        target.replace_task(overall_index, task)
 
-        # Set new schedule objects as current schedules.
-        self.set_new_schedules(new_planned, new_actual)
+        # Set new schedule object as current schedule.
+        self._set_edited_schedule(planned, target, task.end_time)
 
     def insert_task(
         self,
@@ -169,45 +250,52 @@ class Session:
         planned: bool,
         name: str,
         priority: float,
-        start_time: time,
+        start_time: Optional[time],
         hours: float,
     ) -> None:
-        """ Insert a task into the current session. """
+        """
+        Insert a task into the current session. If ``start_time`` is None, the task is
+        placed at the earliest time on its day which is free in the target schedule,
+        and an error is raised if there is none.
+        """
 
-        # Create new schedule objects to represent edited schedules.
-        current_schedules = self.current_schedules()
-        new_planned = deepcopy(current_schedules[0])
-        new_actual = deepcopy(current_schedules[1])
+        # Create a new schedule object to represent the edited schedule.
+        target = self._copy_schedule(planned)
 
         # Construct task.
         task_date = self.base_date + timedelta(days=day)
-        start = datetime.combine(task_date, start_time)
-        end = start + timedelta(hours=hours)
+        duration = timedelta(hours=hours)
+        if start_time is not None:
+            start = datetime.combine(task_date, start_time)
+        else:
+            day_start = datetime.combine(task_date, time())
+            start = target.find_slot(duration, day_start, day_start + timedelta(days=1))
+            if start is None:
+                raise ValueError(
+                    "No free time for task %s on %s." % (name, str(task_date))
+                )
+        end = start + duration
         task = Task(name, priority, start, end)
 
-        # Set values in new schedule objects.
-        target = new_planned if planned else new_actual
+        # Add task to new schedule object.
         target.add_task(task)
 
-        # Set new schedule objects as current schedules.
-        self.set_new_schedules(new_planned, new_actual)
+        # Set new schedule object as current schedule.
+        self._set_edited_schedule(planned, target, end)
 
     def delete_task(self, planned: bool, day: int, task_index: int) -> None:
         """ Delete a task in the current session. """
 
-        # Create new schedule objects to represent edited schedules.
-        current_schedules = self.current_schedules()
-        new_planned = deepcopy(current_schedules[0])
-        new_actual = deepcopy(current_schedules[1])
+        # Create a new schedule object to represent the edited schedule.
+        target = self._copy_schedule(planned)
 
-        # Set values in new schedule objects.
-        target = new_planned if planned else new_actual
+        # Remove task from new schedule object.
         task_date = self.base_date + timedelta(days=day)
         overall_index = target.get_task_index(task_date, task_index)
         target.remove_task(overall_index)
 
-        # Set new schedule objects as current schedules.
-        self.set_new_schedules(new_planned, new_actual)
+        # Set new schedule object as current schedule.
+        self._set_edited_schedule(planned, target)
 
     def move_tasks(
         self,
@@ -219,24 +307,67 @@ class Session:
     ) -> None:
         """ Move a contiguous sequence of tasks in time. """
 
-        # Create new schedule objects to represent edited schedules.
-        current_schedules = self.current_schedules()
-        new_planned = deepcopy(current_schedules[0])
-        new_actual = deepcopy(current_schedules[1])
+        # Create a new schedule object to represent the edited schedule.
+        target = self._copy_schedule(planned)
 
-        # Set values in new schedule objects.
-        target = new_planned if planned else new_actual
+        # Shift tasks in new schedule object.
         task_date = self.base_date + timedelta(days=day)
         overall_start_index = target.get_task_index(task_date, start_task_index)
         overall_end_index = overall_start_index + (end_task_index - start_task_index)
-        for task_index in range(overall_start_index, overall_end_index):
-            target.tasks[task_index].start_time += time_delta
-            target.tasks[task_index].end_time += time_delta
-        target._sort_tasks()
-        target.check_for_overlap()
+        target.shift_tasks(overall_start_index, overall_end_index, time_delta)
+
+        # Set new schedule object as current schedule.
+        self._set_edited_schedule(planned, target)
+
+    def _copy_schedule(self, planned: bool) -> Schedule:
+        """
+        Return a copy of the current planned or actual schedule to be edited. The copy
+        shares its tasks with the current schedule, so that an edit only allocates the
+        tasks that it changes.
+        """
+
+        planned_schedule, actual_schedule = self.current_schedules()
+        return (planned_schedule if planned else actual_schedule).copy()
+
+    def repair_plan(self, now: datetime = None) -> None:
+        """
+        Re-plan the planned tasks of the rest of the current week which end after
+        ``now`` (by default, the current time) around the actual schedule, moving tasks
+        as little as possible and dropping the tasks worth the fewest points when they
+        no longer fit (see flowshop.repair).
+        """
+
+        if now is None:
+            now = datetime.now()
+        planned_schedule, actual_schedule = self.current_schedules()
+        repaired = repair_plan(planned_schedule, actual_schedule, now, self._week_end())
+        if repaired != planned_schedule:
+            self.set_new_schedules(repaired, actual_schedule)
 
-        # Set new schedule objects as current schedules.
-        self.set_new_schedules(new_planned, new_actual)
+    def _week_end(self) -> datetime:
+        """ Return midnight at the end of the current week. """
+        return datetime.combine(self.base_date + timedelta(days=7), time())
+
+    def _set_edited_schedule(
+        self, planned: bool, target: Schedule, edit_end: datetime = None
+    ) -> None:
+        """
+        Set an edited copy of the current planned or actual schedule as current. The
+        schedule which wasn't edited is shared with the previous point in history,
+        unless the actual schedule was edited and self.auto_repair is set, in which case
+        the planned schedule is repaired from ``edit_end`` (the end of the edited task)
+        in the same point in history.
+        """
+
+        planned_schedule, actual_schedule = self.current_schedules()
+        if planned:
+            self.set_new_schedules(target, actual_schedule)
+        else:
+            if self.auto_repair and edit_end is not None:
+                planned_schedule = repair_plan(
+                    planned_schedule, target, edit_end, self._week_end()
+                )
+            self.set_new_schedules(planned_schedule, target)
 
     def undo(self) -> None:
         """ Undo last change, i.e. move to previous schedule in edit history. """
@@ -252,20 +383,10 @@ class Session:
         schedule and potentially cumulative from the beginning of the week.
         """
 
-        # Construct interval over which to compute points.
         current_date = self.base_date + timedelta(days=day)
         start = self.base_date if cumulative else current_date
         end = current_date + timedelta(days=1)
-        start_time = datetime(start.year, start.month, start.day)
-        end_time = datetime(end.year, end.month, end.day)
-
-        # Compute points in interval.
-        planned_schedule, actual_schedule = self.current_schedules()
-        schedule = planned_schedule if planned else actual_schedule
-        tasks = schedule.tasks_in_interval(start_time, end_time)
-        points = sum(task.points() for task in tasks)
-
-        return points
+        return self.range_points(start, end, planned)
 
     def daily_score(self, day: int, cumulative: bool) -> float:
         """
@@ -273,12 +394,75 @@ class Session:
         or cumulative from the beginning of the week.
         """
 
-        planned_points = self.daily_points(day, planned=True, cumulative=cumulative)
-        actual_points = self.daily_points(day, planned=False, cumulative=cumulative)
+        current_date = self.base_date + timedelta(days=day)
+        start = self.base_date if cumulative else current_date
+        end = current_date + timedelta(days=1)
+        return self.range_score(start, end)
 
-        if planned_points == 0.0:
-            score = 100.0
-        else:
-            score = 100.0 * actual_points / planned_points
+    def weekly_score(self) -> float:
+        """ Compute score for the current week. """
+
+        return self.range_score(self.base_date, self.base_date + timedelta(days=7))
+
+    def range_points(self, start_date: date, end_date: date, planned: bool) -> float:
+        """
+        Compute points for the days from ``start_date`` up to (but not including)
+        ``end_date``, for either the planned or actual schedule.
+        """
+
+        planned_schedule, actual_schedule = self.current_schedules()
+        schedule = planned_schedule if planned else actual_schedule
+        return schedule.days_points(start_date, end_date)
+
+    def range_score(self, start_date: date, end_date: date) -> float:
+        """
+        Compute score for the days from ``start_date`` up to (but not including)
+        ``end_date``.
+        """
 
-        return score
+        planned_points = self.range_points(start_date, end_date, planned=True)
+        actual_points = self.range_points(start_date, end_date, planned=False)
+        return score(planned_points, actual_points)
+
+
+def save_sessions(sessions: Iterable[Session]) -> None:
+    """
+    Save ``sessions`` to the session store (see flowshop.store) in a single
+    transaction, each with its compression.
+    """
+
+    with open_store() as store:
+        store.save_state_dicts(
+            (session.state_dict(), session.compression) for session in sessions
+        )
+
+
+def load_sessions(names: List[str], **kwargs: Any) -> List[Session]:
+    """
+    Load the sessions with names ``names`` from the session store (see flowshop.store)
+    in a single query, in order. Keyword arguments are passed on to Session.
+    """
+
+    with open_store() as store:
+        state_dicts = store.load_state_dicts(names)
+    return [
+        Session(
+            state_dict["name"],
+            storage=STORE,
+            compression=compression,
+            state_dict=state_dict,
+            **kwargs,
+        )
+        for state_dict, compression in state_dicts
+    ]
+
+
+def score(planned_points: float, actual_points: float) -> float:
+    """
+    Compute score from planned and actual points, as the percentage of planned points
+    which were earned, or 100 if no points were planned.
+    """
+
+    if planned_points == 0.0:
+        return 100.0
+    return 100.0 * actual_points / planned_points
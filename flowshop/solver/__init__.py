@@ -0,0 +1,14 @@
+"""
+Solvers for permutation flow-shop problems, where jobs are processed on several
+machines in the same order. Sequences of jobs convert to one Schedule per machine (see
+FlowShopProblem.to_schedules()).
+"""
+
+from flowshop.solver.problem import (
+    FlowShopProblem,
+    MAKESPAN,
+    WEIGHTED_COMPLETION,
+)
+from flowshop.solver.heuristics import johnson, neh, best_insertion
+from flowshop.solver.search import iterated_greedy
+from flowshop.solver.taillard import taillard_problem, INSTANCES
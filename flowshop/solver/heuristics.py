@@ -0,0 +1,130 @@
+"""
+Constructive heuristics for permutation flow-shop problems: Johnson's rule, which is
+optimal for the makespan on two machines, and NEH, which builds a sequence by inserting
+jobs one at a time at their best position.
+"""
+
+from typing import List, Sequence, Tuple
+
+from flowshop.solver.problem import FlowShopProblem, MAKESPAN
+
+
+def johnson(problem: FlowShopProblem) -> List[int]:
+    """
+    Sequence the jobs of a two machine problem by Johnson's rule, which minimizes the
+    makespan: jobs which are shorter on the first machine go first, in order of their
+    time on the first machine, followed by the other jobs in reverse order of their
+    time on the second machine.
+    """
+
+    if problem.num_machines != 2:
+        raise ValueError(
+            "Johnson's rule needs 2 machines, not %d." % problem.num_machines
+        )
+
+    times = problem.processing_times
+    first = [job for job in range(problem.num_jobs) if times[job][0] < times[job][1]]
+    last = [job for job in range(problem.num_jobs) if times[job][0] >= times[job][1]]
+    first.sort(key=lambda job: times[job][0])
+    last.sort(key=lambda job: -times[job][1])
+    return first + last
+
+
+def neh(problem: FlowShopProblem) -> List[int]:
+    """
+    Sequence jobs by the NEH heuristic: jobs are taken in order of decreasing total
+    processing time (or of decreasing weight per unit of processing time, for the
+    weighted completion objective), and each is inserted at the position of the
+    sequence so far which is best for the objective.
+    """
+
+    times = problem.processing_times
+    if problem.objective == MAKESPAN:
+        order = sorted(range(problem.num_jobs), key=lambda job: -sum(times[job]))
+    else:
+        order = sorted(
+            range(problem.num_jobs),
+            key=lambda job: -problem.weights[job] / max(sum(times[job]), 1),
+        )
+
+    sequence: List[int] = []
+    for job in order:
+        position, _ = best_insertion(problem, sequence, job)
+        sequence.insert(position, job)
+    return sequence
+
+
+def best_insertion(
+    problem: FlowShopProblem, sequence: Sequence[int], job: int
+) -> Tuple[int, float]:
+    """
+    Find the position at which inserting ``job`` into ``sequence`` is best for the
+    objective, returning it along with the value of the objective. Ties go to the
+    earliest position.
+    """
+
+    if problem.objective == MAKESPAN:
+        values = insertion_makespans(problem, sequence, job)
+    else:
+        values = [
+            problem.weighted_completion(
+                list(sequence[:position]) + [job] + list(sequence[position:])
+            )
+            for position in range(len(sequence) + 1)
+        ]
+    position = min(range(len(values)), key=values.__getitem__)
+    return position, values[position]
+
+
+def insertion_makespans(
+    problem: FlowShopProblem, sequence: Sequence[int], job: int
+) -> List[int]:
+    """
+    Return the makespan of inserting ``job`` at each position of ``sequence``, using
+    Taillard's acceleration: with the completion times of the jobs of the sequence
+    (heads) and the times from the start of each job to the end of the sequence
+    (tails), the makespan of each insertion only takes O(m) to compute, so all of them
+    take O(nm) instead of O(n^2 m).
+    """
+
+    times = problem.processing_times
+    num_machines = problem.num_machines
+    length = len(sequence)
+    machines = range(num_machines)
+
+    # heads[k][i] is the completion time of the k-th job of the sequence on machine i,
+    # counting from 1, with heads[0] all 0.
+    heads = [[0] * num_machines]
+    for sequence_job in sequence:
+        previous = heads[-1]
+        current = []
+        end = 0
+        for i, time in enumerate(times[sequence_job]):
+            end = max(end, previous[i]) + time
+            current.append(end)
+        heads.append(current)
+
+    # tails[k][i] is the time from the start of the k-th job of the sequence on
+    # machine i (counting from 0) to the end of the sequence, with tails[length] all 0.
+    tails = [[0] * num_machines for _ in range(length + 1)]
+    for k in range(length - 1, -1, -1):
+        following = tails[k + 1]
+        current = tails[k]
+        job_times = times[sequence[k]]
+        end = 0
+        for i in reversed(machines):
+            end = max(end, following[i]) + job_times[i]
+            current[i] = end
+
+    job_times = times[job]
+    makespans = []
+    for k in range(length + 1):
+        previous = heads[k]
+        tail = tails[k]
+        end = 0
+        makespan = 0
+        for i in machines:
+            end = max(end, previous[i]) + job_times[i]
+            makespan = max(makespan, end + tail[i])
+        makespans.append(makespan)
+    return makespans
@@ -0,0 +1,147 @@
+"""
+Permutation flow-shop problems. Each job is processed on every machine in the same
+order of machines, and every machine processes the jobs in the same order (the
+sequence), so a solution is a permutation of the jobs.
+"""
+
+from datetime import datetime, timedelta
+from typing import List, Sequence, Optional
+
+from flowshop.schedule import Schedule
+from flowshop.task import Task
+
+
+MAKESPAN = "makespan"
+WEIGHTED_COMPLETION = "weighted_completion"
+OBJECTIVES = [MAKESPAN, WEIGHTED_COMPLETION]
+
+
+class FlowShopProblem:
+    """
+    Permutation flow-shop problem. ``processing_times[j][i]`` is the processing time of
+    job ``j`` on machine ``i``, in whole time units. The objective is either the
+    makespan (the completion time of the last job) or the weighted sum of completion
+    times of the jobs, with ``weights`` (by default, 1 for each job).
+    """
+
+    def __init__(
+        self,
+        processing_times: Sequence[Sequence[int]],
+        objective: str = MAKESPAN,
+        weights: Sequence[float] = None,
+        names: Sequence[str] = None,
+    ) -> None:
+        """ Init function for FlowShopProblem object. """
+
+        if objective not in OBJECTIVES:
+            raise ValueError("Unrecognized flow-shop objective %s." % objective)
+        self.processing_times = [list(times) for times in processing_times]
+        self.num_jobs = len(self.processing_times)
+        self.num_machines = len(self.processing_times[0]) if self.num_jobs else 0
+        if any(len(times) != self.num_machines for times in self.processing_times):
+            raise ValueError("Jobs have processing times for different machines.")
+
+        self.objective = objective
+        self.weights = [1.0] * self.num_jobs if weights is None else list(weights)
+        self.names = (
+            ["job%d" % j for j in range(self.num_jobs)]
+            if names is None
+            else list(names)
+        )
+        if len(self.weights) != self.num_jobs or len(self.names) != self.num_jobs:
+            raise ValueError("Expected a weight and a name for each job.")
+
+    def completion_times(self, sequence: Sequence[int]) -> List[List[int]]:
+        """
+        Return the completion time of each job of ``sequence`` on each machine, indexed
+        by position in the sequence and then by machine.
+        """
+
+        completion = []
+        previous = [0] * self.num_machines
+        for job in sequence:
+            times = self.processing_times[job]
+            current = []
+            end = 0
+            for machine in range(self.num_machines):
+                end = max(end, previous[machine]) + times[machine]
+                current.append(end)
+            completion.append(current)
+            previous = current
+        return completion
+
+    def makespan(self, sequence: Sequence[int]) -> int:
+        """ Completion time of the last job of ``sequence``. """
+
+        previous = [0] * self.num_machines
+        for job in sequence:
+            end = 0
+            for machine, time in enumerate(self.processing_times[job]):
+                end = max(end, previous[machine]) + time
+                previous[machine] = end
+        return previous[-1] if sequence else 0
+
+    def weighted_completion(self, sequence: Sequence[int]) -> float:
+        """ Weighted sum of the completion times of the jobs of ``sequence``. """
+
+        return sum(
+            self.weights[job] * times[-1]
+            for job, times in zip(sequence, self.completion_times(sequence))
+        )
+
+    def evaluate(self, sequence: Sequence[int]) -> float:
+        """ Value of the objective of the problem for ``sequence``. """
+
+        if self.objective == MAKESPAN:
+            return self.makespan(sequence)
+        return self.weighted_completion(sequence)
+
+    def lower_bound(self) -> int:
+        """
+        Taillard's lower bound on the makespan: the largest total processing time of a
+        job, or of a machine plus the least time before it can start and after it
+        finishes.
+        """
+
+        times = self.processing_times
+        machines = range(self.num_machines)
+        job_bound = max(sum(job_times) for job_times in times)
+        machine_bound = max(
+            min(sum(job_times[:machine]) for job_times in times)
+            + sum(job_times[machine] for job_times in times)
+            + min(sum(job_times[machine + 1 :]) for job_times in times)
+            for machine in machines
+        )
+        return max(job_bound, machine_bound)
+
+    def to_schedules(
+        self,
+        sequence: Sequence[int],
+        start_time: datetime,
+        time_unit: timedelta = timedelta(minutes=1),
+        name: Optional[str] = None,
+    ) -> List[Schedule]:
+        """
+        Convert a sequence of jobs into one Schedule per machine, starting at
+        ``start_time``, where each time unit of the problem lasts ``time_unit``. Each
+        task is named after its job, and has the weight of its job as priority.
+        """
+
+        name = "flowshop" if name is None else name
+        completion = self.completion_times(sequence)
+        schedules = []
+        for machine in range(self.num_machines):
+            tasks = []
+            for job, times in zip(sequence, completion):
+                end = times[machine]
+                start = end - self.processing_times[job][machine]
+                tasks.append(
+                    Task(
+                        self.names[job],
+                        priority=self.weights[job],
+                        start_time=start_time + start * time_unit,
+                        end_time=start_time + end * time_unit,
+                    )
+                )
+            schedules.append(Schedule("%s_machine%d" % (name, machine), tasks))
+        return schedules
@@ -0,0 +1,130 @@
+"""
+Iterated greedy search for permutation flow-shop problems (Ruiz and Stuetzle, 2007).
+Each iteration removes a few random jobs from the current sequence (destruction),
+inserts them again one at a time at their best position (construction), and improves
+the result by moving single jobs to their best position (local search). A worse
+sequence is accepted with a probability which depends on how much worse it is, as in
+simulated annealing with a constant temperature.
+"""
+
+import math
+import random
+import time
+from typing import List, Sequence, Tuple, Iterator
+
+from flowshop.solver.heuristics import neh, best_insertion
+from flowshop.solver.problem import FlowShopProblem
+
+
+NUM_DESTROYED = 4
+TEMPERATURE = 0.4
+
+
+def iterated_greedy(
+    problem: FlowShopProblem,
+    time_limit: float = None,
+    max_iterations: int = None,
+    sequence: Sequence[int] = None,
+    num_destroyed: int = NUM_DESTROYED,
+    temperature: float = TEMPERATURE,
+    seed: int = 0,
+) -> Tuple[List[int], float]:
+    """
+    Search for a good sequence by iterated greedy, starting from ``sequence`` (by
+    default, the NEH sequence), until ``time_limit`` seconds have passed or
+    ``max_iterations`` iterations have run. Returns the best sequence found, along with
+    the value of its objective. See improvements() for the other arguments.
+    """
+
+    if time_limit is None and max_iterations is None:
+        raise ValueError(
+            "Iterated greedy needs a time limit or a number of iterations."
+        )
+
+    best: Tuple[List[int], float] = ([], 0.0)
+    for best in improvements(
+        problem, time_limit, max_iterations, sequence, num_destroyed, temperature, seed
+    ):
+        pass
+    return best
+
+
+def improvements(
+    problem: FlowShopProblem,
+    time_limit: float = None,
+    max_iterations: int = None,
+    sequence: Sequence[int] = None,
+    num_destroyed: int = NUM_DESTROYED,
+    temperature: float = TEMPERATURE,
+    seed: int = 0,
+) -> Iterator[Tuple[List[int], float]]:
+    """
+    Run iterated greedy as iterated_greedy() does, yielding each sequence which is
+    better than the best so far along with the value of its objective. ``num_destroyed``
+    is the number of jobs removed by each iteration, and ``temperature`` scales the
+    probability of accepting a worse sequence, relative to the mean processing time of
+    an operation. Without ``time_limit`` or ``max_iterations``, the search runs until
+    the caller stops iterating.
+    """
+
+    rng = random.Random(seed)
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    total_time = sum(map(sum, problem.processing_times))
+    scaled_temperature = (
+        temperature * total_time / max(problem.num_jobs * problem.num_machines, 1) / 10
+    )
+
+    current = list(sequence) if sequence is not None else neh(problem)
+    current, current_value = local_search(problem, current, rng)
+    best, best_value = list(current), current_value
+    yield best, best_value
+
+    iteration = 0
+    while (deadline is None or time.perf_counter() < deadline) and (
+        max_iterations is None or iteration < max_iterations
+    ):
+        iteration += 1
+        candidate = list(current)
+        removed = [
+            candidate.pop(rng.randrange(len(candidate)))
+            for _ in range(min(num_destroyed, len(candidate)))
+        ]
+        for job in removed:
+            position, _ = best_insertion(problem, candidate, job)
+            candidate.insert(position, job)
+        candidate, candidate_value = local_search(problem, candidate, rng)
+
+        if candidate_value < current_value or rng.random() <= math.exp(
+            -(candidate_value - current_value) / max(scaled_temperature, 1e-9)
+        ):
+            current, current_value = candidate, candidate_value
+            if current_value < best_value:
+                best, best_value = list(current), current_value
+                yield best, best_value
+
+
+def local_search(
+    problem: FlowShopProblem, sequence: List[int], rng: random.Random
+) -> Tuple[List[int], float]:
+    """
+    Improve ``sequence`` by removing each job in a random order and inserting it again
+    at its best position, until no job can be moved to a better position. Returns the
+    improved sequence and the value of its objective.
+    """
+
+    sequence = list(sequence)
+    value = problem.evaluate(sequence)
+    improved = True
+    while improved:
+        improved = False
+        for job in rng.sample(sequence, len(sequence)):
+            position = sequence.index(job)
+            del sequence[position]
+            best_position, best_value = best_insertion(problem, sequence, job)
+            if best_value < value:
+                sequence.insert(best_position, job)
+                value = best_value
+                improved = True
+            else:
+                sequence.insert(position, job)
+    return sequence, value
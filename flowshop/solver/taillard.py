@@ -0,0 +1,189 @@
+"""
+Taillard's benchmark instances for permutation flow-shop problems (Taillard, 1993).
+Processing times are drawn uniformly from 1 to 99 by Taillard's portable random number
+generator, from the time seed of each instance, so instances are generated here instead
+of being stored. Each instance comes with the best known upper bound on its makespan,
+which is optimal for every instance with 20 jobs or 5 machines.
+"""
+
+from typing import Dict, List, Tuple, NamedTuple
+
+from flowshop.solver.problem import FlowShopProblem
+
+
+# Constants of Taillard's generator, a Lehmer generator computed with Schrage's method
+# so that it doesn't overflow 32 bit integers.
+MULTIPLIER = 16807
+QUOTIENT = 127773
+REMAINDER = 2836
+MODULUS = 2 ** 31 - 1
+
+
+class TaillardInstance(NamedTuple):
+    """ Size, time seed and best known makespan of a Taillard instance. """
+
+    num_jobs: int
+    num_machines: int
+    time_seed: int
+    upper_bound: int
+
+
+def _instances(
+    num_jobs: int, num_machines: int, first: int, seeds: List[int], bounds: List[int]
+) -> Dict[str, TaillardInstance]:
+    """ Name the instances of a class of Taillard instances, starting at ``first``. """
+
+    return {
+        "ta%03d" % (first + k): TaillardInstance(num_jobs, num_machines, seed, bound)
+        for k, (seed, bound) in enumerate(zip(seeds, bounds))
+    }
+
+
+INSTANCES: Dict[str, TaillardInstance] = {
+    **_instances(
+        20,
+        5,
+        1,
+        [
+            873654221,
+            379008056,
+            1866992158,
+            216771124,
+            495070989,
+            402959317,
+            1369363414,
+            2021925980,
+            573109518,
+            88325120,
+        ],
+        [1278, 1359, 1081, 1293, 1235, 1195, 1234, 1206, 1230, 1108],
+    ),
+    **_instances(
+        20,
+        10,
+        11,
+        [
+            587595453,
+            1401007982,
+            873136276,
+            268827376,
+            1634173168,
+            691823909,
+            73807235,
+            1273398721,
+            2065119309,
+            1672900551,
+        ],
+        [1582, 1659, 1496, 1377, 1419, 1397, 1484, 1538, 1593, 1591],
+    ),
+    **_instances(
+        20,
+        20,
+        21,
+        [
+            479340445,
+            268827376,
+            1958948863,
+            918272953,
+            555010963,
+            2010851491,
+            1519833303,
+            1748670931,
+            1923497586,
+            1829909967,
+        ],
+        [2297, 2099, 2326, 2223, 2291, 2226, 2273, 2200, 2237, 2178],
+    ),
+    **_instances(
+        50,
+        5,
+        31,
+        [
+            1328042058,
+            200382020,
+            496319842,
+            1203030903,
+            1730708564,
+            450926852,
+            1303135678,
+            1273398721,
+            587288402,
+            248421594,
+        ],
+        [2724, 2834, 2621, 2751, 2863, 2829, 2725, 2683, 2552, 2782],
+    ),
+    **_instances(
+        50,
+        10,
+        41,
+        [
+            1958948863,
+            575633267,
+            655816003,
+            1977864101,
+            93805469,
+            1803345551,
+            49612559,
+            1899802599,
+            2013025619,
+            578962478,
+        ],
+        [2991, 2867, 2839, 3063, 2976, 3006, 3093, 3037, 2897, 3065],
+    ),
+    **_instances(
+        50,
+        20,
+        51,
+        [
+            1539989115,
+            691823909,
+            655816003,
+            1315102446,
+            1949668355,
+            1923497586,
+            1805594913,
+            1861070898,
+            715643788,
+            464843328,
+        ],
+        [3850, 3704, 3640, 3723, 3611, 3681, 3704, 3691, 3743, 3756],
+    ),
+}
+
+
+def taillard_random(seed: int, low: int, high: int) -> Tuple[int, int]:
+    """
+    Draw an integer uniformly from ``low`` to ``high`` with Taillard's generator,
+    returning it along with the next seed.
+    """
+
+    k = seed // QUOTIENT
+    seed = MULTIPLIER * (seed % QUOTIENT) - k * REMAINDER
+    if seed < 0:
+        seed += MODULUS
+    return low + int(seed / MODULUS * (high - low + 1)), seed
+
+
+def taillard_times(num_jobs: int, num_machines: int, time_seed: int) -> List[List[int]]:
+    """
+    Generate the processing times of a Taillard instance, indexed by job and then by
+    machine. Times are drawn machine by machine, as in Taillard's generator.
+    """
+
+    times = [[0] * num_machines for _ in range(num_jobs)]
+    seed = time_seed
+    for machine in range(num_machines):
+        for job in range(num_jobs):
+            times[job][machine], seed = taillard_random(seed, 1, 99)
+    return times
+
+
+def taillard_problem(name: str) -> FlowShopProblem:
+    """ Generate the makespan problem of the Taillard instance with name ``name``. """
+
+    if name not in INSTANCES:
+        raise ValueError("Unrecognized Taillard instance %s." % name)
+    instance = INSTANCES[name]
+    return FlowShopProblem(
+        taillard_times(instance.num_jobs, instance.num_machines, instance.time_seed)
+    )
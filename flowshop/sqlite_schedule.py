@@ -0,0 +1,819 @@
+"""
+Schedule stored in an SQLite database, for schedules which are too large to keep in
+memory. Tasks are stored as rows indexed by start time, so that looking up tasks by
+day, tasks in an interval and overlapping neighbours are range queries on the index.
+The number and points of the tasks on each day are stored alongside the tasks, and are
+kept in memory as prefix sums, so that positions of tasks and points over days are
+looked up without counting rows.
+
+The rows of a schedule are never changed by editing it. Instead, each SQLiteSchedule is
+a view of the rows along with an overlay of the rows it removed and the tasks it added,
+so that copies (e.g. the entries of an edit history) only copy their overlay, and an
+edit only costs a few queries. commit() writes the overlay of a schedule into its rows.
+"""
+
+import os
+import sqlite3
+import weakref
+from bisect import bisect_left, bisect_right
+from datetime import datetime, date, time, timedelta
+from heapq import merge
+from typing import List, Dict, Any, Tuple, Sequence, Iterable, Iterator, Optional
+
+from flowshop.encoding import EPOCH, MICROSECOND
+from flowshop.schedule import Schedule, _overlaps
+from flowshop.task import Task
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS schedules (
+    name TEXT PRIMARY KEY,
+    max_duration INTEGER NOT NULL,
+    generation INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    schedule TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    end INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    priority REAL
+);
+CREATE INDEX IF NOT EXISTS tasks_start ON tasks (schedule, start);
+CREATE TABLE IF NOT EXISTS days (
+    schedule TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    points REAL NOT NULL,
+    PRIMARY KEY (schedule, day)
+);
+"""
+
+TASK_COLUMNS = "id, start, end, name, priority"
+
+# Largest number of row ids to look up in a single query, which stays below the limit
+# on the number of variables in an SQLite statement.
+BATCH_SIZE = 500
+
+ONE_DAY = timedelta(days=1)
+
+# Number of tasks read at a time when looking for a free slot.
+GAP_SCAN_SIZE = 64
+
+# Open connections and tables, by path of database and by path and name of schedule, so
+# that every SQLiteSchedule of a table shares the Task objects of its rows.
+_CONNECTIONS: Dict[str, sqlite3.Connection] = {}
+_TABLES: Dict[Tuple[str, str], "_Table"] = {}
+
+
+class SQLiteSchedule(Schedule):
+    """
+    Schedule whose tasks are stored in the SQLite database at ``path`` under the name
+    ``name``, which must have been created with SQLiteSchedule.create(). The Schedule
+    API is unchanged, except that self.tasks is a property which reads every task, and
+    so should be avoided on large schedules.
+    """
+
+    def __init__(self, path: str, name: str) -> None:
+        """ Init function for SQLiteSchedule object. """
+
+        self.name = name
+        self.state_vars = ["name", "tasks"]
+        self._table = _open_table(path, name)
+        self._generation = self._table.generation
+        self._max_duration = self._table.max_duration
+        self._reset_overlay()
+
+    @classmethod
+    def create(
+        cls, path: str, name: str, tasks: Iterable[Task] = ()
+    ) -> "SQLiteSchedule":
+        """
+        Create a schedule with name ``name`` holding ``tasks`` in the database at
+        ``path``, which is created if it doesn't exist.
+        """
+
+        tasks = sorted(tasks, key=lambda task: task.start_time)
+        for task, next_task in zip(tasks, tasks[1:]):
+            if task.end_time > next_task.start_time:
+                raise ValueError(
+                    "Schedule contains overlapping tasks %s and %s." % (task, next_task)
+                )
+
+        connection = _connect(path)
+        exists = connection.execute(
+            "SELECT 1 FROM schedules WHERE name = ?", (name,)
+        ).fetchone()
+        if exists is not None:
+            raise ValueError("Already a schedule with name %s in %s." % (name, path))
+
+        days: Dict[int, Tuple[int, float]] = {}
+        for task in tasks:
+            ordinal = task.date.toordinal()
+            count, points = days.get(ordinal, (0, 0.0))
+            days[ordinal] = (count + 1, points + task.points())
+        max_duration = max((task.duration for task in tasks), default=timedelta(0))
+
+        with connection:
+            connection.executemany(
+                "INSERT INTO tasks (schedule, start, end, name, priority) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (
+                    (
+                        name,
+                        _to_micros(task.start_time),
+                        _to_micros(task.end_time),
+                        task.name,
+                        task.priority,
+                    )
+                    for task in tasks
+                ),
+            )
+            connection.executemany(
+                "INSERT INTO days VALUES (?, ?, ?, ?)",
+                ((name, day, count, points) for day, (count, points) in days.items()),
+            )
+            connection.execute(
+                "INSERT INTO schedules VALUES (?, ?, 0)",
+                (name, max(max_duration, timedelta(0)) // MICROSECOND),
+            )
+
+        return cls(path, name)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """
+        Return state for pickling, which refers to the rows of the schedule in its
+        database instead of holding its tasks.
+        """
+
+        return {
+            "name": self.name,
+            "path": self._table.path,
+            "table": self._table.name,
+            "generation": self._generation,
+            "max_duration": self._max_duration,
+            "removed": sorted(self._removed),
+            "added": list(self._added),
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """ Restore state when unpickling, reopening the database of the schedule. """
+
+        self.name = state["name"]
+        self.state_vars = ["name", "tasks"]
+        self._table = _open_table(state["path"], state["table"])
+        self._generation = state["generation"]
+        self._max_duration = state["max_duration"]
+        self._reset_overlay()
+        for row_id, task in self._table.rows_by_id(state["removed"]):
+            self._remove_row(row_id, task)
+        for task in state["added"]:
+            self._add(task)
+
+    def __eq__(self, other) -> bool:
+        """
+        Definition of self == other. Schedules which share rows only differ at the start
+        times of tasks in their overlays, so only those are compared.
+        """
+
+        if not isinstance(other, SQLiteSchedule) or other._table is not self._table:
+            return super().__eq__(other)
+
+        starts = set(self._removed_starts + self._added_starts)
+        starts.update(other._removed_starts + other._added_starts)
+        return self.name == other.name and all(
+            self._window(start, start + MICROSECOND)
+            == other._window(start, start + MICROSECOND)
+            for start in starts
+        )
+
+    @property
+    def tasks(self) -> List[Task]:
+        """ Every task of the schedule, sorted by start time. """
+        return self._window(datetime.min, datetime.max)
+
+    def copy(self) -> "SQLiteSchedule":
+        """
+        Return a copy of the schedule, which shares its rows and Task objects with
+        ``self`` and copies its overlay. The copy keeps track of its edits, so that an
+        edit history can store them without comparing the tasks of the schedules.
+        """
+
+        schedule = type(self).__new__(type(self))
+        schedule.__dict__.update(self.__dict__)
+        schedule._removed = dict(self._removed)
+        schedule._removed_ids = list(self._removed_ids)
+        schedule._removed_starts = list(self._removed_starts)
+        schedule._removed_tasks = list(self._removed_tasks)
+        schedule._added = list(self._added)
+        schedule._added_starts = list(self._added_starts)
+        schedule._parent = weakref.ref(self)
+        schedule._edits = []
+        return schedule
+
+    def splice_tasks(
+        self, task_index: int, num_removed: int, new_tasks: Sequence[Task]
+    ) -> None:
+        """
+        Replace the ``num_removed`` tasks starting at ``task_index`` with ``new_tasks``
+        in the overlay of the schedule (see Schedule.splice_tasks()). Tasks are kept
+        sorted by start time, so ``new_tasks`` have to belong at ``task_index``.
+        """
+
+        removed = self._row_range(task_index, task_index + num_removed)
+        for row_id, task in removed:
+            if row_id is not None:
+                self._remove_row(row_id, task)
+            else:
+                _remove_sorted(self._added_starts, self._added, task)
+
+        # Tasks of rows which were removed (e.g. by an edit which is being undone) are
+        # restored as rows, rather than added.
+        for task in new_tasks:
+            if not self._restore_row(task):
+                self._add(task)
+            self._max_duration = max(self._max_duration, task.duration)
+
+        self._edits.append((task_index, len(removed), tuple(new_tasks)))
+
+    def edits_since(
+        self, old: Schedule
+    ) -> Tuple[int, Tuple[Task, ...], Tuple[Task, ...]]:
+        """
+        Return the edit which changes ``old`` into this schedule (see
+        Schedule.edits_since()). If this schedule is a copy of ``old``, the edits made
+        to the copy are combined into one, which replaces the smallest run of the tasks
+        of ``old`` that covers all of them, without reading every task.
+        """
+
+        parent = self._parent() if self._parent is not None else None
+        if parent is not old:
+            return super().edits_since(old)
+        if not self._edits:
+            return (0, (), ())
+
+        # The edit replaces old.tasks[low:high] with ``window``, and is built up by
+        # widening it to cover each edit in turn.
+        low, high = self._edits[0][0], self._edits[0][0]
+        window: List[Task] = []
+        for task_index, num_removed, added in self._edits:
+            if task_index < low:
+                window = old._task_range(task_index, low) + window
+                low = task_index
+            extra = task_index + num_removed - (low + len(window))
+            if extra > 0:
+                window += old._task_range(high, high + extra)
+                high += extra
+            window[task_index - low : task_index - low + num_removed] = added
+
+        return low, tuple(old._task_range(low, high)), tuple(window)
+
+    def commit(self) -> None:
+        """
+        Write the overlay of the schedule into its rows, so that it no longer has to be
+        copied along with the schedule. Other schedules which share the rows (e.g.
+        other entries of an edit history) can't be used afterwards.
+        """
+
+        table = self._base()
+        connection = table.connection
+        days = {task.date.toordinal() for task in self._removed_tasks + self._added}
+        removed_ids = sorted(self._removed)
+        for row_id in removed_ids:
+            table.forget(row_id)
+        with connection:
+            for start in range(0, len(removed_ids), BATCH_SIZE):
+                batch = removed_ids[start : start + BATCH_SIZE]
+                connection.execute(
+                    "DELETE FROM tasks WHERE id IN (%s)" % ", ".join("?" * len(batch)),
+                    batch,
+                )
+            for task in self._added:
+                cursor = connection.execute(
+                    "INSERT INTO tasks (schedule, start, end, name, priority) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (
+                        table.name,
+                        _to_micros(task.start_time),
+                        _to_micros(task.end_time),
+                        task.name,
+                        task.priority,
+                    ),
+                )
+                table.remember(cursor.lastrowid, task)
+
+            # Points of each changed day are summed from scratch, as in
+            # Schedule._update_day_points().
+            for ordinal in days:
+                day_start = datetime.combine(date.fromordinal(ordinal), time())
+                day_tasks = [
+                    task for _, task in table.rows(day_start, day_start + ONE_DAY)
+                ]
+                if day_tasks:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO days VALUES (?, ?, ?, ?)",
+                        (
+                            table.name,
+                            ordinal,
+                            len(day_tasks),
+                            sum(task.points() for task in day_tasks),
+                        ),
+                    )
+                else:
+                    connection.execute(
+                        "DELETE FROM days WHERE schedule = ? AND day = ?",
+                        (table.name, ordinal),
+                    )
+            connection.execute(
+                "UPDATE schedules SET max_duration = ?, generation = generation + 1 "
+                "WHERE name = ?",
+                (self._max_duration // MICROSECOND, table.name),
+            )
+
+        table.load()
+        self._generation = table.generation
+        self._reset_overlay()
+
+    def get_task_index(self, day: date, daily_index: int) -> int:
+        """
+        Get index of the ``daily_index``-th task on day ``day``.
+        """
+
+        day_start = datetime.combine(day, time())
+        first_index = self._rank(day_start)
+        num_tasks = self._rank(day_start + ONE_DAY) - first_index
+        if num_tasks == 0:
+            raise ValueError("No task on day %s" % str(day))
+        if not 0 <= daily_index < num_tasks:
+            raise ValueError(
+                "Index %d is larger than number of tasks on day %s" % (daily_index, day)
+            )
+
+        return first_index + daily_index
+
+    def get_task(self, day: date, daily_index: int) -> Task:
+        """
+        Get the ``daily_index``-th task on day ``day``.
+        """
+
+        day_start = datetime.combine(day, time())
+        day_tasks = self._window(day_start, day_start + ONE_DAY)
+        if not day_tasks:
+            raise ValueError("No task on day %s" % str(day))
+        if not 0 <= daily_index < len(day_tasks):
+            raise ValueError(
+                "Index %d is larger than number of tasks on day %s" % (daily_index, day)
+            )
+        return day_tasks[daily_index]
+
+    def check_for_overlap(self) -> None:
+        """
+        Checks whether the schedule contains any overlapping tasks. Raises an error if
+        so.
+        """
+
+        tasks = self.tasks
+        for current_task, next_task in zip(tasks, tasks[1:]):
+            if current_task.end_time > next_task.start_time:
+                raise ValueError(
+                    "Schedule contains overlapping tasks %s and %s."
+                    % (current_task, next_task)
+                )
+
+    def points(self) -> float:
+        """ Computes points earned for entire schedule. """
+
+        table = self._base()
+        return (
+            table.prefix_points[-1]
+            - sum(task.points() for task in self._removed_tasks)
+            + sum(task.points() for task in self._added)
+        )
+
+    def days_points(self, start_date: date, end_date: date) -> float:
+        """
+        Computes points for all tasks within the days from ``start_date`` up to (but not
+        including) ``end_date`` (see Schedule.days_points()). The points of tasks which
+        start inside the interval are looked up in the prefix sums of the rows, and
+        corrected for the overlay.
+        """
+
+        start_time = datetime.combine(start_date, time())
+        end_time = datetime.combine(end_date, time())
+        if end_date <= start_date:
+            return sum(
+                task.points() for task in self.tasks_in_interval(start_time, end_time)
+            )
+
+        table = self._base()
+        low = bisect_left(table.ordinals, start_date.toordinal())
+        high = bisect_left(table.ordinals, end_date.toordinal())
+        points = table.prefix_points[high] - table.prefix_points[low]
+        for starts, tasks, sign in [
+            (self._removed_starts, self._removed_tasks, -1),
+            (self._added_starts, self._added, 1),
+        ]:
+            low = bisect_left(starts, start_time)
+            high = bisect_left(starts, end_time)
+            points += sign * sum(task.points() for task in tasks[low:high])
+
+        # Points of tasks which start before the interval and overlap it.
+        for task in self._window(start_time - self._max_duration, start_time):
+            if _overlaps(task, start_time, end_time):
+                points += task.points()
+
+        return points
+
+    def tasks_in_interval(self, start_time: datetime, end_time: datetime) -> List[Task]:
+        """
+        Returns a list of all tasks in the schedule that overlap the interval
+        (start_time, end_time).
+        """
+
+        if end_time < start_time:
+            return [
+                task for task in self.tasks if _overlaps(task, start_time, end_time)
+            ]
+
+        candidates = self._window(
+            start_time - self._max_duration, end_time + MICROSECOND
+        )
+        return [task for task in candidates if _overlaps(task, start_time, end_time)]
+
+    def count_in_interval(self, start_time: datetime, end_time: datetime) -> int:
+        """
+        Returns the number of tasks in the schedule that overlap the interval
+        (start_time, end_time).
+        """
+        return len(self.tasks_in_interval(start_time, end_time))
+
+    def _free_gaps(
+        self, duration: timedelta, earliest: datetime, latest: datetime
+    ) -> Iterator[Tuple[datetime, datetime]]:
+        """
+        Iterate over the gaps between tasks which are at least ``duration`` long and
+        overlap the time from ``earliest`` to ``latest`` (see Schedule._free_gaps()).
+        Gaps aren't indexed in the database, so the tasks from ``earliest`` on are read
+        GAP_SCAN_SIZE at a time, until a gap fits.
+        """
+
+        index = self.insert_index(earliest)
+        previous = self._task_range(index - 1, index) if index > 0 else []
+        gap_start = previous[0].end_time if previous else datetime.min
+        while gap_start < latest:
+            tasks = self._task_range(index, index + GAP_SCAN_SIZE)
+            for task in tasks:
+                # The gap before the first task from ``latest`` on may still overlap.
+                if (
+                    task.start_time > earliest
+                    and gap_start < latest
+                    and task.start_time - gap_start >= duration
+                ):
+                    yield gap_start, task.start_time
+                if task.start_time >= latest:
+                    return
+                gap_start = task.end_time
+            if len(tasks) < GAP_SCAN_SIZE:
+                if gap_start < latest:
+                    yield gap_start, datetime.max
+                return
+            index += GAP_SCAN_SIZE
+
+    def _merge_tasks(self, new_tasks: List[Task]) -> None:
+        """ Add sorted ``new_tasks``, which were already checked for overlap. """
+
+        for task in new_tasks:
+            self.splice_tasks(self.insert_index(task.start_time), 0, [task])
+
+    def _task_range(self, start_index: int, end_index: int) -> List[Task]:
+        """ Return the tasks from ``start_index`` up to ``end_index`` in the schedule. """
+        return [task for _, task in self._row_range(start_index, end_index)]
+
+    def _row_range(
+        self, start_index: int, end_index: int
+    ) -> List[Tuple[Optional[int], Task]]:
+        """
+        Return the tasks from ``start_index`` up to ``end_index`` in the schedule along
+        with their row ids, which are None for tasks added by the overlay.
+        """
+
+        if end_index <= start_index:
+            return []
+        table = self._base()
+
+        # Find the last day with rows on it which starts at or before the
+        # ``start_index``-th task, and read the tasks from there.
+        low, high = 0, len(table.ordinals)
+        while low < high:
+            middle = (low + high) // 2
+            if self._day_rank(middle) <= start_index:
+                low = middle + 1
+            else:
+                high = middle
+        position = low - 1
+
+        first_index = 0 if position < 0 else self._day_rank(position)
+        rows: List[Tuple[Optional[int], Task]] = []
+        while first_index + len(rows) < end_index and position < len(table.ordinals):
+            window_start = datetime.min if position < 0 else table.day_start(position)
+            window_end = (
+                datetime.max
+                if position + 1 == len(table.ordinals)
+                else table.day_start(position + 1)
+            )
+            rows.extend(self._window_rows(window_start, window_end))
+            position += 1
+
+        return rows[start_index - first_index : end_index - first_index]
+
+    def insert_index(self, start_time: datetime) -> int:
+        """ Index at which to insert a task starting at ``start_time``. """
+
+        return self._rank(start_time, right=True)
+
+    def _base(self) -> "_Table":
+        """
+        Return the rows of the schedule, making sure that they haven't been changed by
+        a commit of another schedule.
+        """
+
+        if self._generation != self._table.generation:
+            raise ValueError(
+                "Rows of schedule %s were changed by a commit of another schedule."
+                % self.name
+            )
+        return self._table
+
+    def _reset_overlay(self) -> None:
+        """ Clear the overlay of the schedule, and the edits made since its copy. """
+
+        # Rows removed by the schedule by id, and their ids sorted by start time.
+        self._removed: Dict[int, Task] = {}
+        self._removed_ids: List[int] = []
+        self._removed_starts: List[datetime] = []
+        self._removed_tasks: List[Task] = []
+
+        # Tasks added by the schedule, sorted by start time.
+        self._added: List[Task] = []
+        self._added_starts: List[datetime] = []
+
+        self._parent: Optional[weakref.ref] = None
+        self._edits: List[Tuple[int, int, Tuple[Task, ...]]] = []
+
+    def _remove_row(self, row_id: int, task: Task) -> None:
+        """ Add the row ``row_id`` holding ``task`` to the removed rows. """
+
+        self._removed[row_id] = task
+        position = bisect_right(self._removed_starts, task.start_time)
+        self._removed_ids.insert(position, row_id)
+        self._removed_starts.insert(position, task.start_time)
+        self._removed_tasks.insert(position, task)
+
+    def _restore_row(self, task: Task) -> bool:
+        """
+        Take the row holding ``task`` out of the removed rows, if it is one of them.
+        Returns whether or not it was.
+        """
+
+        position = bisect_left(self._removed_starts, task.start_time)
+        while (
+            position < len(self._removed_starts)
+            and self._removed_starts[position] == task.start_time
+        ):
+            if self._removed_tasks[position] is task:
+                del self._removed[self._removed_ids[position]]
+                del self._removed_ids[position]
+                del self._removed_starts[position]
+                del self._removed_tasks[position]
+                return True
+            position += 1
+        return False
+
+    def _add(self, task: Task) -> None:
+        """ Add ``task`` to the added tasks. """
+
+        position = bisect_right(self._added_starts, task.start_time)
+        self._added_starts.insert(position, task.start_time)
+        self._added.insert(position, task)
+
+    def _rank(self, start_time: datetime, right: bool = False) -> int:
+        """
+        Number of tasks which start before ``start_time``, or at or before it if
+        ``right`` is True.
+        """
+
+        search = bisect_right if right else bisect_left
+        return (
+            self._base().rank(start_time, right)
+            - search(self._removed_starts, start_time)
+            + search(self._added_starts, start_time)
+        )
+
+    def _day_rank(self, position: int) -> int:
+        """
+        Number of tasks which start before the day at ``position`` in the days with
+        rows on them.
+        """
+
+        day_start = self._table.day_start(position)
+        return (
+            self._table.prefix_counts[position]
+            - bisect_left(self._removed_starts, day_start)
+            + bisect_left(self._added_starts, day_start)
+        )
+
+    def _window(self, start_time: datetime, end_time: datetime) -> List[Task]:
+        """ Return the tasks which start from ``start_time`` up to ``end_time``. """
+        return [task for _, task in self._window_rows(start_time, end_time)]
+
+    def _window_rows(
+        self, start_time: datetime, end_time: datetime
+    ) -> List[Tuple[Optional[int], Task]]:
+        """
+        Return the tasks which start from ``start_time`` up to ``end_time`` along with
+        their row ids, which are None for tasks added by the overlay.
+        """
+
+        rows: List[Tuple[Optional[int], Task]] = [
+            (row_id, task)
+            for row_id, task in self._base().rows(start_time, end_time)
+            if row_id not in self._removed
+        ]
+        low = bisect_left(self._added_starts, start_time)
+        high = bisect_left(self._added_starts, end_time)
+        if low == high:
+            return rows
+        added = [(None, task) for task in self._added[low:high]]
+        return list(merge(rows, added, key=lambda row: row[1].start_time))
+
+
+class _Table:
+    """
+    The rows of the schedule with name ``name`` in a database, which are shared by every
+    SQLiteSchedule of that schedule. Holds the days with rows on them along with prefix
+    sums of their number of tasks and points, and caches the Task objects of rows by
+    row id, so that schedules which share rows also share their Task objects. Task
+    objects are only cached while something else holds them (e.g. the overlay or edit
+    history of a schedule), so the cache doesn't grow with the number of rows read.
+    """
+
+    def __init__(self, connection: sqlite3.Connection, path: str, name: str) -> None:
+        """ Init function for _Table object. """
+
+        self.connection = connection
+        self.path = path
+        self.name = name
+        self.tasks: "weakref.WeakValueDictionary[int, Task]" = (
+            weakref.WeakValueDictionary()
+        )
+        self.load()
+
+    def load(self) -> None:
+        """ Read the metadata of the schedule and its days from the database. """
+
+        row = self.connection.execute(
+            "SELECT max_duration, generation FROM schedules WHERE name = ?",
+            (self.name,),
+        ).fetchone()
+        if row is None:
+            raise ValueError("No schedule with name %s in %s." % (self.name, self.path))
+        self.max_duration = row[0] * MICROSECOND
+        self.generation = row[1]
+
+        self.ordinals: List[int] = []
+        self.prefix_counts = [0]
+        self.prefix_points = [0.0]
+        for day, count, points in self.connection.execute(
+            "SELECT day, count, points FROM days WHERE schedule = ? ORDER BY day",
+            (self.name,),
+        ):
+            self.ordinals.append(day)
+            self.prefix_counts.append(self.prefix_counts[-1] + count)
+            self.prefix_points.append(self.prefix_points[-1] + points)
+
+    def day_start(self, position: int) -> datetime:
+        """ Midnight of the day at ``position`` in self.ordinals. """
+        return datetime.combine(date.fromordinal(self.ordinals[position]), time())
+
+    def rank(self, start_time: datetime, right: bool = False) -> int:
+        """
+        Number of rows which start before ``start_time``, or at or before it if
+        ``right`` is True. Only the rows of the day of ``start_time`` are counted.
+        """
+
+        day = start_time.date()
+        position = bisect_left(self.ordinals, day.toordinal())
+        count = self.prefix_counts[position]
+        if position == len(self.ordinals) or self.ordinals[position] != day.toordinal():
+            return count
+
+        day_start = datetime.combine(day, time())
+        if start_time == day_start and not right:
+            return count
+        (day_count,) = self.connection.execute(
+            "SELECT COUNT(*) FROM tasks WHERE schedule = ? AND start >= ? AND start %s ?"
+            % ("<=" if right else "<"),
+            (self.name, _to_micros(day_start), _to_micros(start_time)),
+        ).fetchone()
+        return count + day_count
+
+    def rows(self, start_time: datetime, end_time: datetime) -> List[Tuple[int, Task]]:
+        """
+        Return the rows which start from ``start_time`` up to ``end_time``, sorted by
+        start time, as row ids along with their tasks.
+        """
+
+        cursor = self.connection.execute(
+            "SELECT %s FROM tasks WHERE schedule = ? AND start >= ? AND start < ? "
+            "ORDER BY start, id" % TASK_COLUMNS,
+            (self.name, _to_micros(start_time), _to_micros(end_time)),
+        )
+        return [(row[0], self.task(row)) for row in cursor]
+
+    def rows_by_id(self, row_ids: List[int]) -> List[Tuple[int, Task]]:
+        """ Return the rows with ids ``row_ids``, as row ids along with their tasks. """
+
+        rows = []
+        for start in range(0, len(row_ids), BATCH_SIZE):
+            batch = row_ids[start : start + BATCH_SIZE]
+            cursor = self.connection.execute(
+                "SELECT %s FROM tasks WHERE id IN (%s)"
+                % (TASK_COLUMNS, ", ".join("?" * len(batch))),
+                batch,
+            )
+            rows.extend((row[0], self.task(row)) for row in cursor)
+        return rows
+
+    def task(self, row: Tuple[int, int, int, str, Optional[float]]) -> Task:
+        """ Return the Task object of a row, constructing it if it isn't cached. """
+
+        row_id, start, end, name, priority = row
+        task = self.tasks.get(row_id)
+        if task is None:
+            task = Task(name, priority, _from_micros(start), _from_micros(end))
+            self.remember(row_id, task)
+        return task
+
+    def remember(self, row_id: int, task: Task) -> None:
+        """ Cache ``task`` as the Task object of the row ``row_id``. """
+        self.tasks[row_id] = task
+
+    def forget(self, row_id: int) -> None:
+        """ Drop the cached Task object of the row ``row_id``, if any. """
+        self.tasks.pop(row_id, None)
+
+
+def close_database(path: str) -> None:
+    """
+    Close the database at ``path``, if it is open. Schedules stored in it can't be used
+    afterwards, but can be opened again.
+    """
+
+    path = os.path.abspath(path)
+    connection = _CONNECTIONS.pop(path, None)
+    if connection is not None:
+        connection.close()
+    for key in [key for key in _TABLES if key[0] == path]:
+        del _TABLES[key]
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    """ Open the database at ``path``, creating it if necessary. """
+
+    path = os.path.abspath(path)
+    if path not in _CONNECTIONS:
+        connection = sqlite3.connect(path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        with connection:
+            connection.executescript(SCHEMA)
+        _CONNECTIONS[path] = connection
+    return _CONNECTIONS[path]
+
+
+def _open_table(path: str, name: str) -> _Table:
+    """ Open the rows of the schedule with name ``name`` in the database at ``path``. """
+
+    key = (os.path.abspath(path), name)
+    if key not in _TABLES:
+        _TABLES[key] = _Table(_connect(path), key[0], name)
+    return _TABLES[key]
+
+
+def _remove_sorted(starts: List[datetime], tasks: List[Task], task: Task) -> None:
+    """ Remove ``task`` from ``tasks``, which is sorted by start time in ``starts``. """
+
+    position = bisect_left(starts, task.start_time)
+    while tasks[position] is not task:
+        position += 1
+    del starts[position]
+    del tasks[position]
+
+
+def _to_micros(time_value: datetime) -> int:
+    """ Convert a (naive) datetime into integer microseconds since the epoch. """
+    return (time_value - EPOCH) // MICROSECOND
+
+
+def _from_micros(micros: int) -> datetime:
+    """ Convert integer microseconds since the epoch into a datetime. """
+    return EPOCH + micros * MICROSECOND
@@ -0,0 +1,192 @@
+"""
+Session store which holds many sessions in a single SQLite database, along with a
+catalog of the sessions it holds. Listing the sessions of a store only reads the
+catalog, and loading or saving many sessions at once takes a single query or
+transaction, rather than one open (or stat) per session file.
+
+The catalog holds the name, size, last modified time, current week (i.e. base date)
+and compression codec of each session. The state dict of each session is pickled and
+compressed as it would be in a pickled session file (see flowshop.files), and is
+stored in a separate table, so that listing the catalog never reads a state dict.
+
+The store only deals in state dicts, so that it doesn't depend on Session. Sessions are
+saved to and loaded from the store many at a time by flowshop.session.save_sessions()
+and flowshop.session.load_sessions().
+"""
+
+import os
+import pickle
+import sqlite3
+import time
+from datetime import date, datetime
+from typing import List, Dict, Any, Tuple, Iterable, NamedTuple, Optional, Union
+
+from flowshop.compression import get_codec, compress_file, decompress_file
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS catalog (
+    name TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    modified REAL NOT NULL,
+    base_date TEXT,
+    compression TEXT
+);
+CREATE TABLE IF NOT EXISTS states (
+    name TEXT PRIMARY KEY,
+    state BLOB NOT NULL
+);
+"""
+
+# Largest number of names to look up in a single query, which stays below the limit on
+# the number of variables in an SQLite statement.
+BATCH_SIZE = 500
+
+
+class CatalogEntry(NamedTuple):
+    """ Entry of the catalog of a session store. """
+
+    name: str
+    size: int
+    modified: float
+    base_date: Union[date, datetime, None]
+    compression: Optional[str]
+
+
+class SessionStore:
+    """
+    Session store backed by the SQLite database at ``path``, which is created if it
+    doesn't exist. The database is opened in WAL mode, so that sessions can be read
+    while another process saves to the store.
+    """
+
+    def __init__(self, path: str) -> None:
+        """ Init function for SessionStore object. """
+
+        save_dir = os.path.dirname(path)
+        if save_dir and not os.path.isdir(save_dir):
+            os.makedirs(save_dir)
+
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+
+    def __enter__(self) -> "SessionStore":
+        """ Enter a context which closes the store on exit. """
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """ Close the store. """
+        self.close()
+
+    def __contains__(self, name: str) -> bool:
+        """ Whether or not the store holds a session with name ``name``. """
+        return self.entry(name) is not None
+
+    def __len__(self) -> int:
+        """ Number of sessions in the store. """
+        return self.connection.execute("SELECT COUNT(*) FROM catalog").fetchone()[0]
+
+    def close(self) -> None:
+        """ Close the connection to the database. """
+        self.connection.close()
+
+    def catalog(self) -> List[CatalogEntry]:
+        """ Return the catalog entries of all sessions in the store, sorted by name. """
+
+        rows = self.connection.execute("SELECT * FROM catalog ORDER BY name")
+        return [_catalog_entry(row) for row in rows]
+
+    def entry(self, name: str) -> Optional[CatalogEntry]:
+        """ Return the catalog entry of the session with name ``name``, if any. """
+
+        row = self.connection.execute(
+            "SELECT * FROM catalog WHERE name = ?", (name,)
+        ).fetchone()
+        return _catalog_entry(row) if row is not None else None
+
+    def save_state_dicts(
+        self, state_dicts: Iterable[Tuple[Dict[str, Any], Optional[str]]]
+    ) -> None:
+        """
+        Save session state dicts, each compressed with the codec named by the
+        compression which comes with it, in a single transaction. Sessions with the
+        same name are replaced.
+        """
+
+        modified = time.time()
+        catalog_rows = []
+        state_rows = []
+        for state_dict, compression in state_dicts:
+            state = compress_file(pickle.dumps(state_dict), get_codec(compression))
+            base_date = state_dict["base_date"]
+            catalog_rows.append(
+                (
+                    state_dict["name"],
+                    len(state),
+                    modified,
+                    base_date.isoformat() if base_date is not None else None,
+                    compression,
+                )
+            )
+            state_rows.append((state_dict["name"], state))
+
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO catalog VALUES (?, ?, ?, ?, ?)", catalog_rows
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO states VALUES (?, ?)", state_rows
+            )
+
+    def load_state_dicts(
+        self, names: List[str]
+    ) -> List[Tuple[Dict[str, Any], Optional[str]]]:
+        """
+        Load the state dicts of the sessions with names ``names`` in order, each along
+        with the name of its compression codec.
+        """
+
+        rows = {}
+        for start in range(0, len(names), BATCH_SIZE):
+            batch = names[start : start + BATCH_SIZE]
+            rows.update(
+                (name, (state, compression))
+                for name, state, compression in self.connection.execute(
+                    "SELECT states.name, state, compression FROM states "
+                    "JOIN catalog ON states.name = catalog.name "
+                    "WHERE states.name IN (%s)" % ", ".join("?" * len(batch)),
+                    batch,
+                )
+            )
+
+        state_dicts = []
+        for name in names:
+            if name not in rows:
+                raise ValueError("No session with name %s in store." % name)
+            state, compression = rows[name]
+            state_dicts.append((pickle.loads(decompress_file(state)), compression))
+        return state_dicts
+
+    def remove(self, name: str) -> None:
+        """ Remove the session with name ``name`` from the store. """
+
+        if name not in self:
+            raise ValueError("No session with name %s in store." % name)
+        with self.connection:
+            self.connection.execute("DELETE FROM catalog WHERE name = ?", (name,))
+            self.connection.execute("DELETE FROM states WHERE name = ?", (name,))
+
+
+def _catalog_entry(row: Tuple[Any, ...]) -> CatalogEntry:
+    """ Convert a row of the catalog table to a CatalogEntry. """
+
+    name, size, modified, base_date, compression = row
+    if base_date is not None:
+        if "T" in base_date:
+            base_date = datetime.fromisoformat(base_date)
+        else:
+            base_date = date.fromisoformat(base_date)
+    return CatalogEntry(name, size, modified, base_date, compression)
@@ -1,10 +1,30 @@
 """ Task object definition. Represents a single task in a schedule. """
 
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
+from typing import Dict, Any, Optional
 
 
 class Task:
-    """ Represents a single task in a schedule. """
+    """
+    Represents a single task in a schedule. Tasks are stored with __slots__ to keep them
+    small, since schedules hold lots of them, and the duration and points of a task are
+    cached until its start time, end time or priority changes. Tasks can be weakly
+    referenced, so that a cache of tasks (see flowshop.sqlite_schedule) doesn't keep
+    them alive.
+    """
+
+    __slots__ = (
+        "name",
+        "_priority",
+        "_start_time",
+        "_end_time",
+        "_duration",
+        "_points",
+        "__weakref__",
+    )
+
+    # State variables that are compared, printed and saved during pickling.
+    state_vars = ("name", "priority", "start_time", "end_time")
 
     def __init__(
         self,
@@ -16,11 +36,11 @@ class Task:
         """ Init function for Task object. """
 
         self.name = name
-        self.priority = priority
-        self.start_time = start_time
-        self.end_time = end_time
-
-        self.state_vars = ["name", "priority", "start_time", "end_time"]
+        self._priority = priority
+        self._start_time = start_time
+        self._end_time = end_time
+        self._duration: Optional[timedelta] = None
+        self._points: Optional[float] = None
 
     def __repr__(self) -> str:
         """ Returns string representation of task. """
@@ -36,12 +56,86 @@ class Task:
             for var_name in self.state_vars
         )
 
+    def __copy__(self) -> "Task":
+        """ Return a copy of the task, including its cached values. """
+
+        task = Task.__new__(Task)
+        for slot in Task.__slots__:
+            if slot != "__weakref__":
+                setattr(task, slot, getattr(self, slot))
+        return task
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """ Return state for pickling. Cached values aren't saved. """
+
+        return {var_name: getattr(self, var_name) for var_name in self.state_vars}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """
+        Restore state when unpickling. Tasks pickled before Task had __slots__ have
+        their instance __dict__ as state, which also holds a "state_vars" entry that we
+        ignore.
+        """
+
+        self.name = state["name"]
+        self._priority = state["priority"]
+        self._start_time = state["start_time"]
+        self._end_time = state["end_time"]
+        self._duration = None
+        self._points = None
+
+    @property
+    def priority(self) -> float:
+        """ Priority of task, i.e. points earned per hour. """
+        return self._priority
+
+    @priority.setter
+    def priority(self, priority: float) -> None:
+        """ Set priority, and clear cached points. """
+        self._priority = priority
+        self._points = None
+
+    @property
+    def start_time(self) -> datetime:
+        """ Start time of task. """
+        return self._start_time
+
+    @start_time.setter
+    def start_time(self, start_time: datetime) -> None:
+        """ Set start time, and clear cached duration and points. """
+        self._start_time = start_time
+        self._duration = None
+        self._points = None
+
+    @property
+    def end_time(self) -> datetime:
+        """ End time of task. """
+        return self._end_time
+
+    @end_time.setter
+    def end_time(self, end_time: datetime) -> None:
+        """ Set end time, and clear cached duration and points. """
+        self._end_time = end_time
+        self._duration = None
+        self._points = None
+
     @property
     def date(self) -> date:
         """ Get date of task. Note that this is the date of the start time. """
-        return self.start_time.date()
+        return self._start_time.date()
+
+    @property
+    def duration(self) -> timedelta:
+        """ Length of time between the start and end of the task. """
+
+        if self._duration is None:
+            self._duration = self._end_time - self._start_time
+        return self._duration
 
     def points(self) -> float:
         """ Computes points for completing task. """
-        hours = (self.end_time - self.start_time).total_seconds() / 3600
-        return self.priority * hours
+
+        if self._points is None:
+            hours = self.duration.total_seconds() / 3600
+            self._points = self._priority * hours
+        return self._points
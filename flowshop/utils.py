@@ -1,8 +1,10 @@
 """ Utilities for flowshop. """
 
-from datetime import datetime
+import random
+from datetime import datetime, timedelta
 from typing import List, Any
 
+from flowshop.optimizer import PendingTask
 from flowshop.task import Task
 
 
@@ -11,6 +13,78 @@ def list_exclude(vals: List[Any], index: int) -> List[Any]:
     return vals[:index] + vals[index + 1 :]
 
 
+def random_tasks(
+    num_tasks: int,
+    num_days: int = None,
+    density: float = 0.5,
+    start_time: datetime = datetime(2020, 1, 6),
+    num_names: int = 20,
+    seed: int = 0,
+) -> List[Task]:
+    """
+    Generate a sorted list of ``num_tasks`` random, non-overlapping tasks spread evenly
+    over ``num_days`` days (by default, 10 tasks per day) starting at ``start_time``.
+    ``density`` is the fraction of the time which is covered by tasks. Task names are
+    drawn from a pool of ``num_names`` names, and priorities from a few fixed values.
+    """
+
+    rng = random.Random(seed)
+    if num_days is None:
+        num_days = max(num_tasks // 10, 1)
+
+    slot_length = timedelta(days=num_days) / max(num_tasks, 1)
+    task_length = slot_length * density
+    tasks = []
+    for i in range(num_tasks):
+        offset = (slot_length - task_length) * rng.random()
+        task_start = start_time + slot_length * i + offset
+        tasks.append(
+            Task(
+                "task%d" % rng.randrange(num_names),
+                priority=rng.choice([0.5, 1.0, 1.5, 2.0]),
+                start_time=task_start,
+                end_time=task_start + task_length,
+            )
+        )
+
+    return tasks
+
+
+def random_pending_tasks(
+    num_tasks: int,
+    num_days: int = 7,
+    load: float = 1.5,
+    start_time: datetime = datetime(2020, 1, 6),
+    num_names: int = 20,
+    seed: int = 0,
+) -> List[PendingTask]:
+    """
+    Generate ``num_tasks`` random pending tasks (see flowshop.optimizer) with windows in
+    the ``num_days`` days starting at ``start_time``. Durations are drawn so that the
+    tasks take ``load`` times the length of those days in total, and each window is
+    between one and four times as long as its task.
+    """
+
+    rng = random.Random(seed)
+    mean_duration = timedelta(days=num_days) * load / max(num_tasks, 1)
+    tasks = []
+    for _ in range(num_tasks):
+        duration = mean_duration * rng.uniform(0.5, 1.5)
+        window = duration * rng.uniform(1.0, 4.0)
+        earliest = start_time + (timedelta(days=num_days) - window) * rng.random()
+        tasks.append(
+            PendingTask(
+                "task%d" % rng.randrange(num_names),
+                priority=rng.choice([0.5, 1.0, 1.5, 2.0]),
+                duration=duration,
+                earliest=earliest,
+                latest=earliest + window,
+            )
+        )
+
+    return tasks
+
+
 EXAMPLE_TASKS = (
     [
         Task(
@@ -0,0 +1,319 @@
+"""
+Benchmark the hot paths of Schedule and Session on synthetic schedules. Results are
+printed as a table and can be saved as JSON, to compare runs across commits.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, time as dt_time
+from typing import Callable, Dict, List, Any
+
+from flowshop import files
+from flowshop.schedule import Schedule
+from flowshop.session import Session
+from flowshop.task import Task
+from flowshop.utils import random_tasks
+
+
+SIZES = [10 ** 3, 10 ** 4, 10 ** 5]
+TASKS_PER_DAY = 10
+DENSITY = 0.5
+MIN_TIME = 0.2
+START_TIME = datetime(2020, 1, 6)
+
+
+def measure(
+    operation: Callable[[int], Any], min_time: float = MIN_TIME
+) -> Dict[str, float]:
+    """
+    Measure ``operation`` (which is passed the number of the call), calling it
+    repeatedly for at least ``min_time`` seconds. Returns the number of operations per
+    second, and the peak memory allocated during one extra traced call.
+    """
+
+    num_ops = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time:
+        operation(num_ops)
+        num_ops += 1
+        elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    operation(num_ops)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"ops_per_sec": num_ops / elapsed, "peak_memory": peak_memory}
+
+
+def week_start(num_tasks: int, num_days: int) -> datetime:
+    """ Start of a week in the middle of a synthetic schedule. """
+
+    middle = START_TIME + timedelta(days=num_days // 2)
+    return middle - timedelta(days=middle.weekday())
+
+
+def schedule_benchmarks(
+    num_tasks: int, num_days: int, density: float
+) -> Dict[str, Callable[[int], Any]]:
+    """ Construct operations which benchmark Schedule methods. """
+
+    tasks = random_tasks(num_tasks, num_days, density, START_TIME, seed=0)
+    schedule = Schedule("benchmark", tasks)
+    start = week_start(num_tasks, num_days)
+    span = timedelta(days=num_days)
+
+    # Tasks to add are placed after the end of the schedule, so they never overlap.
+    new_tasks = random_tasks(10 ** 5, 10 ** 4, density, START_TIME + span, seed=1)
+    add_schedule = Schedule("benchmark", tasks)
+
+    def add_task(i: int) -> None:
+        add_schedule.add_task(new_tasks[i % len(new_tasks)])
+        if i % len(new_tasks) == len(new_tasks) - 1:
+            add_schedule.splice_tasks(num_tasks, len(new_tasks), [])
+
+    def tasks_in_interval(i: int) -> None:
+        day_start = start + timedelta(days=i % 7)
+        schedule.tasks_in_interval(day_start, day_start + timedelta(days=1))
+
+    def get_task_index(i: int) -> None:
+        schedule.get_task_index((start + timedelta(days=i % 7)).date(), 0)
+
+    def points(_: int) -> None:
+        schedule.points()
+
+    return {
+        "Schedule.add_task": add_task,
+        "Schedule.tasks_in_interval": tasks_in_interval,
+        "Schedule.get_task_index": get_task_index,
+        "Schedule.points": points,
+    }
+
+
+def make_session(
+    name: str,
+    num_tasks: int,
+    num_days: int,
+    density: float,
+    storage: str = files.PICKLE,
+) -> Session:
+    """
+    Construct a session whose planned and actual schedules each hold ``num_tasks``
+    synthetic tasks, with the base date set to a week in the middle of the tasks.
+    """
+
+    session = Session(name, storage=storage)
+    planned = Schedule(
+        "%s_planned" % name,
+        random_tasks(num_tasks, num_days, density, START_TIME, seed=0),
+    )
+    actual = Schedule(
+        "%s_actual" % name,
+        random_tasks(num_tasks, num_days, density, START_TIME, seed=1),
+    )
+    session.set_new_schedules(planned, actual)
+    session.base_date = week_start(num_tasks, num_days).date()
+    return session
+
+
+def session_benchmarks(
+    num_tasks: int, num_days: int, density: float
+) -> Dict[str, Callable[[int], Any]]:
+    """ Construct operations which benchmark Session methods. """
+
+    session = make_session("benchmark", num_tasks, num_days, density)
+
+    def edit_task(i: int) -> None:
+        session.edit_task(True, i % 7, 0, {"name": "edited%d" % i})
+
+    def insert_task(i: int) -> None:
+        # Insert tasks into an empty week after the end of the schedule, and undo the
+        # insertions once the week is full.
+        if i % (7 * 24 * 60) == 0:
+            session.base_date += timedelta(days=7 * (num_days // 7 + 1))
+        minute = i % (24 * 60)
+        session.insert_task(
+            day=(i // (24 * 60)) % 7,
+            planned=False,
+            name="inserted",
+            priority=1.0,
+            start_time=dt_time(hour=minute // 60, minute=minute % 60),
+            hours=1 / 120,
+        )
+
+    move_session = make_session("benchmark", num_tasks, num_days, density)
+
+    def move_tasks(i: int) -> None:
+        direction = 1 if i % 2 == 0 else -1
+        move_session.move_tasks(True, 3, 0, 1, timedelta(seconds=direction))
+
+    def undo_redo(i: int) -> None:
+        if i % 2 == 0:
+            move_session.undo()
+        else:
+            move_session.redo()
+
+    def daily_score(i: int) -> None:
+        move_session.daily_score(i % 7, cumulative=i % 2 == 0)
+
+    return {
+        "Session.edit_task": edit_task,
+        "Session.insert_task": insert_task,
+        "Session.move_tasks": move_tasks,
+        "Session.undo/redo": undo_redo,
+        "Session.daily_score": daily_score,
+    }
+
+
+def files_benchmarks(
+    num_tasks: int, num_days: int, density: float
+) -> Dict[str, Callable[[int], Any]]:
+    """ Construct operations which benchmark saving and loading through files. """
+
+    benchmarks = {}
+    for storage in [files.PICKLE, files.JOURNAL, files.INDEXED]:
+        name = "benchmark_%s" % storage
+        session = make_session(name, num_tasks, num_days, density, storage)
+        session.save()
+
+        def save(i: int, session: Session = session) -> None:
+            session.edit_task(True, 3, 0, {"name": "edited%d" % i})
+            session.save()
+
+        def load(_: int, name: str = name) -> None:
+            files.load_session_state_dict(name)
+
+        benchmarks["files.save_session (%s)" % storage] = save
+        benchmarks["files.load_session_state_dict (%s)" % storage] = load
+
+    return benchmarks
+
+
+def run(sizes: List[int], density: float, min_time: float) -> List[Dict[str, Any]]:
+    """ Run all benchmarks for each schedule size, printing results as they finish. """
+
+    results = []
+    print("%-45s %10s %14s %14s" % ("benchmark", "tasks", "ops/sec", "peak memory"))
+    for num_tasks in sizes:
+        num_days = max(num_tasks // TASKS_PER_DAY, 7)
+        with tempfile.TemporaryDirectory() as storage_dir:
+            files.STORAGE_DIR = storage_dir
+            benchmarks = {}
+            benchmarks.update(schedule_benchmarks(num_tasks, num_days, density))
+            benchmarks.update(session_benchmarks(num_tasks, num_days, density))
+            benchmarks.update(files_benchmarks(num_tasks, num_days, density))
+
+            for name, operation in benchmarks.items():
+                result = measure(operation, min_time)
+                result.update({"benchmark": name, "num_tasks": num_tasks})
+                results.append(result)
+                print(
+                    "%-45s %10d %14.1f %14d"
+                    % (name, num_tasks, result["ops_per_sec"], result["peak_memory"])
+                )
+
+    return results
+
+
+def git_commit() -> str:
+    """ Return the current git commit, if there is one. """
+
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+        return output.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str) -> None:
+    """ Print the speedup of each result relative to a saved baseline run. """
+
+    with open(baseline_path, "r") as baseline_file:
+        baseline = json.load(baseline_file)
+    baseline_results = {
+        (result["benchmark"], result["num_tasks"]): result
+        for result in baseline["results"]
+    }
+
+    print("\nCompared to %s (commit %s):" % (baseline_path, baseline["commit"]))
+    print("%-45s %10s %10s %12s" % ("benchmark", "tasks", "speedup", "memory"))
+    for result in results:
+        key = (result["benchmark"], result["num_tasks"])
+        if key not in baseline_results:
+            continue
+        old = baseline_results[key]
+        print(
+            "%-45s %10d %9.2fx %11.2fx"
+            % (
+                result["benchmark"],
+                result["num_tasks"],
+                result["ops_per_sec"] / old["ops_per_sec"],
+                result["peak_memory"] / max(old["peak_memory"], 1),
+            )
+        )
+
+
+def main() -> None:
+    """ Parse arguments and run benchmarks. """
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=SIZES,
+        help="Numbers of tasks per schedule to benchmark with.",
+    )
+    parser.add_argument(
+        "--density",
+        type=float,
+        default=DENSITY,
+        help="Fraction of time covered by tasks in synthetic schedules.",
+    )
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=MIN_TIME,
+        help="Minimum number of seconds to run each benchmark for.",
+    )
+    parser.add_argument("--output", help="Path to save results to as JSON.")
+    parser.add_argument("--compare", help="Path of saved JSON results to compare to.")
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.density, args.min_time)
+
+    if args.output is not None:
+        output_dir = os.path.dirname(args.output)
+        if output_dir and not os.path.isdir(output_dir):
+            os.makedirs(output_dir)
+        with open(args.output, "w") as output_file:
+            json.dump(
+                {
+                    "commit": git_commit(),
+                    "time": datetime.now().isoformat(),
+                    "python": platform.python_version(),
+                    "density": args.density,
+                    "results": results,
+                },
+                output_file,
+                indent=2,
+            )
+
+    if args.compare is not None:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark the comparison of planned and actual schedules over a year of history for
+many sessions, with both schedule backends. For each session, we match the tasks of the
+year and compute start delays, overruns, missed and unplanned tasks, and weekly and
+monthly adherence.
+"""
+
+import argparse
+import random
+import time
+from datetime import date
+
+from flowshop.analytics import MONTH, compare_schedules
+from flowshop.columnar import ColumnarSchedule
+from flowshop.schedule import Schedule
+from flowshop.task import Task
+from flowshop.utils import random_tasks
+
+
+NUM_SESSIONS = 200
+NUM_DAYS = 365
+TASKS_PER_DAY = 10
+
+# Sessions are generated from a few distinct histories, which are reused.
+NUM_HISTORIES = 4
+
+
+def history(seed: int):
+    """ Generate planned tasks for a year, along with actual tasks which diverge. """
+
+    rng = random.Random(seed)
+    planned = random_tasks(NUM_DAYS * TASKS_PER_DAY, NUM_DAYS, density=0.6, seed=seed)
+    actual = []
+    for task in planned:
+        if rng.random() < 0.15:
+            continue
+        duration = task.duration * rng.uniform(0.5, 1.0)
+        start_time = task.start_time + (task.duration - duration) * rng.random()
+        actual.append(Task(task.name, task.priority, start_time, start_time + duration))
+    return planned, actual
+
+
+def main(num_sessions: int) -> None:
+    """ Compare every session with each backend and print the time taken. """
+
+    histories = [history(seed) for seed in range(NUM_HISTORIES)]
+    start_date = histories[0][0][0].date
+    end_date = date(start_date.year + 1, start_date.month, start_date.day)
+    print("%-18s %10s %14s %12s" % ("backend", "sessions", "seconds", "ms/session"))
+    for schedule_cls in [Schedule, ColumnarSchedule]:
+        schedules = [
+            (schedule_cls("planned", planned), schedule_cls("actual", actual))
+            for planned, actual in histories
+        ]
+        start = time.perf_counter()
+        for session in range(num_sessions):
+            planned, actual = schedules[session % NUM_HISTORIES]
+            comparison = compare_schedules(planned, actual, start_date, end_date)
+            comparison.start_delays()
+            comparison.overruns()
+            comparison.adherence()
+            comparison.adherence(MONTH)
+        elapsed = time.perf_counter() - start
+        print(
+            "%-18s %10d %14.3f %12.3f"
+            % (
+                schedule_cls.__name__,
+                num_sessions,
+                elapsed,
+                1000 * elapsed / num_sessions,
+            )
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sessions",
+        type=int,
+        default=NUM_SESSIONS,
+        help="Number of sessions to compare.",
+    )
+    args = parser.parse_args()
+    main(args.sessions)
@@ -0,0 +1,95 @@
+""" Benchmark ColumnarSchedule against the list-backed Schedule. """
+
+import argparse
+import time
+from datetime import timedelta
+from typing import Callable
+
+from flowshop.schedule import Schedule
+from flowshop.columnar import ColumnarSchedule
+from flowshop.utils import random_tasks
+
+
+SIZES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]
+NUM_QUERIES = 100
+
+
+def time_call(func: Callable[[], object], repeats: int = 1) -> float:
+    """ Return average time in seconds of ``repeats`` calls to ``func``. """
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start) / repeats
+
+
+def benchmark(schedule_cls: type, num_tasks: int) -> dict:
+    """ Time the main operations of a schedule class on ``num_tasks`` random tasks. """
+
+    tasks = random_tasks(num_tasks)
+    results = {}
+
+    start = time.perf_counter()
+    schedule = schedule_cls("benchmark", tasks)
+    results["build"] = time.perf_counter() - start
+
+    first_start = tasks[0].start_time
+    span = tasks[-1].end_time - first_start
+    window_starts = [first_start + span * i / NUM_QUERIES for i in range(NUM_QUERIES)]
+    windows = [(start, start + timedelta(days=7)) for start in window_starts]
+
+    results["points"] = time_call(schedule.points, repeats=5)
+    results["interval_points"] = time_call(
+        lambda: [schedule.interval_points(*window) for window in windows]
+    ) / len(windows)
+    results["tasks_in_interval"] = time_call(
+        lambda: [schedule.tasks_in_interval(*window) for window in windows]
+    ) / len(windows)
+    results["check_for_overlap"] = time_call(schedule.check_for_overlap)
+
+    return results
+
+
+def main(sizes) -> None:
+    """ Run benchmarks and print a table of results, in seconds per operation. """
+
+    print(
+        "%-10s %-18s %10s %10s %16s %18s %18s"
+        % (
+            "tasks",
+            "backend",
+            "build",
+            "points",
+            "interval_points",
+            "tasks_in_interval",
+            "check_for_overlap",
+        )
+    )
+    for num_tasks in sizes:
+        for schedule_cls in [Schedule, ColumnarSchedule]:
+            results = benchmark(schedule_cls, num_tasks)
+            print(
+                "%-10d %-18s %10.4f %10.6f %16.6f %18.6f %18.6f"
+                % (
+                    num_tasks,
+                    schedule_cls.__name__,
+                    results["build"],
+                    results["points"],
+                    results["interval_points"],
+                    results["tasks_in_interval"],
+                    results["check_for_overlap"],
+                )
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=SIZES,
+        help="Numbers of tasks to benchmark with.",
+    )
+    args = parser.parse_args()
+    main(args.sizes)
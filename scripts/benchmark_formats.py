@@ -0,0 +1,129 @@
+"""
+Compare the size and load time of sessions saved as pickles and as indexed files, each
+uncompressed and compressed with a few codecs. Each session is loaded in two ways: opening it and scoring the current week (which is all
+that an indexed file decodes up front), and decoding its whole edit history.
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from typing import Callable
+
+from flowshop import compression, files
+from flowshop.session import Session
+from scripts.benchmark import make_session
+
+
+SIZES = [10 ** 3, 10 ** 4, 10 ** 5]
+CODECS = ["zlib", "lzma"]
+TASKS_PER_DAY = 10
+NUM_EDITS = 30
+REPEATS = 3
+
+
+def time_call(func: Callable[[], object], repeats: int = REPEATS) -> float:
+    """ Return the best time in seconds of ``repeats`` calls to ``func``. """
+
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def open_week(name: str) -> None:
+    """ Load a session and score its current week. """
+
+    session = Session(name, load=True)
+    session.weekly_score()
+
+
+def load_all(name: str) -> None:
+    """ Load a session and decode its whole edit history. """
+
+    session = Session(name, load=True)
+    for planned, actual in session.edit_history:
+        planned.points()
+        actual.points()
+
+
+def compare(name: str, codecs) -> None:
+    """
+    Print the size and load times of the saved session with name ``name`` as a pickle
+    and as an indexed file, uncompressed and compressed with each of ``codecs``. The
+    session has to be saved as an uncompressed pickle.
+    """
+
+    for storage in [files.PICKLE, files.INDEXED]:
+        for compression in [None] + list(codecs):
+            files.migrate_session(name, storage, compression)
+            size = os.path.getsize(files.filename_from_name(name, storage))
+            print(
+                "%-24s %-14s %12d %12.4f %12.4f"
+                % (
+                    name,
+                    storage
+                    if compression is None
+                    else "%s+%s" % (storage, compression),
+                    size,
+                    time_call(lambda: open_week(name)),
+                    time_call(lambda: load_all(name)),
+                )
+            )
+        files.migrate_session(name, storage)
+
+
+def main(sizes, storage_dir: str, codecs) -> None:
+    """ Compare formats on the saved sessions in ``storage_dir`` and synthetic ones. """
+
+    print(
+        "%-24s %-14s %12s %12s %12s"
+        % ("session", "storage", "bytes", "open week", "load all")
+    )
+    with tempfile.TemporaryDirectory() as temp_dir:
+        files.STORAGE_DIR = temp_dir
+
+        # Copies of pickled sessions in ``storage_dir``.
+        for filename in sorted(os.listdir(storage_dir)):
+            name, extension = os.path.splitext(filename)
+            if extension == ".%s" % files.STORAGE_EXTENSIONS[files.PICKLE]:
+                shutil.copy(os.path.join(storage_dir, filename), temp_dir)
+                compare(name, codecs)
+
+        # Synthetic sessions with a history of edits.
+        for num_tasks in sizes:
+            name = "synthetic_%d" % num_tasks
+            num_days = max(num_tasks // TASKS_PER_DAY, 7)
+            session = make_session(name, num_tasks, num_days, 0.5)
+            for i in range(NUM_EDITS):
+                session.edit_task(i % 2 == 0, i % 7, 0, {"name": "edited%d" % i})
+            session.save()
+            compare(name, codecs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=SIZES,
+        help="Numbers of tasks per schedule in synthetic sessions.",
+    )
+    parser.add_argument(
+        "--storage-dir",
+        default=files.STORAGE_DIR,
+        help="Directory of saved sessions to compare formats on.",
+    )
+    parser.add_argument(
+        "--codecs",
+        nargs="*",
+        default=CODECS,
+        choices=sorted(compression.CODECS),
+        help="Compression codecs to compare.",
+    )
+    args = parser.parse_args()
+    main(args.sizes, args.storage_dir, args.codecs)
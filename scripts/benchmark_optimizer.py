@@ -0,0 +1,76 @@
+"""
+Benchmark the schedule optimizer: the points of the greedy and dynamic programming
+schedules, and of the schedule found by local search within each time budget.
+"""
+
+import argparse
+import time
+
+from flowshop.optimizer import Optimizer
+from flowshop.utils import random_pending_tasks
+
+
+SIZES = [50, 200, 1000]
+TIME_LIMITS = [0.1, 1.0, 5.0]
+
+
+def benchmark(num_tasks: int, time_limits) -> None:
+    """ Print the points and time of each method on ``num_tasks`` random tasks. """
+
+    optimizer = Optimizer(random_pending_tasks(num_tasks))
+    upper_bound = sum(task.points() for task in optimizer.tasks)
+
+    methods = [
+        ("greedy", optimizer.greedy),
+        ("sequence", lambda: optimizer.sequence(optimizer.deadline_order())),
+    ]
+    for method, solve in methods:
+        start = time.perf_counter()
+        points = solve().points
+        report(num_tasks, method, points, upper_bound, time.perf_counter() - start)
+
+    for time_limit in [None] + list(time_limits):
+        start = time.perf_counter()
+        points = 0.0
+        for solution in optimizer.solutions(time_limit):
+            points = optimizer.schedule(solution).points()
+        method = "local" if time_limit is None else "iterated %gs" % time_limit
+        report(num_tasks, method, points, upper_bound, time.perf_counter() - start)
+
+
+def report(
+    num_tasks: int, method: str, points: float, upper_bound: float, seconds: float
+) -> None:
+    """ Print a row of the table of results. """
+
+    print(
+        "%-8d %-14s %12.2f %12.1f%% %10.3f"
+        % (num_tasks, method, points, 100 * points / upper_bound, seconds)
+    )
+
+
+def main(sizes, time_limits) -> None:
+    """ Run benchmarks and print a table of results. """
+
+    print(
+        "%-8s %-14s %12s %13s %10s"
+        % ("tasks", "method", "points", "of all tasks", "seconds")
+    )
+    for num_tasks in sizes:
+        benchmark(num_tasks, time_limits)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=SIZES, help="Numbers of tasks."
+    )
+    parser.add_argument(
+        "--time-limits",
+        type=float,
+        nargs="+",
+        default=TIME_LIMITS,
+        help="Time budgets of the iterated local search, in seconds.",
+    )
+    args = parser.parse_args()
+    main(args.sizes, args.time_limits)
@@ -0,0 +1,71 @@
+"""
+Benchmark the parallel schedule optimizer with increasing numbers of worker processes:
+the points of the best schedule found within a time budget, the iterations of iterated
+local search run by all islands per second, and the scaling efficiency, which is the
+speedup in iterations per second over one worker, divided by the number of workers.
+"""
+
+import argparse
+import os
+
+from flowshop.parallel import ParallelOptimizer
+from flowshop.utils import random_pending_tasks
+
+
+NUM_TASKS = 1000
+TIME_LIMIT = 5.0
+
+
+def main(num_tasks: int, time_limit: float, workers) -> None:
+    """ Run the optimizer with each number of workers and print a table of results. """
+
+    tasks = random_pending_tasks(num_tasks)
+    upper_bound = sum(task.points() for task in tasks)
+    print(
+        "%-8s %12s %13s %12s %10s %11s"
+        % ("workers", "points", "of all tasks", "iterations/s", "speedup", "efficiency")
+    )
+
+    base_rate = None
+    for num_workers in workers:
+        optimizer = ParallelOptimizer(tasks, num_workers=num_workers)
+        points = 0.0
+        for solution in optimizer.solutions(time_limit):
+            points = optimizer.schedule(solution).points()
+        rate = optimizer.iterations / time_limit
+        if base_rate is None:
+            base_rate = rate / workers[0]
+        speedup = rate / base_rate
+        print(
+            "%-8d %12.2f %12.1f%% %12.1f %10.2f %10.1f%%"
+            % (
+                num_workers,
+                points,
+                100 * points / upper_bound,
+                rate,
+                speedup,
+                100 * speedup / num_workers,
+            )
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--num-tasks", type=int, default=NUM_TASKS, help="Number of tasks."
+    )
+    parser.add_argument(
+        "--time-limit",
+        type=float,
+        default=TIME_LIMIT,
+        help="Time budget of each run, in seconds.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=[2 ** k for k in range(os.cpu_count().bit_length())],
+        help="Numbers of worker processes.",
+    )
+    args = parser.parse_args()
+    main(args.num_tasks, args.time_limit, args.workers)
@@ -0,0 +1,79 @@
+"""
+Benchmark the flow-shop solvers on Taillard's instances: the relative deviation of the
+makespan of NEH and of iterated greedy (within each time budget) from the best known
+upper bound of each instance, along with the wall time taken.
+"""
+
+import argparse
+import time
+
+from flowshop.solver import neh, iterated_greedy, taillard_problem, INSTANCES
+
+
+NAMES = ["ta001", "ta011", "ta021", "ta031", "ta041", "ta051"]
+TIME_LIMITS = [0.5, 2.0, 10.0]
+
+
+def report(name: str, method: str, makespan: int, seconds: float) -> None:
+    """ Print a row of the table of results. """
+
+    instance = INSTANCES[name]
+    deviation = 100 * (makespan - instance.upper_bound) / instance.upper_bound
+    print(
+        "%-8s %-8s %-16s %10d %10d %9.2f%% %10.3f"
+        % (
+            name,
+            "%dx%d" % (instance.num_jobs, instance.num_machines),
+            method,
+            makespan,
+            instance.upper_bound,
+            deviation,
+            seconds,
+        )
+    )
+
+
+def main(names, time_limits) -> None:
+    """ Run benchmarks and print a table of results. """
+
+    print(
+        "%-8s %-8s %-16s %10s %10s %10s %10s"
+        % ("instance", "size", "method", "makespan", "best", "deviation", "seconds")
+    )
+    for name in names:
+        problem = taillard_problem(name)
+
+        start = time.perf_counter()
+        makespan = problem.makespan(neh(problem))
+        report(name, "neh", makespan, time.perf_counter() - start)
+
+        for time_limit in time_limits:
+            start = time.perf_counter()
+            _, makespan = iterated_greedy(problem, time_limit=time_limit)
+            report(
+                name,
+                "ig %gs" % time_limit,
+                makespan,
+                time.perf_counter() - start,
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--instances",
+        nargs="+",
+        default=NAMES,
+        choices=sorted(INSTANCES),
+        metavar="NAME",
+        help="Names of Taillard instances to benchmark with.",
+    )
+    parser.add_argument(
+        "--time-limits",
+        type=float,
+        nargs="+",
+        default=TIME_LIMITS,
+        help="Time budgets of iterated greedy, in seconds.",
+    )
+    args = parser.parse_args()
+    main(args.instances, args.time_limits)
@@ -0,0 +1,134 @@
+"""
+Benchmark SQLiteSchedule against the list-backed Schedule. Edits are timed as a session
+makes them: copying the schedule and then changing the copy.
+"""
+
+import argparse
+import os
+import pickle
+import tempfile
+import time
+from datetime import timedelta
+from typing import Callable
+
+from flowshop.schedule import Schedule
+from flowshop.sqlite_schedule import SQLiteSchedule, close_database
+from flowshop.task import Task
+from flowshop.utils import random_tasks
+
+
+SIZES = [10 ** 4, 10 ** 5, 10 ** 6]
+NUM_QUERIES = 100
+
+
+def time_call(func: Callable[[], object], repeats: int = 1) -> float:
+    """ Return average time in seconds of ``repeats`` calls to ``func``. """
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start) / repeats
+
+
+def benchmark(backend: str, num_tasks: int, temp_dir: str) -> dict:
+    """
+    Time the main operations of a schedule backend on ``num_tasks`` random tasks.
+    Opening a schedule is timed as unpickling it for the list backend, and as opening
+    its database for the SQLite backend.
+    """
+
+    # Every other task is left out of the schedule, to be inserted by edits.
+    tasks = random_tasks(2 * num_tasks)
+    results = {}
+
+    start = time.perf_counter()
+    if backend == "sqlite":
+        path = os.path.join(temp_dir, "benchmark_%d.db" % num_tasks)
+        SQLiteSchedule.create(path, "benchmark", tasks[::2])
+        results["build"] = time.perf_counter() - start
+        close_database(path)
+        start = time.perf_counter()
+        schedule = SQLiteSchedule(path, "benchmark")
+    else:
+        schedule = Schedule("benchmark", tasks[::2])
+        results["build"] = time.perf_counter() - start
+        data = pickle.dumps(schedule)
+        start = time.perf_counter()
+        schedule = pickle.loads(data)
+    results["open"] = time.perf_counter() - start
+
+    first_start = tasks[0].start_time
+    span = tasks[-1].end_time - first_start
+    window_starts = [
+        first_start + span * i / NUM_QUERIES + timedelta(hours=5)
+        for i in range(NUM_QUERIES)
+    ]
+    windows = [(start, start + timedelta(days=7)) for start in window_starts]
+    days = [start.date() for start in window_starts]
+
+    results["get_task_index"] = time_call(
+        lambda: [schedule.get_task_index(day, 1) for day in days]
+    ) / len(days)
+    results["interval_points"] = time_call(
+        lambda: [schedule.interval_points(*window) for window in windows]
+    ) / len(windows)
+    results["days_points"] = time_call(
+        lambda: [schedule.days_points(day, day + timedelta(days=7)) for day in days]
+    ) / len(days)
+    results["tasks_in_interval"] = time_call(
+        lambda: [schedule.tasks_in_interval(*window) for window in windows]
+    ) / len(windows)
+
+    inserted = tasks[1 : 2 * num_tasks : 2 * num_tasks // NUM_QUERIES]
+
+    def edit() -> None:
+        """ Insert a task into a copy of the schedule, and edit another task. """
+
+        for task in inserted:
+            target = schedule.copy()
+            target.add_task(task)
+            task_index = target.get_task_index(task.date, 0)
+            old_task = target.get_task(task.date, 0)
+            target.replace_task(
+                task_index,
+                Task("edited", 1.0, old_task.start_time, old_task.end_time),
+            )
+
+    results["edit"] = time_call(edit) / len(inserted)
+    return results
+
+
+def main(sizes) -> None:
+    """ Run benchmarks and print a table of results, in seconds per operation. """
+
+    columns = [
+        "build",
+        "open",
+        "get_task_index",
+        "interval_points",
+        "days_points",
+        "tasks_in_interval",
+        "edit",
+    ]
+    print("%-10s %-8s" % ("tasks", "backend") + "".join("%18s" % c for c in columns))
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for num_tasks in sizes:
+            for backend in ["list", "sqlite"]:
+                results = benchmark(backend, num_tasks, temp_dir)
+                print(
+                    "%-10d %-8s" % (num_tasks, backend)
+                    + "".join("%18.6f" % results[column] for column in columns)
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=SIZES,
+        help="Numbers of tasks to benchmark with.",
+    )
+    args = parser.parse_args()
+    main(args.sizes)
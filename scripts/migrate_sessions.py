@@ -0,0 +1,62 @@
+"""
+Migrate saved sessions to another storage or compression codec, e.g. pickled sessions
+to compressed indexed files.
+"""
+
+import argparse
+import glob
+import os
+
+from flowshop import compression, files
+
+
+def main(names, storage: str, codec: str = None) -> None:
+    """ Migrate sessions, printing the size of each session before and after. """
+
+    for name in names:
+        old_storage = files.saved_session_storage(name)
+        if old_storage is None:
+            print("%s: no saved session" % name)
+            continue
+        old_size = files.saved_session_size(name)
+        files.migrate_session(name, storage, codec)
+        new_size = files.saved_session_size(name)
+        print(
+            "%s: %s (%d bytes) -> %s (%d bytes)"
+            % (name, old_storage, old_size, storage, new_size)
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "names",
+        nargs="*",
+        help="Names of sessions to migrate. Defaults to all pickled sessions.",
+    )
+    parser.add_argument(
+        "--storage",
+        default=files.INDEXED,
+        choices=sorted(files.STORAGES),
+        help="Storage to migrate sessions to.",
+    )
+    parser.add_argument(
+        "--compression",
+        choices=sorted(compression.CODECS),
+        help="Compression codec to migrate sessions to. Defaults to none.",
+    )
+    parser.add_argument(
+        "--storage-dir", default=files.STORAGE_DIR, help="Directory of saved sessions."
+    )
+    args = parser.parse_args()
+
+    files.STORAGE_DIR = args.storage_dir
+    names = args.names
+    if not names:
+        pattern = os.path.join(
+            files.STORAGE_DIR, "*.%s" % files.STORAGE_EXTENSIONS[files.PICKLE]
+        )
+        names = sorted(
+            os.path.splitext(os.path.basename(path))[0] for path in glob.glob(pattern)
+        )
+    main(names, args.storage, args.compression)
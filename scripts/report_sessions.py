@@ -0,0 +1,98 @@
+"""
+Write a report of the points and score of each week of every saved session, as CSV or
+JSON, streaming sessions one at a time so that memory use doesn't grow with the number
+of sessions (see flowshop.reports). Optionally print the distribution of weekly scores
+afterwards.
+"""
+
+import argparse
+import sys
+from datetime import date, timedelta
+
+from flowshop import files
+from flowshop.reports import (
+    FORMATS,
+    CSV,
+    ScoreDistribution,
+    weekly_reports,
+    write_reports,
+)
+
+
+NUM_WEEKS = 52
+
+
+def main(
+    names, start_date: date, end_date: date, fmt: str, output, distribution: bool
+) -> None:
+    """ Write the report of the sessions, and print the distribution of scores. """
+
+    scores = ScoreDistribution()
+    reports = scores.count(weekly_reports(start_date, end_date, names))
+    num_rows = write_reports(reports, output, fmt)
+    output.flush()
+
+    if distribution:
+        print("%d weeks reported" % num_rows, file=sys.stderr)
+        print("%-10s %10s" % ("score", "weeks"), file=sys.stderr)
+        for lower, count in scores.bins():
+            print("%-10s %10d" % ("%g+" % lower, count), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    this_monday = date.today() - timedelta(days=date.today().weekday())
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "names",
+        nargs="*",
+        help="Names of sessions to report on. Defaults to all saved sessions.",
+    )
+    parser.add_argument(
+        "--start",
+        type=date.fromisoformat,
+        default=this_monday - timedelta(weeks=NUM_WEEKS),
+        help="First day to report on, as YYYY-MM-DD. Defaults to %d weeks ago."
+        % NUM_WEEKS,
+    )
+    parser.add_argument(
+        "--end",
+        type=date.fromisoformat,
+        default=this_monday + timedelta(weeks=1),
+        help="Day to report up to, as YYYY-MM-DD. Defaults to the end of this week.",
+    )
+    parser.add_argument(
+        "--format", default=CSV, choices=FORMATS, help="Format of the report."
+    )
+    parser.add_argument(
+        "--output", help="File to write the report to. Defaults to standard output."
+    )
+    parser.add_argument(
+        "--distribution",
+        action="store_true",
+        help="Print the distribution of weekly scores to standard error.",
+    )
+    parser.add_argument(
+        "--storage-dir", default=files.STORAGE_DIR, help="Directory of saved sessions."
+    )
+    args = parser.parse_args()
+
+    files.STORAGE_DIR = args.storage_dir
+    if args.output is None:
+        main(
+            args.names or None,
+            args.start,
+            args.end,
+            args.format,
+            sys.stdout,
+            args.distribution,
+        )
+    else:
+        with open(args.output, "w", newline="") as output_file:
+            main(
+                args.names or None,
+                args.start,
+                args.end,
+                args.format,
+                output_file,
+                args.distribution,
+            )
@@ -0,0 +1,98 @@
+"""
+Score saved sessions in parallel over a process pool, and write the scores of every
+session to a single JSON file: the points of its current schedules, the score of each
+day of each week, and adherence to the plan. Prints the time taken to standard error.
+"""
+
+import argparse
+import sys
+import time
+from datetime import date, timedelta
+
+from flowshop import files
+from flowshop.batch import CHUNK_SIZE, score_sessions_parallel, write_scores
+
+
+NUM_WEEKS = 52
+
+
+def main(
+    names, start_date: date, end_date: date, output, num_workers: int, chunk_size: int
+) -> None:
+    """ Score the sessions, write their scores, and print the time taken. """
+
+    start = time.perf_counter()
+    scores = score_sessions_parallel(
+        names, start_date, end_date, num_workers, chunk_size
+    )
+    num_sessions = write_scores(scores, output)
+    output.flush()
+    elapsed = time.perf_counter() - start
+    print(
+        "Scored %d sessions in %.2f seconds (%.1f sessions/s)"
+        % (num_sessions, elapsed, num_sessions / elapsed),
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    this_monday = date.today() - timedelta(days=date.today().weekday())
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "names",
+        nargs="*",
+        help="Names of sessions to score. Defaults to all saved sessions.",
+    )
+    parser.add_argument(
+        "--start",
+        type=date.fromisoformat,
+        default=this_monday - timedelta(weeks=NUM_WEEKS),
+        help="First day to score, as YYYY-MM-DD. Defaults to %d weeks ago." % NUM_WEEKS,
+    )
+    parser.add_argument(
+        "--end",
+        type=date.fromisoformat,
+        default=this_monday + timedelta(weeks=1),
+        help="Day to score up to, as YYYY-MM-DD. Defaults to the end of this week.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes. Defaults to one per CPU.",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=CHUNK_SIZE,
+        help="Number of sessions scored by a worker at a time.",
+    )
+    parser.add_argument(
+        "--output", help="File to write the scores to. Defaults to standard output."
+    )
+    parser.add_argument(
+        "--storage-dir", default=files.STORAGE_DIR, help="Directory of saved sessions."
+    )
+    args = parser.parse_args()
+
+    files.STORAGE_DIR = args.storage_dir
+    session_names = args.names or files.saved_session_names()
+    if args.output is None:
+        main(
+            session_names,
+            args.start,
+            args.end,
+            sys.stdout,
+            args.workers,
+            args.chunk_size,
+        )
+    else:
+        with open(args.output, "w") as output_file:
+            main(
+                session_names,
+                args.start,
+                args.end,
+                output_file,
+                args.workers,
+                args.chunk_size,
+            )
@@ -0,0 +1,168 @@
+"""
+Unit test cases for flowshop/analytics.py.
+"""
+
+import random
+from datetime import datetime, date, timedelta
+
+import pytest
+
+from flowshop import Schedule, Task
+from flowshop.utils import random_tasks
+
+np = pytest.importorskip("numpy")
+
+# pylint: disable=wrong-import-position
+from flowshop.analytics import MONTH, MAX_DISTANCE, compare_schedules
+from flowshop.columnar import ColumnarSchedule
+
+
+def task(name: str, start: datetime, hours: float, priority: float = 1.0) -> Task:
+    """ Create a task starting at ``start`` which lasts ``hours`` hours. """
+    return Task(name, priority, start, start + timedelta(hours=hours))
+
+
+def diverged_tasks(planned, seed: int = 0):
+    """
+    Generate actual tasks from ``planned`` tasks, by dropping some, shifting and
+    stretching others, and adding unplanned tasks.
+    """
+
+    rng = random.Random(seed)
+    actual = []
+    for planned_task in planned:
+        if rng.random() < 0.2:
+            continue
+        duration = planned_task.duration * rng.uniform(0.5, 1.0)
+        start_time = planned_task.start_time + (planned_task.duration - duration) * (
+            rng.random()
+        )
+        if rng.random() < 0.2:
+            start_time = planned_task.start_time + planned_task.duration - duration
+            actual.append(Task("unplanned", 1.0, start_time, start_time + duration))
+        else:
+            actual.append(
+                Task(
+                    planned_task.name,
+                    planned_task.priority,
+                    start_time,
+                    start_time + duration,
+                )
+            )
+    return actual
+
+
+def test_compare_schedules():
+    """
+    Test matching planned and actual tasks, and the delays, overruns, missed and
+    unplanned tasks and adherence which result.
+    """
+
+    monday = datetime(2020, 6, 29)
+    planned = Schedule(
+        "planned",
+        [
+            task("A", monday + timedelta(hours=9), 1, 2.0),
+            task("B", monday + timedelta(hours=11), 1),
+            task("A", monday + timedelta(hours=14), 1, 2.0),
+            task("C", monday + timedelta(days=2, hours=9), 2),
+        ],
+    )
+    actual = Schedule(
+        "actual",
+        [
+            task("A", monday + timedelta(hours=9, minutes=30), 1.25),
+            task("D", monday + timedelta(hours=11), 1),
+            task("A", monday + timedelta(hours=13), 0.5),
+            task("C", monday + timedelta(days=3, hours=9), 2),
+        ],
+    )
+    comparison = compare_schedules(planned, actual, date(2020, 6, 29), date(2020, 7, 6))
+
+    planned_indices, actual_indices = comparison.matches()
+    assert list(planned_indices) == [0, 2]
+    assert list(actual_indices) == [0, 2]
+    assert list(comparison.start_delays()) == [0.5, -1.0]
+    assert list(comparison.overruns()) == [0.25, -0.5]
+    assert list(comparison.missed()) == [1, 3]
+    assert list(comparison.unplanned()) == [1, 3]
+    assert comparison.task(True, 3) == planned.tasks[3]
+    assert comparison.task(False, 1).name == "D"
+
+    (week,) = comparison.adherence()
+    assert week.start_date == date(2020, 6, 29)
+    assert week.planned_points == 7.0
+    assert week.completed_points == 4.0
+    assert (week.num_missed, week.num_unplanned) == (2, 2)
+    assert week.adherence == pytest.approx(400 / 7)
+
+    # Weeks and months start on Monday and on the 1st, and tasks outside of the dates
+    # are left out.
+    june, july = comparison.adherence(MONTH)
+    assert (june.start_date, july.start_date) == (date(2020, 6, 1), date(2020, 7, 1))
+    assert (june.planned_points, july.planned_points) == (5.0, 2.0)
+    assert july.actual_points == 2.0
+    assert july.adherence == 0.0
+    later = compare_schedules(planned, actual, date(2020, 7, 2), date(2020, 7, 10))
+    assert len(later.planned.starts) == 0
+    assert later.adherence() == [(date(2020, 6, 29), 0.0, 2.0, 0.0, 0, 1, 100.0)]
+
+    with pytest.raises(ValueError):
+        comparison.adherence("day")
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_compare_random_schedules(seed):
+    """
+    Test that every match is between tasks with the same name which start close
+    together, that matches are one to one, and that no pair of unmatched tasks could
+    have been matched. Also test that columnar schedules give the same comparison.
+    """
+
+    planned_tasks = random_tasks(600, density=0.6, num_names=5, seed=seed)
+    actual_tasks = diverged_tasks(planned_tasks, seed)
+    start_date = date(2020, 1, 10)
+    end_date = date(2020, 2, 20)
+    comparison = compare_schedules(
+        Schedule("planned", planned_tasks),
+        Schedule("actual", actual_tasks),
+        start_date,
+        end_date,
+    )
+    planned = [comparison.task(True, i) for i in range(len(comparison.planned_match))]
+    actual = [comparison.task(False, i) for i in range(len(comparison.actual_match))]
+    assert all(start_date <= task.date < end_date for task in planned + actual)
+    assert len(planned) == sum(
+        start_date <= task.date < end_date for task in planned_tasks
+    )
+
+    planned_indices, actual_indices = comparison.matches()
+    assert len(set(actual_indices)) == len(actual_indices)
+    assert list(comparison.actual_match[actual_indices]) == list(planned_indices)
+    for i, j in zip(planned_indices, actual_indices):
+        assert planned[i].name == actual[j].name
+        assert abs(planned[i].start_time - actual[j].start_time) <= MAX_DISTANCE
+    for i in comparison.missed():
+        for j in comparison.unplanned():
+            assert (
+                planned[i].name != actual[j].name
+                or abs(planned[i].start_time - actual[j].start_time) > MAX_DISTANCE
+            )
+    assert len(comparison.missed()) > 0
+    assert len(comparison.unplanned()) > 0
+
+    weeks = comparison.adherence()
+    assert sum(week.planned_points for week in weeks) == pytest.approx(
+        sum(task.points() for task in planned)
+    )
+    assert sum(week.num_missed for week in weeks) == len(comparison.missed())
+
+    columnar = compare_schedules(
+        ColumnarSchedule("planned", planned_tasks),
+        ColumnarSchedule("actual", actual_tasks),
+        start_date,
+        end_date,
+    )
+    assert list(columnar.planned_match) == list(comparison.planned_match)
+    assert list(columnar.actual_match) == list(comparison.actual_match)
+    assert columnar.adherence() == weeks
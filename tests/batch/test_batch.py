@@ -0,0 +1,131 @@
+"""
+Unit test cases for flowshop/batch.py.
+"""
+
+import io
+import json
+from datetime import date
+
+import pytest
+
+from flowshop import Schedule, Session
+from flowshop import analytics, files
+from flowshop.batch import score_sessions, score_sessions_parallel, write_scores
+from flowshop.utils import random_tasks
+
+
+START_DATE = date(2020, 1, 6)
+END_DATE = date(2020, 3, 2)
+
+
+@pytest.fixture(autouse=True)
+def storage_dir(tmp_path, monkeypatch):
+    """ Save sessions to a temporary directory. """
+    monkeypatch.setattr(files, "STORAGE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def save_sessions(num_sessions: int):
+    """
+    Save sessions in each storage in turn, with random planned tasks over a few weeks
+    and actual tasks which follow some of them, and return them.
+    """
+
+    sessions = []
+    for i in range(num_sessions):
+        planned_tasks = random_tasks(60, 30 + i, num_names=5, seed=i)
+        actual_tasks = [task for j, task in enumerate(planned_tasks) if j % (i + 2)]
+        session = Session(
+            "session%d" % i, storage=files.STORAGES[i % len(files.STORAGES)]
+        )
+        session.base_date = START_DATE
+        session.set_new_schedules(
+            Schedule("planned", planned_tasks), Schedule("actual", actual_tasks)
+        )
+        session.save()
+        sessions.append(session)
+    return sessions
+
+
+def test_score_sessions():
+    """
+    Test that the scores of sessions match their points, weekly and daily scores, and
+    adherence.
+    """
+
+    sessions = save_sessions(3)
+    scores = score_sessions(
+        [session.name for session in sessions], START_DATE, END_DATE
+    )
+
+    assert [session_scores.name for session_scores in scores] == [
+        session.name for session in sessions
+    ]
+    for session, session_scores in zip(sessions, scores):
+        planned, actual = session.current_schedules()
+        assert session_scores.planned_points == pytest.approx(planned.points())
+        assert session_scores.actual_points == pytest.approx(actual.points())
+        assert len(session_scores.weeks) == 5
+        for week in session_scores.weeks:
+            session.base_date = week.week_start
+            assert week.score == pytest.approx(session.weekly_score())
+            assert week.daily_scores == pytest.approx(
+                [session.daily_score(day, cumulative=False) for day in range(7)]
+            )
+            assert week.num_unplanned == 0
+            assert 0 <= week.adherence <= 100
+
+        # Actual tasks are a subset of the planned tasks, so every actual task matches
+        # a planned task exactly.
+        assert session_scores.mean_start_delay == 0.0
+        assert session_scores.mean_overrun == 0.0
+        num_missed = sum(START_DATE <= task.date < END_DATE for task in planned.tasks)
+        num_missed -= sum(START_DATE <= task.date < END_DATE for task in actual.tasks)
+        assert sum(week.num_missed for week in session_scores.weeks) == num_missed
+        assert session_scores.adherence < 100
+
+
+def test_score_sessions_without_numpy(monkeypatch):
+    """
+    Test that sessions are scored without adherence if NumPy isn't installed.
+    """
+
+    sessions = save_sessions(2)
+    monkeypatch.setattr(analytics, "np", None)
+    (session_scores,) = score_sessions([sessions[1].name], START_DATE, END_DATE)
+    assert session_scores.adherence is None
+    assert session_scores.mean_start_delay is None
+    assert all(week.adherence is None for week in session_scores.weeks)
+    assert session_scores.score < 100
+
+
+def test_score_sessions_parallel():
+    """
+    Test that scoring sessions in chunks over a process pool gives the same scores as
+    scoring them in order, and writing the scores as a JSON array.
+    """
+
+    sessions = save_sessions(5)
+    names = [session.name for session in sessions]
+    scores = score_sessions(names, START_DATE, END_DATE)
+    parallel_scores = list(
+        score_sessions_parallel(
+            names, START_DATE, END_DATE, num_workers=2, chunk_size=2
+        )
+    )
+    assert parallel_scores == scores
+
+    output = io.StringIO()
+    assert write_scores(iter(parallel_scores), output) == len(sessions)
+    output.seek(0)
+    rows = json.load(output)
+    assert [row["name"] for row in rows] == names
+    assert rows[0]["weeks"][0]["week_start"] == START_DATE.isoformat()
+    assert rows[0]["weeks"][0]["daily_scores"] == pytest.approx(
+        scores[0].weeks[0].daily_scores
+    )
+
+    with pytest.raises(ValueError):
+        list(score_sessions_parallel(names, START_DATE, END_DATE, num_workers=0))
+    with pytest.raises(ValueError):
+        list(score_sessions_parallel(names, START_DATE, END_DATE, chunk_size=0))
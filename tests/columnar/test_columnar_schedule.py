@@ -0,0 +1,91 @@
+"""
+Unit test cases for flowshop/columnar.py.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from flowshop import Schedule, Task
+from flowshop.utils import random_tasks
+
+np = pytest.importorskip("numpy")
+
+# pylint: disable=wrong-import-position
+from flowshop.columnar import ColumnarSchedule, EPOCH, MICROSECOND
+
+
+def test_columnar_schedule_points():
+    """
+    Test that ColumnarSchedule computes the same points as Schedule.
+    """
+
+    tasks = random_tasks(500, density=0.7)
+    schedule = Schedule("test", tasks)
+    columnar = ColumnarSchedule("test", tasks)
+
+    assert columnar.points() == pytest.approx(schedule.points())
+    for day in range(0, 50, 3):
+        start_time = datetime(2020, 1, 6) + timedelta(days=day, hours=5)
+        end_time = start_time + timedelta(days=2)
+        assert columnar.tasks_in_interval(
+            start_time, end_time
+        ) == schedule.tasks_in_interval(start_time, end_time)
+        assert columnar.interval_points(start_time, end_time) == pytest.approx(
+            schedule.interval_points(start_time, end_time)
+        )
+        starts, ends, priorities, name_ids = columnar.interval_columns(
+            start_time, end_time
+        )
+        assert [
+            Task(columnar.names[name_id], priority, start, end)
+            for name_id, priority, start, end in zip(
+                name_ids,
+                priorities,
+                [EPOCH + int(start) * MICROSECOND for start in starts],
+                [EPOCH + int(end) * MICROSECOND for end in ends],
+            )
+        ] == schedule.tasks_in_interval(start_time, end_time)
+
+
+def test_columnar_schedule_edits():
+    """
+    Test that ColumnarSchedule columns are kept up to date when tasks are added,
+    removed and replaced.
+    """
+
+    tasks = random_tasks(100)
+    columnar = ColumnarSchedule("test", tasks[:50])
+    for task in tasks[50:]:
+        columnar.add_task(task)
+    columnar.remove_task(10)
+    columnar.splice_tasks(20, 2, [tasks[21]])
+    expected = Schedule("test", tasks[:10] + tasks[11:22] + tasks[23:])
+
+    assert columnar.tasks == expected.tasks
+    assert columnar.points() == pytest.approx(expected.points())
+    start_time = datetime(2020, 1, 1)
+    end_time = datetime(2021, 1, 1)
+    assert len(columnar.copy().tasks_in_interval(start_time, end_time)) == 98
+
+
+def test_columnar_schedule_overlap():
+    """
+    Test that ColumnarSchedule raises an error on overlapping tasks.
+    """
+
+    task1 = Task(
+        "task1",
+        priority=1.0,
+        start_time=datetime(2020, 5, 1, hour=12),
+        end_time=datetime(2020, 5, 1, hour=13, minute=30),
+    )
+    task2 = Task(
+        "task2",
+        priority=1.0,
+        start_time=datetime(2020, 5, 1, hour=13),
+        end_time=datetime(2020, 5, 1, hour=14),
+    )
+
+    with pytest.raises(ValueError):
+        ColumnarSchedule("test", [task1, task2])
@@ -0,0 +1,83 @@
+"""
+Unit test cases for flowshop/compression.py.
+"""
+
+import pytest
+
+from flowshop import compression
+from flowshop.compression import (
+    get_codec,
+    codec_from_id,
+    compress_file,
+    decompress_file,
+    detect_codec,
+)
+
+
+DATA = b"".join(b"task%d,2020-06-%02d,1.5;" % (i, i % 28 + 1) for i in range(500))
+
+
+@pytest.fixture(params=["zlib", "lzma", "bz2", "zstd"])
+def codec(request):
+    """ Each registered codec, skipping zstd if zstandard isn't installed. """
+
+    if request.param == "zstd":
+        pytest.importorskip("zstandard")
+    return get_codec(request.param)
+
+
+def test_codec_round_trip(codec):
+    """
+    Test compressing and decompressing data with each codec.
+    """
+
+    compressed = codec.compress(DATA)
+    assert len(compressed) < len(DATA)
+    assert codec.decompress(compressed) == DATA
+    assert codec_from_id(codec.codec_id) is codec
+
+
+def test_codec_dictionary(codec):
+    """
+    Test that codecs which support dictionaries compress small blobs better against a
+    dictionary, and that other codecs reject dictionaries.
+    """
+
+    blob = DATA[1000:1200]
+    if not codec.supports_dictionary:
+        with pytest.raises(ValueError):
+            codec.compress(blob, DATA)
+        return
+
+    compressed = codec.compress(blob, DATA)
+    assert len(compressed) < len(codec.compress(blob))
+    assert codec.decompress(compressed, DATA) == blob
+
+
+def test_compress_file(codec):
+    """
+    Test that compressed files are detected and decompressed, and that uncompressed
+    files are left as they are.
+    """
+
+    data = compress_file(DATA, codec)
+    assert detect_codec(data) is codec
+    assert decompress_file(data) == DATA
+
+    assert compress_file(DATA, None) == DATA
+    assert detect_codec(DATA) is None
+    assert decompress_file(DATA) == DATA
+
+
+def test_unknown_codec():
+    """
+    Test looking up codecs which don't exist.
+    """
+
+    assert get_codec(None) is None
+    with pytest.raises(ValueError):
+        get_codec("gzip")
+    with pytest.raises(ValueError):
+        codec_from_id(255)
+    with pytest.raises(ValueError):
+        compression.register_codec(compression.ZlibCodec())
@@ -0,0 +1,39 @@
+"""
+Unit test cases for encoding edit history deltas in flowshop/encoding.py.
+"""
+
+from datetime import datetime
+
+from flowshop import Task
+from flowshop.encoding import NameTable, encode_delta, decode_delta
+from flowshop.history import Splice, Delta
+
+
+def test_encode_delta():
+    """
+    Test encoding a delta which edits the planned schedule and inserts into the actual
+    schedule.
+    """
+
+    old_task = Task("old", 1.0, datetime(2020, 5, 1, 12), datetime(2020, 5, 1, 13))
+    new_task = Task("new", 2.0, datetime(2020, 5, 1, 12), datetime(2020, 5, 1, 14))
+    delta = Delta(
+        (
+            Splice(True, 3, (old_task,), (new_task,)),
+            Splice(False, 0, (), (old_task, new_task)),
+        )
+    )
+    names = NameTable()
+    decoded_delta = decode_delta(encode_delta(delta, names), names)
+
+    assert decoded_delta == delta
+    assert names.names == ["old", "new"]
+
+
+def test_encode_delta_empty():
+    """
+    Test encoding a delta without any splices.
+    """
+
+    names = NameTable()
+    assert decode_delta(encode_delta(Delta(()), names), names) == Delta(())
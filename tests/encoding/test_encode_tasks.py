@@ -0,0 +1,96 @@
+"""
+Unit test cases for encoding tasks in flowshop/encoding.py.
+"""
+
+from datetime import datetime, date, timedelta
+
+import pytest
+
+from flowshop import Task
+from flowshop.encoding import (
+    NameTable,
+    CHUNK_HEADER,
+    TASK_RECORDS,
+    MINUTES,
+    MICROSECONDS,
+    encode_tasks,
+    decode_tasks,
+    encode_date,
+    decode_date,
+)
+
+
+def test_encode_tasks_minutes():
+    """
+    Test encoding tasks which start and end on whole minutes, with interned names.
+    """
+
+    start = datetime(2020, 5, 1, hour=12)
+    tasks = [
+        Task(
+            "task%d" % (i % 2),
+            1.5,
+            start + timedelta(hours=i),
+            start + timedelta(hours=i, minutes=30),
+        )
+        for i in range(4)
+    ]
+    names = NameTable()
+    data = encode_tasks(tasks, names)
+
+    assert names.names == ["task0", "task1"]
+    assert len(data) == CHUNK_HEADER.size + 4 * TASK_RECORDS[MINUTES].size
+    assert decode_tasks(data, names) == tasks
+
+    # The table of names round trips too.
+    decoded_names, offset = NameTable.decode(names.encode())
+    assert decoded_names.names == names.names
+    assert offset == len(names.encode())
+
+
+def test_encode_tasks_microseconds():
+    """
+    Test encoding tasks whose times aren't on whole minutes, and a task without a
+    priority. These should round trip exactly.
+    """
+
+    tasks = [
+        Task("task1", 0.1, datetime(2020, 5, 1, 12), datetime(2020, 5, 1, 13)),
+        Task(
+            "task2",
+            None,
+            datetime(2020, 5, 1, 13, 0, 1, 5),
+            datetime(2020, 5, 1, 14, 30, 59, 999999),
+        ),
+    ]
+    names = NameTable()
+    data = encode_tasks(tasks, names)
+
+    assert len(data) == CHUNK_HEADER.size + 2 * TASK_RECORDS[MICROSECONDS].size
+    decoded_tasks = decode_tasks(data, names)
+    assert decoded_tasks == tasks
+    assert decoded_tasks[1].priority is None
+
+
+def test_encode_tasks_truncated():
+    """
+    Test decoding a chunk of tasks which was cut short.
+    """
+
+    task = Task("task", 1.0, datetime(2020, 5, 1, 12), datetime(2020, 5, 1, 13))
+    names = NameTable()
+    data = encode_tasks([task], names)
+    with pytest.raises(ValueError):
+        decode_tasks(data[:-1], names)
+
+
+def test_encode_date():
+    """
+    Test encoding the kinds of values which sessions hold as their base date.
+    """
+
+    for day in [None, date(2020, 4, 27), datetime(2020, 4, 27, 12)]:
+        decoded_day, offset = decode_date(encode_date(day))
+        assert decoded_day == day
+        assert type(decoded_day) is type(day)
+        assert offset == len(encode_date(day))
@@ -0,0 +1,136 @@
+"""
+Unit test cases for saving and loading compressed sessions in flowshop/files.py.
+"""
+
+from datetime import date, time
+
+import pytest
+
+from flowshop import Session
+from flowshop import files
+from flowshop.history import EditHistory
+
+
+@pytest.fixture(autouse=True)
+def storage_dir(tmp_path, monkeypatch):
+    """ Save sessions to a temporary directory. """
+    monkeypatch.setattr(files, "STORAGE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def make_session(storage: str, compression: str) -> Session:
+    """ Construct a session with tasks over three weeks in ``storage``. """
+
+    session = Session("test", storage=storage, compression=compression)
+    session.base_date = date(2020, 6, 1)
+    for week in range(3):
+        for i in range(20):
+            session.insert_task(
+                day=i % 7,
+                planned=i % 2 == 0,
+                name="task%d_%d" % (week, i % 5),
+                priority=1.0,
+                start_time=time(hour=i // 7 * 2),
+                hours=1.5,
+            )
+        session.move_week()
+    session.base_date = date(2020, 6, 15)
+    return session
+
+
+def saved_size(storage: str) -> int:
+    """ Size of the file of the saved session named "test". """
+
+    with open(files.filename_from_name("test", storage), "rb") as session_file:
+        return len(session_file.read())
+
+
+@pytest.mark.parametrize("storage", [files.PICKLE, files.JOURNAL, files.INDEXED])
+@pytest.mark.parametrize("compression", ["zlib", "lzma", "bz2"])
+def test_compressed_save_load(storage, compression):
+    """
+    Test saving a compressed session and loading it again, with the codec detected
+    from the file.
+    """
+
+    session = make_session(storage, compression)
+    session.undo()
+    session.save()
+
+    loaded_session = Session("test", load=True)
+    assert loaded_session.storage == storage
+    assert loaded_session.compression == compression
+    assert files.saved_session_compression("test") == compression
+    assert loaded_session.history_pos == session.history_pos
+    assert list(loaded_session.edit_history) == list(session.edit_history)
+
+    # Loaded sessions are saved again with the same codec.
+    loaded_session.redo()
+    loaded_session.edit_task(True, 0, 0, {"name": "edited"})
+    loaded_session.save()
+    reloaded_session = Session("test", load=True)
+    assert reloaded_session.compression == compression
+    assert list(reloaded_session.edit_history) == list(loaded_session.edit_history)
+
+
+def test_indexed_dictionary():
+    """
+    Test that compressing the blobs of an indexed file against a dictionary makes the
+    file smaller, and that the dictionary is kept when the file is saved again.
+    """
+
+    session = make_session(files.INDEXED, None)
+    session.edit_history = EditHistory(session.edit_history, checkpoint_interval=2)
+    state_dict = session.state_dict()
+    path = files.filename_from_name("test", files.INDEXED)
+    codec = files.get_codec("zlib")
+
+    files.save_indexed(path, state_dict, codec, use_dictionary=False)
+    plain_size = saved_size(files.INDEXED)
+    files.save_indexed(path, state_dict, codec)
+    dictionary_size = saved_size(files.INDEXED)
+    assert dictionary_size < plain_size
+
+    loaded_state_dict = files.load_indexed(path)
+    assert list(loaded_state_dict["edit_history"]) == list(session.edit_history)
+    dictionary = loaded_state_dict["edit_history"][0][0]._file.dictionary
+    assert dictionary is not None
+
+    files.save_indexed(path, loaded_state_dict, codec)
+    reloaded_state_dict = files.load_indexed(path)
+    assert reloaded_state_dict["edit_history"][0][0]._file.dictionary == dictionary
+    assert list(reloaded_state_dict["edit_history"]) == list(session.edit_history)
+
+
+@pytest.mark.parametrize("storage", [files.PICKLE, files.JOURNAL, files.INDEXED])
+def test_migrate_compression(storage):
+    """
+    Test recompressing a saved session in the same storage.
+    """
+
+    session = make_session(storage, None)
+    session.save()
+    uncompressed_size = saved_size(storage)
+
+    assert files.migrate_session("test", storage, "zlib") == storage
+    assert saved_size(storage) < uncompressed_size
+    loaded_session = Session("test", load=True)
+    assert loaded_session.compression == "zlib"
+    assert list(loaded_session.edit_history) == list(session.edit_history)
+
+
+def test_journal_change_codec():
+    """
+    Test that changing the codec of a journaled session writes a new snapshot.
+    """
+
+    session = make_session(files.JOURNAL, None)
+    session.save()
+    session.compression = "bz2"
+    session.edit_task(True, 0, 0, {"name": "edited"})
+    session.save()
+
+    loaded_session = Session("test", load=True)
+    assert loaded_session.compression == "bz2"
+    assert loaded_session.journal.num_records == 0
+    assert list(loaded_session.edit_history) == list(session.edit_history)
@@ -0,0 +1,164 @@
+"""
+Unit test cases for saving and loading indexed sessions in flowshop/files.py.
+"""
+
+import pickle
+from datetime import datetime, date, time, timedelta
+
+import pytest
+
+from flowshop import Session, Schedule
+from flowshop import files
+from flowshop.history import EditHistory, LazyEntry
+from flowshop.indexed import LazySchedule
+
+
+@pytest.fixture(autouse=True)
+def storage_dir(tmp_path, monkeypatch):
+    """ Save sessions to a temporary directory. """
+    monkeypatch.setattr(files, "STORAGE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def make_session() -> Session:
+    """
+    Construct an indexed session with tasks over three weeks, and a history which is
+    long enough to hold a few checkpoints.
+    """
+
+    session = Session("test", storage=files.INDEXED)
+    session.base_date = date(2020, 6, 1)
+    for week in range(3):
+        for i in range(10):
+            session.insert_task(
+                day=i % 7,
+                planned=i % 2 == 0,
+                name="task%d_%d" % (week, i),
+                priority=1.0 + week,
+                start_time=time(hour=i // 7 * 2),
+                hours=1.5,
+            )
+        session.move_week()
+    session.base_date = date(2020, 6, 8)
+    return session
+
+
+def test_indexed_save_load():
+    """
+    Test saving an indexed session and loading it again.
+    """
+
+    session = make_session()
+    session.undo()
+    session.save()
+
+    loaded_session = Session("test", load=True)
+    assert loaded_session.storage == files.INDEXED
+    assert loaded_session.history_pos == session.history_pos
+    assert loaded_session.base_date == session.base_date
+    assert list(loaded_session.edit_history) == list(session.edit_history)
+
+
+def test_indexed_lazy_load():
+    """
+    Test that loading an indexed session only decodes the current entry of the edit
+    history, and only the weeks of its schedules which are looked up.
+    """
+
+    session = make_session()
+    session.save()
+    loaded_session = Session("test", load=True)
+
+    # Nothing should be decoded until the current schedules are needed.
+    stored_entries = loaded_session.edit_history.stored_entries()
+    assert all(isinstance(entry, LazyEntry) for entry in stored_entries)
+
+    for day in range(7):
+        for planned in [True, False]:
+            assert loaded_session.daily_points(day, planned, True) == (
+                session.daily_points(day, planned, True)
+            )
+    assert loaded_session.get_task(True, 2, 0) == session.get_task(True, 2, 0)
+    with pytest.raises(ValueError):
+        loaded_session.get_task(True, 2, 1)
+
+    planned, actual = loaded_session.current_schedules()
+    assert isinstance(planned, LazySchedule) and not planned.materialized
+    assert isinstance(actual, LazySchedule) and not actual.materialized
+    assert len(planned._week_tasks) == 2
+
+    # Interval queries only decode the weeks involved as well.
+    session_planned = session.current_schedules()[0]
+    start_time = datetime.combine(loaded_session.base_date, time(hour=1))
+    end_time = start_time + timedelta(days=2)
+    assert planned.count_in_interval(
+        start_time, end_time
+    ) == session_planned.count_in_interval(start_time, end_time)
+    assert planned.task_at(start_time) == session_planned.task_at(start_time)
+    assert planned.task_at(start_time) is not None
+    assert not planned.materialized
+    stored_entries = loaded_session.edit_history.stored_entries()
+    assert sum(not isinstance(entry, LazyEntry) for entry in stored_entries) == 1
+
+    # Other entries are decoded on undo and redo.
+    loaded_session.undo()
+    assert loaded_session.current_schedules() == session.edit_history[-2]
+    loaded_session.redo()
+
+    # Edits work on a copy of the current schedule, after which the session can be
+    # saved and loaded again.
+    loaded_session.move_week()
+    loaded_session.edit_task(True, 0, 0, {"name": "edited"})
+    loaded_session.save()
+    reloaded_session = Session("test", load=True)
+    assert list(reloaded_session.edit_history) == list(loaded_session.edit_history)
+    assert reloaded_session.get_task(True, 0, 0).name == "edited"
+
+
+def test_indexed_shared_chunks():
+    """
+    Test that week chunks which are shared between checkpoints are only written once.
+    """
+
+    session = make_session()
+    session.edit_history = EditHistory(session.edit_history, checkpoint_interval=2)
+    session.save()
+    loaded_session = Session("test", load=True)
+
+    chunks = {}
+    history = loaded_session.edit_history
+    for i in range(len(history)):
+        if history.is_checkpoint(i):
+            for schedule in history[i]:
+                for week, data in schedule.week_chunks():
+                    chunks[week[3]] = data
+    assert len(history) == 31
+    assert len(chunks) == len(set(chunks.values()))
+
+    # Each insertion changes one week of one schedule, so it adds at most one chunk.
+    assert len(chunks) <= 30
+
+
+def test_lazy_schedule_pickle():
+    """
+    Test that a lazily loaded schedule is pickled as a plain Schedule.
+    """
+
+    session = make_session()
+    session.save()
+    planned, _ = Session("test", load=True).current_schedules()
+    unpickled = pickle.loads(pickle.dumps(planned))
+    assert type(unpickled) is Schedule
+    assert unpickled == session.current_schedules()[0]
+    assert unpickled.days_points(date(2020, 6, 8), date(2020, 6, 15)) == 15.0
+
+
+def test_indexed_invalid():
+    """
+    Test loading a file which isn't an indexed session file.
+    """
+
+    with open(files.filename_from_name("test", files.INDEXED), "wb") as bad_file:
+        bad_file.write(b"not an indexed session file")
+    with pytest.raises(ValueError):
+        Session("test", load=True)
@@ -0,0 +1,156 @@
+"""
+Unit test cases for saving and loading journaled sessions in flowshop/files.py.
+"""
+
+import os
+from datetime import time, timedelta
+
+import pytest
+
+from flowshop import Session
+from flowshop import files
+from flowshop.journal import Journal, read_journal
+
+
+@pytest.fixture(autouse=True)
+def storage_dir(tmp_path, monkeypatch):
+    """ Save sessions to a temporary directory. """
+    monkeypatch.setattr(files, "STORAGE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def insert_tasks(session: Session, num_tasks: int, hour: int = 0) -> None:
+    """ Insert ``num_tasks`` one hour long tasks into a session. """
+
+    for i in range(num_tasks):
+        session.insert_task(
+            day=i % 7,
+            planned=i % 2 == 0,
+            name="task%d" % i,
+            priority=1.0,
+            start_time=time(hour=hour + i // 7),
+            hours=1.0,
+        )
+
+
+def assert_sessions_equal(session: Session, loaded_session: Session) -> None:
+    """ Check that a session and a loaded copy of it hold the same state. """
+
+    assert loaded_session.history_pos == session.history_pos
+    assert loaded_session.base_date == session.base_date
+    assert list(loaded_session.edit_history) == list(session.edit_history)
+
+
+def test_journal_save_load():
+    """
+    Test saving a journaled session several times, and loading it again.
+    """
+
+    session = Session("test", storage=files.JOURNAL)
+    insert_tasks(session, 5)
+    session.save()
+    insert_tasks(session, 5, hour=8)
+    session.undo()
+    session.save()
+    session.edit_task(True, day=0, task_index=0, new_values={"name": "edited"})
+    session.move_week()
+    session.save()
+
+    # The first save writes a snapshot, and later saves each append a record.
+    _, records, _ = read_journal(files.filename_from_name("test", files.JOURNAL))
+    assert len(records) == 2
+
+    loaded_session = Session("test", load=True)
+    assert loaded_session.storage == files.JOURNAL
+    assert_sessions_equal(session, loaded_session)
+
+    # Saving and loading again should continue the same journal.
+    loaded_session.redo()
+    loaded_session.save()
+    assert_sessions_equal(loaded_session, Session("test", load=True))
+
+
+def test_journal_torn_tail():
+    """
+    Test loading a journal whose last record was only partially written.
+    """
+
+    session = Session("test", storage=files.JOURNAL)
+    insert_tasks(session, 3)
+    session.save()
+    saved_history = list(session.edit_history)
+    saved_pos = session.history_pos
+    insert_tasks(session, 3, hour=8)
+    session.save()
+    session.close()
+
+    # Cut the last record in half.
+    journal_filename = files.filename_from_name("test", files.JOURNAL)
+    size = os.path.getsize(journal_filename)
+    _, _, sizes = read_journal(journal_filename)
+    with open(journal_filename, "r+b") as journal_file:
+        journal_file.truncate(size - sizes[-1] // 2)
+
+    # Loading should skip the torn tail without writing to the journal.
+    loaded_session = Session("test", load=True)
+    assert loaded_session.history_pos == saved_pos
+    assert list(loaded_session.edit_history) == saved_history
+    assert os.path.getsize(journal_filename) == size - sizes[-1] // 2
+
+    # New records should be appended after the last good record.
+    insert_tasks(loaded_session, 1, hour=20)
+    loaded_session.save()
+    _, records, new_sizes = read_journal(journal_filename)
+    assert len(records) == 1
+    assert os.path.getsize(journal_filename) == size - sizes[-1] + new_sizes[-1]
+    assert_sessions_equal(loaded_session, Session("test", load=True))
+
+
+def test_journal_compaction():
+    """
+    Test that the journal is compacted into a new snapshot once it has enough records.
+    """
+
+    session = Session("test", storage=files.JOURNAL)
+    session.save()
+    session.journal = Journal(
+        files.filename_from_name("test", files.JOURNAL), compact_records=3
+    )
+    session.journal.write_snapshot(session.state_dict())
+    for i in range(4):
+        insert_tasks(session, 1, hour=i)
+        session.save()
+
+    _, records, _ = read_journal(files.filename_from_name("test", files.JOURNAL))
+    assert len(records) == 0
+    assert_sessions_equal(session, Session("test", load=True))
+
+
+def test_journal_close():
+    """
+    Test that a journaled session closes its journal on exit, and writes a new snapshot
+    if it is saved again afterwards.
+    """
+
+    with Session("test", storage=files.JOURNAL) as session:
+        insert_tasks(session, 3)
+        session.save()
+        journal = session.journal
+        assert not journal._file.closed
+    assert session.journal is None
+    assert journal._file is None
+
+    insert_tasks(session, 3, hour=8)
+    session.save()
+    _, records, _ = read_journal(files.filename_from_name("test", files.JOURNAL))
+    assert records == []
+    with Session("test", load=True) as loaded_session:
+        assert_sessions_equal(session, loaded_session)
+    session.close()
+
+    # Journals in the format before compression are no longer read.
+    journal_filename = files.filename_from_name("test", files.JOURNAL)
+    with open(journal_filename, "r+b") as journal_file:
+        journal_file.write(b"FSJ1")
+    with pytest.raises(ValueError):
+        read_journal(journal_filename)
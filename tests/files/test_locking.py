@@ -0,0 +1,165 @@
+"""
+Unit test cases for atomic and concurrent saves of sessions in flowshop/files.py.
+"""
+
+import multiprocessing
+import os
+from datetime import time
+
+import pytest
+
+from flowshop import Session
+from flowshop import files
+from flowshop.locking import atomic_file, fcntl
+
+
+pytestmark = pytest.mark.skipif(fcntl is None, reason="requires fcntl")
+
+NUM_SAVES = 20
+
+
+@pytest.fixture(autouse=True)
+def storage_dir(tmp_path, monkeypatch):
+    """ Save sessions to a temporary directory. """
+    monkeypatch.setattr(files, "STORAGE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def insert_task(session: Session, i: int, hour: int = 0) -> None:
+    """ Insert the ``i``-th of a sequence of one hour long tasks into a session. """
+
+    session.insert_task(
+        day=i % 7,
+        planned=True,
+        name="task%d" % i,
+        priority=1.0,
+        start_time=time(hour=hour + i // 7),
+        hours=1.0,
+    )
+
+
+def save_repeatedly(hour: int) -> None:
+    """ Load the saved session, then insert a task and save it NUM_SAVES times. """
+
+    session = Session("test", load=True)
+    for i in range(NUM_SAVES):
+        insert_task(session, i, hour=hour)
+        session.save()
+
+
+def load_until(stop: multiprocessing.Event) -> None:
+    """ Load the saved session over and over until ``stop`` is set. """
+
+    while not stop.is_set():
+        session = Session("test", load=True)
+        assert len(session.edit_history) == session.history_pos + 1
+
+
+def test_atomic_file_error():
+    """
+    Test that an error while writing a file atomically leaves the old file in place.
+    """
+
+    path = os.path.join(files.STORAGE_DIR, "test.pkl")
+    with open(path, "wb") as old_file:
+        old_file.write(b"old")
+
+    with pytest.raises(RuntimeError):
+        with atomic_file(path) as new_file:
+            new_file.write(b"partial")
+            raise RuntimeError
+
+    with open(path, "rb") as old_file:
+        assert old_file.read() == b"old"
+    assert os.listdir(files.STORAGE_DIR) == ["test.pkl"]
+
+
+def test_lock_blocks_writers_not_readers():
+    """
+    Test that a save waits for the lock of the session, while a load doesn't.
+    """
+
+    context = multiprocessing.get_context("fork")
+    session = Session("test", storage=files.PICKLE)
+    insert_task(session, 0)
+    session.save()
+
+    with files.session_lock("test"):
+        writer = context.Process(target=save_repeatedly, args=(8,))
+        writer.start()
+        reader = context.Process(target=Session, args=("test",), kwargs={"load": True})
+        reader.start()
+        reader.join(10)
+        assert reader.exitcode == 0
+
+        writer.join(0.5)
+        assert writer.is_alive()
+        assert len(Session("test", load=True).edit_history) == 2
+
+    writer.join(10)
+    assert writer.exitcode == 0
+    assert len(Session("test", load=True).edit_history) == NUM_SAVES + 2
+
+
+@pytest.mark.parametrize("storage", [files.PICKLE, files.JOURNAL, files.INDEXED])
+def test_concurrent_saves(storage):
+    """
+    Test loading a session in several processes while several others save it.
+    """
+
+    context = multiprocessing.get_context("fork")
+    session = Session("test", storage=storage, compression="zlib")
+    insert_task(session, 0)
+    session.save()
+
+    stop = context.Event()
+    readers = [context.Process(target=load_until, args=(stop,)) for _ in range(3)]
+    writers = [
+        context.Process(target=save_repeatedly, args=(8 + 4 * i,)) for i in range(2)
+    ]
+    for process in readers + writers:
+        process.start()
+    for writer in writers:
+        writer.join(60)
+    stop.set()
+    for reader in readers:
+        reader.join(60)
+    assert [process.exitcode for process in readers + writers] == [0] * 5
+
+    # The last save wins, so the session holds every task of one of the writers, and
+    # one history entry per task it holds.
+    loaded_session = Session("test", load=True)
+    assert loaded_session.storage == storage
+    planned_tasks = loaded_session.edit_history[-1][0].tasks
+    assert len(loaded_session.edit_history) == len(planned_tasks) + 1
+    assert NUM_SAVES in [
+        sum(task.start_time.hour // 4 == 2 + i for task in planned_tasks)
+        for i in range(2)
+    ]
+
+
+def test_stale_journal_writer():
+    """
+    Test that saving a journaled session which another process saved since it was
+    loaded replaces the journal with a snapshot, instead of appending to it.
+    """
+
+    session = Session("test", storage=files.JOURNAL)
+    insert_task(session, 0)
+    session.save()
+
+    first_session = Session("test", load=True)
+    second_session = Session("test", load=True)
+    insert_task(first_session, 1)
+    first_session.save()
+    insert_task(second_session, 2)
+    second_session.save()
+
+    loaded_session = Session("test", load=True)
+    assert list(loaded_session.edit_history) == list(second_session.edit_history)
+
+    # Saving the first session again replaces the second session's save.
+    insert_task(first_session, 3)
+    first_session.save()
+    loaded_session = Session("test", load=True)
+    assert list(loaded_session.edit_history) == list(first_session.edit_history)
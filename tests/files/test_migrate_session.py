@@ -0,0 +1,56 @@
+"""
+Unit test cases for migrating saved sessions in flowshop/files.py.
+"""
+
+import os
+import shutil
+
+import pytest
+
+from flowshop import Session
+from flowshop import files
+
+
+@pytest.fixture(autouse=True)
+def storage_dir(tmp_path, monkeypatch):
+    """ Save sessions to a temporary directory holding a copy of the example session. """
+
+    shutil.copy(os.path.join(files.STORAGE_DIR, "example.pkl"), str(tmp_path))
+    monkeypatch.setattr(files, "STORAGE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def test_migrate_session_example():
+    """
+    Test migrating the example session, which was pickled with an older version of
+    flowshop, to an indexed file and back.
+    """
+
+    session = Session("example", load=True)
+
+    assert files.migrate_session("example", files.INDEXED) == files.PICKLE
+    assert not os.path.isfile(files.filename_from_name("example", files.PICKLE))
+    indexed_size = os.path.getsize(files.filename_from_name("example", files.INDEXED))
+
+    loaded_session = Session("example", load=True)
+    assert loaded_session.storage == files.INDEXED
+    assert loaded_session.history_pos == session.history_pos
+    assert loaded_session.base_date == session.base_date
+    assert list(loaded_session.edit_history) == list(session.edit_history)
+
+    assert files.migrate_session("example", files.PICKLE) == files.INDEXED
+    assert os.path.getsize(files.filename_from_name("example", files.PICKLE)) > (
+        indexed_size
+    )
+    assert list(Session("example", load=True).edit_history) == list(
+        session.edit_history
+    )
+
+
+def test_migrate_session_invalid():
+    """
+    Test migrating a session which doesn't exist.
+    """
+
+    with pytest.raises(ValueError):
+        files.migrate_session("bad_example")
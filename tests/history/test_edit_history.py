@@ -0,0 +1,95 @@
+"""
+Unit test cases for flowshop/history.py.
+"""
+
+from copy import copy
+from datetime import datetime, timedelta
+
+from flowshop import Schedule, Task
+from flowshop.history import EditHistory
+
+
+def history_schedules(num_entries: int):
+    """
+    Construct a list of (planned, actual) pairs, where each pair differs from the
+    previous one by a single inserted or edited task.
+    """
+
+    planned = Schedule("planned")
+    actual = Schedule("actual")
+    schedules = [(planned, actual)]
+    for i in range(num_entries - 1):
+        start = datetime(2020, 5, 1) + timedelta(hours=i)
+        end = start + timedelta(hours=1)
+        if i % 3 == 0:
+            planned = planned.copy()
+            planned.add_task(Task("task%d" % i, 1.0, start, end))
+        elif i % 3 == 1:
+            actual = actual.copy()
+            actual.add_task(Task("task%d" % i, 2.0, start, end))
+        else:
+            planned = planned.copy()
+            task = copy(planned.tasks[0])
+            task.name = "edited%d" % i
+            planned.replace_task(0, task)
+        schedules.append((planned, actual))
+
+    return schedules
+
+
+def test_edit_history_getitem():
+    """
+    Test that EditHistory entries are reconstructed correctly when accessed out of
+    order.
+    """
+
+    schedules = history_schedules(25)
+    history = EditHistory(schedules, checkpoint_interval=4)
+
+    assert len(history) == len(schedules)
+    for index in [24, 0, 13, 12, 11, 14, 3, 4, 2, -1, -25]:
+        assert history[index] == schedules[index]
+    assert history[5:9] == schedules[5:9]
+    assert list(history) == schedules
+
+
+def test_edit_history_deltas():
+    """
+    Test that EditHistory only stores full checkpoints every ``checkpoint_interval``
+    entries.
+    """
+
+    schedules = history_schedules(9)
+    history = EditHistory(schedules, checkpoint_interval=4)
+
+    checkpoints = [i for i in range(len(history)) if history.is_checkpoint(i)]
+    assert checkpoints == [0, 4, 8]
+
+
+def test_edit_history_max_len():
+    """
+    Test that EditHistory drops its oldest entries when it grows past ``max_len``.
+    """
+
+    schedules = history_schedules(12)
+    history = EditHistory(max_len=5, checkpoint_interval=3)
+    for planned, actual in schedules:
+        history.append((planned, actual))
+
+    assert len(history) == 5
+    assert history.is_checkpoint(0)
+    assert list(history) == schedules[-5:]
+
+
+def test_edit_history_truncate():
+    """
+    Test truncating EditHistory, then appending a new entry.
+    """
+
+    schedules = history_schedules(8)
+    history = EditHistory(schedules, checkpoint_interval=3)
+    history[6]
+    history.truncate(5)
+    history.append(schedules[2])
+
+    assert list(history) == schedules[:5] + [schedules[2]]
@@ -0,0 +1,190 @@
+"""
+Unit test cases for flowshop/optimizer.py.
+"""
+
+import itertools
+import random
+import time
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+import pytest
+
+from flowshop import Schedule, Task
+from flowshop.optimizer import (
+    PendingTask,
+    Optimizer,
+    optimize_schedule,
+    blocked_time,
+)
+
+
+BASE_TIME = datetime(2020, 6, 15)
+
+
+def window_tasks(
+    num_tasks: int, num_hours: int, agreeable: bool = False, seed: int = 0
+) -> List[PendingTask]:
+    """
+    Generate ``num_tasks`` pending tasks with windows in the first ``num_hours`` hours
+    after BASE_TIME. If ``agreeable`` is True, every window has the same length, so that
+    tasks which can start earlier also have earlier deadlines.
+    """
+
+    rng = random.Random(seed)
+    tasks = []
+    for i in range(num_tasks):
+        duration = timedelta(minutes=rng.choice([30, 60, 90, 120]))
+        earliest = BASE_TIME + timedelta(hours=rng.randrange(num_hours))
+        slack = timedelta(hours=3) if agreeable else timedelta(hours=rng.randrange(6))
+        latest = earliest + (timedelta(hours=2) if agreeable else duration) + slack
+        tasks.append(
+            PendingTask(
+                "task%d" % i,
+                rng.choice([0.5, 1.0, 1.5, 2.0]),
+                duration,
+                earliest,
+                latest,
+            )
+        )
+    return tasks
+
+
+def brute_force_points(tasks: List[PendingTask]) -> float:
+    """
+    Find the most points of any schedule of ``tasks`` by trying every order of every
+    subset of tasks, placing each task as early as it fits after the previous one.
+    """
+
+    best = 0.0
+    for num_tasks in range(1, len(tasks) + 1):
+        for order in itertools.permutations(tasks, num_tasks):
+            end = BASE_TIME
+            for task in order:
+                end = max(end, task.earliest) + task.duration
+                if end > task.latest:
+                    break
+            else:
+                best = max(best, sum(task.points() for task in order))
+    return best
+
+
+def check_schedule(
+    schedule: Schedule,
+    tasks: List[PendingTask],
+    blocked: List[Tuple[datetime, datetime]] = (),
+) -> None:
+    """
+    Check that every task of ``schedule`` is a distinct pending task, done within its
+    window and outside of blocked time. Schedule() itself checks for overlap.
+    """
+
+    pending = {task.name: task for task in tasks}
+    names = [task.name for task in schedule.tasks]
+    assert len(set(names)) == len(names)
+    for task in schedule.tasks:
+        pending_task = pending[task.name]
+        assert task.priority == pending_task.priority
+        assert task.duration == pending_task.duration
+        assert pending_task.earliest <= task.start_time
+        assert task.end_time <= pending_task.latest
+        for start, end in blocked:
+            assert task.end_time <= start or task.start_time >= end
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_sequence_agreeable(seed):
+    """
+    Test that the dynamic program finds an optimal schedule when windows are agreeable
+    and no time is blocked.
+    """
+
+    tasks = window_tasks(6, 6, agreeable=True, seed=seed)
+    optimizer = Optimizer(tasks)
+    solution = optimizer.sequence(optimizer.deadline_order())
+    schedule = optimizer.schedule(solution.starts)
+    check_schedule(schedule, tasks)
+    assert schedule.points() == pytest.approx(brute_force_points(tasks))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_optimize_schedule_small(seed):
+    """
+    Test that the optimizer with a short time budget finds an optimal schedule for a
+    small example with arbitrary windows.
+    """
+
+    tasks = window_tasks(6, 6, seed=seed)
+    schedule = optimize_schedule(tasks, time_limit=0.1, seed=seed)
+    check_schedule(schedule, tasks)
+    assert schedule.points() == pytest.approx(brute_force_points(tasks))
+
+
+def test_optimize_schedule_blocked():
+    """
+    Test scheduling around the tasks of an existing schedule, where the greedy
+    placement of the first task leaves no room for the second.
+    """
+
+    existing = Schedule(
+        "existing",
+        [
+            Task(
+                "meeting",
+                priority=1.0,
+                start_time=BASE_TIME + timedelta(hours=2),
+                end_time=BASE_TIME + timedelta(hours=3),
+            )
+        ],
+    )
+    tasks = [
+        PendingTask(
+            "long", 2.0, timedelta(hours=2), BASE_TIME, BASE_TIME + timedelta(hours=5)
+        ),
+        PendingTask(
+            "short", 1.0, timedelta(hours=2), BASE_TIME, BASE_TIME + timedelta(hours=2)
+        ),
+    ]
+    blocked = blocked_time(existing)
+    schedule = optimize_schedule(tasks, blocked)
+    check_schedule(schedule, tasks, blocked)
+    assert [task.name for task in schedule.tasks] == ["short", "long"]
+    assert schedule.points() == 6.0
+
+
+def test_optimize_schedule_time_limit():
+    """
+    Test that the optimizer returns a valid schedule within its time budget, and that
+    its solutions improve as they are yielded.
+    """
+
+    tasks = window_tasks(150, 7 * 24)
+    blocked = [
+        (BASE_TIME + timedelta(days=day), BASE_TIME + timedelta(days=day, hours=8))
+        for day in range(7)
+    ]
+    optimizer = Optimizer(tasks, blocked)
+
+    start = time.perf_counter()
+    points = [
+        optimizer.schedule(solution).points()
+        for solution in optimizer.solutions(time_limit=0.5)
+    ]
+    assert time.perf_counter() - start < 1.5
+    assert points == sorted(set(points))
+    assert points[-1] >= optimizer.greedy().points
+
+    schedule = optimize_schedule(tasks, blocked)
+    check_schedule(schedule, tasks, blocked)
+    assert schedule.points() >= optimizer.greedy().points
+
+
+def test_optimize_schedule_invalid():
+    """
+    Test that tasks without a duration are rejected.
+    """
+
+    with pytest.raises(ValueError):
+        optimize_schedule(
+            [PendingTask("task", 1.0, timedelta(0), BASE_TIME, BASE_TIME)]
+        )
@@ -0,0 +1,123 @@
+"""
+Unit test cases for flowshop/parallel.py.
+"""
+
+import itertools
+from datetime import datetime, timedelta
+from typing import List, Dict
+
+import pytest
+
+from flowshop.optimizer import PendingTask, Optimizer
+from flowshop.parallel import (
+    ParallelOptimizer,
+    optimize_schedule_parallel,
+    _encode_solution,
+    _decode_solution,
+)
+from flowshop.utils import random_pending_tasks
+
+
+START_TIME = datetime(2020, 1, 6)
+BLOCKED = [
+    (START_TIME + timedelta(days=day), START_TIME + timedelta(days=day, hours=8))
+    for day in range(7)
+]
+
+
+def brute_force_points(tasks: List[PendingTask]) -> float:
+    """
+    Find the most points of any schedule of ``tasks`` by trying every order of every
+    subset of tasks, placing each task as early as it fits after the previous one.
+    """
+
+    best = 0.0
+    for num_tasks in range(1, len(tasks) + 1):
+        for order in itertools.permutations(tasks, num_tasks):
+            end = START_TIME
+            for task in order:
+                end = max(end, task.earliest) + task.duration
+                if end > task.latest:
+                    break
+            else:
+                best = max(best, sum(task.points() for task in order))
+    return best
+
+
+def check_solution(optimizer: Optimizer, solution: Dict[int, int]) -> None:
+    """
+    Check that every task of ``solution`` is done within its window and in free time.
+    """
+
+    free = list(zip(optimizer.free.starts, optimizer.free.ends))
+    for i, start in solution.items():
+        end = start + optimizer.durations[i]
+        assert optimizer.earliest[i] <= start and end <= optimizer.latest[i]
+        assert any(gap_start <= start and end <= gap_end for gap_start, gap_end in free)
+
+
+def test_from_arrays():
+    """
+    Test that an optimizer created from the arrays of another one finds the same
+    solutions.
+    """
+
+    optimizer = Optimizer(random_pending_tasks(100), BLOCKED)
+    copy = Optimizer.from_arrays(optimizer.arrays())
+
+    assert copy.greedy().starts == optimizer.greedy().starts
+    assert (
+        copy.sequence(copy.deadline_order()).starts
+        == optimizer.sequence(optimizer.deadline_order()).starts
+    )
+    assert list(copy.solutions()) == list(optimizer.solutions())
+
+
+def test_encode_solution():
+    """
+    Test packing a solution into an array and unpacking it again.
+    """
+
+    solution = {3: 1592179200000000, 0: 1592182800000000, 7: -5}
+    assert _decode_solution(_encode_solution(solution)) == solution
+    assert _decode_solution(_encode_solution({})) == {}
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_optimize_schedule_parallel_small(seed):
+    """
+    Test that islands searching in two workers find an optimal schedule for a small
+    example.
+    """
+
+    tasks = random_pending_tasks(6, num_days=1, seed=seed)
+    schedule = optimize_schedule_parallel(
+        tasks, time_limit=0.2, num_workers=2, seed=seed
+    )
+    assert schedule.points() == pytest.approx(brute_force_points(tasks))
+
+
+def test_parallel_solutions():
+    """
+    Test that solutions improve as they are yielded, that they are at least as good as
+    the greedy solution, and that iterations are counted over epochs.
+    """
+
+    tasks = random_pending_tasks(150)
+    optimizer = ParallelOptimizer(tasks, BLOCKED, num_workers=2)
+    solutions = list(optimizer.solutions(time_limit=0.4, exchange_interval=0.1))
+    points = [optimizer.schedule(solution).points() for solution in solutions]
+
+    assert points == sorted(set(points))
+    assert points[-1] >= optimizer.optimizer.greedy().points - 1e-9
+    assert optimizer.iterations > 0
+    check_solution(optimizer.optimizer, solutions[-1])
+
+
+def test_invalid_num_workers():
+    """
+    Test that a number of workers below 1 is rejected.
+    """
+
+    with pytest.raises(ValueError):
+        ParallelOptimizer(random_pending_tasks(5), num_workers=0)
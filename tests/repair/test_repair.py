@@ -0,0 +1,182 @@
+"""
+Unit test cases for flowshop/repair.py.
+"""
+
+import time
+from datetime import datetime, timedelta
+
+from flowshop import Schedule, Task
+from flowshop.repair import repair_plan
+from flowshop.utils import random_tasks
+
+
+BASE_TIME = datetime(2020, 6, 15)
+
+
+def hours_task(name: str, priority: float, start: float, end: float) -> Task:
+    """ Create a task from ``start`` to ``end`` hours after BASE_TIME. """
+
+    return Task(
+        name,
+        priority=priority,
+        start_time=BASE_TIME + timedelta(hours=start),
+        end_time=BASE_TIME + timedelta(hours=end),
+    )
+
+
+def test_repair_plan_shift():
+    """
+    Test that remaining tasks are shifted as little as possible after an overrun, and
+    that tasks which still fit keep their planned time.
+    """
+
+    planned = Schedule(
+        "planned",
+        [
+            hours_task("a", 1.0, 9, 10),
+            hours_task("b", 2.0, 10, 11),
+            hours_task("c", 1.0, 11, 12),
+            hours_task("d", 1.0, 14, 15),
+        ],
+    )
+    actual = Schedule("actual", [hours_task("a", 1.0, 9, 10.5)])
+    now = BASE_TIME + timedelta(hours=10)
+    repaired = repair_plan(planned, actual, now)
+
+    assert repaired.tasks == [
+        hours_task("a", 1.0, 9, 10),
+        hours_task("b", 2.0, 10.5, 11.5),
+        hours_task("c", 1.0, 11.5, 12.5),
+        hours_task("d", 1.0, 14, 15),
+    ]
+    assert repaired.tasks[0] is planned.tasks[0]
+    assert repaired.tasks[3] is planned.tasks[3]
+    assert planned.tasks[1] == hours_task("b", 2.0, 10, 11)
+
+
+def test_repair_plan_drop():
+    """
+    Test that when the rest of the day no longer fits, the tasks worth the fewest points
+    are dropped, and tasks move around the actual schedule.
+    """
+
+    planned = Schedule(
+        "planned",
+        [
+            hours_task("x", 1.0, 19, 21),
+            hours_task("y", 2.0, 21, 22),
+            hours_task("z", 0.5, 22, 23),
+            hours_task("next", 1.0, 33, 34),
+        ],
+    )
+    actual = Schedule(
+        "actual", [hours_task("w", 1.0, 18, 20), hours_task("call", 1.0, 22, 22.5)]
+    )
+    now = BASE_TIME + timedelta(hours=19)
+    repaired = repair_plan(planned, actual, now)
+
+    assert repaired.tasks == [
+        hours_task("x", 1.0, 20, 22),
+        hours_task("y", 2.0, 22.5, 23.5),
+        hours_task("next", 1.0, 33, 34),
+    ]
+
+
+def test_repair_plan_keep_later():
+    """
+    Test that a task is dropped in favour of a later task worth more points, which
+    keeps its planned time, and that tasks never move before their planned time.
+    """
+
+    planned = Schedule(
+        "planned",
+        [hours_task("short", 1.0, 22, 23), hours_task("long", 2.0, 23, 24)],
+    )
+    actual = Schedule("actual", [hours_task("meeting", 1.0, 21, 22.5)])
+    now = BASE_TIME + timedelta(hours=20)
+    repaired = repair_plan(planned, actual, now)
+
+    assert repaired.tasks == [hours_task("long", 2.0, 23, 24)]
+    assert repaired.tasks[0] is planned.tasks[1]
+
+
+def test_repair_plan_end_time():
+    """
+    Test that only tasks which start before ``end_time`` are re-planned, and that they
+    don't move past it.
+    """
+
+    planned = Schedule(
+        "planned",
+        [
+            hours_task("a", 1.0, 10, 11),
+            hours_task("b", 1.0, 11, 12),
+            hours_task("c", 1.0, 12, 13),
+        ],
+    )
+    actual = Schedule("actual", [hours_task("a", 1.0, 10, 11.5)])
+    now = BASE_TIME + timedelta(hours=11)
+    repaired = repair_plan(planned, actual, now, BASE_TIME + timedelta(hours=12))
+
+    assert repaired.tasks == [
+        hours_task("a", 1.0, 10, 11),
+        hours_task("c", 1.0, 12, 13),
+    ]
+
+    # Nothing remains after ``now``.
+    assert repair_plan(planned, actual, BASE_TIME + timedelta(hours=13)) == planned
+
+    # Tasks which start exactly at ``end_time`` are kept, even when it is ``now``.
+    planned = Schedule("planned", [hours_task("p1", 1.0, 4.75, 6.75)])
+    actual = Schedule("actual", [hours_task("a2", 1.0, 5.5, 6)])
+    now = BASE_TIME + timedelta(hours=4.75)
+    assert repair_plan(planned, actual, now, now) == planned
+
+
+def test_repair_plan_in_progress():
+    """
+    Test that tasks which started before ``now`` are kept as they are, even when they
+    are still in progress.
+    """
+
+    planned = Schedule("planned", [hours_task("p", 1.0, 9, 11)])
+    actual = Schedule("actual", [])
+    now = BASE_TIME + timedelta(hours=10)
+    assert repair_plan(planned, actual, now).tasks[0] is planned.tasks[0]
+    repaired = repair_plan(planned, actual, now, BASE_TIME + timedelta(hours=11))
+    assert repaired.tasks[0] is planned.tasks[0]
+
+
+def test_repair_plan_week():
+    """
+    Test that repairing a week of planned tasks after an overrun keeps every task which
+    can keep its time, and takes milliseconds.
+    """
+
+    tasks = random_tasks(70, num_days=7, density=0.7, start_time=BASE_TIME)
+    planned = Schedule("planned", tasks)
+    now = tasks[0].end_time + timedelta(minutes=30)
+    actual = Schedule(
+        "actual",
+        [
+            Task(
+                tasks[0].name,
+                priority=tasks[0].priority,
+                start_time=tasks[0].start_time,
+                end_time=now,
+            )
+        ],
+    )
+
+    start = time.perf_counter()
+    repaired = repair_plan(planned, actual, now)
+    assert time.perf_counter() - start < 0.05
+
+    assert repaired.tasks[0] is tasks[0]
+    unmoved = sum(
+        1 for task in repaired.tasks if any(task is original for original in tasks)
+    )
+    assert unmoved >= len(tasks) - 3
+    assert repaired.points() >= planned.points() - max(
+        task.points() for task in tasks[:3]
+    )
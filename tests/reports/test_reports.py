@@ -0,0 +1,158 @@
+"""
+Unit test cases for flowshop/reports.py.
+"""
+
+import csv
+import gc
+import io
+import json
+import weakref
+from datetime import date, timedelta
+
+import pytest
+
+from flowshop import Schedule, Session
+from flowshop import files
+from flowshop.reports import (
+    CSV,
+    JSON,
+    ScoreDistribution,
+    session_schedules,
+    weekly_reports,
+    write_reports,
+)
+from flowshop.utils import random_tasks
+
+
+START_DATE = date(2020, 1, 6)
+END_DATE = date(2020, 3, 2)
+
+
+@pytest.fixture(autouse=True)
+def storage_dir(tmp_path, monkeypatch):
+    """ Save sessions to a temporary directory. """
+    monkeypatch.setattr(files, "STORAGE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def save_sessions():
+    """
+    Save a session in each storage, with random planned and actual tasks over a few
+    weeks, and return them.
+    """
+
+    sessions = []
+    for i, storage in enumerate(files.STORAGES):
+        session = Session("session%d" % i, storage=storage)
+        session.base_date = START_DATE
+        session.set_new_schedules(
+            Schedule("planned", random_tasks(100, 30 + 5 * i, seed=2 * i)),
+            Schedule("actual", random_tasks(80, 30 + 5 * i, seed=2 * i + 1)),
+        )
+        session.save()
+        sessions.append(session)
+    return sessions
+
+
+def test_weekly_reports():
+    """
+    Test that weekly reports match the points and score of each week of each session,
+    and that weeks without tasks are left out.
+    """
+
+    sessions = save_sessions()
+    assert files.saved_session_names() == [session.name for session in sessions]
+
+    reports = list(weekly_reports(START_DATE + timedelta(days=3), END_DATE))
+    assert [report.session for report in reports] == sorted(
+        report.session for report in reports
+    )
+    for session in sessions:
+        session_reports = [
+            report for report in reports if report.session == session.name
+        ]
+        assert session_reports[0].week_start == START_DATE
+        for report in session_reports:
+            week_end = report.week_start + timedelta(days=7)
+            assert report.week_start.weekday() == 0
+            assert report.planned_points == pytest.approx(
+                session.range_points(report.week_start, week_end, planned=True)
+            )
+            assert report.actual_points == pytest.approx(
+                session.range_points(report.week_start, week_end, planned=False)
+            )
+            assert report.score == pytest.approx(
+                session.range_score(report.week_start, week_end)
+            )
+            assert report.num_planned + report.num_actual > 0
+
+        # Sessions span 30 to 45 days from the first Monday, which is 5 to 7 weeks.
+        num_days = (session.current_schedules()[0].tasks[-1].date - START_DATE).days
+        assert len(session_reports) == num_days // 7 + 1
+
+    assert list(weekly_reports(START_DATE, END_DATE, ["session1"])) == [
+        report for report in reports if report.session == "session1"
+    ]
+    with pytest.raises(ValueError):
+        list(weekly_reports(START_DATE, END_DATE, ["missing"]))
+
+
+def test_session_schedules_streamed():
+    """
+    Test that the schedules of each session are released once the next session is
+    reached, so that memory doesn't grow with the number of sessions.
+    """
+
+    sessions = save_sessions()
+    refs = []
+    for name, planned, actual in session_schedules():
+        gc.collect()
+        assert not any(ref() is not None for ref in refs)
+        session = sessions[len(refs) // 2]
+        assert name == session.name
+        assert list(planned.tasks) == session.current_schedules()[0].tasks
+        assert list(actual.tasks) == session.current_schedules()[1].tasks
+        refs.extend([weakref.ref(planned), weakref.ref(actual)])
+        del planned, actual
+    assert len(refs) == 2 * len(sessions)
+
+
+@pytest.mark.parametrize("fmt", [CSV, JSON])
+def test_write_reports(fmt):
+    """
+    Test writing reports as CSV and JSON, while counting the distribution of scores.
+    """
+
+    save_sessions()
+    reports = list(weekly_reports(START_DATE, END_DATE))
+    distribution = ScoreDistribution(bin_width=50.0, max_score=100.0)
+    output = io.StringIO()
+    assert write_reports(
+        distribution.count(weekly_reports(START_DATE, END_DATE)), output, fmt
+    ) == len(reports)
+
+    output.seek(0)
+    if fmt == CSV:
+        rows = list(csv.DictReader(output))
+    else:
+        rows = json.load(output)
+    assert len(rows) == len(reports)
+    for row, report in zip(rows, reports):
+        assert row["session"] == report.session
+        assert row["week_start"] == report.week_start.isoformat()
+        assert float(row["score"]) == pytest.approx(report.score)
+        assert int(row["num_planned"]) == report.num_planned
+
+    assert distribution.bins() == [
+        (0.0, sum(report.score < 50 for report in reports)),
+        (50.0, sum(50 <= report.score < 100 for report in reports)),
+        (100.0, sum(report.score >= 100 for report in reports)),
+    ]
+
+    empty = io.StringIO()
+    assert write_reports(iter([]), empty, fmt) == 0
+    empty.seek(0)
+    if fmt == JSON:
+        assert json.load(empty) == []
+    with pytest.raises(ValueError):
+        write_reports(iter(reports), io.StringIO(), "xml")
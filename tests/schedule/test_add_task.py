@@ -77,3 +77,46 @@ def test_add_task_incompatible():
     except:
         # Something else went wrong.
         assert False
+
+
+def test_add_task_middle():
+    """
+    Test adding a task between two existing tasks, and adding an incompatible task
+    between two existing tasks (which should leave the schedule unchanged).
+    """
+
+    task1 = Task(
+        "task1",
+        priority=1.0,
+        start_time=datetime(2020, 5, 1, hour=12),
+        end_time=datetime(2020, 5, 1, hour=13),
+    )
+    task2 = Task(
+        "task2",
+        priority=1.0,
+        start_time=datetime(2020, 5, 1, hour=15),
+        end_time=datetime(2020, 5, 1, hour=16),
+    )
+    task3 = Task(
+        "task3",
+        priority=1.0,
+        start_time=datetime(2020, 5, 1, hour=13),
+        end_time=datetime(2020, 5, 1, hour=14),
+    )
+    task4 = Task(
+        "task4",
+        priority=1.0,
+        start_time=datetime(2020, 5, 1, hour=14),
+        end_time=datetime(2020, 5, 1, hour=15, minute=30),
+    )
+    schedule = Schedule("test", [task1, task2])
+
+    schedule.add_task(task3)
+    assert schedule.tasks == [task1, task3, task2]
+
+    try:
+        schedule.add_task(task4)
+        assert False
+    except ValueError:
+        pass
+    assert schedule.tasks == [task1, task3, task2]
@@ -0,0 +1,71 @@
+"""
+Unit test cases for flowshop/schedule.py.
+"""
+
+from datetime import datetime
+
+from flowshop import Schedule, Task
+from flowshop.schedule import BULK_INSERT_SIZE
+from flowshop.utils import random_tasks
+
+
+def test_add_tasks_small():
+    """
+    Test adding a few tasks at once, in an arbitrary order.
+    """
+
+    tasks = random_tasks(10)
+    schedule = Schedule("test", tasks[::3])
+    schedule.add_tasks(tasks[2::3] + tasks[1::3])
+
+    assert schedule.tasks == tasks
+    assert schedule == Schedule("test", tasks)
+
+
+def test_add_tasks_large():
+    """
+    Test adding more than BULK_INSERT_SIZE tasks at once.
+    """
+
+    tasks = random_tasks(3 * BULK_INSERT_SIZE)
+    schedule = Schedule("test", tasks[::3])
+    schedule.add_tasks(tasks[1::3] + tasks[2::3])
+
+    assert schedule.tasks == tasks
+    start_time = tasks[10].start_time
+    end_time = tasks[20].start_time
+    assert schedule.tasks_in_interval(start_time, end_time) == tasks[10:20]
+
+
+def test_add_tasks_incompatible():
+    """
+    Test adding tasks which overlap each other, which should leave the schedule
+    unchanged.
+    """
+
+    task1 = Task(
+        "task1",
+        priority=1.0,
+        start_time=datetime(2020, 5, 1, hour=10),
+        end_time=datetime(2020, 5, 1, hour=11),
+    )
+    task2 = Task(
+        "task2",
+        priority=1.0,
+        start_time=datetime(2020, 5, 1, hour=12),
+        end_time=datetime(2020, 5, 1, hour=13, minute=30),
+    )
+    task3 = Task(
+        "task3",
+        priority=1.0,
+        start_time=datetime(2020, 5, 1, hour=13),
+        end_time=datetime(2020, 5, 1, hour=14),
+    )
+    schedule = Schedule("test", [task1])
+
+    try:
+        schedule.add_tasks([task3, task2])
+        assert False
+    except ValueError:
+        pass
+    assert schedule.tasks == [task1]
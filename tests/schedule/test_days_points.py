@@ -0,0 +1,88 @@
+"""
+Unit test cases for flowshop/schedule.py.
+"""
+
+from copy import copy
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from flowshop import Schedule
+from flowshop.utils import random_tasks
+
+
+def expected_points(schedule: Schedule, start_date: date, end_date: date) -> float:
+    """ Points of tasks in an interval, computed with Schedule.tasks_in_interval(). """
+
+    start_time = datetime(start_date.year, start_date.month, start_date.day)
+    end_time = datetime(end_date.year, end_date.month, end_date.day)
+    tasks = schedule.tasks_in_interval(start_time, end_time)
+    return sum(task.points() for task in tasks)
+
+
+def test_days_points_ranges():
+    """
+    Test Schedule.days_points() over single days and ranges of days, for tasks which
+    often cross midnight.
+    """
+
+    tasks = random_tasks(300, num_days=100, density=0.9)
+    schedule = Schedule("test", tasks)
+
+    first_date = date(2020, 1, 5)
+    for start in range(0, 102, 5):
+        for length in [1, 2, 7, 30]:
+            start_date = first_date + timedelta(days=start)
+            end_date = start_date + timedelta(days=length)
+            assert schedule.days_points(start_date, end_date) == pytest.approx(
+                expected_points(schedule, start_date, end_date)
+            )
+
+
+def test_days_points_edits():
+    """
+    Test that Schedule.days_points() is updated when tasks are added, removed,
+    replaced and shifted.
+    """
+
+    tasks = random_tasks(200, num_days=50, density=0.9)
+    schedule = Schedule("test", tasks[:100])
+    start_date = date(2020, 1, 6)
+    end_date = date(2020, 3, 1)
+    schedule.days_points(start_date, end_date)
+
+    schedule.add_tasks(tasks[100:])
+    schedule.remove_task(5)
+    task = copy(schedule.tasks[20])
+    task.priority = 5.0
+    schedule.replace_task(20, task)
+    num_tasks = len(schedule.tasks)
+    schedule.shift_tasks(num_tasks - 10, num_tasks, timedelta(days=1))
+
+    for day in range(50):
+        day_start = start_date + timedelta(days=day)
+        day_end = day_start + timedelta(days=1)
+        assert schedule.days_points(day_start, day_end) == pytest.approx(
+            expected_points(schedule, day_start, day_end)
+        )
+    assert schedule.days_points(start_date, end_date) == pytest.approx(
+        expected_points(schedule, start_date, end_date)
+    )
+
+
+def test_days_points_datetime():
+    """
+    Test that Schedule.days_points() counts datetimes as the day they fall on.
+    """
+
+    tasks = random_tasks(100, num_days=20, density=0.9)
+    schedule = Schedule("test", tasks)
+    for day in range(20):
+        start_date = date(2020, 1, 6) + timedelta(days=day)
+        start_time = datetime.combine(start_date, time(hour=12))
+        for length in [1, 3]:
+            assert schedule.days_points(
+                start_time, start_time + timedelta(days=length)
+            ) == pytest.approx(
+                schedule.days_points(start_date, start_date + timedelta(days=length))
+            )
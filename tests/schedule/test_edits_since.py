@@ -0,0 +1,39 @@
+"""
+Unit test cases for flowshop/schedule.py.
+"""
+
+from copy import copy
+from datetime import timedelta
+
+from flowshop import Schedule
+from flowshop.utils import random_tasks
+
+
+def test_edits_since():
+    """
+    Test that Schedule.edits_since() returns the smallest edit which changes the old
+    schedule into the new one.
+    """
+
+    old = Schedule("test", random_tasks(25))
+    assert old.edits_since(old.copy()) == (len(old.tasks), (), ())
+
+    new = old.copy()
+    new.remove_task(3)
+    task = copy(new.tasks[10])
+    task.name = "edited"
+    new.replace_task(10, task)
+    assert new.edits_since(old) == (
+        3,
+        tuple(old.tasks[3:12]),
+        tuple(new.tasks[3:11]),
+    )
+
+    # Tasks which are equal but not the same objects are unchanged as well.
+    shifted = Schedule("test", [copy(task) for task in old.tasks])
+    shifted.shift_tasks(20, 25, timedelta(minutes=1))
+    assert shifted.edits_since(old) == (
+        20,
+        tuple(old.tasks[20:25]),
+        tuple(shifted.tasks[20:25]),
+    )
@@ -0,0 +1,163 @@
+"""
+Unit test cases for Schedule.find_slot() in flowshop/schedule.py.
+"""
+
+import random
+from datetime import datetime, time, timedelta
+from typing import Optional
+
+import pytest
+
+from flowshop import Schedule, Task
+from flowshop.gaps import GapIndex
+from flowshop.utils import random_tasks
+
+
+START_TIME = datetime(2020, 1, 6)
+
+
+def brute_force_slot(
+    schedule: Schedule,
+    duration: timedelta,
+    earliest: datetime,
+    latest: datetime,
+    weekdays=None,
+    day_start: time = None,
+    day_end: time = None,
+) -> Optional[datetime]:
+    """
+    Find the earliest free slot by trying ``earliest``, the end of every task and the
+    start of every day as start times.
+    """
+
+    constrained = weekdays is not None or day_start is not None or day_end is not None
+    weekdays = range(7) if weekdays is None else weekdays
+    day_start = time() if day_start is None else day_start
+
+    candidates = {earliest}
+    candidates.update(task.end_time for task in schedule.tasks)
+    day = earliest.date()
+    while datetime.combine(day, time()) < latest:
+        candidates.add(datetime.combine(day, day_start))
+        day += timedelta(days=1)
+
+    for start in sorted(candidates):
+        end = start + duration
+        day_limit = datetime.combine(
+            start.date() + timedelta(days=int(day_end is None)),
+            time() if day_end is None else day_end,
+        )
+        if (
+            earliest <= start
+            and end <= latest
+            and not (
+                constrained
+                and (
+                    start.weekday() not in weekdays
+                    or start.time() < day_start
+                    or end > day_limit
+                )
+            )
+            and not any(
+                task.start_time < end and task.end_time > start
+                for task in schedule.tasks
+            )
+        ):
+            return start
+    return None
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_find_slot_random(seed):
+    """
+    Test that the earliest slot matches a brute force search, with and without
+    constraints on days and times of day.
+    """
+
+    rng = random.Random(seed)
+    schedule = Schedule("test", random_tasks(100, density=0.8, seed=seed))
+    for _ in range(50):
+        duration = timedelta(minutes=rng.choice([10, 30, 60, 120, 300]))
+        earliest = START_TIME + timedelta(hours=rng.uniform(-24, 10 * 24))
+        latest = earliest + timedelta(hours=rng.choice([3, 24, 24 * 5]))
+        assert schedule.find_slot(duration, earliest, latest) == brute_force_slot(
+            schedule, duration, earliest, latest
+        )
+
+        weekdays = rng.sample(range(7), rng.randint(1, 7))
+        day_start = time(hour=rng.randrange(12))
+        day_end = rng.choice([None, time(hour=rng.randrange(13, 24))])
+        assert schedule.find_slot(
+            duration, earliest, latest, weekdays, day_start, day_end
+        ) == brute_force_slot(
+            schedule, duration, earliest, latest, weekdays, day_start, day_end
+        )
+
+
+def test_find_slot_best_fit():
+    """
+    Test that the best fit slot is in the shortest gap which fits, and that the slots
+    before the first task and after the last one are unbounded.
+    """
+
+    schedule = Schedule(
+        "test",
+        [
+            Task("a", 1.0, datetime(2020, 5, 1, 9), datetime(2020, 5, 1, 10)),
+            Task("b", 1.0, datetime(2020, 5, 1, 13), datetime(2020, 5, 1, 14)),
+            Task("c", 1.0, datetime(2020, 5, 1, 15), datetime(2020, 5, 1, 16)),
+        ],
+    )
+    earliest = datetime(2020, 5, 1, 9)
+    assert schedule.find_slot(timedelta(hours=1), earliest) == datetime(2020, 5, 1, 10)
+    assert schedule.find_slot(timedelta(hours=1), earliest, best_fit=True) == datetime(
+        2020, 5, 1, 14
+    )
+    assert schedule.find_slot(timedelta(hours=4), earliest) == datetime(2020, 5, 1, 16)
+    assert schedule.find_slot(
+        timedelta(hours=4), datetime(2020, 4, 1), datetime(2020, 5, 1, 10)
+    ) == datetime(2020, 4, 1)
+    assert (
+        schedule.find_slot(timedelta(hours=4), earliest, datetime(2020, 5, 1, 19, 59))
+        is None
+    )
+
+    # No day has a long enough window.
+    assert (
+        schedule.find_slot(
+            timedelta(hours=4), earliest, day_start=time(9), day_end=time(12)
+        )
+        is None
+    )
+    with pytest.raises(ValueError):
+        schedule.find_slot(
+            timedelta(hours=1), earliest, day_start=time(12), day_end=time(9)
+        )
+    with pytest.raises(ValueError):
+        schedule.find_slot(timedelta(hours=-1), earliest)
+
+
+def test_find_slot_edits():
+    """
+    Test that the index of free time is kept up to date through edits, and that copies
+    don't share it.
+    """
+
+    tasks = random_tasks(200)
+    schedule = Schedule("test", tasks[::2])
+    schedule.find_slot(timedelta(hours=1), START_TIME)
+    original = schedule.copy()
+
+    schedule.add_tasks(tasks[1:100:2])
+    schedule.add_task(tasks[151])
+    schedule.remove_task(30)
+    schedule.replace_task(
+        40, Task("new", 2.0, tasks[171].start_time, tasks[171].end_time)
+    )
+    schedule.shift_tasks(60, 63, timedelta(minutes=1))
+    schedule.add_tasks(tasks[103:149:2])
+
+    assert list(schedule._gaps) == list(GapIndex.between(schedule.tasks))
+    assert list(original._gaps) == list(GapIndex.between(tasks[::2]))
+    for start, end in schedule._gaps:
+        assert schedule.find_slot(end - start, start) == start
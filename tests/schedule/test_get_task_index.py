@@ -2,9 +2,11 @@
 Unit test cases for flowshop/task.py.
 """
 
+import random
 from datetime import datetime, date
 
 from flowshop import Schedule, Task
+from flowshop.utils import random_tasks
 
 
 def test_get_task_index_valid():
@@ -129,3 +131,57 @@ def test_get_task_index_invalid():
             failed = True
 
         assert failed
+
+
+def test_get_task_index_edits():
+    """
+    Test Schedule.get_task_index() after adding and removing tasks, for every task in
+    the schedule.
+    """
+
+    tasks = random_tasks(200, num_days=30)
+    schedule = Schedule("test", tasks[::2])
+    schedule.get_task_index(tasks[0].date, 0)
+    schedule.add_tasks(tasks[1::2])
+    schedule.remove_task(0)
+    schedule.remove_task(-1)
+    schedule.add_task(tasks[0])
+
+    daily_index = 0
+    for task_index, task in enumerate(schedule.tasks):
+        if task_index > 0 and schedule.tasks[task_index - 1].date != task.date:
+            daily_index = 0
+        assert schedule.get_task_index(task.date, daily_index) == task_index
+        daily_index += 1
+
+    # The index after the last task of the last day should raise a ValueError.
+    last_date = schedule.tasks[-1].date
+    try:
+        schedule.get_task_index(last_date, daily_index)
+        assert False
+    except ValueError:
+        pass
+
+
+def test_get_task_index_updated_in_place():
+    """
+    Test that the day index is updated in place by each edit, rather than rebuilt, and
+    matches an index built from scratch after every edit.
+    """
+
+    tasks = random_tasks(300, num_days=30, density=0.3)
+    schedule = Schedule("test", tasks[::3])
+    rng = random.Random(0)
+    for task in tasks[1::3] + tasks[2::3]:
+        schedule.get_task_index(schedule.tasks[0].date, 0)
+        day_index = schedule._day_index
+        if rng.random() < 0.3:
+            schedule.remove_task(rng.randrange(len(schedule.tasks)))
+        else:
+            schedule.add_task(task)
+        assert schedule._day_index is day_index
+
+        rebuilt = schedule.copy()
+        rebuilt._day_index = None
+        assert schedule._day_index == rebuilt._get_day_index()
+        assert schedule._day_keys == rebuilt._day_keys
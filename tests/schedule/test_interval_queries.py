@@ -0,0 +1,98 @@
+"""
+Unit test cases for interval queries in flowshop/schedule.py: count_in_interval(),
+task_at() and the batch queries.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+from flowshop import Schedule, Task
+from flowshop.schedule import _overlaps
+from flowshop.utils import random_tasks
+
+
+START_TIME = datetime(2020, 1, 6)
+
+
+def random_windows(schedule: Schedule, num_windows: int, seed: int = 0) -> list:
+    """
+    Generate random windows, including windows which start or end exactly at the start
+    or end of a task, and degenerate windows.
+    """
+
+    rng = random.Random(seed)
+    times = [task.start_time for task in schedule.tasks]
+    times += [task.end_time for task in schedule.tasks]
+    windows = []
+    for _ in range(num_windows):
+        start_time = rng.choice(
+            [rng.choice(times), START_TIME + timedelta(hours=rng.uniform(-24, 400))]
+        )
+        end_time = rng.choice(
+            [
+                rng.choice(times),
+                start_time,
+                start_time + timedelta(hours=rng.uniform(-5, 30)),
+            ]
+        )
+        windows.append((start_time, end_time))
+    return windows
+
+
+def test_interval_queries_random():
+    """
+    Test interval queries against checking every task, for a schedule with zero length
+    tasks and a long task.
+    """
+
+    tasks = random_tasks(300, density=0.6)
+
+    # Zero length tasks go before the tasks which start at the same time.
+    tasks = [
+        Task("zero", 1.0, tasks[10].end_time, tasks[10].end_time),
+        Task("zero", 1.0, tasks[20].start_time, tasks[20].start_time),
+        *tasks,
+        Task("long", 1.0, tasks[-1].end_time, tasks[-1].end_time + timedelta(days=30)),
+    ]
+    schedule = Schedule("test", tasks)
+
+    windows = random_windows(schedule, 500)
+    expected = [
+        [task for task in schedule.tasks if _overlaps(task, start_time, end_time)]
+        for start_time, end_time in windows
+    ]
+    assert schedule.tasks_in_intervals(windows) == expected
+    assert schedule.count_in_intervals(windows) == [len(tasks) for tasks in expected]
+
+    time_points = [start_time for start_time, _ in windows]
+    running = [
+        [task for task in schedule.tasks if task.start_time <= point < task.end_time]
+        for point in time_points
+    ]
+    assert all(len(tasks) <= 1 for tasks in running)
+    assert schedule.tasks_at(time_points) == [
+        tasks[0] if tasks else None for tasks in running
+    ]
+
+
+def test_interval_queries_edits():
+    """
+    Test that interval queries stay correct through edits.
+    """
+
+    tasks = random_tasks(200)
+    schedule = Schedule("test", tasks[::2])
+    schedule.add_tasks(tasks[1:100:2])
+    schedule.remove_task(30)
+    schedule.replace_task(
+        40, Task("new", 2.0, tasks[151].start_time, tasks[151].end_time)
+    )
+    schedule.shift_tasks(60, 63, timedelta(minutes=1))
+
+    windows = random_windows(schedule, 200, seed=1)
+    assert schedule.tasks_in_intervals(windows) == [
+        [task for task in schedule.tasks if _overlaps(task, start_time, end_time)]
+        for start_time, end_time in windows
+    ]
+    assert schedule.task_at(tasks[151].start_time).name == "new"
+    assert schedule.task_at(tasks[151].end_time) is None
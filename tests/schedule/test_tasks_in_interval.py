@@ -139,3 +139,34 @@ def test_tasks_in_interval_surround():
     start_time = datetime(2020, 5, 1, hour=12)
     end_time = datetime(2020, 5, 1, hour=14)
     assert schedule.tasks_in_interval(start_time, end_time) == [task1, task2]
+
+
+def test_tasks_in_interval_early_start():
+    """
+    Test Schedule.tasks_in_interval() when a target task starts well before the interval
+    and a long task earlier in the schedule doesn't overlap the interval.
+    """
+
+    task1 = Task(
+        "task1",
+        priority=1.5,
+        start_time=datetime(2020, 4, 28, hour=12),
+        end_time=datetime(2020, 4, 30, hour=12),
+    )
+    task2 = Task(
+        "task2",
+        priority=2.0,
+        start_time=datetime(2020, 4, 30, hour=20),
+        end_time=datetime(2020, 5, 1, hour=2),
+    )
+    task3 = Task(
+        "task3",
+        priority=2.0,
+        start_time=datetime(2020, 5, 1, hour=13, minute=30),
+        end_time=datetime(2020, 5, 1, hour=14, minute=30),
+    )
+    schedule = Schedule("test", [task1, task2, task3])
+
+    start_time = datetime(2020, 5, 1)
+    end_time = datetime(2020, 5, 2)
+    assert schedule.tasks_in_interval(start_time, end_time) == [task2, task3]
@@ -236,3 +236,29 @@ def test_daily_points_score_full():
         )
         assert session.daily_score(day, cumulative=False) == ind_score[day]
         assert session.daily_score(day, cumulative=True) == cum_score[day]
+
+    # Test weekly values.
+    assert session.weekly_score() == cum_score[-1]
+    assert session.range_points(b, b + timedelta(days=7), planned=True) == p_cum_pts[-1]
+    assert session.range_points(b, b + timedelta(days=7), planned=False) == (
+        a_cum_pts[-1]
+    )
+
+
+def test_daily_points_score_datetime_base_date():
+    """ Daily points for a session whose base date is a datetime, as older saves hold. """
+
+    session = Session("test")
+    session.base_date = datetime.combine(session.base_date, time(hour=12))
+    session.insert_task(
+        day=4,
+        planned=True,
+        name="pt",
+        priority=1.0,
+        start_time=time(hour=9),
+        hours=2.5,
+    )
+
+    assert session.daily_points(4, planned=True, cumulative=False) == 2.5
+    assert session.daily_points(4, planned=True, cumulative=True) == 2.5
+    assert session.daily_score(4, cumulative=False) == 0.0
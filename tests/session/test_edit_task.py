@@ -152,3 +152,37 @@ def test_edit_task_time_sorted():
     assert pre_edit_history[-1][0].tasks[3] == original_task
     assert session.edit_history[-1][0].tasks[2] == new_task
     assert session.edit_history[-1][1] == pre_edit_history[-1][1]
+
+
+def test_edit_task_shared():
+    """
+    Edit the name of a single task, and check that the unedited tasks and the unedited
+    schedule are shared with the previous point in history instead of copied.
+    """
+
+    # Set up case. Note that we have to manually set the base date of the session in
+    # order to access the task, since it has a hard-coded date.
+    session = Session("example", load=True)
+    session.base_date = session.current_schedules()[0].tasks[0].start_time.date()
+    session.base_date -= timedelta(days=session.base_date.weekday())
+    planned = True
+    day = 4
+    task_index = 0
+    new_values = {"name": "new_name"}
+
+    # Edit task.
+    old_planned, old_actual = session.current_schedules()
+    session.edit_task(
+        planned=planned, day=day, task_index=task_index, new_values=new_values,
+    )
+    new_planned, new_actual = session.current_schedules()
+
+    # Test sharing between old and new schedules.
+    assert new_actual is old_actual
+    assert new_planned is not old_planned
+    assert new_planned.tasks[0] is not old_planned.tasks[0]
+    assert old_planned.tasks[0].name != "new_name"
+    assert all(
+        new_task is old_task
+        for new_task, old_task in zip(new_planned.tasks[1:], old_planned.tasks[1:])
+    )
@@ -4,6 +4,8 @@ Unit test cases for insert_task() in flowshop/session.py.
 
 from datetime import datetime, time, timedelta
 
+import pytest
+
 from flowshop import Session, Task
 from flowshop.utils import list_exclude
 
@@ -238,3 +240,43 @@ def test_insert_task_overlap():
 
     # Ensure error was thrown.
     assert error
+
+
+def test_insert_task_auto_place():
+    """
+    Insert tasks without a start time, which are placed at the earliest free time on
+    their day, and check that an error gets raised when the day is full.
+    """
+
+    # Construct session.
+    session = Session("test")
+    session.insert_task(
+        day=2,
+        planned=True,
+        name="first",
+        priority=1.0,
+        start_time=time(hour=0),
+        hours=2,
+    )
+
+    # Insert tasks.
+    for name in ["second", "third"]:
+        session.insert_task(
+            day=2, planned=True, name=name, priority=1.0, start_time=None, hours=11
+        )
+
+    # Test session values.
+    planned, actual = session.current_schedules()
+    day_start = datetime.combine(session.base_date + timedelta(days=2), time())
+    assert [task.name for task in planned.tasks] == ["first", "second", "third"]
+    assert planned.tasks[1].start_time == day_start + timedelta(hours=2)
+    assert planned.tasks[2].start_time == day_start + timedelta(hours=13)
+    assert len(actual.tasks) == 0
+
+    # The day is full.
+    history_pos = session.history_pos
+    with pytest.raises(ValueError):
+        session.insert_task(
+            day=2, planned=True, name="fourth", priority=1.0, start_time=None, hours=1
+        )
+    assert session.history_pos == history_pos
@@ -0,0 +1,118 @@
+"""
+Unit test cases for repair_plan() and auto_repair in flowshop/session.py.
+"""
+
+from datetime import datetime, time, timedelta
+
+import pytest
+
+from flowshop import Session
+
+
+def insert_planned_day(session: Session) -> None:
+    """ Plan three consecutive one hour tasks from 9am on the first day. """
+
+    for i, hour in enumerate([9, 10, 11]):
+        session.insert_task(
+            day=0,
+            planned=True,
+            name="task%d" % i,
+            priority=1.0,
+            start_time=time(hour=hour),
+            hours=1.0,
+        )
+
+
+def test_auto_repair():
+    """
+    Test that a task inserted in the actual schedule shifts the rest of the plan around
+    the actual tasks after it, in the same point in history.
+    """
+
+    session = Session("test", auto_repair=True)
+    insert_planned_day(session)
+    session.insert_task(
+        day=0,
+        planned=False,
+        name="meeting",
+        priority=1.0,
+        start_time=time(hour=11),
+        hours=0.5,
+    )
+    session.insert_task(
+        day=0,
+        planned=False,
+        name="task0",
+        priority=1.0,
+        start_time=time(hour=9),
+        hours=1.0,
+    )
+
+    assert session.history_pos == 5
+    planned, actual = session.current_schedules()
+    assert len(actual.tasks) == 2
+    assert [task.start_time.time() for task in planned.tasks] == [
+        time(hour=9),
+        time(hour=10),
+        time(hour=11, minute=30),
+    ]
+    assert planned.tasks[0] is session.edit_history[4][0].tasks[0]
+
+    # Undo restores the plan along with the actual schedule.
+    session.undo()
+    planned, actual = session.current_schedules()
+    assert len(actual.tasks) == 1
+    assert planned.tasks[2].start_time.time() == time(hour=11)
+
+
+def test_auto_repair_in_progress():
+    """
+    Test that auto_repair keeps the planned task which an actual task was logged
+    against, so that it still counts towards the score.
+    """
+
+    session = Session("test", auto_repair=True)
+    for planned, hours in [(True, 3.0), (False, 2.5)]:
+        session.insert_task(
+            day=0,
+            planned=planned,
+            name="work",
+            priority=1.0,
+            start_time=time(hour=20),
+            hours=hours,
+        )
+
+    planned, _ = session.current_schedules()
+    assert len(planned.tasks) == 1
+    assert session.daily_points(0, planned=True, cumulative=False) == 3.0
+    assert session.daily_score(0, cumulative=False) == pytest.approx(250.0 / 3)
+
+
+def test_repair_plan_manual():
+    """
+    Test that without auto_repair the plan is only repaired on request, and that
+    repairing an unchanged plan doesn't add to the history.
+    """
+
+    session = Session("test")
+    insert_planned_day(session)
+    session.insert_task(
+        day=0,
+        planned=False,
+        name="task0",
+        priority=1.0,
+        start_time=time(hour=9),
+        hours=1.5,
+    )
+    planned, _ = session.current_schedules()
+    assert planned.tasks[1].start_time.time() == time(hour=10)
+
+    now = datetime.combine(session.base_date, time(hour=10))
+    session.repair_plan(now)
+    assert session.history_pos == 5
+    planned, _ = session.current_schedules()
+    assert planned.tasks[1].start_time.time() == time(hour=10, minute=30)
+
+    session.repair_plan(now)
+    assert session.history_pos == 5
+    assert len(session.edit_history) == 6
@@ -192,3 +192,35 @@ def test_set_new_schedules_3():
     assert session.edit_history[1][1].tasks == [actual_tasks[1]]
     assert session.edit_history[2][0].tasks == [planned_tasks[0], planned_tasks[2]]
     assert session.edit_history[2][1].tasks == [actual_tasks[0], actual_tasks[2]]
+
+
+def test_set_new_schedules_history_len():
+    """
+    Call `set_new_schedules()` more times than the maximum history length, and check
+    that the oldest points in history are dropped.
+    """
+
+    # Construct session.
+    session = Session("test", history_len=3)
+
+    # Set new schedules in session.
+    schedules = []
+    for i in range(5):
+        task = Task(
+            "task_%d" % i,
+            priority=1.0,
+            start_time=datetime(2020, 5, 1, hour=i),
+            end_time=datetime(2020, 5, 1, hour=i, minute=30),
+        )
+        schedules.append((Schedule("planned", [task]), Schedule("actual")))
+        session.set_new_schedules(*schedules[-1])
+
+    # Test session values.
+    assert session.history_pos == 2
+    assert len(session.edit_history) == 3
+    assert list(session.edit_history) == schedules[-3:]
+    session.undo()
+    session.undo()
+    session.undo()
+    assert session.history_pos == 0
+    assert session.current_schedules() == schedules[-3]
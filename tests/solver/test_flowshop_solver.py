@@ -0,0 +1,143 @@
+"""
+Unit test cases for flowshop/solver.
+"""
+
+import itertools
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from flowshop.solver import (
+    FlowShopProblem,
+    WEIGHTED_COMPLETION,
+    johnson,
+    neh,
+    iterated_greedy,
+    taillard_problem,
+)
+from flowshop.solver.heuristics import insertion_makespans
+
+
+# Processing times of the jobs of Taillard's first instance on the first machine.
+TA001_FIRST_MACHINE = "54 83 15 71 77 36 53 38 27 87 76 91 14 29 12 77 32 87 68 94"
+
+
+def random_problem(
+    num_jobs: int, num_machines: int, objective: str = "makespan", seed: int = 0
+) -> FlowShopProblem:
+    """ Generate a problem with random processing times and weights. """
+
+    rng = random.Random(seed)
+    return FlowShopProblem(
+        [[rng.randint(1, 20) for _ in range(num_machines)] for _ in range(num_jobs)],
+        objective=objective,
+        weights=[rng.choice([1.0, 2.0, 3.0]) for _ in range(num_jobs)],
+    )
+
+
+def brute_force(problem: FlowShopProblem) -> float:
+    """ Find the best value of the objective over every sequence of jobs. """
+
+    return min(
+        problem.evaluate(sequence)
+        for sequence in itertools.permutations(range(problem.num_jobs))
+    )
+
+
+def test_taillard_ta001():
+    """
+    Test generating Taillard's first instance, along with its lower bound and the
+    makespan of its NEH sequence, which are known.
+    """
+
+    problem = taillard_problem("ta001")
+    assert (problem.num_jobs, problem.num_machines) == (20, 5)
+    assert [times[0] for times in problem.processing_times] == [
+        int(time) for time in TA001_FIRST_MACHINE.split()
+    ]
+    assert problem.lower_bound() == 1232
+    assert problem.makespan(neh(problem)) == 1286
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_insertion_makespans(seed):
+    """
+    Test that the accelerated makespans of inserting a job at each position of a
+    sequence match the makespans of the sequences.
+    """
+
+    problem = random_problem(8, 4, seed=seed)
+    sequence = list(range(7))
+    random.Random(seed).shuffle(sequence)
+    assert insertion_makespans(problem, sequence, 7) == [
+        problem.makespan(sequence[:position] + [7] + sequence[position:])
+        for position in range(len(sequence) + 1)
+    ]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_johnson(seed):
+    """
+    Test that Johnson's rule finds the best makespan on two machines.
+    """
+
+    problem = random_problem(7, 2, seed=seed)
+    assert problem.makespan(johnson(problem)) == brute_force(problem)
+
+    with pytest.raises(ValueError):
+        johnson(random_problem(7, 3, seed=seed))
+
+
+@pytest.mark.parametrize("objective", ["makespan", WEIGHTED_COMPLETION])
+def test_iterated_greedy(objective):
+    """
+    Test that iterated greedy finds the best sequence of a small problem, and
+    improves on NEH.
+    """
+
+    problem = random_problem(7, 4, objective=objective)
+    sequence, value = iterated_greedy(problem, max_iterations=200)
+    assert sorted(sequence) == list(range(problem.num_jobs))
+    assert value == problem.evaluate(sequence)
+    assert value <= problem.evaluate(neh(problem))
+    assert value == brute_force(problem)
+
+
+def test_to_schedules():
+    """
+    Test converting a sequence of jobs into one schedule per machine.
+    """
+
+    problem = random_problem(5, 3)
+    sequence = neh(problem)
+    start_time = datetime(2020, 6, 15)
+    schedules = problem.to_schedules(sequence, start_time, timedelta(minutes=5))
+
+    assert len(schedules) == problem.num_machines
+    for machine, schedule in enumerate(schedules):
+        assert [task.name for task in schedule.tasks] == [
+            problem.names[job] for job in sequence
+        ]
+        for task, job in zip(schedule.tasks, sequence):
+            assert task.duration == timedelta(
+                minutes=5 * problem.processing_times[job][machine]
+            )
+            if machine > 0:
+                previous = schedules[machine - 1].tasks[sequence.index(job)]
+                assert task.start_time >= previous.end_time
+    assert schedules[-1].tasks[-1].end_time == start_time + timedelta(
+        minutes=5 * problem.makespan(sequence)
+    )
+
+
+def test_invalid_problem():
+    """
+    Test that problems with an unrecognized objective, or with jobs on different
+    numbers of machines, are rejected.
+    """
+
+    with pytest.raises(ValueError):
+        FlowShopProblem([[1, 2]], objective="tardiness")
+    with pytest.raises(ValueError):
+        FlowShopProblem([[1, 2], [1]])
@@ -0,0 +1,274 @@
+"""
+Unit test cases for flowshop/sqlite_schedule.py.
+"""
+
+import gc
+import pickle
+import random
+from datetime import datetime, date, time, timedelta
+
+import pytest
+
+from flowshop import Schedule, Session, Task
+from flowshop import files
+from flowshop.history import EditHistory
+from flowshop.sqlite_schedule import SQLiteSchedule, close_database
+from flowshop.utils import random_tasks
+
+
+@pytest.fixture
+def path(tmp_path):
+    """ Path of a database in a temporary directory, which is closed afterwards. """
+
+    path = str(tmp_path / "schedules.db")
+    yield path
+    close_database(path)
+
+
+def assert_same_schedule(sqlite_schedule: SQLiteSchedule, schedule: Schedule) -> None:
+    """ Check that the queries of an SQLiteSchedule agree with those of a Schedule. """
+
+    assert sqlite_schedule.tasks == schedule.tasks
+    assert sqlite_schedule.points() == pytest.approx(schedule.points())
+    for day in range(0, 60, 4):
+        start_date = date(2020, 1, 6) + timedelta(days=day)
+        start_time = datetime.combine(start_date, time(hour=5))
+        end_time = start_time + timedelta(days=2)
+        assert sqlite_schedule.tasks_in_interval(
+            start_time, end_time
+        ) == schedule.tasks_in_interval(start_time, end_time)
+        assert sqlite_schedule.interval_points(start_time, end_time) == pytest.approx(
+            schedule.interval_points(start_time, end_time)
+        )
+        assert sqlite_schedule.count_in_interval(
+            start_time, end_time
+        ) == schedule.count_in_interval(start_time, end_time)
+        assert sqlite_schedule.task_at(start_time) == schedule.task_at(start_time)
+        for hours in [0.5, 2, 8]:
+            duration = timedelta(hours=hours)
+            assert sqlite_schedule.find_slot(
+                duration, start_time, end_time
+            ) == schedule.find_slot(duration, start_time, end_time)
+            assert sqlite_schedule.find_slot(
+                duration, start_time, best_fit=True
+            ) == schedule.find_slot(duration, start_time, best_fit=True)
+        assert sqlite_schedule.days_points(
+            start_date, start_date + timedelta(days=3)
+        ) == pytest.approx(schedule.days_points(start_date, start_date + timedelta(3)))
+        for daily_index in [0, 4]:
+            for method in ["get_task_index", "get_task"]:
+                assert same_result(
+                    getattr(sqlite_schedule, method), getattr(schedule, method)
+                )(start_date, daily_index)
+
+
+def same_result(method, other_method):
+    """
+    Wrap two methods into a function which checks that they return the same result or
+    both raise a ValueError.
+    """
+
+    def check(*args):
+        try:
+            result = method(*args)
+        except ValueError:
+            with pytest.raises(ValueError):
+                other_method(*args)
+            return True
+        return result == other_method(*args)
+
+    return check
+
+
+def test_sqlite_schedule_queries(path):
+    """
+    Test that SQLiteSchedule answers queries like Schedule.
+    """
+
+    tasks = random_tasks(500, density=0.7)
+    assert_same_schedule(
+        SQLiteSchedule.create(path, "test", tasks), Schedule("test", tasks)
+    )
+
+    with pytest.raises(ValueError):
+        SQLiteSchedule.create(path, "test", tasks)
+    with pytest.raises(ValueError):
+        SQLiteSchedule.create(path, "overlapping", [tasks[0], tasks[0]])
+    with pytest.raises(ValueError):
+        SQLiteSchedule(path, "missing")
+
+
+def test_sqlite_schedule_edits(path):
+    """
+    Test editing an SQLiteSchedule, and that copies don't share edits.
+    """
+
+    tasks = random_tasks(500)
+    sqlite_schedule = SQLiteSchedule.create(path, "test", tasks[::2])
+    schedule = Schedule("test", tasks[::2])
+    original = sqlite_schedule.copy()
+
+    for edited in [sqlite_schedule, schedule]:
+        edited.add_tasks(tasks[1:100:2])
+        edited.add_task(tasks[201])
+        edited.remove_task(30)
+        edited.replace_task(
+            40, Task("new", 2.0, tasks[151].start_time, tasks[151].end_time)
+        )
+        edited.shift_tasks(60, 63, timedelta(minutes=1))
+        with pytest.raises(ValueError):
+            edited.add_task(tasks[0])
+    assert_same_schedule(sqlite_schedule, schedule)
+    assert_same_schedule(original, Schedule("test", tasks[::2]))
+    assert sqlite_schedule != original
+    assert sqlite_schedule.copy() == sqlite_schedule
+
+    # Removing an added task and adding back a removed one leaves the overlay as it was.
+    copy = original.copy()
+    removed = copy.remove_task(3)
+    copy.add_task(removed)
+    assert copy == original
+    assert not copy._removed and not copy._added
+
+
+def test_sqlite_schedule_session(path, tmp_path, monkeypatch):
+    """
+    Test editing SQLiteSchedules through a session, with undo and redo, and saving and
+    loading the session.
+    """
+
+    monkeypatch.setattr(files, "STORAGE_DIR", str(tmp_path))
+    tasks = random_tasks(700)
+    session = Session("test")
+    session.edit_history = EditHistory(
+        [
+            (
+                SQLiteSchedule.create(path, "planned", tasks),
+                SQLiteSchedule.create(path, "actual", tasks[::3]),
+            )
+        ],
+        max_len=session.history_len,
+    )
+    session.base_date = date(2020, 1, 6)
+
+    session.insert_task(2, True, "inserted", 1.0, time(hour=23, minute=59), 0.01)
+    session.edit_task(True, 1, 2, {"name": "edited", "priority": 3.0})
+    session.delete_task(False, 0, 1)
+    session.move_tasks(True, 3, 0, 2, timedelta(seconds=1))
+    assert session.get_task(True, 1, 2).name == "edited"
+
+    # Edits are stored as deltas, without reading every task.
+    assert not session.edit_history.is_checkpoint(1)
+    planned, actual = session.current_schedules()
+    assert len(planned._added) <= 8 and len(actual._removed) == 1
+
+    scores = [session.weekly_score()]
+    for _ in range(3):
+        session.undo()
+    scores.append(session.weekly_score())
+    assert session.get_task(True, 1, 2).name != "edited"
+    for _ in range(3):
+        session.redo()
+    assert session.weekly_score() == pytest.approx(scores[0])
+    assert session.get_task(True, 1, 2).name == "edited"
+
+    session.save()
+    loaded_session = Session("test", load=True)
+    assert loaded_session.weekly_score() == pytest.approx(scores[0])
+    assert list(loaded_session.edit_history) == list(session.edit_history)
+
+
+def test_sqlite_schedule_find_slot(path):
+    """
+    Test that SQLiteSchedule.find_slot() agrees with Schedule.find_slot() for random
+    windows, including windows which end before the gap that fits would end.
+    """
+
+    task_start = datetime(2020, 5, 3, 17)
+    task = Task("task", 1.0, task_start, task_start + timedelta(hours=1))
+    earliest = datetime(2020, 4, 30, 19, 30)
+    latest = datetime(2020, 5, 2, 19, 30)
+    sqlite_schedule = SQLiteSchedule.create(path, "single", [task])
+    assert sqlite_schedule.find_slot(timedelta(minutes=30), earliest, latest) == (
+        Schedule("single", [task]).find_slot(timedelta(minutes=30), earliest, latest)
+    )
+
+    rng = random.Random(0)
+    tasks = random_tasks(200, num_days=60, density=0.3)
+    sqlite_schedule = SQLiteSchedule.create(path, "test", tasks)
+    schedule = Schedule("test", tasks)
+    for _ in range(300):
+        earliest = datetime(2020, 1, 1) + timedelta(hours=rng.randrange(70 * 24))
+        latest = earliest + timedelta(minutes=rng.randrange(10, 5 * 24 * 60))
+        duration = timedelta(minutes=rng.randrange(0, 24 * 60, 10))
+        kwargs = rng.choice(
+            [{}, {"best_fit": True}, {"weekdays": [1, 3], "day_start": time(9)}]
+        )
+        assert sqlite_schedule.find_slot(
+            duration, earliest, latest, **kwargs
+        ) == schedule.find_slot(duration, earliest, latest, **kwargs)
+
+
+def test_sqlite_schedule_commit(path):
+    """
+    Test committing the overlay of an SQLiteSchedule into its rows.
+    """
+
+    tasks = random_tasks(300)
+    sqlite_schedule = SQLiteSchedule.create(path, "test", tasks[::2])
+    schedule = Schedule("test", tasks[::2])
+    original = sqlite_schedule.copy()
+    for edited in [sqlite_schedule, schedule]:
+        edited.add_tasks(tasks[1:50:2])
+        edited.remove_task(100)
+
+    sqlite_schedule.commit()
+    assert not sqlite_schedule._removed and not sqlite_schedule._added
+    assert_same_schedule(sqlite_schedule, schedule)
+    assert_same_schedule(pickle.loads(pickle.dumps(sqlite_schedule)), schedule)
+    assert_same_schedule(SQLiteSchedule(path, "test"), schedule)
+    with pytest.raises(ValueError):
+        original.points()
+
+
+def test_sqlite_schedule_commit_reinsert(path):
+    """
+    Test removing a task and committing, then inserting and removing another task.
+    Rows of removed tasks must not be mistaken for rows of tasks added afterwards, even
+    if the removed Task object is added again.
+    """
+
+    tasks = random_tasks(20)
+    sqlite_schedule = SQLiteSchedule.create(path, "test", tasks)
+    schedule = Schedule("test", tasks)
+    fresh_start = tasks[-1].end_time + timedelta(hours=1)
+    fresh = Task("fresh", 1.0, fresh_start, fresh_start + timedelta(hours=1))
+    for edited in [sqlite_schedule, schedule]:
+        removed = edited.remove_task(len(edited.tasks) - 1)
+        edited.add_task(fresh)
+    sqlite_schedule.commit()
+    assert sqlite_schedule.tasks[-1] is fresh
+
+    for edited in [sqlite_schedule, schedule]:
+        edited.add_task(removed)
+        edited.remove_task(len(edited.tasks) - 2)
+    sqlite_schedule.commit()
+    assert sqlite_schedule.tasks[-1].name == "fresh"
+    assert_same_schedule(sqlite_schedule, schedule)
+    assert_same_schedule(SQLiteSchedule(path, "test"), schedule)
+
+
+def test_sqlite_schedule_task_cache(path):
+    """
+    Test that Task objects of rows are shared between copies of a schedule, but are
+    only cached while they are in use.
+    """
+
+    sqlite_schedule = SQLiteSchedule.create(path, "test", random_tasks(500))
+    copy = sqlite_schedule.copy()
+    assert sqlite_schedule.tasks[10] is copy.tasks[10]
+
+    removed = sqlite_schedule.remove_task(10)
+    gc.collect()
+    assert list(sqlite_schedule._table.tasks.values()) == [removed]
+    assert copy.tasks[10] is removed
@@ -0,0 +1,127 @@
+"""
+Unit test cases for flowshop/store.py.
+"""
+
+import os
+from datetime import date, datetime, time
+
+import pytest
+
+from flowshop import Session
+from flowshop import files
+from flowshop.session import save_sessions, load_sessions
+
+
+@pytest.fixture(autouse=True)
+def storage_dir(tmp_path, monkeypatch):
+    """ Save sessions to a temporary directory. """
+    monkeypatch.setattr(files, "STORAGE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def make_session(name: str, num_tasks: int, compression: str = None) -> Session:
+    """ Construct a session in the session store with ``num_tasks`` tasks. """
+
+    session = Session(name, storage=files.STORE, compression=compression)
+    session.base_date = date(2020, 6, 1)
+    for i in range(num_tasks):
+        session.insert_task(
+            day=i % 7,
+            planned=i % 2 == 0,
+            name="%s_task%d" % (name, i),
+            priority=1.0,
+            start_time=time(hour=i // 7),
+            hours=1.0,
+        )
+    return session
+
+
+def test_store_save_load():
+    """
+    Test saving sessions to the session store and loading them again through Session.
+    """
+
+    session = make_session("test", 10, "zlib")
+    session.save()
+    assert files.saved_session_storage("test") == files.STORE
+    assert files.saved_session_compression("test") == "zlib"
+    assert not any(name.startswith("test") for name in os.listdir(files.STORAGE_DIR))
+
+    loaded_session = Session("test", load=True)
+    assert loaded_session.storage == files.STORE
+    assert loaded_session.compression == "zlib"
+    assert loaded_session.history_pos == session.history_pos
+    assert list(loaded_session.edit_history) == list(session.edit_history)
+
+    with pytest.raises(ValueError):
+        Session("test")
+
+
+def test_store_catalog():
+    """
+    Test that the catalog lists each session in the store with its size, modified time
+    and current week.
+    """
+
+    sessions = [make_session("session%d" % i, i) for i in range(5)]
+    sessions[3].base_date = datetime(2020, 6, 8)
+    save_sessions(sessions)
+    with files.open_store() as store:
+        catalog = store.catalog()
+        assert len(store) == 5
+
+    assert [entry.name for entry in catalog] == ["session%d" % i for i in range(5)]
+    assert [entry.base_date for entry in catalog] == [
+        date(2020, 6, 1),
+        date(2020, 6, 1),
+        date(2020, 6, 1),
+        datetime(2020, 6, 8),
+        date(2020, 6, 1),
+    ]
+    assert all(entry.compression is None for entry in catalog)
+    assert catalog[4].size > catalog[0].size
+    assert len({entry.modified for entry in catalog}) == 1
+
+
+def test_store_load_many():
+    """
+    Test saving and loading many sessions to and from the store at once.
+    """
+
+    sessions = [make_session("session%d" % i, 3) for i in range(3)]
+    save_sessions(sessions)
+
+    names = ["session2", "session0"]
+    loaded_sessions = load_sessions(names, history_len=5)
+    assert [session.name for session in loaded_sessions] == names
+    for session, loaded_session in zip([sessions[2], sessions[0]], loaded_sessions):
+        assert loaded_session.storage == files.STORE
+        assert loaded_session.history_len == 5
+        assert list(loaded_session.edit_history) == list(session.edit_history)
+
+    with pytest.raises(ValueError):
+        load_sessions(["session0", "missing"])
+
+    # Edits to a loaded session are saved back to the store.
+    loaded_sessions[0].delete_task(True, 0, 0)
+    loaded_sessions[0].save()
+    (reloaded_session,) = load_sessions(["session2"])
+    assert list(reloaded_session.edit_history) == list(loaded_sessions[0].edit_history)
+
+
+def test_store_migrate_remove():
+    """
+    Test migrating a session between a file and the store, and removing it.
+    """
+
+    session = Session("test", storage=files.PICKLE)
+    session.save()
+    assert files.migrate_session("test", files.STORE) == files.PICKLE
+    assert not os.path.isfile(files.filename_from_name("test", files.PICKLE))
+    assert files.saved_session_size("test") > 0
+    assert list(Session("test", load=True).edit_history) == list(session.edit_history)
+
+    files.remove_saved_session("test", files.STORE)
+    assert not files.saved_session_exists("test")
+    with pytest.raises(ValueError):
+        files.remove_saved_session("test", files.STORE)
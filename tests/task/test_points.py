@@ -29,3 +29,21 @@ def test_points_empty():
         end_time=datetime(2020, 5, 1, hour=13, minute=30),
     )
     assert task.points() == 0.0
+
+
+def test_points_changed():
+    """ Test Task.points() after changing the priority and times of a task. """
+
+    task = Task(
+        "test",
+        priority=0.5,
+        start_time=datetime(2020, 5, 1, hour=12),
+        end_time=datetime(2020, 5, 1, hour=13, minute=30),
+    )
+    assert task.points() == 0.75
+    task.priority = 2.0
+    assert task.points() == 3.0
+    task.end_time = datetime(2020, 5, 1, hour=13)
+    assert task.points() == 2.0
+    task.start_time = datetime(2020, 5, 1, hour=11)
+    assert task.points() == 4.0
@@ -0,0 +1,46 @@
+"""
+Unit test cases for flowshop/task.py.
+"""
+
+import pickle
+from copy import copy
+from datetime import datetime
+
+from flowshop import Task
+
+
+def test_setstate_pickle():
+    """ Test pickling and unpickling a task. """
+
+    task = Task(
+        "test",
+        priority=0.5,
+        start_time=datetime(2020, 5, 1, hour=12),
+        end_time=datetime(2020, 5, 1, hour=13, minute=30),
+    )
+    task.points()
+    loaded_task = pickle.loads(pickle.dumps(task))
+
+    assert loaded_task == task
+    assert loaded_task.points() == 0.75
+    assert copy(task) == task
+
+
+def test_setstate_old_format():
+    """
+    Test Task.__setstate__() with the state of a task which was pickled before Task had
+    __slots__.
+    """
+
+    state = {
+        "name": "test",
+        "priority": 0.5,
+        "start_time": datetime(2020, 5, 1, hour=12),
+        "end_time": datetime(2020, 5, 1, hour=13, minute=30),
+        "state_vars": ["name", "priority", "start_time", "end_time"],
+    }
+    task = Task.__new__(Task)
+    task.__setstate__(state)
+
+    assert task == Task("test", 0.5, state["start_time"], state["end_time"])
+    assert task.points() == 0.75